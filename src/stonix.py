@@ -90,6 +90,11 @@ The following options control the running of the script:
       Generate a new config file with current options in the full format (shows all options).
  -l --list
       Print the list of installed rules that apply to this platform.
+ -j --jobs N
+      Run up to N rules at the same time in report mode.
+ --no-cache
+      Evaluate every rule in report mode, even those whose inputs did not
+      change since their last compliant report.
 
 WARNING! If run with the -f flag THIS PROGRAM WILL MODIFY
 SYSTEM SETTINGS!
@@ -140,10 +145,14 @@ from stonix_resources.observable import Observable
 from stonix_resources.configuration import Configuration
 from stonix_resources.environment import Environment
 from stonix_resources.StateChgLogger import StateChgLogger
-from stonix_resources.logdispatcher import LogPriority, LogDispatcher
+from stonix_resources.logdispatcher import LogPriority, LogDispatcher, LogEvent
 from stonix_resources.program_arguments import ProgramArguments
 from stonix_resources.CommandHelper import CommandHelper
 from stonix_resources.cli import Cli
+from stonix_resources.rulescheduler import RuleScheduler
+from stonix_resources.rulemanifest import RuleManifest
+from stonix_resources.resultcache import ResultCache
+from stonix_resources import filecache
 
 
 class Controller(Observable):
@@ -167,6 +176,9 @@ class Controller(Observable):
         self.pcf = False
         self.pcs = False
         self.list = False
+        self.jobs = 1
+        self.usecache = True
+        self.catalog = []
 
         self.euid = self.environ.geteuid()
         test_mode = self.environ.get_test_mode()
@@ -197,6 +209,12 @@ class Controller(Observable):
         self.ch = CommandHelper(self.logger)
         self.statechglogger = StateChgLogger(self.logger, self.environ)
         self.logger.log(LogPriority.DEBUG, 'State Logger Started')
+        if self.euid == 0:
+            resultpath = "/var/db/stonix/resultcache.json"
+        else:
+            resultpath = os.path.join(self.environ.get_log_path(),
+                                      "resultcache.json")
+        self.resultcache = ResultCache(resultpath, self.logger)
 
         if not self.safetycheck():
             self.logger.log(LogPriority.CRITICAL, ['SafetyCheck', 'ERROR: Installation safety check failed!'])
@@ -269,7 +287,7 @@ class Controller(Observable):
         self.installedrules = self.findapplicable(allrules)
 
         # if no applicable rules are found, exit STONIX with message
-        if len(self.installedrules) == 0:
+        if len(self.installedrules) == 0 and not self.catalog:
             try:
                 self.releaselock()
             except:
@@ -286,7 +304,6 @@ class Controller(Observable):
         self.logger.log(LogPriority.DEBUG, ['OSFamily', self.environ.getosfamily()])
         self.logger.log(LogPriority.DEBUG, ['OSType', self.environ.getostype()])
         self.logger.log(LogPriority.DEBUG, ['OSVersion', self.environ.getosver()])
-        self.list = self.prog_args.getList()
 
         if self.list:
             self.__listrules()
@@ -346,6 +363,7 @@ class Controller(Observable):
         rulewalklist = []
         instruleclasses = []
         validrulefiles = []
+        buildmanifest = False
         rulenumbers = []
         rulenames = []
         initlist = ['__init__.py', '__init__.pyc', '__init__.pyo']
@@ -366,6 +384,8 @@ class Controller(Observable):
 
         rulefiles = os.listdir(str(rulesPath))
 
+        manifest = RuleManifest(self.logger, environ, rulesPath)
+
         #####
         # Check if stonix has been 'frozen' with pyinstaller, py2app, etc and
         # process rules accordingly
@@ -379,7 +399,24 @@ class Controller(Observable):
                     rulewalklist.append(item)
             self.logger.log(LogPriority.DEBUG,
                             ['Rule Walk list from keys: ', str(rulewalklist)])
+        elif manifest.load():
+            # Only import the rules that were selected and may apply
+            entries = manifest.select(self.getselectedrules())
+            if not entries and self.runrule:
+                # unknown rule names, load everything as before
+                entries = manifest.select()
+            if self.list:
+                # only rules that decide their own applicability need to
+                # be instantiated in order to list the applicable rules
+                self.catalog = [entry for entry in entries
+                                if not entry['customapplicable']]
+                entries = [entry for entry in entries
+                           if entry['customapplicable']]
+            for entry in entries:
+                rulewalklist.append(entry['module'] + '.' +
+                                    entry['classname'])
         else:
+            buildmanifest = True
             for rfile in rulefiles:
                 if rfile in initlist:
                     continue
@@ -485,8 +522,25 @@ class Controller(Observable):
                                 "Error instantiating rule: " + str(trace))
                 continue
 
+        if buildmanifest:
+            manifest.build(instruleclasses)
+            manifest.save()
+
         return instruleclasses
 
+    def getselectedrules(self):
+        """Return the names of the rules selected to run with -m.
+
+        :return: list of rule names, None when all rules are to be run
+        :rtype: list
+
+        """
+        if not self.runrule:
+            return None
+        if isinstance(self.runrule, list):
+            return self.runrule
+        return [self.runrule]
+
     def findapplicable(self, rules):
         """This method checks each rule to see if it is applicable on the current
         platform on which stonix is running. A list of applicable rule objects
@@ -591,23 +645,24 @@ class Controller(Observable):
             self.currulenum = rule.getrulenum()
             self.currulename = rule.getrulename()
             try:
-                self.logger.log(LogPriority.DEBUG, "****************** RULE START: " + str(self.currulename) + " ******************")
+                self.logger.logevent(LogEvent.RULESTART, str(self.currulename))
                 starttime = time.time()
-                self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
+                self.logger.logevent(LogEvent.STARTREPORT)
                 rule.report()
-                self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                self.logger.logevent(LogEvent.ENDREPORT)
                 if not rule.getrulesuccess():
                     self.logger.log(LogPriority.ERROR,
                                     [rule.getrulename(),
                                      rule.getdetailedresults()])
                 elif not rule.iscompliant():
-                    self.logger.log(LogPriority.DEBUG, "=================== START FIX ===================")
-                    rule.fix()
-                    self.logger.log(LogPriority.DEBUG, "==================== END FIX ====================")
+                    self.logger.logevent(LogEvent.STARTFIX)
+                    with self.statechglogger.batch():
+                        rule.fix()
+                    self.logger.logevent(LogEvent.ENDFIX)
                     if rule.getrulesuccess():
-                        self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
+                        self.logger.logevent(LogEvent.STARTREPORT)
                         rule.report()
-                        self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                        self.logger.logevent(LogEvent.ENDREPORT)
                         if not rule.getrulesuccess():
                             self.logger.log(LogPriority.ERROR,
                                             [rule.getrulename(),
@@ -628,7 +683,7 @@ class Controller(Observable):
                 self.logger.log(LogPriority.DEBUG,
                                 [rule.getrulename(),
                                 'Elapsed Time: ' + str(etime)])
-                self.logger.log(LogPriority.DEBUG, "****************** RULE END: " + str(self.currulename) + " ******************")
+                self.logger.logevent(LogEvent.RULEEND, str(self.currulename))
             except (KeyboardInterrupt, SystemExit):
             # User initiated exit
                 raise
@@ -642,25 +697,31 @@ class Controller(Observable):
             self.notify_check()
 
     def auditsystem(self):
-        """Call all rules in audit(report) mode
+        """Call all rules in audit(report) mode. Cacheable rules whose inputs
+        did not change since their last compliant report reuse that result
+        unless --no-cache was given.
 
         """
         self.numrulesrunning = self.numexecutingrules
         self.numrulescomplete = 0
+        if self.jobs > 1:
+            self.parallelaudit()
+            self.resultcache.save()
+            return
         for rule in self.installedrules:
             self.currulenum = rule.getrulenum()
             self.currulename = rule.getrulename()
             try:
-                self.logger.log(LogPriority.DEBUG, "****************** RULE START: " + str(self.currulename) + " ******************")
+                self.logger.logevent(LogEvent.RULESTART, str(self.currulename))
                 starttime = time.time()
-                self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
-                rule.report()
-                self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                self.logger.logevent(LogEvent.STARTREPORT)
+                self.resultcache.runreport(rule, self.usecache)
+                self.logger.logevent(LogEvent.ENDREPORT)
                 etime = time.time() - starttime
                 self.logger.log(LogPriority.DEBUG,
                                 [rule.getrulename(),
                                 'Elapsed Time: ' + str(etime)])
-                self.logger.log(LogPriority.DEBUG, "****************** RULE END: " + str(self.currulename) + " ******************")
+                self.logger.logevent(LogEvent.RULEEND, str(self.currulename))
             except (KeyboardInterrupt, SystemExit):
                 # User initiated exit
                 raise
@@ -684,6 +745,74 @@ class Controller(Observable):
                                 rule.getdetailedresults()])
             self.set_dirty()
             self.notify_check()
+        self.resultcache.save()
+
+    def parallelaudit(self):
+        """Call all rules in audit(report) mode using up to self.jobs worker
+        threads. Rules which declare a common shared resource are never run
+        at the same time. Results are logged as each rule completes.
+
+        """
+        scheduler = RuleScheduler(self.logger, self.jobs)
+        self.logger.log(LogPriority.DEBUG,
+                        'Running rule reports with ' +
+                        str(scheduler.getjobs()) + ' jobs')
+        scheduler.run(self.installedrules, self.__auditrule,
+                      self.__auditcomplete)
+
+    def __auditrule(self, rule):
+        """Run the report method of a single rule. Called from a scheduler
+        worker thread.
+
+        :param rule: Rule instance
+
+        """
+        try:
+            self.logger.logevent(LogEvent.RULESTART, str(rule.getrulename()))
+            starttime = time.time()
+            self.logger.logevent(LogEvent.STARTREPORT,
+                                 str(rule.getrulename()))
+            self.resultcache.runreport(rule, self.usecache)
+            self.logger.logevent(LogEvent.ENDREPORT, str(rule.getrulename()))
+            etime = time.time() - starttime
+            self.logger.log(LogPriority.DEBUG,
+                            [rule.getrulename(),
+                            'Elapsed Time: ' + str(etime)])
+            self.logger.logevent(LogEvent.RULEEND, str(rule.getrulename()))
+        except (KeyboardInterrupt, SystemExit):
+            # User initiated exit
+            raise
+        except Exception:
+            trace = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, [rule.getrulename(),
+                            "Controller caught rule death: "
+                            + trace])
+
+    def __auditcomplete(self, rule, error):
+        """Log the results of a rule whose report method has completed.
+        Called from the controller thread by the scheduler.
+
+        :param rule: Rule instance
+        :param error: exception raised by the rule or None
+
+        """
+        self.currulenum = rule.getrulenum()
+        self.currulename = rule.getrulename()
+        self.numrulescomplete = self.numrulescomplete + 1
+        if not rule.getrulesuccess():
+            self.logger.log(LogPriority.ERROR,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        if not rule.iscompliant():
+            self.logger.log(LogPriority.WARNING,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        else:
+            self.logger.log(LogPriority.INFO,
+                            [rule.getrulename(),
+                            rule.getdetailedresults()])
+        self.set_dirty()
+        self.notify_check()
 
     def runruleharden(self, ruleid):
         """Run a single rule in fix(harden) mode
@@ -694,7 +823,7 @@ class Controller(Observable):
         self.numrulesrunning = 1
         self.numrulescomplete = 0
         rulename = self.getrulenamebynum(ruleid)
-        self.logger.log(LogPriority.DEBUG, "****************** RULE START: " + str(rulename) + " ******************")
+        self.logger.logevent(LogEvent.RULESTART, str(rulename))
         self.logger.log(LogPriority.DEBUG, ['RunRuleHarden',
                          'Attempting to run ' + str(ruleid)])
 
@@ -708,9 +837,9 @@ class Controller(Observable):
                 else:
                     starttime = time.time()
                     try:
-                        self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
+                        self.logger.logevent(LogEvent.STARTREPORT)
                         rule.report()
-                        self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                        self.logger.logevent(LogEvent.ENDREPORT)
                     except (KeyboardInterrupt, SystemExit):
                         # User initiated exit
                         raise
@@ -729,9 +858,10 @@ class Controller(Observable):
                         self.numrulescomplete = self.numrulescomplete + 1
                     elif not rule.iscompliant():
                         try:
-                            self.logger.log(LogPriority.DEBUG, "=================== START FIX ===================")
-                            rule.fix()
-                            self.logger.log(LogPriority.DEBUG, "==================== END FIX ====================")
+                            self.logger.logevent(LogEvent.STARTFIX)
+                            with self.statechglogger.batch():
+                                rule.fix()
+                            self.logger.logevent(LogEvent.ENDFIX)
                         except (KeyboardInterrupt, SystemExit):
                             # User initiated exit
                             raise
@@ -746,9 +876,9 @@ class Controller(Observable):
                                             [rule.getrulename(),
                                              rule.getdetailedresults()])
                         try:
-                            self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
+                            self.logger.logevent(LogEvent.STARTREPORT)
                             rule.report()
-                            self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                            self.logger.logevent(LogEvent.ENDREPORT)
                         except (KeyboardInterrupt, SystemExit):
                             # User initiated exit
                             raise
@@ -778,7 +908,7 @@ class Controller(Observable):
             + str(ruleid)
             self.logger.log(LogPriority.ERROR,
                             message)
-        self.logger.log(LogPriority.DEBUG, "****************** RULE END: " + str(rulename) + " ******************")
+        self.logger.logevent(LogEvent.RULEEND, str(rulename))
 
     def runruleaudit(self, ruleid):
         """Run a single rule in audit(report) mode
@@ -787,7 +917,7 @@ class Controller(Observable):
 
         """
         rulename = self.getrulenamebynum(ruleid)
-        self.logger.log(LogPriority.DEBUG, "****************** RULE START: " + str(rulename) + " ******************")
+        self.logger.logevent(LogEvent.RULESTART, str(rulename))
         message = "Controller:runruleaudit: Entering rule with id " + \
         str(ruleid)
         self.logger.log(LogPriority.DEBUG, message)
@@ -805,9 +935,9 @@ class Controller(Observable):
                 else:
                     starttime = time.time()
                     try:
-                        self.logger.log(LogPriority.DEBUG, "=================== START REPORT ===================")
+                        self.logger.logevent(LogEvent.STARTREPORT)
                         rule.report()
-                        self.logger.log(LogPriority.DEBUG, "==================== END REPORT ====================")
+                        self.logger.logevent(LogEvent.ENDREPORT)
                     except (KeyboardInterrupt, SystemExit):
                         # User initiated exit
                         raise
@@ -836,7 +966,7 @@ class Controller(Observable):
                                      'Elapsed Time: ' + str(etime)])
                     self.set_dirty()
                     self.notify_check()
-        self.logger.log(LogPriority.DEBUG, "****************** RULE END: " + str(rulename) + " ******************")
+        self.logger.logevent(LogEvent.RULEEND, str(rulename))
 
     def undochangessystem(self):
         """Undo all changes to the system.
@@ -939,9 +1069,10 @@ class Controller(Observable):
                 self.currulenum = rule.getrulenum()
                 self.currulename = rule.getrulename()
                 try:
-                    self.logger.log(LogPriority.DEBUG, "=================== START FIX ===================")
-                    rule.fix()
-                    self.logger.log(LogPriority.DEBUG, "==================== END FIX ====================")
+                    self.logger.logevent(LogEvent.STARTFIX)
+                    with self.statechglogger.batch():
+                        rule.fix()
+                    self.logger.logevent(LogEvent.ENDFIX)
                 except (KeyboardInterrupt, SystemExit):
                     # User initiated exit
                     raise
@@ -1268,6 +1399,9 @@ ABORTING EXECUTION!"""
         self.undo = self.prog_args.get_rollback()
         self.pcf = self.prog_args.getPrintConfigFull()
         self.pcs = self.prog_args.getPrintConfigSimple()
+        self.jobs = self.prog_args.get_jobs()
+        self.usecache = not self.prog_args.get_nocache()
+        self.list = self.prog_args.getList()
 
         if self.prog_args.get_rollback():
             # rollback()
@@ -1333,6 +1467,10 @@ ABORTING EXECUTION!"""
             rulename = rule.getrulename()
             rulestring = rulename + ' (' + str(rulenum) + ')'
             rulelist.append(rulestring)
+        # rules listed straight from the rule manifest
+        for entry in self.catalog:
+            rulestring = entry['rulename'] + ' (' + str(entry['rulenum']) + ')'
+            rulelist.append(rulestring)
         rulelist.sort(key=str.lower)
         print("STONIX rules which apply to this platform:")
         for rule in rulelist:
@@ -1420,6 +1558,11 @@ ABORTING EXECUTION!"""
             if True not in [self.fix, self.report, self.undo]:
                 self.logger.log(LogPriority.INFO, 'No action specified. Please pass the -r, -f, or -X flag')
                 self.logger.closereports()
+        stats = filecache.getstats()
+        self.logger.log(LogPriority.DEBUG,
+                        'File cache: ' + str(stats['hits']) + ' hits, ' +
+                        str(stats['misses']) + ' misses, ' +
+                        str(stats['invalidations']) + ' invalidations')
         self.releaselock()
 
 if __name__ == '__main__':
@@ -34,16 +34,30 @@
 @change: 2019/08/07 Brandon R. Gonzales - Command output and error output are
         now being decoded to 'utf-8', and are being treated as 'str' types
         instead of 'bytes' types
+@change: 2026/10/16 - replaced the busy wait used for command timeouts with
+        communicate(timeout=); timed out commands now have their whole process
+        group killed and their partial output collected; added wall time and
+        cpu time metrics for the last executed command
+@change: 2026/10/16 - a command run during a rule report marks the report's
+        result as not reusable by the result cache
+@change: 2026/10/16 - added executeCommandStream for commands whose output
+        is too large to collect
         
 """
 
 import inspect
+import os
 import re
+import resource
+import signal
 import subprocess
+import tempfile
+import threading
 import traceback
 import time
 
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import resultcache
 
 
 class CommandHelper(object):
@@ -80,6 +94,12 @@ class CommandHelper(object):
         # set this to False if you need to run a command that has no return code
         self.wait = True
         self.cmdtimeout = 0
+        # seconds to wait for a timed out process group to exit after SIGTERM
+        # before sending SIGKILL
+        self.killgrace = 2
+        self.walltime = 0.0
+        self.cputime = 0.0
+        self.timedout = False
 
 ###############################################################################
 
@@ -416,6 +436,107 @@ class CommandHelper(object):
 
         return self.returncode
 
+    def getWallTime(self):
+        """Get the elapsed wall clock time, in seconds, of the last executed
+        command
+
+        :returns: self.walltime
+        :rtype: float
+
+        """
+
+        return self.walltime
+
+    def getCpuTime(self):
+        """Get the user + system cpu time, in seconds, consumed by the child
+        processes reaped while running the last executed command. When several
+        commands are run at the same time from different threads this figure
+        may include time used by the other commands.
+
+        :returns: self.cputime
+        :rtype: float
+
+        """
+
+        return self.cputime
+
+    def getTimedOut(self):
+        """Get whether the last executed command was aborted because it ran
+        longer than the configured timeout
+
+        :returns: self.timedout
+        :rtype: bool
+
+        """
+
+        return self.timedout
+
+    def setTimeout(self, seconds=0):
+        """Set the maximum number of seconds a command may run before it (and
+        every process in its process group) is killed. 0 disables the timeout.
+
+        :param seconds: int|float: timeout in seconds (Default value = 0)
+        :returns: success
+        :rtype: bool
+
+        """
+
+        success = True
+
+        try:
+            seconds = float(seconds)
+        except (TypeError, ValueError):
+            self.logdispatcher.log(LogPriority.DEBUG, "Invalid timeout value: " + str(seconds))
+            success = False
+            return success
+
+        if seconds < 0:
+            self.logdispatcher.log(LogPriority.DEBUG, "Timeout value may not be negative")
+            success = False
+            return success
+
+        self.cmdtimeout = seconds
+
+        return success
+
+    def __childcputime(self):
+        """return the total user + system cpu time used by reaped children of
+        this process
+
+        :return: cputime
+        :rtype: float
+        """
+
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return usage.ru_utime + usage.ru_stime
+
+    def __killgroup(self, commandobj):
+        """terminate the process group of a timed out command, escalating to
+        SIGKILL if it does not exit within self.killgrace seconds, and return
+        whatever output the command produced
+
+        :param commandobj: subprocess.Popen instance
+        :return: outs, errs
+        :rtype: tuple
+        """
+
+        outs, errs = b"", b""
+
+        for sig in [signal.SIGTERM, signal.SIGKILL]:
+            try:
+                os.killpg(commandobj.pid, sig)
+            except OSError:
+                # process group already gone
+                pass
+            try:
+                outs, errs = commandobj.communicate(timeout=self.killgrace)
+                break
+            except subprocess.TimeoutExpired as err:
+                outs = err.stdout or b""
+                errs = err.stderr or b""
+
+        return outs, errs
+
     def validate_command(self, command):
         """
         A valid format for a command is:
@@ -598,62 +719,60 @@ class CommandHelper(object):
 
         """
 
-        commandaborted = False
         commandobj = None
         success = True
         self.stdout = []
         self.stderr = []
         self.output = []
+        self.walltime = 0.0
+        self.cputime = 0.0
+        self.timedout = False
 
         try:
 
             if not self.setCommand(command):
                 success = False
                 return success
+            # the output of a command can not be fingerprinted
+            resultcache.untracked()
             start_time = time.time()
+            start_cpu = self.__childcputime()
             self.logdispatcher.log(LogPriority.DEBUG, "Beginning new command execution")
+            # a command with a time limit gets its own process group so that
+            # everything it spawns can be killed if the limit is reached
             commandobj = subprocess.Popen(self.command,
                                           stdout=subprocess.PIPE,
                                           stderr=subprocess.PIPE,
-                                          shell=self.shell)
-
-            # if a time limit is specified for this command run,
-            # time out if that limit is reached
-            if self.cmdtimeout:
-                while commandobj.poll() is None:
-                    if time.time() - start_time >= self.cmdtimeout:
-                        commandobj.terminate()
-                        commandobj.returncode = -1
-                        self.logdispatcher.log(LogPriority.DEBUG, "Command run exceeded timeout limit. Command run aborted.")
-                        commandaborted = True
-                        break
-                    else:
-                        continue
-            if commandaborted:
-                success = False
-                self.returncode = commandobj.returncode
-                return success
-
-            outlines = []
-            errlines = []
-            outstr = ""
+                                          shell=self.shell,
+                                          start_new_session=bool(self.cmdtimeout))
 
-            # If we are not waiting, we cannot collect stdout and stderr
-            if self.wait:
+            outs, errs = None, None
 
-                if commandobj is not None:
-                    outs, errs = commandobj.communicate()
-                    outs = self.convert_bytes_to_string(outs)
-                    errs = self.convert_bytes_to_string(errs)
-                    outlines = outs.splitlines()
-                    errlines = errs.splitlines()
-                    outstr = str(outs)
-
-            if commandobj is not None:
-                self.stdout = outlines
-                self.stderr = errlines
+            if self.cmdtimeout:
+                try:
+                    outs, errs = commandobj.communicate(timeout=self.cmdtimeout)
+                except subprocess.TimeoutExpired:
+                    outs, errs = self.__killgroup(commandobj)
+                    self.timedout = True
+                    self.logdispatcher.log(LogPriority.DEBUG, "Command run exceeded timeout limit. Command run aborted.")
+            elif self.wait:
+                # If we are not waiting, we cannot collect stdout and stderr
+                outs, errs = commandobj.communicate()
+
+            self.walltime = time.time() - start_time
+            self.cputime = max(0.0, self.__childcputime() - start_cpu)
+
+            if outs is not None:
+                outs = self.convert_bytes_to_string(outs)
+                errs = self.convert_bytes_to_string(errs)
+                self.stdout = outs.splitlines()
+                self.stderr = errs.splitlines()
                 self.output = self.stderr + self.stdout
-                outstr = " ".join(self.output)
+            outstr = " ".join(self.output)
+
+            if self.timedout:
+                success = False
+                commandobj.returncode = -1
 
             self.returncode = commandobj.returncode
 
@@ -666,12 +785,10 @@ class CommandHelper(object):
             except:
                 pass
 
-            if "outstr" not in locals():
-                outstr = ""
-
             self.logdispatcher.log(LogPriority.DEBUG, "Command: " + str(self.command))
             self.logdispatcher.log(LogPriority.DEBUG, "Output: " + str(outstr))
             self.logdispatcher.log(LogPriority.DEBUG, "Return Code: " + str(self.returncode))
+            self.logdispatcher.log(LogPriority.DEBUG, "Wall Time: " + str(self.walltime) + " CPU Time: " + str(self.cputime))
 
             if success:
                 self.logdispatcher.log(LogPriority.DEBUG, "Command executed successfully")
@@ -685,6 +802,116 @@ class CommandHelper(object):
 
         return success
 
+    def __expire(self, commandobj):
+        """terminate the process group of a streamed command which ran past
+        the timeout. Called from a timer thread while the output is being
+        read, so the output is left to the reader.
+
+        :param commandobj: subprocess.Popen instance
+        """
+
+        self.timedout = True
+        for sig in [signal.SIGTERM, signal.SIGKILL]:
+            try:
+                os.killpg(commandobj.pid, sig)
+            except OSError:
+                # process group already gone
+                pass
+            try:
+                commandobj.wait(timeout=self.killgrace)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+
+    def executeCommandStream(self, command, linehandler):
+        """
+        execute the given command and hand each line of its standard output to
+        linehandler as it is produced instead of collecting it. Standard error
+        is collected as by executeCommand. The timeout set with setTimeout
+        applies.
+
+        :param command: string or list: command to set the command property to
+        :param linehandler: callable taking one line of output, without the
+            line ending
+        :return: success
+        :rtype: bool
+
+        """
+
+        commandobj = None
+        timer = None
+        success = True
+        lines = 0
+        self.stdout = []
+        self.stderr = []
+        self.output = []
+        self.walltime = 0.0
+        self.cputime = 0.0
+        self.timedout = False
+
+        try:
+
+            if not self.setCommand(command):
+                success = False
+                return success
+            # the output of a command can not be fingerprinted
+            resultcache.untracked()
+            start_time = time.time()
+            start_cpu = self.__childcputime()
+            self.logdispatcher.log(LogPriority.DEBUG, "Beginning new streamed command execution")
+            with tempfile.TemporaryFile() as errfile:
+                commandobj = subprocess.Popen(self.command,
+                                              stdout=subprocess.PIPE,
+                                              stderr=errfile,
+                                              shell=self.shell,
+                                              start_new_session=bool(self.cmdtimeout))
+                if self.cmdtimeout:
+                    timer = threading.Timer(self.cmdtimeout, self.__expire,
+                                            [commandobj])
+                    timer.daemon = True
+                    timer.start()
+                try:
+                    for line in commandobj.stdout:
+                        lines += 1
+                        linehandler(line.decode('utf-8', 'replace').rstrip("\n"))
+                finally:
+                    commandobj.stdout.close()
+                    commandobj.wait()
+                    if timer:
+                        timer.cancel()
+                errfile.seek(0)
+                self.stderr = errfile.read().decode('utf-8', 'replace').splitlines()
+                self.output = list(self.stderr)
+
+            self.walltime = time.time() - start_time
+            self.cputime = max(0.0, self.__childcputime() - start_cpu)
+
+            if self.timedout:
+                success = False
+                self.logdispatcher.log(LogPriority.DEBUG, "Command run exceeded timeout limit. Command run aborted.")
+                commandobj.returncode = -1
+
+            self.returncode = commandobj.returncode
+
+            self.logdispatcher.log(LogPriority.DEBUG, "Command: " + str(self.command))
+            self.logdispatcher.log(LogPriority.DEBUG, "Output lines: " + str(lines))
+            self.logdispatcher.log(LogPriority.DEBUG, "Errors: " + " ".join(self.stderr))
+            self.logdispatcher.log(LogPriority.DEBUG, "Return Code: " + str(self.returncode))
+            self.logdispatcher.log(LogPriority.DEBUG, "Wall Time: " + str(self.walltime) + " CPU Time: " + str(self.cputime))
+
+            if success:
+                self.logdispatcher.log(LogPriority.DEBUG, "Command executed successfully")
+            else:
+                self.logdispatcher.log(LogPriority.DEBUG, "Command execution failed")
+
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            success = False
+            self.logdispatcher.log(LogPriority.ERROR, str(traceback.format_exc()))
+
+        return success
+
     def findInOutput(self, expression, searchgroup="output", dtype="list"):
         """findInOutput (expression) finds an expression in the combined stderr
         and stdout
@@ -19,14 +19,26 @@
 Created on May 6, 2013
 
 @author: Derek Walker
+@change: 2026/10/16 - contents are parsed once into a key -> line index
+    dictionary used by validate and update instead of matching every line
+    against every key
+@change: 2026/10/16 - file contents are read through the shared file cache
 '''
 
 from stonix_resources.logdispatcher import LogPriority
 from stonix_resources.stonixutilityfunctions import writeFile
+from stonix_resources import filecache
 import os
 import traceback
 import re
 
+# text up to the first whitespace of a line in a space separated file
+SPACEKEY = re.compile(r"(\S+)\s")
+WHITESPACE = re.compile(r"\s+")
+# characters with a special meaning in a regular expression
+REGEXCHARS = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
 class KVAConf():
     '''This class checks files for correctness that consist of key:value pairs
     either in the form of closed equal separated (k=v), open separated (k = v),
@@ -65,6 +77,8 @@ class KVAConf():
 
         self.fixables = {}
         self.removeables = {}
+        self.keyindex = None
+        self.indextype = None
         self.logger = logger
         self.path = path
         self.tmpPath = tmpPath
@@ -206,32 +220,23 @@ class KVAConf():
         if self.contents:
             if self.intent == "present":  # self.data contains key val pairs we want in the file
                 found = False
-                for line in self.contents:
-                    if re.match('^#', line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
+                for i in self.getKeyLines(key):  # lines containing the current key we're looking for
+                    temp = self.contents[i].split("=")  # split line into key val list [key, val]
+                    if temp[1].strip() == value:  # and the value is correct
+                        found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
                         continue
-                    elif re.search("=", line):  # examine line if there is an = sign
-                        temp = line.split("=")  # split line into key val list [key, val]
-                        if re.match("^" + key + "$", temp[0].strip()):  # it contains the current key we're looking for
-                            if temp[1].strip() == value:  # and the value is correct
-                                found = True  # however we continue to make sure the key doesn't appear later in the file and have the wrong value
-                                continue
-                            else:  # the value is wrong so we break out of the loop.  Unecessary to continue, it will be fixed in the update
-                                found = False
-                                break
+                    else:  # the value is wrong so we break out of the loop.  Unecessary to continue, it will be fixed in the update
+                        found = False
+                        break
                 if found:  # return True or False value
                     return True
                 else:
                     return False
             elif self.intent == "notpresent":  # self.data contains key val pairs we don't want in the file
                 found = True
-                for line in self.contents:
-                    if re.match("^#", line) or re.match(r'^\s*$', line):  # ignore if comment or blank line
-                        continue
-                    elif re.search("=", line):  # examine line if there is an = sign
-                        temp = line.split("=")  # split line into key val list [key, val]
-                        if re.match("^" + key + "$", temp[0].strip()):  # it contains the current key we're looking for
-                            found = True  # no need to check value, it's irrelevant
-                            break
+                for _ in self.getKeyLines(key):  # lines containing the current key we're looking for
+                    found = True  # no need to check value, it's irrelevant
+                    break
                 return found
 
     def getSpaceValue(self, key, value):
@@ -259,6 +264,8 @@ class KVAConf():
         #list that keeps track of key value pairs that shouldn't be present
         # but were and need to be removed in the fix() and commit()
         removeables = []
+        # lines on which the key appears, comments and blank lines excluded
+        keylines = self.getKeyLines(key)
         # self.data contains key val pairs we want in the file
         if self.intent == "present":
             # if "value" is a list that means the key can be repeatable
@@ -268,24 +275,9 @@ class KVAConf():
                 for item in value:
                     # this variable keeps track if at any point we found the key-value
                     foundalready = False
-                    for line in self.contents:
-                        # ignore if comment or blank line
-                        if re.match('^#', line) or re.match(r'^\s*$', line):
-                            continue
-                        # we found the key, which in this case can be repeatable
-                        elif re.search("^" + re.escape(key) + "\s+", line):
-                            # remove any leading or traling whitespace
-                            temp = line.strip()
-                            # check to see if "item" in our self.data dictionary is blank or not
-                            if item != "":
-                                temp = re.sub("\s+", " ", temp)
-                                if temp == key + " " + item:
-                                    foundalready = True
-                            # if it is, that means we're just looking for a special one word
-                            # key with no value after
-                            else:
-                                if temp == key:
-                                    foundalready = True
+                    for i in keylines:
+                        if self.spaceLineMatches(i, key, item):
+                            foundalready = True
                     if not foundalready:
                         fixables.append(item)
                         debug = "didn't find key-value: " + key + " " + item + \
@@ -298,22 +290,9 @@ class KVAConf():
             # value must be a string, normal case
             else:
                 foundalready = False
-                for line in self.contents:
-                    # ignore if comment or blank line
-                    if re.match('^#', line) or re.match(r'^\s*$', line):
-                        continue
-                    # we found the key
-                    elif re.search("^" + re.escape(key) + "\s+", line):
-                        # remove any leading or trailing whitespace
-                        temp = line.strip()
-                        # check to see if "value" in our self.data dictionary is blank or not
-                        if value != "":
-                            temp = re.sub("\s+", " ", temp)
-                            if temp == key + " " + value:
-                                foundalready = True
-                        else:
-                            if temp == key:
-                                foundalready = True
+                for i in keylines:
+                    if self.spaceLineMatches(i, key, value):
+                        foundalready = True
                 return foundalready
         # self.data contains key val pairs we don't want in the file
         elif self.intent == "notpresent":
@@ -323,27 +302,9 @@ class KVAConf():
                 for item in value:
                     # this variable keeps track if at any point we found the key-value
                     foundalready = False
-                    # iterate through the file's contents
-                    for line in self.contents:
-                        # ignore if comment or blank line
-                        if re.match('^#', line) or re.match(r'^\s*$', line):
-                            continue
-                        # we found the key, which in this case can be repeatable
-                        elif re.search("^" + re.escape(key) + "\s+", line):
-                            # remove any leading or trailing whitespace
-                            temp = line.strip()
-                            # check to see if "item" in our self.data dictionary is blank or not
-                            if item != "":
-                                temp = re.sub("\s+", " ", temp)
-                                if temp == key + " " + item:
-                                    foundalready = True
-                            # if it is, that means we're just looking for a special one word
-                            # key with no value after
-                            # normally the implementer in this case should not have put the "value" in a list
-                            # but this will still cover it if they did
-                            else:
-                                if temp == key:
-                                    foundalready = True
+                    for i in keylines:
+                        if self.spaceLineMatches(i, key, item):
+                            foundalready = True
                     if foundalready:
                         removeables.append(item)
                         debug = "Found the key-value: " + key + " " + item + \
@@ -356,20 +317,9 @@ class KVAConf():
             # value must be a string, normal case
             else:
                 foundalready = False
-                for line in self.contents:
-                    # ignore is comment or blank line
-                    if re.match('^#', line) or re.match(r'^\s*$', line):
-                        continue
-                    # we found the key
-                    elif re.search("^" + re.escape(key) + "\s+", line):
-                        temp = line.strip()
-                        if value != "":
-                            temp = re.sub("\s+", " ", temp)
-                            if temp == key + " " + value:
-                                foundalready = True
-                        else:
-                            if temp == key:
-                                foundalready = True
+                for i in keylines:
+                    if self.spaceLineMatches(i, key, value):
+                        foundalready = True
                 if foundalready:
                     debug = "Found the key-value: " + key + " " + value + \
                             ", but should not be present"
@@ -378,6 +328,27 @@ class KVAConf():
                 else:
                     return True
 
+    def spaceLineMatches(self, index, key, value):
+        '''Private method that checks whether a line of a space separated
+        file on which key appears holds value. An empty value matches a line
+        consisting of the key alone.
+
+        :param index: index of the line in self.contents
+        :param key: key in a dictionary passed from calling class
+        :param value: value expected after the key
+        :returns: Bool
+
+        '''
+        # remove any leading or trailing whitespace
+        temp = self.contents[index].strip()
+        # check to see if "value" in our self.data dictionary is blank or not
+        if value != "":
+            temp = WHITESPACE.sub(" ", temp)
+            return temp == key + " " + value
+        # if it is, that means we're just looking for a special one word
+        # key with no value after
+        return temp == key
+
     def update(self, fixables, removeables):
         '''Private outer method to call submethod setOpenClosedValue() or
         setSpaceValue() depending on the value of self.configType.
@@ -415,36 +386,18 @@ class KVAConf():
 
         '''
         self.storeContents(self.path)  # re-read the contents of the desired file
-        contents = self.contents
+        # lines holding any key in removeables or fixables. For removeables
+        # we're not concerned with the value because we don't want the key
+        # either way, for fixables the correct line is added below.
+        poplines = set()
         if removeables:  # we have items that need to be removed from file
             for key in removeables:
-                i = 0  # variable to keep our place in the list, will be used for removing items
-                for line in contents:
-                    if re.search("^#", line) or re.match("^\s*$", line):  # ignore if comment or blank line
-                        i += 1
-                    elif re.search("=", line.strip()):  # line contains an = sign
-                        temp = line.split("=")
-                        if re.match("^" + key + "$", temp[0].strip()):  # found the key
-                            contents.pop(i)  # not concerned with the value because we don't want the key either way
-                        i += 1
-                    else:
-                        i += 1
+                poplines.update(self.getKeyLines(key))
         if fixables:  # we have items that either had the wrong value or don't exist in the file
             for key in fixables:
-                i = 0  # variable to keep our place in the list, will be used for removing items
-                for line in contents:
-                    if re.search("^#", line) or re.match("^\s*$", line):  # ignore if comment or blank line
-                        i += 1
-                    elif re.search("=", line.strip()):  # line contains an = sign
-                        temp = line.split("=")
-                        if re.match("^" + key + "$", temp[0].strip()):  # found the key
-                            contents.pop(i)  # we pop it out but down below we add the correct line unlike above
-                        i += 1
-                    else:
-                        i += 1
-            self.contents = []
-            for line in contents:  # contents should now have a list of items we are ok with having in the file but will still be missing the fixables
-                self.contents.append(line)  # make self.contents contain the correct file contents before fixing
+                poplines.update(self.getKeyLines(key))
+        self.removeLines(poplines)
+        if fixables:
             # self.contents.append("\n" + self.universal)  # add our universal line to show line(s) were added by stonix to self.contents
             for key in fixables:
                 if self.configType == "openeq":  # construct the appropriate line and add to bottom of self.contents
@@ -471,47 +424,31 @@ class KVAConf():
         '''
         # re-read the contents of the desired file
         self.storeContents(self.path)
-        contents = self.contents
+        poplines = set()
         # we have items that need to be removed from file
         if removeables:
-            poplist = []
             for key, val in list(removeables.items()):
+                keylines = self.getKeyLines(key)
+                if not keylines:
+                    continue
                 # we have a list where the key can repeat itself
                 if isinstance(val, list):
-                    for item in val:
-                        for line in contents:
-                            if re.search("^#", line) or re.match("^\s*$", line):
-                                continue
-                            elif re.search("^" + re.escape(key) + "\s+", line):
-                                temp = line.strip()
-                                if val != "":
-                                    temp = re.sub("\s+", " ", temp)
-                                    if re.search("^" + re.escape(key) + " " + item, temp):
-                                        poplist.append(line)
-                                else:
-                                    if re.search("^" + re.escape(key) + "$", temp):
-                                        poplist.append(line)
+                    patterns = [re.compile("^" + re.escape(key) + " " + item)
+                                for item in val]
+                elif val != "":
+                    patterns = [re.compile("^" + re.escape(key) + " " + val)]
                 else:
-                    for line in contents:
-                        if re.search("^#", line) or re.match("^\s*$", line):
-                            continue
-                        elif re.search("^" + re.escape(key) + "\s+", line):
-                            temp = line.strip()
-                            if val != "":
-                                temp = re.sub("\s+", " ", temp)
-                                if re.search("^" + re.escape(key) + " " + val, temp):
-                                    poplist.append(line)
-                            else:
-                                if re.search("^" + re.escape(key) + "$", temp):
-                                    poplist.append(line)
-            if poplist:
-                for item in poplist:
-                    try:
-                        contents.remove(item)
-                    except Exception:
-                        continue
+                    patterns = []
+                for i in keylines:
+                    temp = self.contents[i].strip()
+                    if patterns:
+                        temp = WHITESPACE.sub(" ", temp)
+                        for pattern in patterns:
+                            if pattern.search(temp):
+                                poplines.add(i)
+                    elif temp == key:
+                        poplines.add(i)
         if fixables:
-            poplist = []
             # contents.append(self.universal)
             # in this next section we cover a situation where the key
             # may appear more than once and have wrong values, so anywhere
@@ -521,25 +458,15 @@ class KVAConf():
                 # since these keys can be repeatable we won't take the same
                 # precaution as unique keys.
                 if not isinstance(val, list):
-                    for line in contents:
-                        if re.search("^#", line) or re.match("^\s*$", line):
-                            continue
-                        # we found the key in the file
-                        elif re.search("^" + re.escape(key) + "\s+", line):
-                            poplist.append(line)
-            if poplist:
-                for item in poplist:
-                    try:
-                        contents.remove(item)
-                    except Exception:
-                        continue
+                    poplines.update(self.getKeyLines(key))
+        self.removeLines(poplines)
+        if fixables:
             for key, val in list(fixables.items()):
                 if isinstance(val, list):
                     for item in val:
-                        contents.append(key + " " + item + "\n")
+                        self.contents.append(key + " " + item + "\n")
                 else:
-                    contents.append(key + " " + val + "\n")
-        self.contents = contents
+                    self.contents.append(key + " " + val + "\n")
         return True
 
     def commit(self):
@@ -554,8 +481,7 @@ class KVAConf():
         :returns: Bool
 
         '''
-        for line in self.contents:
-            self.tempstring += line
+        self.tempstring += "".join(self.contents)
         success = writeFile(self.tmpPath, self.tempstring, self.logger)
         return success
 
@@ -571,15 +497,85 @@ class KVAConf():
         '''
 
         self.contents = []
+        self.keyindex = None
 
         try:
-            f = open(path, 'r')
-            self.contents = f.readlines()
-            f.close()
+            self.contents = list(filecache.readlines(path))
 
         except IOError:
             self.logger.log(LogPriority.DEBUG, "Failed to retrieve contents of file: " + str(path))
 
+    def indexContents(self):
+        '''Private method that parses self.contents once into a dictionary
+        of key -> indexes of the lines the key appears on, for the current
+        configType. Comments and blank lines are skipped. For openeq and
+        closedeq files the key is the stripped text before the first equal
+        sign; for space files it is the text up to the first whitespace of a
+        line not starting with whitespace.
+
+        :returns: self.keyindex
+        :rtype: dict
+
+        '''
+        keyindex = {}
+        for i, line in enumerate(self.contents):
+            if line.startswith("#") or not line.strip():
+                continue
+            if self.configType in ['openeq', 'closedeq']:
+                if "=" in line:
+                    key = line.split("=", 1)[0].strip()
+                    keyindex.setdefault(key, []).append(i)
+            else:
+                match = SPACEKEY.match(line)
+                if match:
+                    keyindex.setdefault(match.group(1), []).append(i)
+        self.keyindex = keyindex
+        self.indextype = self.configType
+        return keyindex
+
+    def getKeyLines(self, key):
+        '''Private method that returns the indexes of the lines of
+        self.contents on which key appears, in file order. For openeq and
+        closedeq files key is treated as a regular expression matching the
+        whole key, as it always has been, so keys containing regular
+        expression characters are matched against the distinct keys of the
+        file rather than looked up directly.
+
+        :param key: key in a dictionary passed from calling class
+        :returns: list of int
+
+        '''
+        if self.keyindex is None or self.indextype != self.configType:
+            self.indexContents()
+        if self.configType in ['openeq', 'closedeq']:
+            if not REGEXCHARS.search(key):
+                return self.keyindex.get(key, [])
+            pattern = re.compile("^" + key + "$")
+            lines = []
+            for filekey, indexes in self.keyindex.items():
+                if pattern.match(filekey):
+                    lines.extend(indexes)
+            return sorted(lines)
+        if key and not WHITESPACE.search(key):
+            return self.keyindex.get(key, [])
+        # keys containing whitespace span more than one token of the line
+        pattern = re.compile("^" + re.escape(key) + r"\s+")
+        return [i for i, line in enumerate(self.contents)
+                if not line.startswith("#") and line.strip() and
+                pattern.search(line)]
+
+    def removeLines(self, indexes):
+        '''Private method that removes lines from self.contents and resets
+        the key index.
+
+        :param indexes: set of indexes of the lines to remove
+
+        '''
+        if indexes:
+            self.contents = [line for i, line in enumerate(self.contents)
+                             if i not in indexes]
+        self.keyindex = None
+
     def getValue(self):
         '''Private method that puts any items that don't exist or have the wrong
         value (fixables) and any items that do exist but shouldn't
@@ -19,8 +19,10 @@
 Created on Jul 23, 2013
 
 @author: dwalker
+@change: 2026/10/16 - file contents are read through the shared file cache
 '''
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import filecache
 import traceback
 import re
 import os
@@ -610,15 +612,12 @@ class KVATaggedConf():
 ###############################################################################
     def storeContents(self, path):
         try:
-            f = open(path, 'r')
+            self.contents.extend(filecache.readlines(path))
         except IOError:
             self.detailedresults = "KVATaggedConf: unable to open the " \
             "specified file"
             self.detailedresults += traceback.format_exc()
             return False
-        for line in f:
-            self.contents.append(line)
-        f.close()
 ###############################################################################
     def checkConfigType(self):
         for item in self.contents:
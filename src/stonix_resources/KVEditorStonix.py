@@ -19,9 +19,12 @@
 Created on Jun 12, 2013
 
 @author: dwalker
+@change: 2026/10/16 - commit drops the replaced file from the shared
+    file cache
 '''
 from stonix_resources.KVEditor import KVEditor
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import filecache
 import os
 
 
@@ -137,6 +140,7 @@ class KVEditorStonix(KVEditor):
                 self.stchlgr.recordfilechange(self.path, self.tmpPath, self.eid)
             try:
                 os.rename(self.tmpPath, self.path)
+                filecache.invalidate(self.path)
             except OSError:
                 debug = "Couldn't rename file in KVEditorStonix commit\n"
                 self.logger.log(LogPriority.DEBUG, debug)
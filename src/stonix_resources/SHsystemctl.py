@@ -25,14 +25,41 @@ Created on Sep 19, 2012
         added start and stop service methods; fixed doc strings; added error logging;
         removed unused imports; methods now use commandhelper instead of subprocess;
         fixed typo in license
+@change: 2026/10/16 added takeSnapshot; auditService, isRunning and
+        getServiceStatus answer from the unit state snapshot when one is held
+@change: 2026/10/17 added clearSnapshot
 """
 
 import os
+import threading
+import time
 
 from stonix_resources.CommandHelper import CommandHelper
 from stonix_resources.logdispatcher import LogPriority
 from stonix_resources.ServiceHelperTemplate import ServiceHelperTemplate
 
+# Unit file and active states of every service unit, read by takeSnapshot()
+# and shared by all SHsystemctl instances. 'enabled' maps unit name to the
+# list-unit-files state, 'active' maps unit name to the list-units ACTIVE
+# column. Units changed by STONIX are removed so that they are queried again.
+SNAPSHOTAGE = 600
+_snapshot = {'time': 0, 'enabled': {}, 'active': {}}
+_snapshotlock = threading.Lock()
+
+
+def clearSnapshot():
+    '''discard the service unit state snapshot. Called when something other
+    than the service helper may have changed unit files or unit states
+    (package installs and removals, reverted commands) and by rules when
+    they are done with the snapshot.
+
+    '''
+
+    with _snapshotlock:
+        _snapshot['time'] = 0
+        _snapshot['enabled'] = {}
+        _snapshot['active'] = {}
+
 
 class SHsystemctl(ServiceHelperTemplate):
     '''SHsystemctl is the Service Helper for systems using the systemctl command to
@@ -69,6 +96,94 @@ class SHsystemctl(ServiceHelperTemplate):
         # do not attempt to manipulate any service which has a status in this list
         self.handsoff = ["static", "transient", "generated", "masked", "masked-runtime"]
 
+    def takeSnapshot(self):
+        '''Read the enabled state of every service unit file and the active
+        state of every loaded service unit with one list-unit-files and one
+        list-units call. Until the snapshot is older than SNAPSHOTAGE seconds
+        auditService, isRunning and getServiceStatus answer from it instead
+        of running systemctl for each service. Units STONIX enables,
+        disables, starts, stops or reloads are dropped from the snapshot.
+
+        :returns: success
+        :rtype: bool
+
+        '''
+
+        enabled = {}
+        active = {}
+
+        self.ch.executeCommand(self.sysctl + " list-unit-files --type=service --no-pager --no-legend")
+        if self.ch.getReturnCode() != 0:
+            self.logdispatcher.log(LogPriority.DEBUG, self.ch.getErrorString())
+            return False
+        for line in self.ch.getOutput():
+            fields = line.split()
+            if len(fields) >= 2:
+                enabled[fields[0]] = fields[1]
+
+        # list-units needs a running systemd; without it isRunning keeps
+        # asking systemctl for each service
+        self.ch.executeCommand(self.sysctl + " list-units --type=service --all --no-pager --no-legend --plain")
+        if self.ch.getReturnCode() != 0:
+            self.logdispatcher.log(LogPriority.DEBUG, self.ch.getErrorString())
+        else:
+            for line in self.ch.getOutput():
+                fields = line.split()
+                # failed and not-found units are marked with a bullet
+                if fields and fields[0] in ["\u25cf", "*"]:
+                    fields = fields[1:]
+                if len(fields) >= 3:
+                    active[fields[0]] = fields[2]
+
+        with _snapshotlock:
+            _snapshot['enabled'] = enabled
+            _snapshot['active'] = active
+            _snapshot['time'] = time.time()
+        self.logdispatcher.log(LogPriority.DEBUG, "Service snapshot: " + str(len(enabled)) + " unit files, " + str(len(active)) + " loaded units")
+
+        return True
+
+    def getSnapshotState(self, kind, service):
+        '''return the state of a service from the snapshot
+
+        :param kind: string; 'enabled' or 'active'
+        :param service: string; name of the service
+        :returns: state, or None if there is no current snapshot or the
+            service is not in it
+        :rtype: string
+
+        '''
+
+        unit = service
+        if not unit.endswith(".service"):
+            if "." in unit.rsplit("@", 1)[-1]:
+                # some other unit type, never in the snapshot
+                return None
+            unit += ".service"
+        with _snapshotlock:
+            if time.time() - _snapshot['time'] > SNAPSHOTAGE:
+                return None
+            state = _snapshot[kind].get(unit)
+        # an alias does not show the state of the unit it points to
+        if state == "alias":
+            return None
+        return state
+
+    def dropFromSnapshot(self, service):
+        '''remove a service whose state STONIX changed from the snapshot
+
+        :param service: string; name of the service
+
+        '''
+
+        unit = service
+        if not unit.endswith(".service"):
+            unit += ".service"
+        with _snapshotlock:
+            for kind in ['enabled', 'active']:
+                _snapshot[kind].pop(unit, None)
+                _snapshot[kind].pop(service, None)
+
     def disableService(self, service, **kwargs):
         '''Disables the service and terminates it if it is running.
 
@@ -83,7 +198,8 @@ class SHsystemctl(ServiceHelperTemplate):
         '''
 
         disabled = True
-    
+
+        self.dropFromSnapshot(service)
         self.ch.executeCommand(self.sysctl + " disable " + service)
         retcode = self.ch.getReturnCode()
         if retcode != 0:
@@ -116,6 +232,7 @@ class SHsystemctl(ServiceHelperTemplate):
             enabled = False
             return enabled
 
+        self.dropFromSnapshot(service)
         self.ch.executeCommand(self.sysctl + " enable " + service)
         retcode = self.ch.getReturnCode()
         if retcode != 0:
@@ -138,6 +255,10 @@ class SHsystemctl(ServiceHelperTemplate):
 
         enabled = False
 
+        state = self.getSnapshotState('enabled', service)
+        if state is not None:
+            return "enabled" in state
+
         self.ch.executeCommand(self.sysctl + " is-enabled " + service)
 
         if self.ch.findInOutput("not a native service"):
@@ -166,6 +287,10 @@ class SHsystemctl(ServiceHelperTemplate):
         running = True
         inactive_keys = ["inactive", "unknown"]
 
+        state = self.getSnapshotState('active', service)
+        if state is not None:
+            return state not in inactive_keys
+
         self.ch.executeCommand(self.sysctl + " is-active " + service)
         for k in inactive_keys:
             if self.ch.findInOutput(k):
@@ -194,6 +319,7 @@ class SHsystemctl(ServiceHelperTemplate):
             success = False
             return success
 
+        self.dropFromSnapshot(service)
         self.ch.executeCommand(self.sysctl + " reload-or-restart " + service)
         retcode = self.ch.getReturnCode()
         if retcode != 0:
@@ -255,6 +381,7 @@ class SHsystemctl(ServiceHelperTemplate):
             started = False
             return started
 
+        self.dropFromSnapshot(service)
         self.ch.executeCommand(self.sysctl + " start " + service)
         retcode = self.ch.getReturnCode()
         if retcode != 0:
@@ -285,6 +412,7 @@ class SHsystemctl(ServiceHelperTemplate):
             return stopped
 
         else:
+            self.dropFromSnapshot(service)
             self.ch.executeCommand(self.sysctl + " stop " + service)
             retcode = self.ch.getReturnCode()
             if retcode != 0:
@@ -324,8 +452,10 @@ class SHsystemctl(ServiceHelperTemplate):
                           "masked", "masked-runtime", "static", "indirect", "disabled",
                           "generated", "transient"]
 
-        self.ch.executeCommand(self.sysctl + " is-enabled " + service)
-        output = self.ch.getOutputString()
+        output = self.getSnapshotState('enabled', service)
+        if output is None:
+            self.ch.executeCommand(self.sysctl + " is-enabled " + service)
+            output = self.ch.getOutputString()
 
         try:
             if len(output.split()) == 1:
@@ -35,22 +35,32 @@ installed.
         change events
 @change: 2019/07/30 Brandon R. Gonzales - Add conditional for chkconfig systems
         to make sure that the 'service' command is available
+@change: 2026/10/16 added takeSnapshot
+@change: 2026/10/16 backend detection moved to servicemanager, done once per
+        process; backends are shared and calls into them serialized
+@change: 2026/10/17 added clearSnapshot
 """
 
-import os
-import re
-
-from stonix_resources import SHchkconfig
-from stonix_resources import SHrcupdate
-from stonix_resources import SHupdaterc
-from stonix_resources import SHsystemctl
-from stonix_resources import SHsvcadm
-from stonix_resources import SHrcconf
-from stonix_resources import SHlaunchd
-from stonix_resources import SHlaunchdTwo
+import functools
 
 from stonix_resources.logdispatcher import LogPriority
-from stonix_resources.get_libc import getLibc
+from stonix_resources.servicemanager import getservicemanagers
+from stonix_resources.SHsystemctl import clearSnapshot
+
+
+def serialized(method):
+    '''Run a ServiceHelper method while holding the lock of the shared
+    service management backends
+
+    :param method: ServiceHelper method
+
+    '''
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class ServiceHelper(object):
@@ -83,167 +93,18 @@ class ServiceHelper(object):
 
         self.environ = environ
         self.logdispatcher = logger
-        self.isHybrid = False
-        self.isdualparameterservice = False
-        self.svchelper = None
-        self.secondary = None
         self.service = ""
         self.servicename = ""
 
-        try:
-            self.lc = getLibc()
-        except Exception as err:
-            self.logdispatcher.log(LogPriority.ERROR, str(err))
-            raise
-
-        systemctl_paths = ["/usr/bin/systemctl", "/bin/systemctl"]
-
-        # Red Hat, CentOS, SUSE
-        foundchkconfig = os.path.exists('/sbin/chkconfig')
-        foundservice = os.path.exists('/sbin/service') or \
-                       os.path.exists('/usr/sbin/service')
-        if foundchkconfig and foundservice:
-            ischkconfig = True
-        else:
-            ischkconfig = False
-
-        # Gentoo
-        if os.path.exists('/sbin/rc-update'):
-            isrcupdate = True
-        else:
-            isrcupdate = False
-        # Ubuntu, Debian
-        if os.path.exists('/usr/sbin/update-rc.d'):
-            isupdaterc = True
-        else:
-            isupdaterc = False
-        # Fedora, RHEL 7
-        if any(os.path.exists(p) for p in systemctl_paths):
-            issystemctl = True
-        else:
-            issystemctl = False
-        # Solaris
-        if os.path.exists('/usr/sbin/svcadm'):
-            issvcadm = True
-        else:
-            issvcadm = False
-        # FreeBSD
-        if os.path.exists('/etc/rc.conf') and \
-        os.path.exists('/etc/rc.d/LOGIN'):
-            isrcconf = True
-        else:
-            isrcconf = False
-        # OS X
-        if os.path.exists('/sbin/launchd'):
-            islaunchd = True
-            self.isdualparameterservice = True
-        else:
-            islaunchd = False
-
-        truecount = 0
-        for svctype in [ischkconfig, isrcupdate, isupdaterc,
-                        issystemctl, issvcadm, isrcconf, islaunchd]:
-            if svctype:
-                truecount += 1
-        if truecount == 0:
-            raise RuntimeError("Could not identify service management programs")
-        elif truecount == 1:
-            if ischkconfig:
-                self.svchelper = SHchkconfig.SHchkconfig(self.environ,
-                                                         self.logdispatcher)
-            elif isrcupdate:
-                self.svchelper = SHrcupdate.SHrcupdate(self.environ,
-                                                       self.logdispatcher)
-            elif isupdaterc:
-                self.svchelper = SHupdaterc.SHupdaterc(self.environ,
-                                                       self.logdispatcher)
-            elif issystemctl:
-                self.svchelper = SHsystemctl.SHsystemctl(self.environ,
-                                                         self.logdispatcher)
-            elif issvcadm:
-                self.svchelper = SHsvcadm.SHsvcadm(self.environ,
-                                                   self.logdispatcher)
-            elif isrcconf:
-                self.svchelper = SHrcconf.SHrcconf(self.environ,
-                                                   self.logdispatcher)
-            elif islaunchd:
-                if re.match("10.11", self.environ.getosver()):
-                    self.svchelper = SHlaunchd.SHlaunchd(self.environ,
-                                                     self.logdispatcher)
-                else:
-                    self.svchelper = SHlaunchdTwo.SHlaunchdTwo(self.environ,
-                                                     self.logdispatcher)
-            else:
-                raise RuntimeError("Could not identify service management programs")
-        elif truecount > 1:
-            self.isHybrid = True
-            count = 0
-            if issystemctl:
-                self.svchelper = SHsystemctl.SHsystemctl(self.environ,
-                                                         self.logdispatcher)
-                count = 1
-            if ischkconfig:
-                if count == 0:
-                    self.svchelper = SHchkconfig.SHchkconfig(self.environ,
-                                                             self.logdispatcher)
-                    count = 1
-                elif count == 1:
-                    self.secondary = SHchkconfig.SHchkconfig(self.environ,
-                                                             self.logdispatcher)
-            if isrcupdate:
-                if count == 0:
-                    self.svchelper = SHrcupdate.SHrcupdate(self.environ,
-                                                           self.logdispatcher)
-                    count = 1
-                elif count == 1:
-                    self.secondary = SHrcupdate.SHrcupdate(self.environ,
-                                                           self.logdispatcher)
-            if isupdaterc:
-                if count == 0:
-                    self.svchelper = SHupdaterc.SHupdaterc(self.environ,
-                                                           self.logdispatcher)
-                    count = 1
-                elif count == 1:
-                    self.secondary = SHupdaterc.SHupdaterc(self.environ,
-                                                           self.logdispatcher)
-            if issvcadm:
-                if count == 0:
-                    self.svchelper = SHsvcadm.SHsvcadm(self.environ,
-                                                       self.logdispatcher)
-                    count = 1
-                elif count == 1:
-                    self.secondary = SHsvcadm.SHsvcadm(self.environ,
-                                                       self.logdispatcher)
-            if isrcconf:
-                if count == 0:
-                    self.svchelper = SHrcconf.SHrcconf(self.environ,
-                                                       self.logdispatcher)
-                    count = 1
-                elif count == 1:
-                    self.secondary = SHrcconf.SHrcconf(self.environ,
-                                                       self.logdispatcher)
-            if islaunchd:
-                self.svchelper = SHlaunchd.SHlaunchd(self.environ,
-                                                     self.logdispatcher)
-                count = 1
-
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'ischkconfig: ' + str(ischkconfig))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'isrcupdate: ' + str(isrcupdate))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'isupdaterc: ' + str(isupdaterc))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'issystemctl: ' + str(issystemctl))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'issvcadm: ' + str(issvcadm))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'isrcconf: ' + str(isrcconf))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'ishybrid: ' + str(self.isHybrid))
-        self.logdispatcher.log(LogPriority.DEBUG,
-                               'isdualparameterservice: ' +
-                               str(self.isdualparameterservice))
+        # backend detection is done once per process and the backends are
+        # shared by every ServiceHelper
+        managers = getservicemanagers(self.environ, self.logdispatcher)
+        self.lc = managers.lc
+        self.lock = managers.lock
+        self.isHybrid = managers.isHybrid
+        self.isdualparameterservice = managers.isdualparameterservice
+        self.svchelper = managers.svchelper
+        self.secondary = managers.secondary
 
     def getService(self):
         '''
@@ -348,6 +209,7 @@ class ServiceHelper(object):
 
         return setServiceSuccess
 
+    @serialized
     def disableService(self, service, **kwargs):
         '''Disables the service and terminates it if it is running.
 
@@ -405,6 +267,7 @@ class ServiceHelper(object):
 
         return disabled
 
+    @serialized
     def enableService(self, service, **kwargs):
         '''Enables a service and starts it if it is not running as long as we are
         not in install mode
@@ -463,6 +326,7 @@ class ServiceHelper(object):
 
         return enabledSuccess
 
+    @serialized
     def auditService(self, service, **kwargs):
         '''Checks the status of a service and returns a bool indicating whether or
         not the service is configured to run or not.
@@ -502,6 +366,7 @@ class ServiceHelper(object):
 
         return enabled
 
+    @serialized
     def isRunning(self, service, **kwargs):
         '''Check to see if a service is currently running. The enable service uses
         this so that we're not trying to start a service that is already
@@ -542,6 +407,7 @@ class ServiceHelper(object):
 
         return isrunning
 
+    @serialized
     def reloadService(self, service, **kwargs):
         '''Reload (HUP) a service so that it re-reads it's config files. Called
         by rules that are configuring a service to make the new configuration
@@ -596,6 +462,7 @@ class ServiceHelper(object):
 
         return reloadSuccess
 
+    @serialized
     def listServices(self):
         '''List the services installed on the system.
 
@@ -632,6 +499,42 @@ class ServiceHelper(object):
 
         return serviceList
 
+    @serialized
+    def takeSnapshot(self):
+        '''Read the enabled and running state of every service at once.
+        Rules that audit many services should call this before their audit
+        loop; auditService and isRunning are then answered from the snapshot
+        where the helper supports one (systemd). Services enabled, disabled,
+        started or stopped through this helper are dropped from the snapshot
+        and queried directly again.
+
+        :returns: snapshot
+        :rtype: bool
+
+        '''
+
+        snapshot = False
+
+        try:
+            snapshot = self.svchelper.takeSnapshot()
+        except AttributeError:
+            pass
+
+        self.logdispatcher.log(LogPriority.DEBUG, "Service state snapshot taken: " + str(snapshot))
+
+        return snapshot
+
+    def clearSnapshot(self):
+        '''Discard the service state snapshot taken by takeSnapshot. Rules
+        which take a snapshot should call this once their audit loop is done
+        so that later audits, by this or any other rule, query the services
+        directly.
+
+        '''
+
+        clearSnapshot()
+
+    @serialized
     def startService(self, service, **kwargs):
         '''start the given service
 
@@ -683,6 +586,7 @@ class ServiceHelper(object):
 
         return started
 
+    @serialized
     def stopService(self, service, **kwargs):
         '''stop the given service
 
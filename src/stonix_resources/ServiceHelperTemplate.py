@@ -209,6 +209,18 @@ class ServiceHelperTemplate(object):
 
     #----------------------------------------------------------------------
 
+    def takeSnapshot(self):
+        '''Read the state of every service in as few calls as possible so
+        that following audits can be answered without a command per service.
+        Helpers that can not do this keep querying each service.
+
+        :returns: bool, True if a snapshot was taken
+
+        '''
+        return False
+
+    #----------------------------------------------------------------------
+
     def start(self, service, *args, **kwargs):
         '''Start a service installed on the system.
 
@@ -29,11 +29,19 @@ oldfile does not exist
 @change: 2017/10/23 rsn - change to new service helper interface
 @change: 2018/12/06 Brandon R. Gonzales - Fixed issue where patch files are
         created without a trailing endline character
+@change: 2026/10/16 - Event log moved from a shelve to an SQLite database
+        indexed by rule id. Existing shelve event logs are migrated on first
+        use. Added batch() so a rule's changes are committed together.
 '''
+import contextlib
+import dbm
+import pickle
 import shelve
 import shutil
+import sqlite3
 import os
 import re
+import threading
 import traceback
 import filecmp
 import time
@@ -65,7 +73,8 @@ class StateChgLogger(object):
          The eventlog database. This file contains a record of change events.
          The change event record can be referenced to determine whether or not a
          change occured and/or the initial value of objects before the change
-         occured.
+         occured. eventlog is the sqlite3 connection to the database at
+         eventdb, events are indexed by their 4 digit rule id.
 
         eventlog  (public)
 
@@ -87,25 +96,18 @@ class StateChgLogger(object):
         self.debug = self.environment.getdebugmode()
         self.diffdir = '/var/db/stonix/diffdir'
         self.archive = '/var/db/stonix/archive'
+        self.eventdb = '/var/db/stonix/eventlog.sqlite'
+        self.oldeventlog = '/var/db/stonix/eventlog'
         self.privmode = True
+        self.lock = threading.RLock()
+        self.batchdepth = 0
         try:
             if not os.path.exists('/var/db/stonix') and \
                self.environment.geteuid() == 0:
                 os.makedirs('/var/db/stonix', 0o700)
             if self.environment.geteuid() == 0:
-                try:
-                    self.eventlog = shelve.open('/var/db/stonix/eventlog', 'c', None, True)
-                except:
-                    # if a python 3 version of stonix attempts to access an eventlog file
-                    # created or written to in a python 2 version of stonix, there is an incompatibility
-                    # which results in a traceback; catch this traceback and backup the old python 2 version
-                    # of the file and create a new python 3 version of it
-                    if not os.path.isfile('/var/db/stonix/eventlog.old'):
-                        if os.path.isfile('/var/db/stonix/eventlog'):
-                            shutil.copy2('/var/db/stonix/eventlog', '/var/db/stonix/eventlog.old')
-                    if os.path.isfile('/var/db/stonix/eventlog'):
-                        os.remove('/var/db/stonix/eventlog')
-                    self.eventlog = shelve.open('/var/db/stonix/eventlog', 'c', None, True)
+                self.openlog()
+                self.migrateshelve()
             else:
                 self.privmode = False
             for node in [self.diffdir, self.archive]:
@@ -114,6 +116,86 @@ class StateChgLogger(object):
         except OSError:
             raise
 
+    def openlog(self):
+        '''Private method to open the event log database, creating the events
+        table and its rule id index if needed. A database that cannot be read
+        is moved aside to eventlog.sqlite.old and a new one is created.
+
+        '''
+        try:
+            self.eventlog = self.connect()
+        except sqlite3.DatabaseError:
+            self.logger.log(LogPriority.ERROR,
+                            ['StateChgLogger',
+                             'Unable to read ' + self.eventdb +
+                             ', moving it aside: ' + traceback.format_exc()])
+            os.rename(self.eventdb, self.eventdb + '.old')
+            self.eventlog = self.connect()
+
+    def connect(self):
+        '''Private method that returns a connection to the event log
+        database.
+
+        :returns: sqlite3.Connection
+
+        '''
+        conn = sqlite3.connect(self.eventdb, check_same_thread=False)
+        try:
+            os.chmod(self.eventdb, 0o600)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS events ' +
+                         '(eventid TEXT PRIMARY KEY, ' +
+                         'ruleid TEXT NOT NULL, event BLOB NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS events_ruleid ' +
+                         'ON events (ruleid)')
+            conn.commit()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def migrateshelve(self):
+        '''Private method that copies the events from a shelve based event
+        log written by older versions of stonix into the event log database.
+        The shelve files are renamed with a .migrated suffix afterwards so the
+        migration is only done once. A shelve that cannot be read (e.g. one
+        written by python 2) is preserved as eventlog.old.
+
+        '''
+        if not dbm.whichdb(self.oldeventlog):
+            return
+        self.logger.log(LogPriority.DEBUG,
+                        ['StateChgLogger',
+                         'Migrating shelve event log ' + self.oldeventlog])
+        try:
+            oldlog = shelve.open(self.oldeventlog, 'r')
+            try:
+                rows = [(key, key[0:4], pickle.dumps(oldlog[key]))
+                        for key in oldlog]
+            finally:
+                oldlog.close()
+            with self.lock:
+                self.eventlog.executemany('INSERT OR IGNORE INTO events ' +
+                                          'VALUES (?, ?, ?)', rows)
+                self.eventlog.commit()
+            suffix = '.migrated'
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            # a python 2 shelve is not readable by python 3
+            self.logger.log(LogPriority.DEBUG,
+                            ['StateChgLogger',
+                             'Unable to migrate event log: ' +
+                             traceback.format_exc()])
+            suffix = '.old'
+        for ext in ['', '.db', '.dat', '.dir', '.bak', '.pag']:
+            oldfile = self.oldeventlog + ext
+            if os.path.isfile(oldfile) and \
+               not os.path.exists(oldfile + suffix):
+                os.rename(oldfile, oldfile + suffix)
+            elif os.path.isfile(oldfile):
+                os.remove(oldfile)
+
     def __del__(self):
         """
         This class has an explicit destructor in order to ensure that the
@@ -419,10 +501,37 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        self.eventlog[eventcode] = eventdict
+        with self.lock:
+            self.eventlog.execute('INSERT OR REPLACE INTO events ' +
+                                  'VALUES (?, ?, ?)',
+                                  (eventcode, eventcode[0:4],
+                                   pickle.dumps(eventdict)))
+            if not self.batchdepth:
+                self.eventlog.commit()
         debug = "Recorded new change event with event code " + eventcode
         self.logger.log(LogPriority.DEBUG, debug)
-        self.eventlog.sync()
+
+    @contextlib.contextmanager
+    def batch(self):
+        '''Context manager that defers committing change events recorded
+        inside the with block until the block exits, so that all of the
+        changes made by a rule run are written in a single transaction. The
+        events are committed even if the block raises. Batches may be nested.
+        Without privilege this does nothing.
+
+        '''
+        if not self.privmode:
+            yield
+            return
+        with self.lock:
+            self.batchdepth += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.batchdepth -= 1
+                if not self.batchdepth:
+                    self.eventlog.commit()
 
     def getchgevent(self, eventcode):
         '''Get change event takes an eventcode and returns a dictionary containing
@@ -440,7 +549,13 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        eventdict = self.eventlog[eventcode]
+        with self.lock:
+            row = self.eventlog.execute('SELECT event FROM events ' +
+                                        'WHERE eventid = ?',
+                                        (eventcode,)).fetchone()
+        if row is None:
+            raise KeyError(eventcode)
+        eventdict = pickle.loads(row[0])
         return eventdict
 
     def closelog(self):
@@ -455,7 +570,12 @@ are an end user please report a bug.''')
             raise RuntimeError('''recordfilechange method called without privilege.
 If you are a rule developer you should guard against this. If you
 are an end user please report a bug.''')
-        self.eventlog.close()
+        with self.lock:
+            if self.eventlog is None:
+                return
+            self.eventlog.commit()
+            self.eventlog.close()
+            self.eventlog = None
 
     def archivefile(self, oldfile):
         '''Private method to archive a copy of a file into the file archive. This
@@ -538,18 +658,12 @@ are an end user please report a bug.''')
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger.findrulechanges',
                          "Searching for: %s" % ruleid])
-        for key in self.eventlog:
-            try:
-                keyruleid = key[0:4]
-                # self.logger.log(LogPriority.DEBUG,
-                #                 ['StateChgLogger.findrulechanges',
-                #                  "Comparing to keyruleid: %s" % keyruleid])
-                if keyruleid == myruleid:
-                    eventlist.append(key)
-            except(IndexError):
-                self.logger.log(LogPriority.ERROR,
-                                ['StateChgLogger.findrulechanges',
-                                 'Bad key detected in eventlog: ' + key])
+        with self.lock:
+            rows = self.eventlog.execute('SELECT eventid FROM events ' +
+                                         'WHERE ruleid = ? ORDER BY eventid',
+                                         (myruleid,)).fetchall()
+        for row in rows:
+            eventlist.append(row[0])
         self.logger.log(LogPriority.DEBUG,
                         ['StateChgLogger.findrulechanges',
                          "returning eventlist: %s" % eventlist])
@@ -579,10 +693,11 @@ are an end user please report a bug.''')
         if not eventid or not type(eventid) == str:
             raise TypeError('Null eventid or wrong type')
         try:
-            del self.eventlog[eventid]
-        except(KeyError):
-            # key was not found in the event log
-            return True
+            with self.lock:
+                self.eventlog.execute('DELETE FROM events WHERE eventid = ?',
+                                      (eventid,))
+                if not self.batchdepth:
+                    self.eventlog.commit()
         except Exception:
             self.logger.log(LogPriority.ERROR,
                             ['StateChgLogger.deleteentry',
@@ -0,0 +1,400 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide, indexed view of the local account database. Many rules need
+the users, groups or shadow entries of the system and used to open and parse
+/etc/passwd, /etc/group and /etc/shadow themselves, call pwd.getpwall() or
+run getent. AccountDatabase parses each file once and indexes the entries by
+name, uid, gid and home directory. UID_MIN and UID_MAX from /etc/login.defs
+are used to tell regular user accounts from system accounts.
+
+The files are read through filecache, so an index is rebuilt only when the
+file changed on disk, including when STONIX itself rewrote it. Enumerating
+all users known to the name service (which on LDAP or SSSD joined hosts
+queries the directory servers) is done at most once per run, see
+getallusers.
+"""
+
+import os
+import pwd
+import threading
+
+from collections import namedtuple
+
+from stonix_resources import filecache
+from stonix_resources.logdispatcher import LogPriority
+
+User = namedtuple("User", ["name", "passwd", "uid", "gid", "gecos", "home",
+                           "shell"])
+Group = namedtuple("Group", ["name", "passwd", "gid", "members"])
+Shadow = namedtuple("Shadow", ["name", "passwd", "lastchange", "minage",
+                               "maxage", "warn", "inactive", "expire"])
+
+# fallbacks used throughout STONIX when login.defs does not set a value
+DEFAULTUIDMIN = 500
+DEFAULTUIDMAX = 60000
+
+
+def _fields(lines, count):
+    """Yield the colon separated fields of the entries of an account file,
+    skipping comments, blank lines and NIS compat (+/-) entries
+
+    :param lines: lines of the file
+    :param count: minimum number of fields of a valid entry
+    """
+
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip() or line.startswith(("#", "+", "-")):
+            continue
+        fields = line.split(":")
+        if len(fields) >= count:
+            yield fields
+
+
+class AccountDatabase(object):
+    """Indexed users, groups and shadow entries of the local account files
+
+    :param logger: logdispatcher object reference (Default value = None)
+    :param passwd: path of the passwd file (Default value = "/etc/passwd")
+    :param group: path of the group file (Default value = "/etc/group")
+    :param shadow: path of the shadow file (Default value = "/etc/shadow")
+    :param logindefs: path of login.defs
+        (Default value = "/etc/login.defs")
+
+    """
+
+    def __init__(self, logger=None, passwd="/etc/passwd", group="/etc/group",
+                 shadow="/etc/shadow", logindefs="/etc/login.defs"):
+        self.logger = logger
+        self.paths = {"passwd": passwd, "group": group, "shadow": shadow,
+                      "logindefs": logindefs}
+        self.lock = threading.RLock()
+        # file kind -> lines the current index was built from
+        self.sources = {}
+        self.users = []
+        self.usersbyname = {}
+        self.usersbyuid = {}
+        self.usersbyhome = {}
+        self.groups = []
+        self.groupsbyname = {}
+        self.groupsbygid = {}
+        self.shadows = {}
+        self.logindefs = {}
+        self.allusers = None
+
+    def debug(self, message):
+        """log a debug message if a logger was given"""
+
+        if self.logger:
+            self.logger.log(LogPriority.DEBUG, message)
+
+    def __current(self, kind):
+        """Return True if the file has the contents its index was built
+        from. The current contents are remembered either way.
+
+        :param kind: passwd, group, shadow or logindefs
+        """
+
+        try:
+            lines = filecache.readlines(self.paths[kind])
+        except (IOError, OSError):
+            # missing or, for shadow, unreadable to non root users
+            lines = ()
+        current = self.sources.get(kind) == lines
+        self.sources[kind] = lines
+        return current
+
+    def loadusers(self):
+        """(re)build the index of the passwd file if it changed"""
+
+        with self.lock:
+            if self.__current("passwd"):
+                return
+            self.debug("Indexing " + self.paths["passwd"])
+            self.users = []
+            self.usersbyname = {}
+            self.usersbyuid = {}
+            self.usersbyhome = {}
+            for fields in _fields(self.sources["passwd"], 7):
+                try:
+                    user = User(fields[0], fields[1], int(fields[2]),
+                                int(fields[3]), fields[4], fields[5],
+                                ":".join(fields[6:]))
+                except ValueError:
+                    self.debug("Skipping malformed passwd entry for " +
+                               fields[0])
+                    continue
+                self.users.append(user)
+                self.usersbyname.setdefault(user.name, user)
+                self.usersbyuid.setdefault(user.uid, []).append(user)
+                self.usersbyhome.setdefault(user.home, []).append(user)
+
+    def loadgroups(self):
+        """(re)build the index of the group file if it changed"""
+
+        with self.lock:
+            if self.__current("group"):
+                return
+            self.debug("Indexing " + self.paths["group"])
+            self.groups = []
+            self.groupsbyname = {}
+            self.groupsbygid = {}
+            for fields in _fields(self.sources["group"], 4):
+                try:
+                    gid = int(fields[2])
+                except ValueError:
+                    self.debug("Skipping malformed group entry for " +
+                               fields[0])
+                    continue
+                members = [m for m in fields[3].split(",") if m]
+                group = Group(fields[0], fields[1], gid, members)
+                self.groups.append(group)
+                self.groupsbyname.setdefault(group.name, group)
+                self.groupsbygid.setdefault(group.gid, []).append(group)
+
+    def loadshadow(self):
+        """(re)build the index of the shadow file if it changed"""
+
+        with self.lock:
+            if self.__current("shadow"):
+                return
+            self.shadows = {}
+            for fields in _fields(self.sources["shadow"], 2):
+                fields = fields + [""] * (8 - len(fields))
+                self.shadows.setdefault(fields[0], Shadow(*fields[:8]))
+
+    def loadlogindefs(self):
+        """(re)build the index of the login.defs settings if it changed"""
+
+        with self.lock:
+            if self.__current("logindefs"):
+                return
+            self.logindefs = {}
+            for line in self.sources["logindefs"]:
+                sline = line.split()
+                if len(sline) >= 2 and not sline[0].startswith("#"):
+                    self.logindefs[sline[0].upper()] = sline[1]
+
+    def getusers(self):
+        """Return all entries of the passwd file, in file order
+
+        :return: users
+        :rtype: list of User
+        """
+
+        self.loadusers()
+        return list(self.users)
+
+    def getuser(self, name):
+        """Return the passwd entry of a user, or None
+
+        :param name: user name
+        :return: user
+        :rtype: User
+        """
+
+        self.loadusers()
+        return self.usersbyname.get(name)
+
+    def getusersbyuid(self, uid):
+        """Return the passwd entries with the given uid. More than one entry
+        means the uid is duplicated.
+
+        :param uid: user id
+        :return: users
+        :rtype: list of User
+        """
+
+        self.loadusers()
+        return list(self.usersbyuid.get(int(uid), []))
+
+    def getusersbyhome(self, home):
+        """Return the passwd entries with the given home directory
+
+        :param home: home directory path
+        :return: users
+        :rtype: list of User
+        """
+
+        self.loadusers()
+        return list(self.usersbyhome.get(home, []))
+
+    def getgroups(self):
+        """Return all entries of the group file, in file order
+
+        :return: groups
+        :rtype: list of Group
+        """
+
+        self.loadgroups()
+        return list(self.groups)
+
+    def getgroup(self, name):
+        """Return the group entry with the given name, or None
+
+        :param name: group name
+        :return: group
+        :rtype: Group
+        """
+
+        self.loadgroups()
+        return self.groupsbyname.get(name)
+
+    def getgroupsbygid(self, gid):
+        """Return the group entries with the given gid
+
+        :param gid: group id
+        :return: groups
+        :rtype: list of Group
+        """
+
+        self.loadgroups()
+        return list(self.groupsbygid.get(int(gid), []))
+
+    def getshadow(self, name):
+        """Return the shadow entry of a user, or None if there is none or the
+        shadow file can not be read
+
+        :param name: user name
+        :return: shadow entry
+        :rtype: Shadow
+        """
+
+        self.loadshadow()
+        return self.shadows.get(name)
+
+    def getshadows(self):
+        """Return all shadow entries
+
+        :return: shadow entries
+        :rtype: list of Shadow
+        """
+
+        self.loadshadow()
+        return list(self.shadows.values())
+
+    def getlogindef(self, key, default=None):
+        """Return the value of a login.defs setting
+
+        :param key: setting name, e.g. UID_MIN
+        :param default: value returned if the setting is not present
+        :return: value
+        :rtype: str
+        """
+
+        self.loadlogindefs()
+        return self.logindefs.get(key.upper(), default)
+
+    def getuidrange(self):
+        """Return the range of user ids of regular (non system) accounts
+
+        :return: (UID_MIN, UID_MAX)
+        :rtype: tuple
+        """
+
+        try:
+            uidmin = int(self.getlogindef("UID_MIN", DEFAULTUIDMIN))
+        except ValueError:
+            uidmin = DEFAULTUIDMIN
+        try:
+            uidmax = int(self.getlogindef("UID_MAX", DEFAULTUIDMAX))
+        except ValueError:
+            uidmax = DEFAULTUIDMAX
+        return uidmin, uidmax
+
+    def isregularuser(self, user):
+        """Return True if the user's uid is in the regular user range
+
+        :param user: User entry
+        :rtype: bool
+        """
+
+        uidmin, uidmax = self.getuidrange()
+        return uidmin <= user.uid <= uidmax
+
+    def getregularusers(self):
+        """Return the passwd entries of regular (non system) accounts
+
+        :return: users
+        :rtype: list of User
+        """
+
+        return [user for user in self.getusers() if self.isregularuser(user)]
+
+    def getsystemusers(self):
+        """Return the passwd entries of system accounts (uid below UID_MIN)
+
+        :return: users
+        :rtype: list of User
+        """
+
+        uidmin = self.getuidrange()[0]
+        return [user for user in self.getusers() if user.uid < uidmin]
+
+    def getallusers(self):
+        """Return all users known to the name service, including directory
+        (LDAP, SSSD, NIS) accounts where enumeration is enabled. The
+        enumeration is done once; invalidate() forces a new one.
+
+        :return: users
+        :rtype: list of User
+        """
+
+        with self.lock:
+            if self.allusers is None:
+                self.allusers = [User(*entry) for entry in pwd.getpwall()]
+            return list(self.allusers)
+
+    def invalidate(self):
+        """Forget all indexes so every file is parsed again on next use"""
+
+        with self.lock:
+            self.sources = {}
+            self.allusers = None
+
+
+_accountdb = None
+_accountdblock = threading.Lock()
+
+
+def getaccountdb(logger=None):
+    """Return the process wide account database
+
+    :param logger: logdispatcher object reference (Default value = None)
+    :return: account database
+    :rtype: AccountDatabase
+    """
+
+    global _accountdb
+    with _accountdblock:
+        if _accountdb is None:
+            _accountdb = AccountDatabase(logger)
+        elif _accountdb.logger is None:
+            _accountdb.logger = logger
+        return _accountdb
+
+
+def invalidate():
+    """Forget the indexes of the process wide account database"""
+
+    with _accountdblock:
+        if _accountdb is not None:
+            _accountdb.invalidate()
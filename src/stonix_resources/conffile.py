@@ -20,11 +20,13 @@ Created on Dec 13, 2011
 
 
 @author: dkennel
+@change: 2026/10/16 - file contents are read through the shared file cache
 '''
 
 import os
 import re
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import filecache
 
 
 class ConfFile(object):
@@ -71,9 +73,7 @@ class ConfFile(object):
         self.filedata = []
         if self.present:
             try:
-                rhandle = open(self.filename, 'r')
-                self.filedata = rhandle.readlines()
-                rhandle.close()
+                self.filedata = list(filecache.readlines(self.filename))
             except(IOError, OSError):
                 self.logger.log(LogPriority.INFO,
                                 ['ConfFile',
@@ -158,9 +158,7 @@ class ConfFile(object):
         '''Reread'''
         if self.present:
             try:
-                rhandle = open(self.filename, 'r')
-                self.filedata = rhandle.readlines()
-                rhandle.close()
+                self.filedata = list(filecache.readlines(self.filename))
             except(IOError, OSError):
                 self.logger.log(LogPriority.INFO,
                                 ['ConfFile',
@@ -205,3 +203,4 @@ class ConfFile(object):
         for line in self.filedata:
             whandle.write(line)
         whandle.close()
+        filecache.invalidate(self.tempfile)
@@ -38,6 +38,11 @@ Created on Aug 24, 2010
 @change: 2017/03/07 - dkennel - added fisma risk level support
 @change: 2017/09/20 - bgonz12 - updated the implementation of getdefaultip and
             getallips.
+@change: 2026/10/16 - host facts are determined on first use and kept in an
+            on-disk fact cache instead of being collected in __init__
+@change: 2026/10/16 - OS, init system, network and DMI facts are read from
+            /proc, /sys and /etc/os-release through hostprobe, commands are
+            only run as a fallback
 """
 
 import os
@@ -47,9 +52,13 @@ import socket
 import subprocess
 import platform
 import pwd
+import threading
 import time
+import functools
 
 from stonix_resources.localize import CORPORATENETWORKSERVERS, STONIXVERSION, FISMACAT
+from stonix_resources.factcache import FactCache
+from stonix_resources import hostprobe
 
 if os.geteuid() == 0:
     try:
@@ -60,6 +69,65 @@ if os.geteuid() == 0:
 else:
     DMI = False
 
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+
+class HostFact(object):
+    """Environment attribute holding a host fact which is determined on first
+    use by calling an Environment method (the setter), or taken from the fact
+    cache if a previous run determined it less than ttl seconds ago. A setter
+    may determine several facts at once; they are cached together.
+
+    :param setter: name of the Environment method which determines the fact
+        by assigning it to the attribute
+    :param ttl: time to live of the cached fact in seconds
+
+    """
+
+    def __init__(self, setter, ttl):
+        self.setter = setter
+        self.ttl = ttl
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, env, owner):
+        if env is None:
+            return self
+        if self.name not in env.facts:
+            with env.factlock:
+                if self.name in env.computing:
+                    # read by the setter while it determines the fact
+                    return env.computing[self.name]
+                if self.name not in env.facts:
+                    env.collectfacts(self.setter)
+        return env.facts[self.name]
+
+    def __set__(self, env, value):
+        if self.name in env.computing:
+            env.computing[self.name] = value
+        else:
+            env.facts[self.name] = value
+
+
+def cachedfact(ttl):
+    """Decorator for Environment methods without arguments whose result is a
+    host fact that should be kept in the fact cache for ttl seconds
+
+    :param ttl: time to live of the cached fact in seconds
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            return self.getcachedfact(method.__name__, ttl,
+                                      lambda: method(self))
+        return wrapper
+    return decorator
+
 
 class Environment:
 
@@ -71,19 +139,24 @@ class Environment:
 
     """
 
+    operatingsystem = HostFact("discoveros", DAY)
+    osreportstring = HostFact("discoveros", DAY)
+    osversion = HostFact("discoveros", DAY)
+    osname = HostFact("setosname", DAY)
+    systemtype = HostFact("setsystemtype", DAY)
+    hostname = HostFact("sethostname", HOUR)
+    ipaddress = HostFact("setipaddress", HOUR)
+    macaddress = HostFact("setmacaddress", DAY)
+
     def __init__(self):
-        self.operatingsystem = ''
-        self.osreportstring = ''
+        # determined host facts, and facts whose setter is running
+        self.facts = {}
+        self.computing = {}
+        self.factlock = threading.RLock()
         self.osfamily = ''
-        self.osname = ''
-        self.hostname = ''
-        self.ipaddress = ''
-        self.macaddress = ''
-        self.osversion = ''
         self.major_ver = ''
         self.minor_ver = ''
         self.trivial_ver = ''
-        self.systemtype = ''
         self.numrules = 0
         self.stonixversion = STONIXVERSION
         self.euid = os.geteuid()
@@ -98,7 +171,13 @@ class Environment:
         self.runtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
         self.systemfismacat = 'low'
         self.systemfismacat = self.determinefismacat()
-        self.collectinfo()
+        self.setosfamily()
+        self.collectpaths()
+        if self.euid == 0:
+            factpath = "/var/db/stonix/factcache.json"
+        else:
+            factpath = os.path.join(self.log_path, "factcache.json")
+        self.factcache = FactCache(factpath)
 
     def setsystemtype(self):
         """determine whether the current system is based on:
@@ -127,18 +206,20 @@ class Environment:
 
         try:
 
-            if cmd:
+            # the name of process 1 from /proc, ps where there is no /proc
+            comm = hostprobe.initsystem()
+            if comm:
+                outputlines = [comm]
+            elif cmd:
                 # run the command
-                cmdoutput = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, close_fds=True)
-                outputlines = cmdoutput.stdout.readlines()
-                for line in outputlines:
-                    line = line.decode('ascii')
-                    for vt in validtypes:
-                        if re.search(vt, line, re.IGNORECASE):
-                            self.systemtype = vt
-
+                outputlines = hostprobe.runcmd(cmd)
             else:
+                outputlines = []
                 print("Unable to determine systemtype. Required utility 'ps' does not exist on this system")
+            for line in outputlines:
+                for vt in validtypes:
+                    if re.search(vt, line, re.IGNORECASE):
+                        self.systemtype = vt
         except OSError:
             print("Unable to determine systemtype. Required utility 'ps' does not exist on this system")
 
@@ -367,7 +448,8 @@ class Environment:
         return self.stonixversion
 
     def collectinfo(self):
-        """Private method to populate data.
+        """Determine all host facts now instead of on first use. Facts found
+        in the fact cache are not determined again.
 
 
         :returns: void
@@ -375,16 +457,75 @@ class Environment:
 
         """
 
-        self.discoveros()
-        self.setosfamily()
-        self.setosname()
-        self.guessnetwork()
-        self.collectpaths()
-        self.determinefismacat()
-        self.setsystemtype()
-        self.sethostname()
-        self.setipaddress()
-        self.setmacaddress()
+        for fact in self.getfacts():
+            getattr(self, fact.name)
+
+    @classmethod
+    def getfacts(cls):
+        """Return the lazily determined host fact attributes
+
+        :returns: list of HostFact
+        """
+
+        return [value for value in vars(cls).values()
+                if isinstance(value, HostFact)]
+
+    def collectfacts(self, setter):
+        """Determine the host facts set by the given method, from the fact
+        cache if possible, and store them in self.facts
+
+        :param setter: name of the Environment method which determines the
+            facts
+        """
+
+        with self.factlock:
+            facts = [fact for fact in self.getfacts() if fact.setter == setter]
+            cached = [self.factcache.get(fact.name, fact.ttl)
+                      for fact in facts]
+            if all(found for found, _ in cached):
+                for fact, (_, value) in zip(facts, cached):
+                    self.facts[fact.name] = value
+                return
+            for fact in facts:
+                self.computing[fact.name] = ''
+            try:
+                getattr(self, setter)()
+            except BaseException:
+                # nothing is remembered, the next use tries again
+                for fact in facts:
+                    del self.computing[fact.name]
+                raise
+            for fact in facts:
+                self.facts[fact.name] = self.computing.pop(fact.name)
+                self.factcache.set(fact.name, self.facts[fact.name])
+
+    def getcachedfact(self, name, ttl, compute):
+        """Return a host fact from memory or the fact cache, determining it
+        with compute() if it is not cached or older than ttl seconds
+
+        :param name: name of the fact
+        :param ttl: time to live of the cached fact in seconds
+        :param compute: function returning the fact
+        :returns: value of the fact
+        """
+
+        with self.factlock:
+            if name in self.facts:
+                return self.facts[name]
+            found, value = self.factcache.get(name, ttl)
+            if not found:
+                value = compute()
+                self.factcache.set(name, value)
+            self.facts[name] = value
+            return value
+
+    def clearfactcache(self):
+        """Forget all host facts, in memory and on disk, so they are
+        determined again on next use"""
+
+        with self.factlock:
+            self.facts = {}
+            self.factcache.clear()
 
     def setosname(self):
         """set the name of the OS (variable self.osname)
@@ -444,13 +585,18 @@ class Environment:
         @author: D. Kennel
 
         """
+        # The files lsb_release reads, without starting it
+        lsbinfo = hostprobe.lsbrelease()
+        if lsbinfo:
+            description, release = lsbinfo
+            self.operatingsystem = description
+            self.osreportstring = description
+            self.osversion = release
         # Alternative (better) implementation for Linux
-        if os.path.exists('/usr/bin/lsb_release'):
-            proc = subprocess.Popen('/usr/bin/lsb_release -dr',
-                                  shell=True, stdout=subprocess.PIPE,
-                                  close_fds=True)
-            description = proc.stdout.readline().decode('utf-8')
-            release = proc.stdout.readline().decode('utf-8')
+        elif os.path.exists('/usr/bin/lsb_release'):
+            output = hostprobe.runcmd('/usr/bin/lsb_release -dr') + ['', '']
+            description = output[0]
+            release = output[1]
             #description = description.split()
             # print description
             #del description[0]
@@ -632,6 +778,11 @@ class Environment:
 
         """
 
+        macaddr = hostprobe.macaddress()
+        if macaddr is not None:
+            self.macaddress = macaddr
+            return macaddr
+
         netutil = self.getnetutil()
         macaddr = "00:00:00:00:00:00"
         macre = "(([0-9A-Fa-f]{2}[:-]){5}[0-9A-Fa-f]{2})"
@@ -654,11 +805,9 @@ class Environment:
 
         try:
 
-            macinfocmd = subprocess.Popen(netcmd, shell=True, stdout=subprocess.PIPE, close_fds=True)
-            macinfo = macinfocmd.stdout.readlines()
+            macinfo = hostprobe.runcmd(netcmd)
 
             for line in macinfo:
-                line = line.decode('ascii')
                 match = re.search(macre, line)
                 if match is not None:
                     macaddr = match.group()
@@ -795,11 +944,12 @@ class Environment:
 
         ipaddr = '127.0.0.1'
         gateway = ''
+        # default route from /proc/net/route, None where it does not exist
+        nativegateway = hostprobe.defaultgateway()
 
         try:
-            if os.path.exists("/usr/bin/nmcli"):
-                nmclicmd = subprocess.Popen("/usr/bin/nmcli -t dev list", shell=True, stdout=subprocess.PIPE, close_fds=True)
-                nmclidata = nmclicmd.stdout.readlines()
+            if nativegateway is None and os.path.exists("/usr/bin/nmcli"):
+                nmclidata = hostprobe.runcmd("/usr/bin/nmcli -t dev list")
                 for line in nmclidata:
                     if re.search("IP4-SETTINGS.ADDRESS:", line):
                         sline = line.split(":")
@@ -811,11 +961,12 @@ class Environment:
         if ipaddr != "127.0.0.1":
             return ipaddr
 
-        if sys.platform == 'linux2':
+        if nativegateway is not None:
+            gateway = nativegateway
+        elif sys.platform == 'linux2':
 
             try:
-                routecmd = subprocess.Popen('/sbin/route -n', shell=True, stdout=subprocess.PIPE, close_fds=True)
-                routedata = routecmd.stdout.readlines()
+                routedata = hostprobe.runcmd('/sbin/route -n')
             except (IOError, OSError):
                 return ipaddr
 
@@ -835,13 +986,12 @@ class Environment:
                     cmd = '/usr/sbin/route -n get default'
                 else:
                     cmd = '/sbin/route -n get default'
-                routecmd = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, close_fds=True)
-                routedata = routecmd.stdout.readlines()
+                routedata = hostprobe.runcmd(cmd)
             except (IOError, OSError):
                 return ipaddr
 
             for line in routedata:
-                if re.search('gateway:', line.decode('utf-8')):
+                if re.search('gateway:', line):
                     line = line.split()
                     try:
                         gateway = line[1]
@@ -877,7 +1027,9 @@ class Environment:
 
         try:
 
-            quad = target.split(b'.')
+            if type(target) is bytes:
+                target = target.decode('utf-8')
+            quad = target.split('.')
 
             if level == 1:
                 network = quad[0]
@@ -915,6 +1067,10 @@ class Environment:
 
         """
 
+        iplist = hostprobe.ipaddresses()
+        if iplist is not None:
+            return iplist
+
         iplist = []
         ifconfig = ""
         nmcli = ""
@@ -934,8 +1090,7 @@ class Environment:
             if ifconfig:
 
                 try:
-                    ifcmd = subprocess.Popen(ifconfig, shell=True, stdout=subprocess.PIPE, close_fds=True)
-                    ifdata = ifcmd.stdout.readlines()
+                    ifdata = hostprobe.runcmd(ifconfig)
                 except OSError:
                     return iplist
 
@@ -960,8 +1115,7 @@ class Environment:
             elif nmcli:
 
                 try:
-                    nmcmd = subprocess.Popen(nmcli, shell=True, stdout=subprocess.PIPE, close_fds=True)
-                    nmdata = nmcmd.stdout.readlines()
+                    nmdata = hostprobe.runcmd(nmcli)
                 except OSError:
                     return iplist
 
@@ -1018,6 +1172,7 @@ class Environment:
             # Failed to obtain property number
         return propnum
 
+    @cachedfact(WEEK)
     def get_system_serial_number(self):
         """Find and return the
         Serial number of the local machine
@@ -1027,6 +1182,9 @@ class Environment:
         :returns: string
 
         """
+        systemserial = hostprobe.dmi("systemserial")
+        if systemserial:
+            return systemserial
         systemserial = '0'
         if DMI and self.euid == 0:
             try:
@@ -1055,6 +1213,7 @@ class Environment:
         systemserial = systemserial.strip()
         return systemserial
 
+    @cachedfact(WEEK)
     def get_chassis_serial_number(self):
         """Find and return the
         Chassis serial number
@@ -1063,6 +1222,9 @@ class Environment:
 
 
         """
+        chassisserial = hostprobe.dmi("chassisserial")
+        if chassisserial:
+            return chassisserial
         chassisserial = '0'
         if DMI and self.euid == 0:
             try:
@@ -1075,6 +1237,7 @@ class Environment:
         chassisserial = chassisserial.strip()
         return chassisserial
 
+    @cachedfact(WEEK)
     def get_system_manufacturer(self):
         """Find and return the
         System manufacturer
@@ -1084,6 +1247,9 @@ class Environment:
         :returns: string
 
         """
+        systemmfr = hostprobe.dmi("systemmanufacturer")
+        if systemmfr:
+            return systemmfr
         systemmfr = 'Unk'
         if DMI and self.euid == 0:
             try:
@@ -1099,6 +1265,7 @@ class Environment:
         systemmfr = systemmfr.strip()
         return systemmfr
 
+    @cachedfact(WEEK)
     def get_chassis_manfacturer(self):
         """Find and return the
         Chassis manufacterer
@@ -1108,6 +1275,9 @@ class Environment:
         :returns: string
 
         """
+        chassismfr = hostprobe.dmi("chassismanufacturer")
+        if chassismfr:
+            return chassismfr
         chassismfr = 'Unk'
         if DMI and self.euid == 0:
             try:
@@ -1120,6 +1290,7 @@ class Environment:
         chassismfr = chassismfr.strip()
         return chassismfr
 
+    @cachedfact(WEEK)
     def get_sys_uuid(self):
         """Find and return a unique identifier for the system. On most systems
         this will be the UUID of the system. On Solaris SPARC this will be
@@ -1131,6 +1302,9 @@ class Environment:
         :returns: string
 
         """
+        uuid = hostprobe.dmi("uuid")
+        if uuid:
+            return uuid
         uuid = '0'
         if DMI and self.euid == 0:
             try:
@@ -0,0 +1,166 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+On-disk cache of host facts (operating system, init system, network identity,
+hardware serial numbers, ...) which are expensive to determine because they
+require running external programs. Each fact is stored with the time it was
+determined and is used again only while it is younger than the time to live
+the caller asks for. The whole cache is discarded when the system has been
+rebooted since it was written, so facts that only change across a reboot
+(the kernel, the init system, an upgraded OS release) are never stale.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+BOOTIDFILE = "/proc/sys/kernel/random/boot_id"
+
+
+def getbootid():
+    """Return an identifier which changes every time the system boots
+
+    :return: boot id, or "" if it can not be determined
+    :rtype: str
+    """
+
+    try:
+        with open(BOOTIDFILE, "r") as f:
+            return f.read().strip()
+    except (IOError, OSError):
+        pass
+    # BSD derived systems, including macOS, report the boot time instead
+    for sysctl in ["/usr/sbin/sysctl", "/sbin/sysctl"]:
+        if os.path.exists(sysctl):
+            try:
+                output = subprocess.check_output([sysctl, "-n",
+                                                  "kern.boottime"],
+                                                 stderr=subprocess.DEVNULL)
+                return output.decode("utf-8", "replace").strip()
+            except (subprocess.CalledProcessError, OSError):
+                pass
+    return ""
+
+
+class FactCache(object):
+    """Host facts persisted as JSON in a file
+
+    :param path: path of the cache file
+    :param bootid: identifier of the current boot, determined with
+        getbootid() when not given
+
+    """
+
+    def __init__(self, path, bootid=None):
+        self.path = path
+        self.bootid = bootid
+        self.facts = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        """Read the cache file, discarding it if it was written before the
+        last reboot or can not be parsed"""
+
+        if self.bootid is None:
+            self.bootid = getbootid()
+        self.facts = {}
+        if not self.bootid:
+            # without a boot id a cached fact might be from before a reboot
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("bootid") == self.bootid:
+                self.facts = dict(data.get("facts", {}))
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """Write the cache file. Failures (e.g. a read only or foreign home
+        directory) are ignored; the facts are then determined again by the
+        next run."""
+
+        if not self.bootid:
+            return
+        tmppath = self.path + ".tmp" + str(os.getpid())
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"bootid": self.bootid, "facts": self.facts}, f)
+            os.rename(tmppath, self.path)
+        except (IOError, OSError):
+            try:
+                os.remove(tmppath)
+            except OSError:
+                pass
+
+    def get(self, name, ttl):
+        """Return a cached fact if it is younger than ttl seconds
+
+        :param name: name of the fact
+        :param ttl: time to live in seconds
+        :return: (found, value)
+        :rtype: tuple
+        """
+
+        with self.lock:
+            if self.facts is None:
+                self.load()
+            entry = self.facts.get(name)
+        if not isinstance(entry, dict) or "value" not in entry:
+            return False, None
+        age = time.time() - entry.get("time", 0)
+        if age < 0 or age > ttl:
+            return False, None
+        return True, entry["value"]
+
+    def set(self, name, value):
+        """Store a fact. Values which can not be represented in JSON are
+        not cached.
+
+        :param name: name of the fact
+        :param value: value of the fact
+        """
+
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            return
+        with self.lock:
+            if self.facts is None:
+                self.load()
+            self.facts[name] = {"value": value, "time": time.time()}
+            self.save()
+
+    def clear(self):
+        """Forget all cached facts"""
+
+        with self.lock:
+            self.facts = {}
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,166 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide cache of the contents of configuration files. Many rules read
+the same system files (/etc/sysctl.conf, /etc/login.defs, /etc/pam.d/*,
+/etc/ssh/sshd_config, ...) through KVAConf, KVATaggedConf, ConfFile and
+readFile. The cache hands out the lines of a file as a tuple so that the
+shared copy can not be changed by a caller; callers that edit the contents
+make a list from it.
+
+An entry is only used while the file's (st_dev, st_ino, st_mtime_ns, st_size)
+is unchanged, so a file replaced by rename or rewritten in place is read
+again. Files modified within the last RACYSECONDS are not cached because a
+second write within the same mtime tick that leaves the size unchanged would
+go unnoticed. STONIX's own writers also drop entries explicitly through
+invalidate().
+
+Every read is reported to resultcache, which records it as an input of the
+rule report running in the calling thread, if any.
+"""
+
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+from stonix_resources import resultcache
+
+
+class FileCache(object):
+    """Least recently used cache of file contents as tuples of lines
+
+    :param maxentries: maximum number of files kept (Default value = 256)
+    :param maxsize: files larger than this many bytes are not cached
+        (Default value = 1MB)
+
+    """
+
+    RACYSECONDS = 2
+
+    def __init__(self, maxentries=256, maxsize=1024 * 1024):
+        self.maxentries = maxentries
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def readlines(self, path):
+        """Return the lines of a file, from the cache if the file has not
+        changed since it was cached. Errors opening or reading the file are
+        raised to the caller as they would be by open().
+
+        :param path: path of the file
+        :return: lines
+        :rtype: tuple
+        """
+
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            resultcache.recordpath(path)
+            raise
+        resultcache.recordpath(path, st)
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        with open(path, 'r') as fh:
+            lines = tuple(fh.readlines())
+        if st.st_size <= self.maxsize and \
+                time.time() - st.st_mtime_ns / 1e9 > self.RACYSECONDS:
+            with self.lock:
+                self.entries[path] = (key, lines)
+                self.entries.move_to_end(path)
+                while len(self.entries) > self.maxentries:
+                    self.entries.popitem(last=False)
+        return lines
+
+    def invalidate(self, path):
+        """Drop the cached contents of a file
+
+        :param path: path of the file
+        """
+
+        path = os.path.abspath(path)
+        with self.lock:
+            if self.entries.pop(path, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        """Drop every cached file"""
+
+        with self.lock:
+            self.entries.clear()
+
+    def getstats(self):
+        """Return the cache statistics
+
+        :return: dict with hits, misses, invalidations and entries
+        :rtype: dict
+        """
+
+        with self.lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'invalidations': self.invalidations,
+                    'entries': len(self.entries)}
+
+
+_filecache = FileCache()
+
+
+def readlines(path):
+    """Return the lines of a file as a tuple using the process wide cache
+
+    :param path: path of the file
+    :return: lines
+    :rtype: tuple
+    """
+
+    return _filecache.readlines(path)
+
+
+def invalidate(path):
+    """Drop a file from the process wide cache. Called by STONIX code that
+    writes or replaces files.
+
+    :param path: path of the file
+    """
+
+    _filecache.invalidate(path)
+
+
+def getstats():
+    """Return the statistics of the process wide cache
+
+    :return: dict with hits, misses, invalidations and entries
+    :rtype: dict
+    """
+
+    return _filecache.getstats()
@@ -0,0 +1,160 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Persistent index of file system metadata used to make repeated file system
+scans incremental. One index is kept per scanned file system. Directories are
+keyed by (st_dev, st_ino) and record their path, mtime and the mode, uid, gid
+and mtime of the files within them that were of interest on the last scan
+(world writable, SUID/SGID or unowned). A directory whose mtime has not
+changed since the last scan has had no entries added, removed or renamed so
+the file list recorded for it can be reused instead of stat'ing every file.
+
+Note that changing the mode or owner of an existing file does not update the
+mtime of its directory. Callers re-check the recorded files of unchanged
+directories and should perform a full scan periodically (see getfullscanage)
+to pick up files which became interesting through chmod or chown alone.
+"""
+
+import os
+import pickle
+import re
+import time
+
+
+class FSIndex(object):
+    """Per file system index of directory and file metadata
+
+    :param indexdir: directory the index files are kept in
+    :param filesystem: mount point of the file system this index describes
+
+    """
+
+    VERSION = 1
+
+    def __init__(self, indexdir, filesystem):
+        self.indexdir = indexdir
+        self.filesystem = filesystem
+        name = re.sub(r'[^A-Za-z0-9_.-]', '_', filesystem.strip('/'))
+        if not name:
+            name = 'root'
+        self.path = os.path.join(indexdir, name + '.idx')
+        self.dirs = {}
+        self.newdirs = {}
+        self.fullscan = 0
+        self.loaded = False
+
+    def load(self):
+        """Read the index from disk. A missing, unreadable or out of date
+        index leaves the index empty.
+
+        :return: self.loaded
+        :rtype: bool
+        """
+
+        self.dirs = {}
+        self.fullscan = 0
+        self.loaded = False
+        try:
+            with open(self.path, 'rb') as fh:
+                data = pickle.load(fh)
+            if data.get('version') == self.VERSION and \
+                    data.get('filesystem') == self.filesystem:
+                self.dirs = data['dirs']
+                self.fullscan = data['fullscan']
+                self.loaded = True
+        except (IOError, OSError, EOFError, KeyError, AttributeError,
+                pickle.UnpicklingError):
+            pass
+        return self.loaded
+
+    def save(self, fullscan=False):
+        """Replace the index on disk with the directories recorded by
+        setdir() during the current scan.
+
+        :param fullscan: bool; True if every directory was read in full
+            during the current scan (Default value = False)
+        """
+
+        if fullscan:
+            self.fullscan = time.time()
+        data = {'version': self.VERSION,
+                'filesystem': self.filesystem,
+                'fullscan': self.fullscan,
+                'dirs': self.newdirs}
+        if not os.path.isdir(self.indexdir):
+            os.makedirs(self.indexdir, 0o700)
+        tmppath = self.path + '.tmp'
+        fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as fh:
+            pickle.dump(data, fh, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmppath, self.path)
+        self.dirs = self.newdirs
+        self.newdirs = {}
+
+    def getfullscanage(self):
+        """return the number of seconds since the last full scan recorded in
+        this index
+
+        :return: age
+        :rtype: float
+        """
+
+        return time.time() - self.fullscan
+
+    def getdir(self, path, dirstat):
+        """return the files recorded for an unchanged directory
+
+        :param path: full path of the directory
+        :param dirstat: os.stat_result of the directory
+        :return: dict of file name -> (mode, uid, gid, mtime) or None if the
+            directory is not in the index or has changed since it was recorded
+        """
+
+        record = self.dirs.get((dirstat.st_dev, dirstat.st_ino))
+        if record is None:
+            return None
+        recpath, mtime, files = record
+        if recpath != path or mtime != dirstat.st_mtime_ns:
+            return None
+        return files
+
+    def setdir(self, path, dirstat, files):
+        """record a directory and its files of interest for the current scan
+
+        :param path: full path of the directory
+        :param dirstat: os.stat_result of the directory
+        :param files: dict of file name -> (mode, uid, gid, mtime)
+        """
+
+        self.newdirs[(dirstat.st_dev, dirstat.st_ino)] = \
+            (path, dirstat.st_mtime_ns, files)
+
+    def getfiles(self):
+        """return the files recorded in the index as it was loaded
+
+        :return: dict of full path -> (mode, uid, gid, mtime)
+        :rtype: dict
+        """
+
+        paths = {}
+        for recpath, _, files in self.dirs.values():
+            for name, meta in files.items():
+                paths[os.path.join(recpath, name)] = meta
+        return paths
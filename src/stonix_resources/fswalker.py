@@ -0,0 +1,367 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Single pass file system traversal shared by the permission oriented rules.
+FSWalker uses os.scandir so that the file type of each entry comes from the
+directory listing and each entry is stat'ed at most once (DirEntry caches the
+result of lstat). Mount points are detected by comparing st_dev with the
+device of the top of the walk rather than calling os.path.ismount for every
+directory. Each stat result is handed to a set of Visitor predicates (world
+writable, SUID/SGID, unowned, group writable, non-root owned) so a single walk
+can gather every list a rule needs.
+
+When given an FSIndex, files in directories that have not changed since the
+index was written are only stat'ed if they were of interest on the last scan.
+
+scanfilesystems() walks several file systems at once with one worker process
+per file system. Each worker reads and writes only the index of its own file
+system and results are returned in the order the file systems were given.
+In a frozen (PyInstaller) build a spawned worker would start the stonix
+binary again rather than the scan, so there the file systems are walked one
+after the other.
+"""
+
+import grp
+import multiprocessing
+import os
+import pwd
+import stat
+import sys
+
+from stonix_resources.fsindex import FSIndex
+
+
+class Visitor(object):
+    """Base class for predicates applied to each entry found by FSWalker.
+    Entries for which match() returns True are collected in
+    FSWalker.results[name].
+
+    """
+
+    name = ''
+    dirs = False
+    files = True
+
+    def match(self, path, mode, uid, gid):
+        """return True if the entry is of interest to this visitor
+
+        :param path: full path of the entry
+        :param mode: st_mode of the entry
+        :param uid: st_uid of the entry
+        :param gid: st_gid of the entry
+        :return: bool
+        """
+
+        return False
+
+
+class WorldWritable(Visitor):
+    """World writable files and directories"""
+
+    name = 'ww'
+    dirs = True
+
+    def match(self, path, mode, uid, gid):
+        return bool(mode & stat.S_IWOTH)
+
+
+class SetID(Visitor):
+    """SUID and SGID files"""
+
+    name = 'suid'
+
+    def match(self, path, mode, uid, gid):
+        return bool(mode & (stat.S_ISUID | stat.S_ISGID))
+
+
+class Unowned(Visitor):
+    """Files whose owner or group does not exist on the system. Name service
+    lookups are cached for the life of the visitor.
+
+    """
+
+    name = 'unowned'
+
+    def __init__(self):
+        self.uids = {}
+        self.gids = {}
+
+    def match(self, path, mode, uid, gid):
+        if uid not in self.uids:
+            try:
+                pwd.getpwuid(uid)
+                self.uids[uid] = True
+            except KeyError:
+                self.uids[uid] = False
+        if gid not in self.gids:
+            try:
+                grp.getgrgid(gid)
+                self.gids[gid] = True
+            except KeyError:
+                self.gids[gid] = False
+        return not self.uids[uid] or not self.gids[gid]
+
+
+class GroupWritable(Visitor):
+    """Group writable files and directories"""
+
+    name = 'gw'
+    dirs = True
+
+    def match(self, path, mode, uid, gid):
+        return bool(mode & stat.S_IWGRP)
+
+
+class NonRootOwned(Visitor):
+    """Files and directories not owned by root"""
+
+    name = 'nro'
+    dirs = True
+
+    def match(self, path, mode, uid, gid):
+        return uid != 0
+
+
+class FSWalker(object):
+    """Walk one or more directory trees applying visitors to every entry.
+    Symbolic links are never followed or reported. Directories are only
+    visited once per walker even when the trees passed to walk() overlap.
+
+    :param visitors: list of Visitor instances
+    :param xdev: bool; do not descend into other file systems
+        (Default value = True)
+    :param limit: int; stop walking once any visitor has collected more than
+        this many entries, 0 for no limit (Default value = 0)
+
+    """
+
+    def __init__(self, visitors, xdev=True, limit=0):
+        self.visitors = visitors
+        self.xdev = xdev
+        self.limit = limit
+        self.results = {}
+        for visitor in visitors:
+            self.results[visitor.name] = []
+        self.seen = set()
+        self.overrun = False
+
+    def getresults(self, name):
+        """return the paths collected by the named visitor
+
+        :param name: Visitor.name
+        :return: list of paths
+        :rtype: list
+        """
+
+        return self.results.get(name, [])
+
+    def check(self, path, st, isdir):
+        """apply the visitors to a single entry
+
+        :param path: full path of the entry
+        :param st: os.stat_result of the entry
+        :param isdir: bool; True if the entry is a directory
+        :return: names of the visitors that matched
+        :rtype: set
+        """
+
+        names = set()
+        for visitor in self.visitors:
+            wanted = visitor.dirs if isdir else visitor.files
+            if wanted and visitor.match(path, st.st_mode, st.st_uid,
+                                        st.st_gid):
+                self.results[visitor.name].append(path)
+                names.add(visitor.name)
+        if self.limit:
+            for name in names:
+                if len(self.results[name]) > self.limit:
+                    self.overrun = True
+        return names
+
+    def walk(self, top, index=None, incremental=False):
+        """Walk the tree rooted at top. The top directory itself is not
+        passed to the visitors.
+
+        :param top: path of the directory to walk
+        :param index: FSIndex to record the files of interest in
+            (Default value = None)
+        :param incremental: bool; skip stat'ing files in directories that
+            are unchanged in index and were not of interest on the last scan
+            (Default value = False)
+        :return: dict of file path -> set of names of the visitors that
+            matched it, for the files found during this walk
+        :rtype: dict
+        """
+
+        flagged = {}
+        try:
+            topstat = os.lstat(top)
+        except OSError:
+            return flagged
+        if not stat.S_ISDIR(topstat.st_mode):
+            return flagged
+        stack = [(top, topstat)]
+        while stack and not self.overrun:
+            path, dirstat = stack.pop()
+            key = (dirstat.st_dev, dirstat.st_ino)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            cached = None
+            if index is not None and incremental:
+                cached = index.getdir(path, dirstat)
+            interesting = {}
+            subdirs = []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if self.overrun:
+                            break
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                if self.xdev and st.st_dev != topstat.st_dev:
+                                    # mount point of another file system
+                                    continue
+                                self.check(entry.path, st, True)
+                                subdirs.append((entry.path, st))
+                                continue
+                            if entry.is_symlink():
+                                continue
+                            if cached is not None and \
+                                    entry.name not in cached:
+                                continue
+                            st = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+                        names = self.check(entry.path, st, False)
+                        if names:
+                            interesting[entry.name] = (st.st_mode, st.st_uid,
+                                                       st.st_gid, st.st_mtime)
+                            flagged[entry.path] = names
+            except OSError:
+                continue
+            if index is not None:
+                index.setdir(path, dirstat, interesting)
+            # reversed so that subdirectories are walked in listing order
+            stack.extend(reversed(subdirs))
+        return flagged
+
+    def newsince(self, previous, flagged):
+        """return the files matched during a walk that did not match the same
+        visitor on the previous scan
+
+        :param previous: dict of path -> (mode, uid, gid, mtime) as returned
+            by FSIndex.getfiles()
+        :param flagged: dict of path -> set of visitor names as returned by
+            walk()
+        :return: dict of visitor name -> sorted list of paths
+        :rtype: dict
+        """
+
+        visitors = {}
+        for visitor in self.visitors:
+            visitors[visitor.name] = visitor
+        new = {}
+        for name in visitors:
+            new[name] = []
+        for path in sorted(flagged):
+            meta = previous.get(path)
+            for name in flagged[path]:
+                if meta is None or \
+                        not visitors[name].match(path, meta[0], meta[1],
+                                                 meta[2]):
+                    new[name].append(path)
+        return new
+
+
+def scanfilesystem(filesystem, visitors, indexdir=None, fullscandays=0,
+                   limit=0):
+    """Walk a single file system, maintaining its FSIndex if indexdir is
+    given. The index is not updated when the walk stops early because limit
+    was exceeded. This is a module level function so that it can be run in
+    a worker process.
+
+    :param filesystem: mount point of the file system to walk
+    :param visitors: list of Visitor instances
+    :param indexdir: directory holding the FSIndex files, None to walk
+        without an index (Default value = None)
+    :param fullscandays: int; read every file when the last full scan of the
+        file system is older than this many days, 0 to always read every file
+        (Default value = 0)
+    :param limit: int; FSWalker limit (Default value = 0)
+    :return: dict with the keys filesystem, results (visitor name -> list of
+        paths), new (visitor name -> list of paths that matched for the first
+        time, None when there was no previous index), incremental and overrun
+    :rtype: dict
+    """
+
+    walker = FSWalker(visitors, limit=limit)
+    index = None
+    loaded = False
+    incremental = False
+    if indexdir:
+        index = FSIndex(indexdir, filesystem)
+        loaded = index.load()
+        incremental = loaded and fullscandays > 0 and \
+            index.getfullscanage() < fullscandays * 86400
+    flagged = walker.walk(filesystem, index, incremental)
+    new = None
+    if index is not None and not walker.overrun:
+        if loaded:
+            new = walker.newsince(index.getfiles(), flagged)
+        index.save(fullscan=not incremental)
+    return {'filesystem': filesystem,
+            'results': walker.results,
+            'new': new,
+            'incremental': incremental,
+            'overrun': walker.overrun}
+
+
+def scanfilesystems(filesystems, visitors, indexdir=None, fullscandays=0,
+                    limit=0, jobs=1):
+    """Run scanfilesystem() for each of the given file systems using up to
+    jobs worker processes. Workers are started with the spawn method because
+    the caller may have other threads running. A frozen build always scans
+    serially.
+
+    :param filesystems: list of mount points
+    :param visitors: list of Visitor instances
+    :param indexdir: see scanfilesystem() (Default value = None)
+    :param fullscandays: see scanfilesystem() (Default value = 0)
+    :param limit: see scanfilesystem() (Default value = 0)
+    :param jobs: int; maximum number of file systems walked at the same time
+        (Default value = 1)
+    :return: list of scanfilesystem() results in the order of filesystems
+    :rtype: list
+    """
+
+    jobs = min(max(1, jobs), len(filesystems))
+    if jobs <= 1 or getattr(sys, 'frozen', False):
+        return [scanfilesystem(filesystem, visitors, indexdir, fullscandays,
+                               limit) for filesystem in filesystems]
+    # a spawn context Pool rather than ProcessPoolExecutor, whose mp_context
+    # argument needs python 3.7 (RHEL/CentOS 7 ship 3.6)
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=jobs) as pool:
+        return pool.starmap(scanfilesystem,
+                            [(filesystem, visitors, indexdir, fullscandays,
+                              limit) for filesystem in filesystems],
+                            chunksize=1)
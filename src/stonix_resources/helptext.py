@@ -0,0 +1,172 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Index of the rule help text stored in help/stonix_helptext. The help text
+file is parsed once per process into a map of rule number to help text which
+every Rule instance shares. The parsed index is also written to the runtime
+state directory (/var/db/stonix/helptext.idx when run as root, the log
+directory otherwise) so that later runs can skip parsing. Both copies are
+discarded when the path, size or mtime of the help text file changes.
+
+Help text blocks start with the rule number in diamond brackets followed by
+the text in double quotes, and end with a period followed by a double quote.
+See Rule.sethelptext for the full format.
+"""
+
+import json
+import os
+import re
+import threading
+
+INDEXNAME = 'helptext.idx'
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def parsehelptext(contents):
+    """Parse the contents of a help text file.
+
+    :param contents: string; contents of the help text file
+    :return: dict of rule number (string) -> help text; only the first block
+        for each rule number is used
+    :rtype: dict
+    """
+
+    index = {}
+    for match in re.finditer(r'<(\d+)>', contents):
+        rulenum = match.group(1)
+        if rulenum in index:
+            continue
+        # the text must be at least one character long
+        end = contents.find('."', match.end() + 1)
+        if end == -1:
+            continue
+        text = contents[match.end():end].strip()
+        if text.startswith('"'):
+            text = text[1:]
+        index[rulenum] = text
+    return index
+
+
+def getindexpath(environ):
+    """return where the serialized help text index is kept for the current
+    user
+
+    :param environ: Environment instance
+    :return: path of the index file
+    :rtype: str
+    """
+
+    if environ.geteuid() == 0:
+        return os.path.join('/var/db/stonix', INDEXNAME)
+    return os.path.join(environ.get_log_path(), INDEXNAME)
+
+
+def loadindex(indexpath, helpfile, signature):
+    """Read the serialized index for helpfile.
+
+    :param indexpath: path of the index file
+    :param helpfile: path to the help text file
+    :param signature: list of [size, mtime_ns] of helpfile
+    :return: dict of rule number -> help text or None if there is no index
+        or it is out of date
+    """
+
+    try:
+        with open(indexpath, 'r') as fh:
+            data = json.load(fh)
+        if data['helpfile'] == helpfile and data['signature'] == signature:
+            return data['index']
+    except (IOError, OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def saveindex(indexpath, helpfile, signature, index):
+    """Write the serialized index for helpfile. Failures are ignored; the
+    help text file is then parsed again by the next run.
+
+    :param indexpath: path of the index file
+    :param helpfile: path to the help text file
+    :param signature: list of [size, mtime_ns] of helpfile
+    :param index: dict of rule number -> help text
+    """
+
+    tmpfile = indexpath + '.' + str(os.getpid())
+    try:
+        directory = os.path.dirname(indexpath)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        with open(tmpfile, 'w') as fh:
+            json.dump({'helpfile': helpfile, 'signature': signature,
+                       'index': index}, fh)
+        os.rename(tmpfile, indexpath)
+    except (IOError, OSError):
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+
+
+def gethelpindex(helpfile, indexpath=None):
+    """return the help text index for helpfile, parsing the file only when
+    neither the in process cache nor the serialized index is current
+
+    :param helpfile: path to the help text file
+    :param indexpath: path of the serialized index (Default value = None,
+        the index is then only kept in process; see getindexpath())
+    :return: dict of rule number (string) -> help text, empty if helpfile
+        does not exist
+    :rtype: dict
+    """
+
+    try:
+        st = os.stat(helpfile)
+    except OSError:
+        return {}
+    signature = [st.st_size, st.st_mtime_ns]
+    with _lock:
+        cached = _cache.get(helpfile)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        index = None
+        if indexpath:
+            index = loadindex(indexpath, helpfile, signature)
+        if index is None:
+            with open(helpfile, 'r') as fh:
+                index = parsehelptext(fh.read())
+            if indexpath:
+                saveindex(indexpath, helpfile, signature, index)
+        _cache[helpfile] = (signature, index)
+        return index
+
+
+def gethelptext(helpfile, rulenum, indexpath=None):
+    """return the help text for a rule
+
+    :param helpfile: path to the help text file
+    :param rulenum: int or string; rule number
+    :param indexpath: path of the serialized index (Default value = None)
+    :return: help text or '' if there is none for rulenum
+    :rtype: str
+    """
+
+    return gethelpindex(helpfile, indexpath).get(str(rulenum), '')
@@ -0,0 +1,296 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Native probes for host facts. Environment used to determine the init system,
+the operating system release, the network identity and the DMI data of the
+host by running ps, lsb_release, ifconfig/nmcli/ip, route and dmidecode and
+parsing their output. On Linux the same information is available from
+/proc, /sys and /etc/os-release, which can be read without starting a
+process. Every probe returns None when the information is not available
+natively so that the caller can fall back to the command it used before.
+
+Commands that are still needed are started through runcmd(), which counts
+them and the time they take. getstats() reports these numbers together with
+the number of facts answered natively, so the cost of determining the host
+facts can be compared between versions.
+
+All probes take the root of the file system to read as an optional
+argument, which is used by the unit tests.
+"""
+
+import os
+import re
+import subprocess
+import threading
+import time
+
+MACRE = re.compile("^([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}$")
+NOMAC = "00:00:00:00:00:00"
+DMIFIELDS = {"systemserial": "product_serial",
+             "chassisserial": "chassis_serial",
+             "systemmanufacturer": "sys_vendor",
+             "chassismanufacturer": "chassis_vendor",
+             "uuid": "product_uuid"}
+
+_statslock = threading.Lock()
+_stats = {"native": 0, "commands": 0, "commandtime": 0.0}
+
+
+def _count(name, amount=1):
+    with _statslock:
+        _stats[name] += amount
+
+
+def getstats():
+    """Return the number of facts answered natively, the number of commands
+    started and the wall time spent running them
+
+    :return: dict with native, commands and commandtime
+    :rtype: dict
+    """
+
+    with _statslock:
+        return dict(_stats)
+
+
+def resetstats():
+    """Set the statistics reported by getstats() back to zero"""
+
+    with _statslock:
+        _stats["native"] = 0
+        _stats["commands"] = 0
+        _stats["commandtime"] = 0.0
+
+
+def runcmd(cmd):
+    """Run a command through the shell and return its output. Used for the
+    fallbacks of the probes so that every command started while
+    determining host facts is counted.
+
+    :param cmd: command line
+    :return: lines of standard output, an empty list if the command could
+        not be started
+    :rtype: list
+    """
+
+    start = time.time()
+    try:
+        proc = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, close_fds=True)
+        output = proc.communicate()[0]
+    except OSError:
+        return []
+    finally:
+        _count("commands")
+        _count("commandtime", time.time() - start)
+    return output.decode("utf-8", "replace").splitlines(True)
+
+
+def _read(root, path):
+    """Return the stripped contents of a file below root, or None if it can
+    not be read
+    """
+
+    try:
+        with open(os.path.join(root, path), "r") as f:
+            return f.read().strip()
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+
+
+def initsystem(root="/"):
+    """Return the name of the command running as process 1
+
+    :param root: root of the file system (Default value = "/")
+    :return: command name, None if /proc is not available
+    :rtype: str
+    """
+
+    comm = _read(root, "proc/1/comm")
+    if comm:
+        _count("native")
+        return comm
+    return None
+
+
+def osrelease(root="/"):
+    """Parse the os-release file of the system
+
+    :param root: root of the file system (Default value = "/")
+    :return: the variables of the file, an empty dict if there is none
+    :rtype: dict
+    """
+
+    release = {}
+    for path in ["etc/os-release", "usr/lib/os-release"]:
+        contents = _read(root, path)
+        if contents is None:
+            continue
+        for line in contents.splitlines():
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            value = value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            release[key.strip()] = value
+        break
+    return release
+
+
+def lsbrelease(root="/"):
+    """Return the description and release number of the operating system as
+    'lsb_release -dr' reports them. Red Hat derived systems are described by
+    the first line of /etc/redhat-release, all others by os-release.
+
+    :param root: root of the file system (Default value = "/")
+    :return: (description, release), None if neither file exists
+    :rtype: tuple
+    """
+
+    contents = _read(root, "etc/redhat-release")
+    if contents:
+        description = contents.splitlines()[0].strip()
+        words = description.split()
+        release = ""
+        for index, word in enumerate(words[:-1]):
+            if word == "release":
+                release = words[index + 1]
+                break
+        _count("native")
+        return description, release
+    release = osrelease(root)
+    if release:
+        description = release.get("PRETTY_NAME", release.get("NAME", ""))
+        version = release.get("VERSION_ID", "")
+        if not version and release.get("VERSION"):
+            version = release["VERSION"].split()[0]
+        if description:
+            _count("native")
+            return description, version
+    return None
+
+
+def macaddress(root="/"):
+    """Return the hardware address of the first network interface, in
+    interface index order, that has a non zero ethernet style address
+
+    :param root: root of the file system (Default value = "/")
+    :return: mac address, "00:00:00:00:00:00" if no interface has one, None
+        if /sys/class/net is not available
+    :rtype: str
+    """
+
+    netdir = os.path.join(root, "sys/class/net")
+    try:
+        interfaces = os.listdir(netdir)
+    except OSError:
+        return None
+    ordered = []
+    for iface in interfaces:
+        index = _read(root, os.path.join("sys/class/net", iface, "ifindex"))
+        try:
+            ordered.append((int(index), iface))
+        except (TypeError, ValueError):
+            ordered.append((0, iface))
+    ordered.sort()
+    _count("native")
+    for _, iface in ordered:
+        address = _read(root, os.path.join("sys/class/net", iface, "address"))
+        if address and MACRE.search(address) and address != NOMAC:
+            return address
+    return NOMAC
+
+
+def ipaddresses(root="/"):
+    """Return the IPv4 addresses configured on the system's interfaces, as
+    listed in the local routing table of /proc/net/fib_trie
+
+    :param root: root of the file system (Default value = "/")
+    :return: addresses, None if /proc/net/fib_trie is not available
+    :rtype: list
+    """
+
+    contents = _read(root, "proc/net/fib_trie")
+    if contents is None:
+        return None
+    addresses = []
+    candidate = ""
+    for line in contents.splitlines():
+        line = line.strip()
+        if line.startswith("|--"):
+            candidate = line.split()[1]
+        elif line.startswith("/32 host LOCAL") and candidate:
+            if candidate not in addresses:
+                addresses.append(candidate)
+            candidate = ""
+    _count("native")
+    return addresses
+
+
+def defaultgateway(root="/"):
+    """Return the gateway of the default IPv4 route from /proc/net/route
+
+    :param root: root of the file system (Default value = "/")
+    :return: gateway in dotted quad notation, "" if there is no default
+        route, None if /proc/net/route is not available
+    :rtype: str
+    """
+
+    contents = _read(root, "proc/net/route")
+    if contents is None:
+        return None
+    _count("native")
+    for line in contents.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 3 or fields[1] != "00000000":
+            continue
+        try:
+            # addresses are in host byte order, little endian on Linux
+            value = int(fields[2], 16)
+        except ValueError:
+            continue
+        if value == 0:
+            continue
+        return ".".join(str((value >> shift) & 0xff)
+                        for shift in (0, 8, 16, 24))
+    return ""
+
+
+def dmi(field, root="/"):
+    """Return a DMI field exported by the kernel in /sys/class/dmi/id. The
+    serial numbers and the UUID are only readable by root. The kernel
+    exports the UUID in lowercase; it is returned in uppercase as dmidecode
+    prints it, so the identity in the report does not change.
+
+    :param field: one of the keys of DMIFIELDS
+    :param root: root of the file system (Default value = "/")
+    :return: value of the field, None if it is not available
+    :rtype: str
+    """
+
+    value = _read(root, os.path.join("sys/class/dmi/id", DMIFIELDS[field]))
+    if value:
+        _count("native")
+        if field == "uuid":
+            value = value.upper()
+        return value
+    return None
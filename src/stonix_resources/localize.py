@@ -79,6 +79,11 @@ REPORTSERVER = None
 # Variable Type: Boolean
 SENDREPORTS = False
 
+# If the report server accepts gzip compressed reports set this to True to
+# compress the run report before it is uploaded. Please note no quotes.
+# Variable Type: Boolean
+COMPRESSREPORTS = False
+
 # The SoftwarePatching rule will check to see if local update sources are being
 # used. If you have local update sources list them here. This check will be
 # skipped if the list is empty. The list is in python list format:
@@ -35,25 +35,40 @@ Created on Aug 24, 2010
 @author: dkennel
 @change: 2016/07/18 eball Added smtplib.SMTPRecipientsRefused to try/except for
     reporterr method, and added debug output for both exceptions.
+@change: 2026/10/16 log() returns before formatting when the message level is
+    disabled; caller attribution uses sys._getframe with a per code object
+    cache instead of inspect.stack(); run milestones are written with
+    logevent() and LogEvent instead of matching banner text
+@change: 2026/10/16 error e-mails are sent in the background as digests by
+    ErrorReporter
+@change: 2026/10/16 the XML report is streamed to disk by xmlReport and can be
+    gzip compressed for upload (localize.COMPRESSREPORTS)
+@change: 2026/10/16 postreport uploads with ReportUploader instead of curl,
+    undelivered reports are spooled and retried on later runs
 """
 
 from stonix_resources.observable import Observable
+from stonix_resources.reportuploader import ReportUploader
 
 import atexit
-import re
+import gzip
 import logging
 from stonix_resources import localize
 import logging.handlers
 import os.path
 import os
 import socket
-import inspect
+import sys
+import threading
+import time
 import traceback
+import queue
 import smtplib
 import xml.etree.ElementTree as ET
-import subprocess
 
-from shutil import move
+from email.message import EmailMessage
+
+from shutil import copyfileobj, move
 
 def singleton_decorator(class_):
     instances = {}
@@ -77,6 +92,7 @@ class LogDispatcher (Observable):
     def __init__(self, environment):
         Observable.__init__(self)
         self.environment = environment
+        self.rootlogger = logging.getLogger('')
         self.debug = self.environment.getdebugmode()
         self.verbose = self.environment.getverbosemode()
         self.constsrequired = [localize.REPORTSERVER,
@@ -88,12 +104,15 @@ class LogDispatcher (Observable):
         self.logpath = self.environment.get_log_path()
         self.reportlog = os.path.join(self.logpath, reportfile)
         self.xmllog = os.path.join(self.logpath, xmlfile)
+        self.reportspool = '/var/db/stonix/reportspool'
         if self.debug:
             print(('LOGDISPATCHER: xml log path: ' + self.xmllog))
         if os.path.isfile(self.xmllog):
             try:
                 if os.path.exists(self.xmllog + '.old'):
                     os.remove(self.xmllog + '.old')
+                if os.path.exists(self.xmllog + '.gz'):
+                    os.remove(self.xmllog + '.gz')
                 move(self.xmllog, self.xmllog + '.old')
             except (KeyboardInterrupt, SystemExit):
                 # User initiated exit
@@ -102,11 +121,13 @@ class LogDispatcher (Observable):
                 print('logdispatcher: ')
                 print((traceback.format_exc()))
                 print(err)
-        self.xmlreport = xmlReport(self.xmllog, self.debug)
+        self.xmlreport = xmlReport(self.xmllog, self.debug,
+                                   localize.COMPRESSREPORTS)
         self.metadataopen = False
         self.__initializelogs()
         self.last_message_received = ""
         self.last_prio = LogPriority.ERROR
+        self.errorreporter = None
 
     def postreport(self):
         """
@@ -131,51 +152,28 @@ class LogDispatcher (Observable):
             return False
 
         self.xmlreport.closeReport()
-        xmlreport = self.xmllog
-        resolvable = True
+        xmlreport = self.xmlreport.getreportpath()
+        if xmlreport.endswith('.gz'):
+            contenttype = 'application/gzip'
+        else:
+            contenttype = 'text/xml'
 
-        # check socket establish
+        # upload the report, failed uploads are kept in the spool and
+        # retried on later runs
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((localize.REPORTSERVER, 80))
-            sock.close()
-        except (socket.gaierror, socket.timeout, socket.error) as sockerr:
-            self.log(LogPriority.DEBUG, str(sockerr))
-            resolvable = False
-
-        # upload the report
-        try:
-            if resolvable:
-
-                curl = "curl"
-                curlpaths = ["/usr/bin/curl", "/bin/curl"]
-                for p in curlpaths:
-                    if os.path.exists(p):
-                        curl = p
-
-                # added -T option to curl command for large file uploads (sometimes log files are very large)
-                curlcommand = curl + ' -k -s -G -F "file=@' + xmlreport + ';type=text/xml" https://' + localize.REPORTSERVER + '/stonix/results.php'
-
-                if self.debug:
-                    self.log(LogPriority.DEBUG,
-                             ['LogDispatcher.postreport',
-                              'Upload command: ' + curlcommand])
-                cmd = subprocess.Popen(curlcommand, shell=True, close_fds=True,
-                                       stdout=subprocess.PIPE,
-                                       stderr=subprocess.PIPE)
-                uploadstatus = cmd.stdout.read()
-                uploadstatus = uploadstatus + cmd.stderr.read()
-                if self.debug:
-                    self.log(LogPriority.DEBUG,
-                             ['LogDispatcher.postreport',
-                              'Upload status: ' + \
-                              uploadstatus.decode('utf-8')])
-            if self.debug and not resolvable:
+            uploader = ReportUploader(
+                localize.REPORTSERVER, self.reportspool,
+                lambda msg: self.log(LogPriority.DEBUG,
+                                     ['LogDispatcher.postreport', msg]))
+            uploaded = uploader.upload(xmlreport, contenttype)
+            if self.debug:
                 self.log(LogPriority.DEBUG,
                          ['LogDispatcher.postreport',
-                          'Could not resolve upload host'])
-            if not self.debug and os.path.exists(xmlreport):
-                os.remove(xmlreport)
+                          'Upload status: ' + str(uploaded)])
+            if not self.debug:
+                for path in set([xmlreport, self.xmllog]):
+                    if os.path.exists(path):
+                        os.remove(path)
 
         except (KeyboardInterrupt, SystemExit):
             raise
@@ -208,6 +206,12 @@ class LogDispatcher (Observable):
 
         try:
 
+            # Fast path: skip all formatting for messages that the configured
+            # logging level would throw away
+            if priority in DISCARDABLE and \
+                    not self.rootlogger.isEnabledFor(LOGLEVELS[priority]):
+                return
+
             if type(msg_data) is list:
                 if type(msg_data[0]) is bytes:
                     msg_data[0] = msg_data[0].decode('utf-8')
@@ -223,48 +227,9 @@ class LogDispatcher (Observable):
             self.last_message_received = entry
             self.last_prio = priority
 
-            if self.debug:
-                #####
-                # Set up inspect to use stack variables to log file and
-                # method/function that is being called. Message to be in the
-                # format:
-                # DEBUG:<name_of_module>:<name of function>(<line number>): <message to print>
-                stack1 = inspect.stack()[1]
-                mod = inspect.getmodule(stack1[0])
-                if mod:
-                    prefix = mod.__name__ + \
-                          ":" + stack1[3] + \
-                          "(" + str(stack1[2]) + "): "
-                else:
-                    prefix = stack1[3] + \
-                          "(" + str(stack1[2]) + "): "
-            else:
-                stack1 = inspect.stack()[1]
-                mod = inspect.getmodule(stack1[0])
-                if mod:
-                    prefix = mod.__name__ + \
-                          ":" + stack1[3] + ":"
-                else:
-                    prefix = stack1[3] + ":"
-
-            if re.search('RULE START', msg):
-                prefix = ''
-                msg = msg + '\n\n'
-            if re.search('RULE END', msg):
-                prefix = ''
-                msg = msg + '\n\n'
-            if re.search('START REPORT', msg):
-                prefix = ''
-                msg = msg + '\n'
-            if re.search('END REPORT', msg):
-                prefix = ''
-                msg = msg + '\n'
-            if re.search('START FIX', msg):
-                prefix = ''
-                msg = msg + '\n'
-            if re.search('END FIX', msg):
-                prefix = ''
-                msg = msg + '\n'
+            # Message prefix format:
+            # DEBUG:<name_of_module>:<name of function>(<line number>): <message to print>
+            prefix = self.callerprefix(sys._getframe(1))
 
             if priority == LogPriority.INFO:
                 logging.info('INFO:' + prefix + msg)
@@ -298,11 +263,67 @@ class LogDispatcher (Observable):
         except Exception as err:
             print(str(err))
 
+    def callerprefix(self, frame):
+        """Build the module:function prefix identifying the caller of log().
+        The module and function names are cached per code object so that only
+        the line number has to be looked up for each message.
+
+        :param frame: stack frame of the caller
+        :returns: prefix
+        :rtype: str
+
+        """
+
+        code = frame.f_code
+        try:
+            modname, funcname = _callercache[code]
+        except KeyError:
+            modname = frame.f_globals.get('__name__')
+            funcname = code.co_name
+            _callercache[code] = (modname, funcname)
+
+        if self.debug:
+            prefix = funcname + "(" + str(frame.f_lineno) + "): "
+        else:
+            prefix = funcname + ":"
+        if modname:
+            prefix = modname + ":" + prefix
+        return prefix
+
+    def logevent(self, event, detail=''):
+        """Write a run milestone (rule start/end, report start/end, fix
+        start/end) to the debug log as a banner line.
+
+        :param event: one of the LogEvent constants
+        :param detail: optional text, e.g. the rule name (Default value = '')
+        :returns: void
+
+        """
+
+        try:
+            if not self.rootlogger.isEnabledFor(logging.DEBUG):
+                return
+            banner, suffix = LogEvent.BANNERS[event]
+            if detail:
+                msg = banner + ": " + str(detail)
+            else:
+                msg = banner
+            pad = LogEvent.PADDING[event]
+            msg = pad + " " + msg + " " + pad
+            self.last_message_received = self.format_message_data(msg)
+            self.last_prio = LogPriority.DEBUG
+            logging.debug('DEBUG:' + msg + suffix)
+            self.set_dirty()
+            self.notify_check()
+        except Exception as err:
+            print(str(err))
+
     def reporterr(self, errmsg, prefix):
         """reporterr(errmsg)
         
         reporterr sends error messages generated by STONIX to the unixeffort
-        email address. Requires an error message string.
+        email address. Requires an error message string. Messages are queued
+        and sent in batches by an ErrorReporter running in the background.
 
         :param errmsg: 
         :param prefix: 
@@ -321,33 +342,25 @@ class LogDispatcher (Observable):
             print("\nUNABLE TO LOG DUE TO ONE OR MORE OF THE FOLLOWING CONSTANTS NOT BEING SET, OR BEING SET TO None, in localize.py: STONIXERR, STONIXDEVS, MAILRELAYSERVER, REPORTSERVER\n")
             return
 
-        # Function wrapped in try/except to allow the program to keep running
-        # when the mail server is unavailable.
+        # Delivery happens on the error reporter's thread so that a slow or
+        # missing mail server does not hold up the run.
         try:
-            message = '''From: ''' + localize.STONIXERR + '''
-To: ''' + localize.STONIXDEVS + '''
-Subject: STONIX Error Report: ''' + prefix + '''
-
-'''
-            message = prefix + ' ' + message + 'Sent by: ' + \
-            self.environment.gethostname() + ' IP: ' \
-            + self.environment.getipaddress() + ' OS: ' + \
-            self.environment.getostype() + ': ' + \
-            str(self.environment.getosver()) + \
-            ' STONIX Ver: ' + str(self.environment.getstonixversion())
-            message = message + '\n' + errmsg
-            to = localize.STONIXDEVS + '\r\n'
-            frm = localize.STONIXERR + '\r\n'
-
-            server = smtplib.SMTP(localize.MAILRELAYSERVER)
-            server.sendmail(frm, to, message)
-            server.quit()
-        except socket.error:
-            self.log(LogPriority.DEBUG, "Could not send error e-mail: " +
-                     "error contacting e-mail server")
-        except smtplib.SMTPRecipientsRefused:
-            self.log(LogPriority.DEBUG, "Could not send error e-mail: " +
-                     "bad e-mail address in localize.STONIXDEVS")
+            if self.errorreporter is None:
+                header = 'Sent by: ' + \
+                    self.environment.gethostname() + ' IP: ' \
+                    + self.environment.getipaddress() + ' OS: ' + \
+                    self.environment.getostype() + ': ' + \
+                    str(self.environment.getosver()) + \
+                    ' STONIX Ver: ' + str(self.environment.getstonixversion())
+                self.errorreporter = ErrorReporter(
+                    localize.MAILRELAYSERVER, localize.STONIXERR,
+                    localize.STONIXDEVS, header,
+                    lambda msg: self.log(LogPriority.DEBUG, msg))
+            self.errorreporter.report(prefix, errmsg)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except Exception as err:
+            print(str(err))
 
     def format_message_data(self, msg_data):
         """If the expected 2 item array is passed then attach those items to
@@ -588,16 +601,262 @@ class LogPriority:
     CRITICAL = "CRITICAL"
 
 
+# python logging levels for each LogPriority
+LOGLEVELS = {LogPriority.DEBUG: logging.DEBUG,
+             LogPriority.INFO: logging.INFO,
+             LogPriority.WARNING: logging.WARNING,
+             LogPriority.ERROR: logging.ERROR,
+             LogPriority.CRITICAL: logging.CRITICAL}
+
+# priorities which have no side effects beyond the python logging call and
+# may be dropped without formatting when their level is disabled
+DISCARDABLE = (LogPriority.DEBUG, LogPriority.INFO)
+
+# code object -> (module name, function name) of log() callers
+_callercache = {}
+
+
+class LogEvent:
+    """Enum (python way) of the run milestones written by
+    LogDispatcher.logevent.
+
+    """
+
+    RULESTART = "RULESTART"
+    RULEEND = "RULEEND"
+    STARTREPORT = "STARTREPORT"
+    ENDREPORT = "ENDREPORT"
+    STARTFIX = "STARTFIX"
+    ENDFIX = "ENDFIX"
+
+    # event: (banner text, trailing whitespace)
+    BANNERS = {RULESTART: ("RULE START", "\n\n"),
+               RULEEND: ("RULE END", "\n\n"),
+               STARTREPORT: ("START REPORT", "\n"),
+               ENDREPORT: ("END REPORT", "\n"),
+               STARTFIX: ("START FIX", "\n"),
+               ENDFIX: ("END FIX", "\n")}
+
+    PADDING = {RULESTART: "*" * 18,
+               RULEEND: "*" * 18,
+               STARTREPORT: "=" * 19,
+               ENDREPORT: "=" * 20,
+               STARTFIX: "=" * 19,
+               ENDFIX: "=" * 20}
+
+
+class ErrorReporter:
+    """Background delivery of STONIX error reports by e-mail. Errors passed
+    to report() are queued and returned immediately; a worker thread groups
+    them into a single digest message per time window and sends the digests
+    over one SMTP connection that is kept open for the whole run.
+
+    The queue is bounded. Errors reported while it is full are counted and
+    the count is included in the next digest. If the relay cannot be reached
+    all further errors are dropped so that an unreachable relay costs at most
+    one connection timeout per run. close() sends whatever is pending and is
+    registered to run at exit.
+
+    :param relay: string; host name of the SMTP relay
+    :param sender: string; From address
+    :param recipients: string; To address
+    :param header: string; text placed at the top of every digest
+    :param debuglog: callable taking a message string, used to report
+        delivery problems (Default value = None)
+    :param window: seconds to collect errors before sending a digest
+        (Default value = 300)
+    :param maxqueue: maximum number of undelivered errors
+        (Default value = 500)
+    :param timeout: SMTP connection timeout in seconds (Default value = 10)
+    """
+
+    STOP = object()
+
+    def __init__(self, relay, sender, recipients, header, debuglog=None,
+                 window=300, maxqueue=500, timeout=10):
+        self.relay = relay
+        self.sender = sender
+        self.recipients = recipients
+        self.header = header
+        self.debuglog = debuglog
+        self.window = window
+        self.maxqueue = maxqueue
+        self.timeout = timeout
+        self.queue = queue.Queue(maxqueue)
+        self.server = None
+        self.unavailable = False
+        self.dropped = 0
+        self.sent = 0
+        self.closed = False
+        self.worker = threading.Thread(target=self.run,
+                                       name='ErrorReporter')
+        self.worker.daemon = True
+        self.worker.start()
+        atexit.register(self.close)
+
+    def report(self, prefix, errmsg):
+        """Queue an error for delivery. Never blocks.
+
+        :param prefix: string; module and function that logged the error
+        :param errmsg: string; the error message
+        """
+
+        if self.closed or self.unavailable:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait((time.strftime('%Y-%m-%d %H:%M:%S'),
+                                   prefix, errmsg))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=None):
+        """Send any pending errors and stop the worker thread, waiting at most
+        timeout seconds for it to finish.
+
+        :param timeout: seconds to wait, defaults to twice the SMTP timeout
+            (Default value = None)
+        """
+
+        if self.closed:
+            return
+        self.closed = True
+        if timeout is None:
+            timeout = self.timeout * 2
+        try:
+            # make room for the stop marker if the queue is full
+            self.queue.put(self.STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.worker.join(timeout)
+
+    def run(self):
+        """Worker thread main loop"""
+
+        batch = []
+        deadline = None
+        while True:
+            wait = None
+            if deadline is not None:
+                wait = max(0, deadline - time.time())
+            try:
+                item = self.queue.get(timeout=wait)
+            except queue.Empty:
+                item = None
+            if item is self.STOP:
+                break
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.time() + self.window
+                if len(batch) < self.maxqueue:
+                    continue
+            if batch and (item is None or len(batch) >= self.maxqueue):
+                self.send(batch)
+                batch = []
+                deadline = None
+        if batch or self.dropped:
+            self.send(batch)
+        self.disconnect()
+
+    def digest(self, batch):
+        """Build the digest message for a list of queued errors
+
+        :param batch: list of (timestamp, prefix, errmsg) tuples
+        :returns: message
+        :rtype: email.message.EmailMessage
+        """
+
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = self.recipients
+        if len(batch) == 1:
+            message['Subject'] = 'STONIX Error Report: ' + batch[0][1]
+        else:
+            message['Subject'] = 'STONIX Error Report: ' + \
+                str(len(batch)) + ' errors'
+        body = [self.header]
+        for stamp, prefix, errmsg in batch:
+            body.append('\n' + stamp + ' ' + prefix + '\n' + errmsg)
+        if self.dropped:
+            body.append('\n' + str(self.dropped) +
+                        ' further errors were not sent')
+            self.dropped = 0
+        message.set_content('\n'.join(body) + '\n')
+        return message
+
+    def send(self, batch):
+        """Deliver a digest, reusing the open SMTP connection when possible
+
+        :param batch: list of (timestamp, prefix, errmsg) tuples
+        """
+
+        if self.unavailable:
+            self.dropped += len(batch)
+            return
+        message = self.digest(batch)
+        for attempt in range(2):
+            try:
+                if self.server is None:
+                    self.server = smtplib.SMTP(self.relay,
+                                               timeout=self.timeout)
+                self.server.send_message(message)
+                self.sent += 1
+                return
+            except smtplib.SMTPServerDisconnected:
+                # the relay closed the idle connection, reconnect once
+                self.server = None
+            except smtplib.SMTPRecipientsRefused:
+                self.logdebug("Could not send error e-mail: " +
+                              "bad e-mail address in localize.STONIXDEVS")
+                return
+            except (socket.error, smtplib.SMTPException):
+                break
+        self.unavailable = True
+        self.server = None
+        self.logdebug("Could not send error e-mail: " +
+                      "error contacting e-mail server")
+
+    def disconnect(self):
+        """Close the SMTP connection"""
+
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (socket.error, smtplib.SMTPException):
+                pass
+            self.server = None
+
+    def logdebug(self, msg):
+        """Report a delivery problem through debuglog"""
+
+        if self.debuglog is not None:
+            try:
+                self.debuglog(msg)
+            except Exception:
+                pass
+
+
 class xmlReport:
     """
     Simple class to manage the STONIX XML report formatting.
+
+    Entries are appended to the report file as they are logged rather than
+    being held in an ElementTree until the end of the run. After every entry
+    the closing tags are written after it and the next entry overwrites them,
+    so the file on disk is always a complete document even if STONIX exits
+    without calling closeReport.
     
     @author: dkennel
 
     @change: 2019/11/19 Brandon R. Gonzales - Replace destructor with cleanup
         function to be triggered by the python atexit library on termination.
+    @change: 2026/10/16 - write entries to disk as they arrive, optionally
+        gzip the finished report
+    @change: 2026/10/16 - entries and closing the report are serialized
+        with a lock
     """
-    def __init__(self, path, debug=False):
+    def __init__(self, path, debug=False, compress=False):
         """
         xmlReport.__init__(path): The xmlReport constructor. Requires a string
         version of the fully qualified path to the file where the XML version
@@ -605,16 +864,69 @@ class xmlReport:
 
         @param path: string - fully qualified path to the report file
         @param debug: Bool - whether or not to run in debug mode
+        @param compress: Bool - whether to gzip the report when it is closed
         @author: dkennel
         """
         self.path = path
         self.debug = debug
-        self.root = ET.Element('run')
-        self.meta = ET.SubElement(self.root, 'metadata')
-        self.findings = ET.SubElement(self.root, 'findings')
+        self.compress = compress
+        self.handle = None
+        self.offset = 0
+        self.section = None
+        self.entries = 0
+        self.failed = False
         self.closed = False
+        # entries are logged from the rule worker threads in --jobs mode
+        self.lock = threading.Lock()
         atexit.register(self.cleanup)
 
+    def openReport(self):
+        """Create the report file containing an empty run element"""
+
+        self.handle = open(self.path, 'wb', buffering=0)
+        self.handle.write(b'<run></run>\n')
+        self.offset = len(b'<run>')
+        self.section = None
+
+    def append(self, section, tag, detail):
+        """Add an entry to a section of the report, opening the section if
+        the previous entry was in a different one. The entry and the closing
+        tags are written with a single unbuffered write.
+
+        :param section: string; metadata or findings
+        :param tag: string; the entry's element name
+        :param detail: string; the entry's val attribute
+        """
+
+        with self.lock:
+            if self.closed or self.failed:
+                return
+            try:
+                if self.handle is None:
+                    self.openReport()
+                data = ''
+                if section != self.section:
+                    if self.section is not None:
+                        data = '</' + self.section + '>'
+                    data += '<' + section + '>'
+                    self.section = section
+                data += ET.tostring(ET.Element(tag, val=detail),
+                                    encoding='unicode')
+                data = data.encode('utf-8')
+                tail = ('</' + section + '></run>\n').encode('utf-8')
+                self.handle.seek(self.offset)
+                self.handle.write(data + tail)
+                self.offset += len(data)
+                self.entries += 1
+            except Exception as err:
+                if self.handle is None:
+                    # the report file can not be created, stop trying
+                    self.failed = True
+                if self.debug:
+                    print('logdispatcher.xmlReport.append: Error writing ' +
+                          'entry ' + str(tag))
+                    print(err)
+
     def writeMetadata(self, entry):
         """xmlReport.writeMetadata(entry): The xmlReport method to add a metadata
         entry to the report. Requires a STONIX log entry which is a list of
@@ -624,7 +936,7 @@ class xmlReport:
         @author: dkennel
 
         """
-        ET.SubElement(self.meta, entry.Tag, val=entry.Detail)
+        self.append('metadata', entry.Tag, entry.Detail)
         if self.debug:
             print('xmlReport.writeMetadata: Added entry ' + entry.Tag + ' ' + entry.Detail)
 
@@ -637,33 +949,50 @@ class xmlReport:
         @author: dkennel
 
         """
-        ET.SubElement(self.findings, entry.Tag, val=entry.Detail)
-        #if self.debug:
-            #print 'xmlReport.writeFinding: Added entry ' + entry.Tag + \
-            #' ' + entry.Detail
+        self.append('findings', entry.Tag, entry.Detail)
 
     def closeReport(self):
-        """xmlReport.closeReport(): This method will write the xmlReport to disk.
+        """xmlReport.closeReport(): This method will close the report file and,
+        if requested, write a gzip compressed copy next to it.
         
         @author: dkennel
 
 
         """
-        try:
-            if not self.closed:
-                f = open(self.path, 'w')
-                ET.ElementTree(self.root).write(f, encoding="unicode")
-                f.close()
-                self.closed = True
-            if self.debug:
-                print('xmlReport.closeReport: dumping the ElementTree: ')
-                ET.dump(self.root)
-        except Exception as err:
-            if self.debug:
-                print('logdispatcher.xmlReport.closeReport: Error encountered processing xml')
-                print(err)
-                trace = traceback.format_exc()
-                print(trace)
+        with self.lock:
+            try:
+                if not self.closed:
+                    self.closed = True
+                    if self.handle is None and not self.failed:
+                        self.openReport()
+                    if self.handle is not None:
+                        self.handle.close()
+                        self.handle = None
+                    if self.compress and os.path.exists(self.path):
+                        with open(self.path, 'rb') as src:
+                            with gzip.open(self.path + '.gz', 'wb') as dst:
+                                copyfileobj(src, dst)
+                if self.debug:
+                    print('xmlReport.closeReport: wrote ' + str(self.entries) +
+                          ' entries to ' + self.getreportpath())
+            except Exception as err:
+                if self.debug:
+                    print('logdispatcher.xmlReport.closeReport: Error encountered processing xml')
+                    print(err)
+                    trace = traceback.format_exc()
+                    print(trace)
+
+    def getreportpath(self):
+        """Return the path of the file to upload, the compressed copy if one
+        was requested and written.
+
+        :returns: path
+        :rtype: string
+        """
+
+        if self.compress and os.path.exists(self.path + '.gz'):
+            return self.path + '.gz'
+        return self.path
 
     def cleanup(self):
         """
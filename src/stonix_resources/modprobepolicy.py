@@ -0,0 +1,332 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide model of the kernel module configuration for the rules that
+disable kernel modules (DisableUnusedFs, DisableUncommonProtocols,
+DisableBluetooth, DisableRemoveableStorage). Those rules used to read the
+files in /etc/modprobe.d one by one, matching a regular expression per
+module against every line, or ran grep and lsmod once per module.
+
+ModprobePolicy parses the modprobe configuration the way modprobe reads it
+(the modprobe.d directories, in which a file masks files of the same name in
+the directories after it, the files in name order and the legacy
+/etc/modprobe.conf) into maps of install commands, blacklisted modules and
+aliases, so that a rule can look a module up in constant time. The maps are
+rebuilt only when one of the files changed, which is detected through
+filecache. The modules that are currently loaded are read from
+/proc/modules. As modprobe does, the policy does not distinguish between
+'-' and '_' in module names.
+
+adddirectives() is used by the rules to add all of the directives they are
+missing to their drop-in file with a single write.
+"""
+
+import os
+import threading
+
+from stonix_resources import filecache
+from stonix_resources import resultcache
+from stonix_resources.logdispatcher import LogPriority
+from stonix_resources.stonixutilityfunctions import resetsecon, writeFile
+
+# in order of precedence, a file masks files of the same name in the
+# directories after it
+MODPROBEDIRS = ["/etc/modprobe.d", "/run/modprobe.d",
+                "/usr/local/lib/modprobe.d", "/usr/lib/modprobe.d",
+                "/lib/modprobe.d"]
+MODPROBECONF = "/etc/modprobe.conf"
+PROCMODULES = "/proc/modules"
+
+
+def modname(name):
+    """Return the canonical form of a module name
+
+    :param name: module name
+    :return: name with '-' replaced by '_'
+    :rtype: str
+    """
+
+    if type(name) is bytes:
+        name = name.decode("utf-8")
+    return name.strip().replace("-", "_")
+
+
+class ModprobePolicy(object):
+    """Install commands, blacklist and aliases of the modprobe configuration
+
+    :param logger: logdispatcher object reference (Default value = None)
+    :param modprobedirs: modprobe.d directories in order of precedence
+        (Default value = MODPROBEDIRS)
+    :param modprobeconf: path of the legacy configuration file
+        (Default value = "/etc/modprobe.conf")
+    :param procmodules: path of the list of loaded modules
+        (Default value = "/proc/modules")
+
+    """
+
+    def __init__(self, logger=None, modprobedirs=None,
+                 modprobeconf=MODPROBECONF, procmodules=PROCMODULES):
+        self.logger = logger
+        if modprobedirs is None:
+            modprobedirs = MODPROBEDIRS
+        self.modprobedirs = modprobedirs
+        self.modprobeconf = modprobeconf
+        self.procmodules = procmodules
+        self.lock = threading.Lock()
+        self.sources = None
+        # module -> (command, path of the file)
+        self.installs = {}
+        # module -> path of the file
+        self.blacklist = {}
+        # alias -> list of modules
+        self.aliases = {}
+        self.loads = 0
+
+    def getfiles(self):
+        """Return the modprobe configuration files in the order modprobe
+        reads them
+
+        :return: paths
+        :rtype: list
+        """
+
+        byname = {}
+        for directory in self.modprobedirs:
+            resultcache.recordpath(directory)
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(".conf") and name not in byname:
+                    byname[name] = os.path.join(directory, name)
+        files = [byname[name] for name in sorted(byname)]
+        resultcache.recordpath(self.modprobeconf)
+        if os.path.isfile(self.modprobeconf):
+            files.append(self.modprobeconf)
+        return files
+
+    def load(self):
+        """(Re)build the maps if any of the configuration files changed"""
+
+        sources = []
+        for path in self.getfiles():
+            try:
+                sources.append((path, filecache.readlines(path)))
+            except (IOError, OSError):
+                continue
+        with self.lock:
+            if sources == self.sources:
+                return
+            installs = {}
+            blacklist = {}
+            aliases = {}
+            for path, lines in sources:
+                for line in self.__joinlines(lines):
+                    fields = line.split()
+                    if len(fields) < 2:
+                        continue
+                    directive = fields[0]
+                    module = modname(fields[1])
+                    if directive == "install" and len(fields) > 2:
+                        # modprobe uses the first install command it finds
+                        if module not in installs:
+                            installs[module] = (" ".join(fields[2:]), path)
+                    elif directive == "blacklist":
+                        blacklist.setdefault(module, path)
+                    elif directive == "alias" and len(fields) > 2:
+                        aliases.setdefault(fields[1], []).append(
+                            modname(fields[2]))
+            self.installs = installs
+            self.blacklist = blacklist
+            self.aliases = aliases
+            self.sources = sources
+            self.loads += 1
+        if self.logger:
+            self.logger.log(LogPriority.DEBUG, "Indexed " + str(len(sources)) +
+                            " modprobe configuration files")
+
+    @staticmethod
+    def __joinlines(lines):
+        """Yield the directives of a file, without comments and with
+        continued lines joined
+        """
+
+        current = ""
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.endswith("\\"):
+                current += line[:-1] + " "
+                continue
+            line = (current + line).strip()
+            current = ""
+            if line and not line.startswith("#"):
+                yield line
+        if current.strip() and not current.strip().startswith("#"):
+            yield current.strip()
+
+    def getinstall(self, module):
+        """Return the install command of a module
+
+        :param module: module name
+        :return: (command, path of the file that sets it), (None, None) if
+            there is none
+        :rtype: tuple
+        """
+
+        self.load()
+        return self.installs.get(modname(module), (None, None))
+
+    def isblacklisted(self, module):
+        """Return True if a module is blacklisted
+
+        :param module: module name
+        :rtype: bool
+        """
+
+        self.load()
+        return modname(module) in self.blacklist
+
+    def getaliases(self, alias):
+        """Return the modules an alias stands for
+
+        :param alias: alias name
+        :return: module names
+        :rtype: list
+        """
+
+        self.load()
+        return list(self.aliases.get(alias, []))
+
+    def hasdirective(self, directive):
+        """Return True if a blacklist or install directive, given as it
+        would be written in a configuration file, is in effect
+
+        :param directive: e.g. "blacklist uas" or
+            "install usb-storage /bin/true"
+        :rtype: bool
+        """
+
+        fields = directive.split()
+        if len(fields) < 2:
+            return False
+        if fields[0] == "blacklist":
+            return self.isblacklisted(fields[1])
+        if fields[0] == "install":
+            command, _ = self.getinstall(fields[1])
+            return command == " ".join(fields[2:])
+        return False
+
+    def getloaded(self):
+        """Return the modules that are currently loaded
+
+        :return: canonical module names, None if they can not be read
+        :rtype: set
+        """
+
+        resultcache.recordpath(self.procmodules)
+        try:
+            with open(self.procmodules, "r") as f:
+                return set(modname(line.split()[0]) for line in f
+                           if line.strip())
+        except (IOError, OSError):
+            return None
+
+    def isloaded(self, module):
+        """Return True if a module is currently loaded
+
+        :param module: module name
+        :rtype: bool
+        """
+
+        loaded = self.getloaded()
+        return bool(loaded) and modname(module) in loaded
+
+    def invalidate(self):
+        """Forget the maps, they are rebuilt on the next lookup"""
+
+        with self.lock:
+            self.sources = None
+
+
+def adddirectives(path, directives, logger, statechglogger=None,
+                  eventid=None):
+    """Add the directives that are not in it yet to a modprobe drop-in file
+    with a single write. The file is created if needed and left owned by
+    root with mode 0644.
+
+    :param path: path of the drop-in file
+    :param directives: lines to add, without newlines
+    :param logger: logdispatcher object reference
+    :param statechglogger: state change logger used to record the change to
+        an existing file (Default value = None)
+    :param eventid: id of the change event (Default value = None)
+    :return: success
+    :rtype: bool
+    """
+
+    try:
+        contents = list(filecache.readlines(path))
+        existed = True
+    except (IOError, OSError):
+        contents = []
+        existed = False
+    present = set(line.strip() for line in contents)
+    missing = [d for d in directives if d.strip() not in present]
+    if not missing:
+        return True
+    if contents and not contents[-1].endswith("\n"):
+        contents[-1] += "\n"
+    contents.extend(d + "\n" for d in missing)
+    tmpfile = path + ".tmp"
+    if not writeFile(tmpfile, "".join(contents), logger):
+        return False
+    if existed and statechglogger and eventid:
+        event = {"eventtype": "conf",
+                 "filepath": path}
+        statechglogger.recordchgevent(eventid, event)
+        statechglogger.recordfilechange(path, tmpfile, eventid)
+    os.rename(tmpfile, path)
+    os.chown(path, 0, 0)
+    os.chmod(path, 0o644)
+    resetsecon(path)
+    filecache.invalidate(path)
+    return True
+
+
+_modprobepolicy = None
+_modprobepolicylock = threading.Lock()
+
+
+def getmodprobepolicy(logger=None):
+    """Return the process wide modprobe policy
+
+    :param logger: logdispatcher object reference (Default value = None)
+    :return: modprobe policy
+    :rtype: ModprobePolicy
+    """
+
+    global _modprobepolicy
+    with _modprobepolicylock:
+        if _modprobepolicy is None:
+            _modprobepolicy = ModprobePolicy(logger)
+        elif _modprobepolicy.logger is None:
+            _modprobepolicy.logger = logger
+        return _modprobepolicy
@@ -21,6 +21,8 @@ import re
 from stonix_resources import yum, aptGet, portage, zypper, freebsd, solaris, dnf
 import traceback
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources.pkginventory import getinventory
+from stonix_resources.SHsystemctl import clearSnapshot
 
 
 class Pkghelper(object):
@@ -32,6 +34,13 @@ class Pkghelper(object):
     @change: 2015/08/20 eball - Added getPackageFromFile
     @change: 2015/09/04 rsn - Gave default value to self.pckgr for OSs that
                               are not included, specifically OS X.
+    @change: 2026/10/16 - check answers from the process wide installed
+                          package inventory where one is available
+    @change: 2026/10/16 - added queueInstall, queueRemove and
+                          commitTransaction to install or remove several
+                          packages with one package manager invocation
+    @change: 2026/10/17 - drop the service state snapshot after package
+                          installs and removals
 
 
     """
@@ -45,6 +54,12 @@ class Pkghelper(object):
                              'fedora': 'dnf', 'mint': 'apt-get',
                              'freebsd': 'freebsd', 'solaris': 'solaris'}
         self.manager = self.determineMgr()
+        self.inventory = getinventory(self.logger, self.manager)
+        # package managers whose install and remove commands accept several
+        # package names in one invocation
+        self.batchmanagers = ["yum", "dnf", "apt-get", "zypper"]
+        self.pendinginstall = []
+        self.pendingremove = []
         self.detailedresults = ''
         """FOR YUM (RHEL,CENTOS)"""
         if self.manager is "yum":
@@ -143,6 +158,10 @@ class Pkghelper(object):
         try:
             if self.enviro.geteuid() is 0 and self.pckgr:
                 if self.pckgr.installpackage(package):
+                    # dependencies may have been installed as well
+                    self.inventory.invalidate()
+                    # and may have brought service unit files with them
+                    clearSnapshot()
                     return True
                 else:
                     return False
@@ -171,6 +190,8 @@ install command"
         try:
             if self.enviro.geteuid() == 0:
                 if self.pckgr.removepackage(package):
+                    self.inventory.invalidate()
+                    clearSnapshot()
                     return True
                 else:
                     return False
@@ -199,6 +220,9 @@ remove command"
         """
 
         try:
+            installed = self.inventory.isinstalled(package)
+            if installed is not None:
+                return installed
             if self.pckgr.checkInstall(package):
                 return True
             else:
@@ -210,6 +234,100 @@ remove command"
             self.logger.log(LogPriority.ERROR, info)
             raise
 
+    def queueInstall(self, package):
+        """Queue a package to be installed by the next call to
+        commitTransaction
+
+        :param package: Name of the package to be installed, must be
+            recognizable to the underlying package manager.
+
+        """
+
+        if type(package) is bytes:
+            package = package.decode('utf-8')
+        if package not in self.pendinginstall:
+            self.pendinginstall.append(package)
+
+    def queueRemove(self, package):
+        """Queue a package to be removed by the next call to
+        commitTransaction
+
+        :param package: Name of the package to be removed, must be
+            recognizable to the underlying package manager.
+
+        """
+
+        if type(package) is bytes:
+            package = package.decode('utf-8')
+        if package not in self.pendingremove:
+            self.pendingremove.append(package)
+
+    def commitTransaction(self):
+        """Remove and then install all queued packages. On package managers
+        that accept several package names, all removals are done with one
+        invocation and all installs with another. Packages which did not
+        reach the wanted state in the batch (e.g. because a single unknown
+        package name made the package manager abort) are retried one at a
+        time, so one bad name does not fail the rest of the queue.
+
+        :returns: results - dictionary of package name -> bool indicating
+            success or failure for that package
+        :rtype: dict
+
+        """
+
+        results = {}
+        try:
+            if self.enviro.geteuid() == 0 and self.pckgr:
+                if self.pendingremove:
+                    results.update(self.__runTransaction(
+                        self.pckgr.removepackage, self.pendingremove, False))
+                if self.pendinginstall:
+                    results.update(self.__runTransaction(
+                        self.pckgr.installpackage, self.pendinginstall, True))
+            else:
+                msg = "Not running as root, only root can use the pkghelper \
+commitTransaction command"
+                raise Exception(msg)
+        except(KeyboardInterrupt, SystemExit):
+            raise
+        except Exception:
+            info = traceback.format_exc()
+            self.logger.log(LogPriority.ERROR, info)
+            raise
+        finally:
+            self.pendingremove = []
+            self.pendinginstall = []
+            clearSnapshot()
+        return results
+
+    def __runTransaction(self, action, packages, wanted):
+        """Run a package manager action for a list of packages
+
+        :param action: the backend installpackage or removepackage method
+        :param packages: list of package names
+        :param wanted: True if the packages should be installed afterwards,
+            False if they should be removed
+        :returns: results - dictionary of package name -> bool
+        :rtype: dict
+
+        """
+
+        results = dict((package, False) for package in packages)
+        if len(packages) > 1 and self.manager in self.batchmanagers:
+            self.logger.log(LogPriority.DEBUG,
+                            "Running one package transaction for: " +
+                            " ".join(packages))
+            action(" ".join(packages))
+            self.inventory.invalidate()
+            for package in packages:
+                results[package] = self.check(package) is wanted
+        for package in packages:
+            if not results[package]:
+                results[package] = bool(action(package))
+        self.inventory.invalidate()
+        return results
+
     def checkAvailable(self, package):
         """check the reachable repositories to see if the specified package
         is available to install or not
@@ -296,6 +414,7 @@ remove command"
                     self.logger.log(LogPriority.DEBUG, "Failed to install updates")
                     updated = False
                 else:
+                    self.inventory.invalidate()
                     self.logger.log(LogPriority.DEBUG, "All updates successfully installed")
             else:
                 self.logger.log(LogPriority.DEBUG, "No updates available to install")
@@ -0,0 +1,202 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide inventory of installed packages. Instead of running the package
+manager once for every package a rule asks about, the names and versions of
+all installed packages are read with a single bulk query (rpm -qa on yum, dnf
+and zypper systems, dpkg-query -W on apt systems) and Pkghelper.check answers
+from that set.
+
+The inventory is reloaded when the package database changes on disk and
+after every install or remove done through Pkghelper, so packages pulled in
+or removed as dependencies are accounted for. Package names containing
+wildcards or version specifications, and platforms without a bulk query,
+are left to the package manager specific checkInstall.
+
+A rule report that asks about a package has the package database file
+recorded as one of its inputs by resultcache.
+"""
+
+import os
+import re
+import threading
+
+from stonix_resources.CommandHelper import CommandHelper
+from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import resultcache
+
+RPMQUERY = ["/bin/rpm", "-qa", "--qf",
+            r"%{NAME}\t%{EPOCH}:%{VERSION}-%{RELEASE}\t%{ARCH}\n"]
+RPMDB = ["/var/lib/rpm/rpmdb.sqlite", "/var/lib/rpm/Packages",
+         "/usr/lib/sysimage/rpm/rpmdb.sqlite",
+         "/usr/lib/sysimage/rpm/Packages"]
+DPKGQUERY = ["/usr/bin/dpkg-query", "-W", "-f",
+             r"${Package}\t${Version}\t${Architecture}\t${db:Status-Abbrev}\n"]
+DPKGDB = ["/var/lib/dpkg/status"]
+
+# package manager name used by Pkghelper -> (bulk query, database files)
+QUERIES = {"yum": (RPMQUERY, RPMDB),
+           "dnf": (RPMQUERY, RPMDB),
+           "zypper": (RPMQUERY, RPMDB),
+           "apt-get": (DPKGQUERY, DPKGDB)}
+
+# a plain package name, optionally with an architecture suffix
+PLAINNAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9+._-]*(:[A-Za-z0-9_]+)?$")
+
+
+class PackageInventory(object):
+    """Installed package names and versions read with one bulk query
+
+    :param logger: logdispatcher object reference
+    :param manager: package manager name as determined by Pkghelper
+
+    """
+
+    def __init__(self, logger, manager):
+        self.logger = logger
+        self.manager = manager
+        self.packages = None
+        self.stamp = None
+        self.loads = 0
+        self.lock = threading.Lock()
+        self.query, self.dbfiles = QUERIES.get(manager, (None, []))
+        if self.query and not os.path.exists(self.query[0]):
+            # rpm lives in /usr/bin on some distributions
+            alternate = os.path.join("/usr/bin",
+                                     os.path.basename(self.query[0]))
+            if os.path.exists(alternate):
+                self.query = [alternate] + self.query[1:]
+            else:
+                self.query = None
+
+    def getstamp(self):
+        """Return the modification stamp of the package database
+
+        :return: (path, st_mtime_ns, st_size) or None
+        :rtype: tuple
+        """
+
+        for path in self.dbfiles:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            return (path, st.st_mtime_ns, st.st_size)
+        return None
+
+    def load(self):
+        """Read the installed packages with the bulk query
+
+        :return: success
+        :rtype: bool
+        """
+
+        packages = {}
+        stamp = self.getstamp()
+        ch = CommandHelper(self.logger)
+        if not ch.executeCommand(self.query) or ch.getReturnCode() != 0:
+            self.logger.log(LogPriority.DEBUG,
+                            "Package inventory query failed: " +
+                            str(ch.getErrorString()))
+            return False
+        for line in ch.getOutput():
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 3:
+                continue
+            name, version, arch = fields[0], fields[1], fields[2]
+            if len(fields) > 3 and fields[3][1:2] != "i":
+                # dpkg knows about packages which are not installed
+                continue
+            if version.startswith("(none):"):
+                version = version[len("(none):"):]
+            packages.setdefault(name, set()).add(version)
+            packages.setdefault(name + "." + arch, set()).add(version)
+            packages.setdefault(name + ":" + arch, set()).add(version)
+        self.packages = packages
+        self.stamp = stamp
+        self.loads += 1
+        self.logger.log(LogPriority.DEBUG, "Package inventory loaded: " +
+                        str(len(packages)) + " entries")
+        return True
+
+    def isinstalled(self, package):
+        """Report whether a package is installed
+
+        :param package: package name
+        :return: True or False, or None if the inventory can not answer for
+            this package
+        """
+
+        if not self.query or not PLAINNAME.match(package):
+            return None
+        with self.lock:
+            if self.packages is None or self.stamp != self.getstamp():
+                # the query's input is the package database, recorded below
+                resultcache.suspend()
+                try:
+                    if not self.load():
+                        return None
+                finally:
+                    resultcache.resume()
+            if self.stamp:
+                resultcache.recordpath(self.stamp[0])
+            else:
+                resultcache.untracked()
+            return package in self.packages
+
+    def getversions(self, package):
+        """Return the installed versions of a package
+
+        :param package: package name
+        :return: set of version strings, empty if the package is not
+            installed, or None if the inventory can not answer
+        """
+
+        if not self.isinstalled(package):
+            if self.packages is None or not self.query:
+                return None
+            return set()
+        return set(self.packages[package])
+
+    def invalidate(self):
+        """Forget the inventory so that it is read again on the next check"""
+
+        with self.lock:
+            self.packages = None
+            self.stamp = None
+
+
+_inventories = {}
+_inventorieslock = threading.Lock()
+
+
+def getinventory(logger, manager):
+    """Return the process wide inventory for a package manager
+
+    :param logger: logdispatcher object reference
+    :param manager: package manager name as determined by Pkghelper
+    :return: inventory
+    :rtype: PackageInventory
+    """
+
+    with _inventorieslock:
+        if manager not in _inventories:
+            _inventories[manager] = PackageInventory(logger, manager)
+        return _inventories[manager]
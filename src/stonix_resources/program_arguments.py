@@ -90,6 +90,16 @@ class ProgramArguments(object):
                           default=False,
                           help="List all installed rules that stonix will run on this platform.")
 
+        self.parser.add_option("-j", "--jobs", action="store", type="int",
+                          dest="jobs",
+                          default=1,
+                          help="Number of rules to run at the same time in report mode.")
+
+        self.parser.add_option("--no-cache", action="store_true",
+                          dest="nocache",
+                          default=False,
+                          help="Evaluate every rule in report mode instead of reusing results of earlier report runs whose inputs are unchanged.")
+
         #####
         # The Self Update test will look to a development/test environment
         # to test Self Update rather than testing self update
@@ -114,6 +124,8 @@ class ProgramArguments(object):
             self.parser.error('The -p --printconfigsimple option may not be used with the fix, report, rollback, or GUI options')
         if self.opts.list and (self.opts.fix or self.opts.report or self.opts.rollback or self.opts.pcf):
             self.parser.error('The -l --list option may not be used with the fix, report, rollback, or GUI options')
+        if self.opts.jobs < 1:
+            self.parser.error('The -j --jobs option must be 1 or greater')
 
         if self.opts.debug:
             print("Selected options: ")
@@ -242,3 +254,21 @@ class ProgramArguments(object):
 
         '''
         return self.opts.list
+
+    def get_jobs(self):
+        '''
+
+
+        :returns: number of rules to run concurrently in report mode.
+
+        '''
+        return self.opts.jobs
+
+    def get_nocache(self):
+        '''
+
+
+        :returns: True if cached report results must not be reused.
+
+        '''
+        return self.opts.nocache
@@ -0,0 +1,334 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Upload of STONIX run reports to the central report server. Reports are sent
+as a multipart/form-data POST over a single HTTPS connection that is reused
+for every report sent during the run. Transient failures are retried a few
+times with jittered exponential backoff. A report that still can not be
+delivered is kept in an on-disk spool of bounded size and is retried on
+later runs, oldest first, once its own backoff period has passed. The random
+jitter spreads retries from many hosts whose scheduled runs fire at the same
+moment instead of having them all hit the server together.
+"""
+
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import ssl
+import time
+import uuid
+
+
+class ReportUploader(object):
+    """Send run reports to the report server, spooling those that fail
+
+    :param server: host name of the report server
+    :param spooldir: directory undelivered reports are kept in
+    :param debuglog: callable taking a message string, used to report
+        upload problems (Default value = None)
+    :param timeout: connection and read timeout in seconds
+        (Default value = 30)
+    :param retries: attempts per report during one run (Default value = 3)
+    :param maxfiles: maximum number of reports kept in the spool
+        (Default value = 10)
+    :param maxbytes: maximum total size of the spool in bytes
+        (Default value = 50MB)
+
+    """
+
+    URL = '/stonix/results.php'
+    BACKOFF = 2
+    MAXBACKOFF = 30
+    SPOOLBACKOFF = 900
+    MAXSPOOLBACKOFF = 86400
+
+    def __init__(self, server, spooldir, debuglog=None, timeout=30,
+                 retries=3, maxfiles=10, maxbytes=50 * 1024 * 1024):
+        self.server = server
+        self.spooldir = spooldir
+        self.debuglog = debuglog
+        self.timeout = timeout
+        self.retries = max(1, retries)
+        self.maxfiles = maxfiles
+        self.maxbytes = maxbytes
+        self.connection = None
+        self.sleep = time.sleep
+
+    def logdebug(self, msg):
+        """Report a problem through debuglog"""
+
+        if self.debuglog is not None:
+            self.debuglog(msg)
+
+    def connect(self):
+        """Return the open connection to the report server, creating it if
+        necessary
+
+        :return: connection
+        :rtype: http.client.HTTPSConnection
+        """
+
+        if self.connection is None:
+            # the report servers use site certificates which are not in the
+            # system trust store, matching the curl -k previously used
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            self.connection = http.client.HTTPSConnection(
+                self.server, timeout=self.timeout, context=context)
+        return self.connection
+
+    def close(self):
+        """Close the connection to the report server"""
+
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def encode(self, path, contenttype):
+        """Build a multipart/form-data body holding the report as the file
+        field
+
+        :param path: path of the report
+        :param contenttype: MIME type of the report
+        :return: (body, content type header)
+        :rtype: tuple
+        """
+
+        boundary = uuid.uuid4().hex
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        head = '--' + boundary + '\r\n' + \
+            'Content-Disposition: form-data; name="file"; filename="' + \
+            os.path.basename(path) + '"\r\n' + \
+            'Content-Type: ' + contenttype + '\r\n\r\n'
+        tail = '\r\n--' + boundary + '--\r\n'
+        body = head.encode('utf-8') + data + tail.encode('utf-8')
+        return body, 'multipart/form-data; boundary=' + boundary
+
+    def post(self, path, contenttype):
+        """Make one attempt at sending a report
+
+        :param path: path of the report
+        :param contenttype: MIME type of the report
+        :return: True if the server accepted the report
+        :rtype: bool
+        """
+
+        body, header = self.encode(path, contenttype)
+        try:
+            connection = self.connect()
+            connection.request('POST', self.URL, body,
+                               {'Content-Type': header})
+            response = connection.getresponse()
+            response.read()
+            if response.will_close:
+                self.close()
+            if 200 <= response.status < 300:
+                return True
+            self.logdebug('Report upload of ' + path + ' returned ' +
+                          str(response.status) + ' ' + response.reason)
+        except (socket.error, http.client.HTTPException, ssl.SSLError) as err:
+            self.close()
+            self.logdebug('Report upload of ' + path + ' failed: ' +
+                          str(err))
+        return False
+
+    def send(self, path, contenttype):
+        """Send a report, retrying with jittered exponential backoff
+
+        :param path: path of the report
+        :param contenttype: MIME type of the report
+        :return: True if the report was delivered
+        :rtype: bool
+        """
+
+        for attempt in range(self.retries):
+            if attempt:
+                delay = min(self.MAXBACKOFF, self.BACKOFF * 2 ** attempt)
+                self.sleep(random.uniform(delay / 2.0, delay))
+            if self.post(path, contenttype):
+                return True
+        return False
+
+    def upload(self, path, contenttype='text/xml'):
+        """Send this run's report and then any spooled reports that are due.
+        If this run's report can not be delivered it is copied to the spool
+        and the spool is left alone until a later run.
+
+        :param path: path of the report
+        :param contenttype: MIME type of the report (Default value = 'text/xml')
+        :return: True if this run's report was delivered
+        :rtype: bool
+        """
+
+        try:
+            if self.send(path, contenttype):
+                self.drain()
+                return True
+            self.spool(path, contenttype)
+            return False
+        finally:
+            self.close()
+
+    def getspooled(self):
+        """Return the spooled reports, oldest first
+
+        :return: list of (report path, state dict)
+        :rtype: list
+        """
+
+        entries = []
+        try:
+            names = os.listdir(self.spooldir)
+        except OSError:
+            return entries
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            statepath = os.path.join(self.spooldir, name)
+            try:
+                with open(statepath) as fh:
+                    state = json.load(fh)
+                report = os.path.join(self.spooldir, state['report'])
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                self.remove(statepath, None)
+                continue
+            if not os.path.exists(report):
+                self.remove(statepath, None)
+                continue
+            entries.append((report, state))
+        entries.sort(key=lambda entry: entry[1].get('spooled', 0))
+        return entries
+
+    def statepath(self, report):
+        """Return the path of the state file for a spooled report"""
+
+        return os.path.splitext(report)[0] + '.json'
+
+    def remove(self, statepath, report):
+        """Delete a spooled report and its state file"""
+
+        for path in (statepath, report):
+            if path is not None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def writestate(self, report, state):
+        """Write the state file of a spooled report"""
+
+        statepath = self.statepath(report)
+        tmppath = statepath + '.tmp'
+        with open(tmppath, 'w') as fh:
+            json.dump(state, fh)
+        os.rename(tmppath, statepath)
+
+    def nextattempt(self, attempts):
+        """Return the time the next attempt to send a spooled report that has
+        failed attempts times should be made
+
+        :param attempts: number of failed runs so far
+        :return: time in seconds since the epoch
+        :rtype: float
+        """
+
+        delay = min(self.MAXSPOOLBACKOFF,
+                    self.SPOOLBACKOFF * 2 ** max(0, attempts - 1))
+        return time.time() + random.uniform(delay / 2.0, delay)
+
+    def spool(self, path, contenttype):
+        """Copy an undelivered report to the spool, discarding the oldest
+        spooled reports if the spool would grow beyond its limits
+
+        :param path: path of the report
+        :param contenttype: MIME type of the report
+        """
+
+        try:
+            if not os.path.isdir(self.spooldir):
+                os.makedirs(self.spooldir, 0o700)
+            now = time.time()
+            name = time.strftime('%Y%m%d%H%M%S', time.localtime(now)) + \
+                '-' + uuid.uuid4().hex[:8]
+            base = os.path.basename(path)
+            if '.' in base:
+                name += base[base.find('.'):]
+            report = os.path.join(self.spooldir, name)
+            shutil.copyfile(path, report)
+            self.writestate(report, {'report': os.path.basename(report),
+                                     'contenttype': contenttype,
+                                     'spooled': now,
+                                     'attempts': 1,
+                                     'next': self.nextattempt(1)})
+            self.logdebug('Report ' + path + ' spooled as ' + report)
+            self.trim()
+        except (IOError, OSError) as err:
+            self.logdebug('Could not spool report ' + path + ': ' + str(err))
+
+    def trim(self):
+        """Discard the oldest spooled reports until the spool is within its
+        file count and size limits"""
+
+        entries = self.getspooled()
+        sizes = []
+        for report, _ in entries:
+            try:
+                sizes.append(os.path.getsize(report))
+            except OSError:
+                sizes.append(0)
+        total = sum(sizes)
+        while entries and (len(entries) > self.maxfiles or
+                           total > self.maxbytes):
+            report, _ = entries.pop(0)
+            total -= sizes.pop(0)
+            self.remove(self.statepath(report), report)
+            self.logdebug('Discarded spooled report ' + report)
+
+    def drain(self):
+        """Send the spooled reports whose backoff period has passed. Stops at
+        the first report that can not be delivered.
+
+        :return: number of spooled reports delivered
+        :rtype: int
+        """
+
+        sent = 0
+        now = time.time()
+        for report, state in self.getspooled():
+            if state.get('next', 0) > now:
+                continue
+            if self.post(report, state.get('contenttype', 'text/xml')):
+                self.remove(self.statepath(report), report)
+                sent += 1
+                continue
+            attempts = state.get('attempts', 0) + 1
+            state['attempts'] = attempts
+            state['next'] = self.nextattempt(attempts)
+            try:
+                self.writestate(report, state)
+            except (IOError, OSError):
+                pass
+            break
+        return sent
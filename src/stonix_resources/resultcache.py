@@ -0,0 +1,369 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Cache of compliant rule reports keyed on the inputs the report looked at.
+While a rule which declares itself cacheable runs its report method, the
+shared readers (filecache, the sysctl service, the modprobe policy, the
+package inventory) record every path they read together with a token of its
+state. Rules add paths they read by other means through their cacheinputs
+list. Running a command through CommandHelper marks the report as untracked
+because its output can not be fingerprinted.
+
+A later report run reuses the stored result when the rule's own fingerprint
+(STONIX version, rule source, operating system and configuration item
+values) is unchanged and every recorded path still has the same token.
+Only compliant results are stored; a rule that has drifted, failed or was
+never compliant is always evaluated.
+
+The state of a regular file or directory is its inode, modification and
+change times, size, mode and ownership. Files in /proc and /sys do not
+carry meaningful times, so their contents are hashed instead.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from stonix_resources.logdispatcher import LogPriority
+
+# pseudo file systems whose times do not follow the contents
+CONTENTPATHS = ("/proc/", "/sys/")
+# files changed this recently may change again without a visible new time
+RACYSECONDS = 2
+# a stored result is not used once it is older than this
+MAXAGE = 24 * 60 * 60
+CACHEVERSION = 1
+
+_local = threading.local()
+
+
+def pathtoken(path, st=None):
+    """Return a token describing the current state of a path
+
+    :param path: path of a file or directory
+    :param st: os.stat result already taken for the path
+        (Default value = None)
+    :return: token, None if the path does not exist, False if the state
+        can not be fingerprinted reliably
+    :rtype: list
+    """
+
+    if path.startswith(CONTENTPATHS):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except (IOError, OSError):
+            return None
+        return ["data", hashlib.sha1(data).hexdigest()]
+    if st is None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+    if time.time() - st.st_mtime_ns / 1e9 <= RACYSECONDS:
+        return False
+    return [st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size,
+            st.st_mode, st.st_uid, st.st_gid]
+
+
+def startrecording():
+    """Start recording the inputs of a report run in the current thread"""
+
+    _local.inputs = {}
+    _local.tracked = True
+    _local.suspended = 0
+
+
+def stoprecording():
+    """Stop recording in the current thread
+
+    :return: (inputs, tracked); inputs maps each path read to its token,
+        tracked is False if something was read that can not be fingerprinted
+    :rtype: tuple
+    """
+
+    inputs = getattr(_local, "inputs", None)
+    tracked = getattr(_local, "tracked", False)
+    _local.inputs = None
+    return inputs or {}, tracked
+
+
+def isrecording():
+    """Return True if the inputs of a report are being recorded in the
+    current thread
+
+    :rtype: bool
+    """
+
+    return getattr(_local, "inputs", None) is not None and \
+        not _local.suspended
+
+
+def recordpath(path, st=None):
+    """Record that the report running in the current thread read a path.
+    Does nothing if no report is being recorded.
+
+    :param path: path of a file or directory
+    :param st: os.stat result already taken for the path
+        (Default value = None)
+    """
+
+    if not isrecording():
+        return
+    path = os.path.abspath(path)
+    token = pathtoken(path, st)
+    if token is False:
+        _local.tracked = False
+    elif path not in _local.inputs:
+        # the state seen first is the one the report was based on
+        _local.inputs[path] = token
+
+
+def untracked():
+    """Record that the report running in the current thread used an input
+    which can not be fingerprinted, e.g. the output of a command"""
+
+    if isrecording():
+        _local.tracked = False
+
+
+def suspend():
+    """Stop recording in the current thread until resume() is called. Used
+    around work whose result is fingerprinted by other means, e.g. the bulk
+    package query whose input is the package database."""
+
+    if getattr(_local, "inputs", None) is not None:
+        _local.suspended += 1
+
+
+def resume():
+    """Undo a suspend() call"""
+
+    if getattr(_local, "inputs", None) is not None and _local.suspended:
+        _local.suspended -= 1
+
+
+class ResultCache(object):
+    """Compliant report results persisted as JSON in a file
+
+    :param path: path of the cache file
+    :param logger: logdispatcher object reference
+    :param maxage: seconds a stored result may be reused
+        (Default value = MAXAGE)
+
+    """
+
+    def __init__(self, path, logger, maxage=MAXAGE):
+        self.path = path
+        self.logger = logger
+        self.maxage = maxage
+        self.entries = None
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Read the cache file, starting empty if it can not be parsed"""
+
+        self.entries = {}
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == CACHEVERSION:
+                self.entries = dict(data.get("rules", {}))
+        except (IOError, OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """Write the cache file if it changed. Failures are ignored; the
+        rules are then evaluated again by the next run."""
+
+        with self.lock:
+            if not self.dirty:
+                return
+            data = {"version": CACHEVERSION, "rules": self.entries}
+            self.dirty = False
+        tmppath = self.path + ".tmp" + str(os.getpid())
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            fd = os.open(tmppath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                         0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.rename(tmppath, self.path)
+        except (IOError, OSError, TypeError, ValueError):
+            try:
+                os.remove(tmppath)
+            except OSError:
+                pass
+
+    def fingerprint(self, rule):
+        """Return the fingerprint of everything about a rule other than the
+        paths its report reads
+
+        :param rule: Rule instance
+        :return: hex digest
+        :rtype: str
+        """
+
+        environ = rule.environ
+        parts = [environ.getstonixversion(), environ.getostype(),
+                 environ.getosver(), type(rule).__name__]
+        module = sys.modules.get(type(rule).__module__)
+        source = getattr(module, "__file__", None)
+        if source:
+            parts.append(pathtoken(source))
+        for ci in rule.getconfigitems():
+            parts.append([ci.getkey(), repr(ci.getcurrvalue())])
+        parts.append(sorted(rule.getcacheinputs()))
+        return hashlib.sha1(json.dumps(parts, sort_keys=True,
+                                       default=str).encode("utf-8")
+                            ).hexdigest()
+
+    def lookup(self, rule):
+        """Return the stored result of a rule if it is still valid
+
+        :param rule: Rule instance
+        :return: entry, None if the rule must be evaluated
+        :rtype: dict
+        """
+
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            entry = self.entries.get(rule.getrulename())
+        if not isinstance(entry, dict):
+            return None
+        age = time.time() - entry.get("time", 0)
+        if age < 0 or age > self.maxage:
+            return None
+        if entry.get("fingerprint") != self.fingerprint(rule):
+            return None
+        for path, token in entry.get("inputs", {}).items():
+            if pathtoken(path) != token:
+                return None
+        return entry
+
+    def store(self, rule, inputs):
+        """Store the result of a compliant report
+
+        :param rule: Rule instance
+        :param inputs: paths read by the report mapped to their tokens
+        """
+
+        for path in rule.getcacheinputs():
+            inputs.setdefault(path, pathtoken(path))
+        if False in inputs.values():
+            self.forget(rule)
+            return
+        entry = {"fingerprint": self.fingerprint(rule),
+                 "time": time.time(),
+                 "inputs": inputs,
+                 "detailedresults": rule.getdetailedresults(),
+                 "currstate": rule.getcurrstate()}
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            self.entries[rule.getrulename()] = entry
+            self.dirty = True
+
+    def forget(self, rule):
+        """Drop the stored result of a rule
+
+        :param rule: Rule instance
+        """
+
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            if self.entries.pop(rule.getrulename(), None) is not None:
+                self.dirty = True
+
+    def runreport(self, rule, usecache=True):
+        """Run the report method of a rule, or restore its stored result if
+        none of its inputs changed since the last compliant report.
+
+        :param rule: Rule instance
+        :param usecache: reuse stored results; when False every rule is
+            evaluated and the stored results are refreshed
+            (Default value = True)
+        :return: True if the stored result was used
+        :rtype: bool
+        """
+
+        if not rule.iscacheable():
+            rule.report()
+            return False
+        if usecache:
+            entry = self.lookup(rule)
+            if entry is not None:
+                rule.compliant = True
+                rule.rulesuccess = True
+                rule.detailedresults = entry.get("detailedresults", "")
+                rule.currstate = entry.get("currstate", rule.currstate)
+                with self.lock:
+                    self.hits += 1
+                self.logger.log(LogPriority.DEBUG,
+                                [rule.getrulename(),
+                                 "Inputs unchanged, reusing the result " +
+                                 "of the report run at " +
+                                 time.ctime(entry.get("time", 0))])
+                return True
+        with self.lock:
+            self.misses += 1
+        startrecording()
+        try:
+            rule.report()
+        finally:
+            inputs, tracked = stoprecording()
+        if tracked and rule.iscompliant() and rule.getrulesuccess():
+            self.store(rule, inputs)
+        else:
+            self.forget(rule)
+        return False
+
+    def clear(self):
+        """Forget all stored results"""
+
+        with self.lock:
+            self.entries = {}
+            self.dirty = False
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def getstats(self):
+        """Return the cache statistics
+
+        :return: dict with hits, misses and entries
+        :rtype: dict
+        """
+
+        with self.lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'entries': len(self.entries or {})}
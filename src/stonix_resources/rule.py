@@ -34,6 +34,11 @@ Created on Aug 24, 2010
 @change: eball 2015/07/08 - Added pkghelper and ServiceHelper undos
 @change: 2017/03/07 dkennel - Added FISMA risk level support to isapplicable
 @change: 2017/10/23 rsn - change to new service helper interface
+@change: 2026/10/16 - sethelptext uses the shared help text index
+@change: 2026/10/16 - added cacheable and cacheinputs for the result cache
+@change: 2026/10/16 - isapplicable logic moved to checkapplicable() for use
+    by the rule manifest
+@change: 2026/10/17 - drop the service state snapshot after undo commands
 '''
 
 from stonix_resources.observable import Observable
@@ -42,6 +47,7 @@ from stonix_resources.logdispatcher import LogPriority
 from types import *
 import os
 import re
+import sys
 from distutils.version import LooseVersion
 from shutil import rmtree
 
@@ -54,8 +60,14 @@ from stonix_resources.localize import DRUNDOSUCCESSFUL, DRUNDOFAILED, DRUNDONOTA
 from stonix_resources.CommandHelper import CommandHelper
 from stonix_resources.pkghelper import Pkghelper
 from stonix_resources.ServiceHelper import ServiceHelper
+from stonix_resources.SHsystemctl import clearSnapshot
 import traceback
 from stonix_resources.CheckApplicable import CheckApplicable
+from stonix_resources.helptext import gethelptext, getindexpath
+
+# module level names which mark a rule as a user of a shared system resource
+HELPERRESOURCES = [('Pkghelper', 'pkgdb'), ('pkghelper', 'pkgdb'),
+                   ('ServiceHelper', 'servicemgr')]
 
 
 class Rule(Observable):
@@ -98,6 +110,9 @@ LANL-stonix."""
         self.targetstate = "configured"
         self.guidance = []
         self.auditonly = False
+        self.sharedresources = []
+        self.cacheable = False
+        self.cacheinputs = []
 
     def fix(self):
         '''The fix method will apply the required settings to the system.
@@ -171,6 +186,8 @@ LANL-stonix."""
                         ch = CommandHelper(self.logdispatch)
                         command = event["command"]
                         ch.executeCommand(command)
+                        # the command may have changed service states
+                        clearSnapshot()
                         if ch.getReturnCode() != 0:
                             self.detailedresults = "Couldn't run the " + \
                                                    "command to undo\n"
@@ -435,142 +452,8 @@ LANL-stonix."""
         @change: 2015/04/13 added this method to template class
         @change: 2017/11/13 ekkehard - make eligible for OS X El Capitan 10.11+
         '''
-        # return True
-        # Shortcut if we are defaulting to true
-        self.logdispatch.log(LogPriority.DEBUG,
-                             'Check applicability for ' + self.rulename)
-        self.logdispatch.log(LogPriority.DEBUG,
-                             'Dictionary is: ' + str(self.applicable))
-        try:
-            if 'os' not in self.applicable and 'family' not in self.applicable:
-                amidefault = self.applicable['default']
-                if amidefault == 'default':
-                    self.logdispatch.log(LogPriority.DEBUG,
-                                         'Defaulting to True')
-                    return True
-        except KeyError:
-            pass
-
-        # Determine whether we are a blacklist or a whitelist, default to a
-        # blacklist
-        if 'type' in self.applicable:
-            listtype = self.applicable['type']
-        else:
-            listtype = 'black'
-        # Set the default return as appropriate to the list type
-        # FIXME check for valid input
-        assert listtype in ['white', 'black'], 'Invalid list type specified: %r' % listtype
-        if listtype == 'black':
-            applies = True
-        else:
-            applies = False
-
-        # get our data in local vars
-        myosfamily = self.environ.getosfamily()
-        myosversion = self.environ.getosver()
-        myostype = self.environ.getostype()
-
-        # Process the os family list
-        if 'family' in self.applicable:
-            if myosfamily in self.applicable['family']:
-                if listtype == 'black':
-                    applies = False
-                else:
-                    applies = True
-                self.logdispatch.log(LogPriority.DEBUG,
-                                     'Family match, applies: ' + str(applies))
-
-        # Process the OS list
-        if 'os' in self.applicable:
-            for ostype, osverlist in list(self.applicable['os'].items()):
-
-                if re.search(ostype, myostype):
-                    # Process version and up
-                    if '+' in osverlist:
-                        assert len(osverlist) is 2, "Wrong number of entries for a +"
-                        if osverlist[1] == '+':
-                            baseversion = osverlist[0]
-                        else:
-                            baseversion = osverlist[1]
-                        if LooseVersion(myosversion) >= LooseVersion(baseversion):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Plus match, applies: ' + str(applies))
-                    # Process version and lower
-                    elif '-' in osverlist:
-                        assert len(osverlist) is 2, "Wrong number of entries for a -"
-                        if osverlist[1] == '-':
-                            baseversion = osverlist[0]
-                        else:
-                            baseversion = osverlist[1]
-                        if LooseVersion(myosversion) <= LooseVersion(baseversion):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Minus match, applies: ' + str(applies))
-                    # Process inclusive range
-                    elif 'r' in osverlist:
-                        assert len(osverlist) is 3, "Wrong number of entries for a range"
-                        vertmp = osverlist
-                        vertmp.remove('r')
-                        if LooseVersion(vertmp[0]) > LooseVersion(vertmp[1]):
-                            highver = vertmp[0]
-                            lowver = vertmp[1]
-                        elif LooseVersion(vertmp[0]) < LooseVersion(vertmp[1]):
-                            highver = vertmp[1]
-                            lowver = vertmp[0]
-                        else:
-                            raise ValueError('Range versions are the same')
-                        if LooseVersion(myosversion) <= LooseVersion(highver) \
-                                and LooseVersion(myosversion) >= LooseVersion(lowver):
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Range match, applies: ' + str(applies))
-                    # Process explicit match
-                    else:
-                        if myosversion in osverlist:
-                            if listtype == 'black':
-                                applies = False
-                            else:
-                                applies = True
-                            self.logdispatch.log(LogPriority.DEBUG,
-                                                 'Version match, applies: ' + str(applies))
-
-        # Perform the rootless check
-        if applies and self.environ.geteuid() == 0:
-            if 'noroot' in self.applicable:
-                if self.applicable['noroot'] == True:
-                    applies = False
-
-        # Perform the FISMA categorization check
-        if applies:
-            rulefisma = ''
-            systemfismacat = ''
-            systemfismacat = self.environ.getsystemfismacat()
-            if systemfismacat not in ['high', 'med', 'low']:
-                raise ValueError('SystemFismaCat invalid: valid values are low, med, high')
-            if 'fisma' in self.applicable:
-                if self.applicable['fisma'] not in ['high', 'med', 'low']:
-                    raise ValueError('fisma value invalid: valid values are low, med, high')
-                else:
-                    rulefisma = self.applicable['fisma']
-            if systemfismacat == 'high' and rulefisma == 'high':
-                pass
-            elif systemfismacat == 'med' and rulefisma == 'high':
-                applies = False
-            elif systemfismacat == 'low' and \
-                    (rulefisma == 'med' or rulefisma == "high"):
-                applies = False
-
-        return applies
+        return checkapplicable(self.applicable, self.environ,
+                               self.logdispatch, self.rulename)
 
     def checkConsts(self, constlist=[]):
         '''This method returns True or False depending
@@ -760,6 +643,53 @@ LANL-stonix."""
 
         return self.auditonly
 
+    def getsharedresources(self):
+        '''Return the list of shared system resources touched by this rule.
+        The controller will not run two rules which share a resource at the
+        same time when running in parallel (--jobs) mode. Common values are
+        'files', 'pkgdb' and 'servicemgr'. A rule listing 'exclusive' is
+        always run by itself. Default = [].
+        Rules whose modules use Pkghelper or ServiceHelper are also given
+        'pkgdb' or 'servicemgr' so that those helpers never run concurrently
+        even when the rule does not declare them.
+        :returns: resources
+        :rtype: list
+        '''
+
+        resources = list(self.sharedresources)
+        for klass in type(self).__mro__:
+            if klass.__module__.split('.')[-1] in ('rule', 'builtins'):
+                continue
+            module = sys.modules.get(klass.__module__)
+            names = getattr(module, '__dict__', {})
+            for helper, resource in HELPERRESOURCES:
+                if helper in names and resource not in resources:
+                    resources.append(resource)
+        return resources
+
+    def iscacheable(self):
+        '''Return whether the result of a compliant report may be reused by
+        later report runs while none of its inputs changed. Only rules
+        whose report reads the system through the recorded readers
+        (filecache, readFile, checkPerms, the sysctl service, the modprobe
+        policy and the package inventory) or through paths listed in
+        self.cacheinputs may set this. Default = False.
+        :returns: self.cacheable
+        :rtype: bool
+        '''
+
+        return self.cacheable
+
+    def getcacheinputs(self):
+        '''Return the list of paths the report reads without going through
+        a recorded reader, e.g. files in /proc opened directly. Their state
+        is part of the fingerprint of a cached result. Default = [].
+        :returns: self.cacheinputs
+        :rtype: list
+        '''
+
+        return self.cacheinputs
+
     def sethelptext(self):
         '''Set the help text for the current rule.
         Help text is retrieved from help/stonix_helptext.
@@ -780,27 +710,16 @@ LANL-stonix."""
 
         # change helpdir variable if you change where the help text is stored!
         helpdir = self.environ.resources_path + '/help/stonix_helptext'
-        contents = ''
-        bstring = ''
         rulenum = self.getrulenum()
 
         try:
 
-            if os.path.exists(helpdir):
-                f = open(helpdir, 'r')
-                contents = f.read()
-                f.close()
-            else:
+            if not os.path.exists(helpdir):
                 self.logdispatch.log(LogPriority.DEBUG, "Could not find help text file at: " + helpdir)
 
-            b = re.findall(r'(?<=\<' + str(rulenum) + '\>).+?(?=\.\")', contents, re.DOTALL)
-            if b:
-                if isinstance(b, list):
-                    if len(b) > 0:
-                        bstring = b[0]
-                bstring = bstring.strip()
-                if re.search('^\"', bstring, re.IGNORECASE):
-                    bstring = bstring[1:]
+            # the help text file is parsed once and shared by all rules
+            bstring = gethelptext(helpdir, rulenum,
+                                  getindexpath(self.environ))
             if not bstring:
                 self.logdispatch.log(LogPriority.DEBUG,
                                      "Failed to get help text for rulenumber = " + str(self.rulenumber))
@@ -810,3 +729,154 @@ LANL-stonix."""
 
         except Exception:
             raise
+
+
+def checkapplicable(applicable, environ, logdispatch, rulename):
+    '''Return True if a rule with the given applicable dictionary applies to
+    the platform described by environ. This is the implementation of
+    Rule.isapplicable, see that method for the format of the applicable
+    dictionary. It is a separate function so that applicability can be
+    checked from the rule manifest without instantiating the rule.
+
+    :param applicable: dict; the rule's applicable property
+    :param environ: environment object
+    :param logdispatch: logdispatcher object
+    :param rulename: string; name of the rule, used in debug messages
+    :returns: bool
+    '''
+    # return True
+    # Shortcut if we are defaulting to true
+    logdispatch.log(LogPriority.DEBUG,
+                    'Check applicability for ' + rulename)
+    logdispatch.log(LogPriority.DEBUG,
+                    'Dictionary is: ' + str(applicable))
+    try:
+        if 'os' not in applicable and 'family' not in applicable:
+            amidefault = applicable['default']
+            if amidefault == 'default':
+                logdispatch.log(LogPriority.DEBUG,
+                                'Defaulting to True')
+                return True
+    except KeyError:
+        pass
+
+    # Determine whether we are a blacklist or a whitelist, default to a
+    # blacklist
+    if 'type' in applicable:
+        listtype = applicable['type']
+    else:
+        listtype = 'black'
+    # Set the default return as appropriate to the list type
+    # FIXME check for valid input
+    assert listtype in ['white', 'black'], 'Invalid list type specified: %r' % listtype
+    if listtype == 'black':
+        applies = True
+    else:
+        applies = False
+
+    # get our data in local vars
+    myosfamily = environ.getosfamily()
+    myosversion = environ.getosver()
+    myostype = environ.getostype()
+
+    # Process the os family list
+    if 'family' in applicable:
+        if myosfamily in applicable['family']:
+            if listtype == 'black':
+                applies = False
+            else:
+                applies = True
+            logdispatch.log(LogPriority.DEBUG,
+                            'Family match, applies: ' + str(applies))
+
+    # Process the OS list
+    if 'os' in applicable:
+        for ostype, osverlist in list(applicable['os'].items()):
+
+            if re.search(ostype, myostype):
+                # Process version and up
+                if '+' in osverlist:
+                    assert len(osverlist) is 2, "Wrong number of entries for a +"
+                    if osverlist[1] == '+':
+                        baseversion = osverlist[0]
+                    else:
+                        baseversion = osverlist[1]
+                    if LooseVersion(myosversion) >= LooseVersion(baseversion):
+                        if listtype == 'black':
+                            applies = False
+                        else:
+                            applies = True
+                        logdispatch.log(LogPriority.DEBUG,
+                                        'Plus match, applies: ' + str(applies))
+                # Process version and lower
+                elif '-' in osverlist:
+                    assert len(osverlist) is 2, "Wrong number of entries for a -"
+                    if osverlist[1] == '-':
+                        baseversion = osverlist[0]
+                    else:
+                        baseversion = osverlist[1]
+                    if LooseVersion(myosversion) <= LooseVersion(baseversion):
+                        if listtype == 'black':
+                            applies = False
+                        else:
+                            applies = True
+                        logdispatch.log(LogPriority.DEBUG,
+                                        'Minus match, applies: ' + str(applies))
+                # Process inclusive range
+                elif 'r' in osverlist:
+                    assert len(osverlist) is 3, "Wrong number of entries for a range"
+                    vertmp = osverlist
+                    vertmp.remove('r')
+                    if LooseVersion(vertmp[0]) > LooseVersion(vertmp[1]):
+                        highver = vertmp[0]
+                        lowver = vertmp[1]
+                    elif LooseVersion(vertmp[0]) < LooseVersion(vertmp[1]):
+                        highver = vertmp[1]
+                        lowver = vertmp[0]
+                    else:
+                        raise ValueError('Range versions are the same')
+                    if LooseVersion(myosversion) <= LooseVersion(highver) \
+                            and LooseVersion(myosversion) >= LooseVersion(lowver):
+                        if listtype == 'black':
+                            applies = False
+                        else:
+                            applies = True
+                        logdispatch.log(LogPriority.DEBUG,
+                                        'Range match, applies: ' + str(applies))
+                # Process explicit match
+                else:
+                    if myosversion in osverlist:
+                        if listtype == 'black':
+                            applies = False
+                        else:
+                            applies = True
+                        logdispatch.log(LogPriority.DEBUG,
+                                        'Version match, applies: ' + str(applies))
+
+    # Perform the rootless check
+    if applies and environ.geteuid() == 0:
+        if 'noroot' in applicable:
+            if applicable['noroot'] == True:
+                applies = False
+
+    # Perform the FISMA categorization check
+    if applies:
+        rulefisma = ''
+        systemfismacat = ''
+        systemfismacat = environ.getsystemfismacat()
+        if systemfismacat not in ['high', 'med', 'low']:
+            raise ValueError('SystemFismaCat invalid: valid values are low, med, high')
+        if 'fisma' in applicable:
+            if applicable['fisma'] not in ['high', 'med', 'low']:
+                raise ValueError('fisma value invalid: valid values are low, med, high')
+            else:
+                rulefisma = applicable['fisma']
+        if systemfismacat == 'high' and rulefisma == 'high':
+            pass
+        elif systemfismacat == 'med' and rulefisma == 'high':
+            applies = False
+        elif systemfismacat == 'low' and \
+                (rulefisma == 'med' or rulefisma == "high"):
+            applies = False
+
+    return applies
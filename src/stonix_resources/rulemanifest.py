@@ -0,0 +1,245 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Catalog of the installed rules used by the controller to decide which rule
+modules to import. Importing and instantiating every rule is expensive (many
+rules create helper objects in their constructors) so the number, name,
+applicable dictionary, root requirement and module of each rule are recorded
+in rulemanifest.json. The manifest is runtime state and is kept with the
+other caches (/var/db/stonix for root, the log directory otherwise), not in
+the installed rules package. On later runs only the rules that are selected
+(e.g. with -m) and that can apply to the platform are imported. When the
+manifest can not be written the rules are scanned on every run.
+
+The manifest is regenerated whenever a rule file is added, removed or
+modified, the rules directory moves, localize.py changes or the platform
+(os family, type or version) changes. Rules which override isapplicable() are always imported since their applicability can
+only be decided by the rule itself.
+"""
+
+import copy
+import json
+import os
+import traceback
+
+from stonix_resources.logdispatcher import LogPriority
+from stonix_resources.rule import checkapplicable
+
+MANIFESTNAME = 'rulemanifest.json'
+
+
+def getmanifestpath(environ):
+    """return where the manifest is kept for the current user
+
+    :param environ: Environment instance
+    :return: path of the manifest file
+    :rtype: str
+    """
+
+    if environ.geteuid() == 0:
+        return os.path.join('/var/db/stonix', MANIFESTNAME)
+    return os.path.join(environ.get_log_path(), MANIFESTNAME)
+
+
+class RuleManifest(object):
+    """Catalog of installed rules
+
+    :param logger: LogDispatcher instance
+    :param environ: Environment instance
+    :param rulespath: directory holding the rule modules
+    :param path: path of the manifest file (Default value = None, see
+        getmanifestpath())
+
+    """
+
+    VERSION = 1
+
+    def __init__(self, logger, environ, rulespath, path=None):
+        self.logger = logger
+        self.environ = environ
+        self.rulespath = rulespath
+        if path is None:
+            path = getmanifestpath(environ)
+        self.path = path
+        self.entries = []
+        self.signature = None
+
+    def getsignature(self):
+        """return the data the manifest is validated against: the name, size
+        and mtime of every rule file and the platform identification
+
+        :return: signature
+        :rtype: dict
+        """
+
+        if self.signature is None:
+            files = []
+            for rfile in sorted(os.listdir(self.rulespath)):
+                if not rfile.endswith('.py') or rfile == '__init__.py':
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.rulespath, rfile))
+                except OSError:
+                    continue
+                files.append([rfile, st.st_size, st.st_mtime_ns])
+            # some rules pick their applicability based on localize.py
+            localize = os.path.join(os.path.dirname(self.rulespath),
+                                    'localize.py')
+            try:
+                st = os.stat(localize)
+                files.append(['localize.py', st.st_size, st.st_mtime_ns])
+            except OSError:
+                pass
+            self.signature = {'rulespath': os.path.abspath(self.rulespath),
+                              'files': files,
+                              'platform': [self.environ.getosfamily(),
+                                           self.environ.getostype(),
+                                           self.environ.getosver()]}
+        return self.signature
+
+    def load(self):
+        """Read the manifest. A missing or out of date manifest is ignored.
+
+        :return: True if a current manifest was read
+        :rtype: bool
+        """
+
+        self.entries = []
+        try:
+            with open(self.path, 'r') as fh:
+                data = json.load(fh)
+            if data['version'] != self.VERSION or \
+                    data['signature'] != self.getsignature():
+                self.logger.log(LogPriority.DEBUG,
+                                ['RuleManifest', 'Manifest out of date'])
+                return False
+            self.entries = data['rules']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            self.logger.log(LogPriority.DEBUG,
+                            ['RuleManifest', 'No usable manifest at ' +
+                             self.path])
+            return False
+        return True
+
+    def build(self, rules):
+        """Replace the manifest entries with entries describing the given
+        instantiated rules
+
+        :param rules: list of Rule instances
+        """
+
+        self.entries = []
+        for rule in rules:
+            ruleclass = type(rule)
+            # rules import the Rule class under more than one module name so
+            # find the class providing isapplicable by name
+            owner = 'Rule'
+            for klass in ruleclass.__mro__:
+                if 'isapplicable' in klass.__dict__:
+                    owner = klass.__name__
+                    break
+            self.entries.append(
+                {'module': ruleclass.__module__,
+                 'classname': ruleclass.__name__,
+                 'rulenum': rule.getrulenum(),
+                 'rulename': rule.getrulename(),
+                 'applicable': rule.applicable,
+                 'rootrequired': rule.getisrootrequired(),
+                 'customapplicable': owner != 'Rule'})
+
+    def save(self):
+        """Write the manifest. Failures are logged and otherwise ignored; the
+        rules are then scanned again by the next run.
+
+        :return: True if the manifest was written
+        :rtype: bool
+        """
+
+        data = {'version': self.VERSION,
+                'signature': self.getsignature(),
+                'rules': self.entries}
+        tmppath = self.path + '.' + str(os.getpid())
+        try:
+            directory = os.path.dirname(self.path)
+            if not os.path.isdir(directory):
+                os.makedirs(directory, 0o700)
+            with open(tmppath, 'w') as fh:
+                json.dump(data, fh, indent=1, sort_keys=True)
+            os.chmod(tmppath, 0o644)
+            os.rename(tmppath, self.path)
+        except (IOError, OSError, TypeError, ValueError):
+            self.logger.log(LogPriority.DEBUG,
+                            ['RuleManifest', 'Unable to write ' + self.path +
+                             ' ' + traceback.format_exc()])
+            try:
+                os.remove(tmppath)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def getentries(self):
+        """return the manifest entries
+
+        :return: list of dicts with the keys module, classname, rulenum,
+            rulename, applicable, rootrequired and customapplicable
+        :rtype: list
+        """
+
+        return self.entries
+
+    def mayapply(self, entry):
+        """return False if the manifest entry describes a rule that will not
+        be applicable on this platform. Rules that decide their own
+        applicability are always reported as possibly applicable.
+
+        :param entry: manifest entry
+        :return: bool
+        """
+
+        if entry['customapplicable']:
+            return True
+        if self.environ.geteuid() != 0 and entry['rootrequired']:
+            return False
+        try:
+            return checkapplicable(copy.deepcopy(entry['applicable']),
+                                   self.environ, self.logger,
+                                   entry['rulename'])
+        except Exception:
+            # let the rule instance decide
+            return True
+
+    def select(self, rulenames=None):
+        """return the entries for the named rules that may apply to this
+        platform
+
+        :param rulenames: list of rule names or None for all rules
+            (Default value = None)
+        :return: list of manifest entries
+        :rtype: list
+        """
+
+        selected = []
+        for entry in self.entries:
+            if rulenames is not None and entry['rulename'] not in rulenames:
+                continue
+            if self.mayapply(entry):
+                selected.append(entry)
+        return selected
@@ -28,6 +28,8 @@ This class audits for passwordless ssh keys on the system.
 @change: 2019/06/13 Breen Malmberg - updated documentation to reST format;
         added missing documentation
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - get user home directories from the shared account
+        database
 """
 
 
@@ -41,6 +43,7 @@ from logdispatcher import LogPriority
 from glob import glob
 from CommandHelper import CommandHelper
 from stonixutilityfunctions import getOctalPerms
+from accountdb import getaccountdb
 
 
 class AuditSSHKeys(Rule):
@@ -219,35 +222,19 @@ class AuditSSHKeys(Rule):
                                 searchdirs.append(sline[1] + "/.ssh/")
             else:
                 # the system is linux-based
-                # determine the start of the user id's on this system (500 or 1000)
-                self.logger.log(LogPriority.DEBUG, "Setting default uidstart to 500...")
-                uidstart = 500
-                if os.path.exists('/etc/login.defs'):
-                    self.logger.log(LogPriority.DEBUG, "login defs file exists. Getting actual uid start value...")
-                    f = open('/etc/login.defs')
-                    contentlines = f.readlines()
-                    f.close()
-                    for line in contentlines:
-                        if re.search('^UID\_MIN\s+500', line, re.IGNORECASE):
-                            uidstart = 500
-                            self.logger.log(LogPriority.DEBUG, "Actual uid start value is 500")
-                        if re.search('^UID\_MIN\s+1000', line, re.IGNORECASE):
-                            uidstart = 1000
-                            self.logger.log(LogPriority.DEBUG, "Actual uid start value is 1000")
+                # determine the start of the user id's on this system
+                accountdb = getaccountdb(self.logger)
+                uidstart = accountdb.getuidrange()[0]
+                self.logger.log(LogPriority.DEBUG, "Actual uid start value is " + str(uidstart))
 
                 self.logger.log(LogPriority.DEBUG, "Building list of searchdirs...")
                 # get list of user home directories from /etc/passwd
-                f = open("/etc/passwd", "r")
-                contentlines = f.readlines()
-                f.close()
-                for line in contentlines:
-                    sline = line.split(":")
-                    if len(sline) > 2:
-                        if int(sline[2]) >= uidstart:
-                            # build list of search directories based on home directories
-                            if os.path.exists(sline[5] + "/.ssh/"):
-                                searchdirs.append(sline[5] + "/.ssh/")
-                                self.logger.log(LogPriority.DEBUG, "Adding directory: " + str(sline[5]) + "/.ssh/ to list of searchdirs...")
+                for user in accountdb.getusers():
+                    if user.uid >= uidstart:
+                        # build list of search directories based on home directories
+                        if os.path.exists(user.home + "/.ssh/"):
+                            searchdirs.append(user.home + "/.ssh/")
+                            self.logger.log(LogPriority.DEBUG, "Adding directory: " + str(user.home) + "/.ssh/ to list of searchdirs...")
 
                 # add the root ssh directory if it exists
                 if os.path.exists("/root/.ssh/"):
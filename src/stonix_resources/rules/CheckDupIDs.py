@@ -35,6 +35,8 @@ on a system must have unique UIDs.
 @change: 2018/06/08 Ekkehard - make eligible for macOS Mojave 10.14
 @change: 2019/03/12 Ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - check the indexed entries of the shared account
+    database; replaced getcolumn, which only returned the last line's column
 """
 
 
@@ -46,6 +48,7 @@ import traceback
 from rule import Rule
 from logdispatcher import LogPriority
 from CommandHelper import CommandHelper
+from accountdb import getaccountdb
 
 
 class CheckDupIDs(Rule):
@@ -206,75 +209,42 @@ class CheckDupIDs(Rule):
 
         try:
             retval = True
-            filelist = ['/etc/passwd', '/etc/group']
-            for adb in filelist:
+            accountdb = getaccountdb(self.logger)
+            databases = [('/etc/passwd', [(user.name, user.uid) for user in
+                                          accountdb.getusers()]),
+                         ('/etc/group', [(group.name, group.gid) for group in
+                                         accountdb.getgroups()])]
+            for adb, entries in databases:
                 if os.path.exists(adb):
                     self.logger.log(LogPriority.DEBUG,
                                     ['CheckDuplicateIds.nixcheck',
                                      "Checking : " + adb])
-                    namelist = []
-                    idlist = []
-                    fdata = open(adb, 'r')
-                    for line in fdata:
-                        line = line.split(':')
-                        try:
-                            if len(line) > 2:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['CheckDuplicateIds.nixcheck',
-                                                 "Checking line: " + str(line)])
-                                name = line[0]
-                                uid = line[2]
-                                self.logger.log(LogPriority.DEBUG,
-                                                "Checking account: " + name + ' ' + uid)
-                                if name not in namelist:
-                                    namelist.append(name)
-                                else:
-                                    issue = "Duplicate Name: NAME('" + name + "'; UID('" + uid + "')"
-                                    self.issuelist.append(issue)
-                                    retval = False
-                                if uid not in idlist:
-                                    idlist.append(uid)
-                                else:
-                                    issue = "Duplicate UID: NAME('" + name + "'; UID('" + uid + "')"
-                                    self.issuelist.append(issue)
-                        except(IndexError):
-                            # Some systems have malformed lines in the
-                            # accounts db due to poor administration
-                            # practices. Go to the next record.
-                            continue
+                    namelist = set()
+                    idlist = set()
+                    for name, uid in entries:
+                        uid = str(uid)
+                        self.logger.log(LogPriority.DEBUG,
+                                        "Checking account: " + name + ' ' + uid)
+                        if name not in namelist:
+                            namelist.add(name)
+                        else:
+                            issue = "Duplicate Name: NAME('" + name + "'; UID('" + uid + "')"
+                            self.issuelist.append(issue)
+                            retval = False
+                        if uid not in idlist:
+                            idlist.add(uid)
+                        else:
+                            issue = "Duplicate UID: NAME('" + name + "'; UID('" + uid + "')"
+                            self.issuelist.append(issue)
                     self.logger.log(LogPriority.DEBUG,
-                                    "NAMELIST: " + str(namelist))
+                                    "NAMELIST: " + str(sorted(namelist)))
                     self.logger.log(LogPriority.DEBUG,
-                                    "IDLIST: " + str(idlist))
-                    fdata.close()
+                                    "IDLIST: " + str(sorted(idlist)))
             return retval
 
         except:
             raise
 
-    def getcolumn(self, file_to_read="", column=0, separator=":"):
-        """Get the data out of <file_to_read> column <column> using <separator>
-        
-        Intended for use with the /etc/group and /etc/password files for getting
-        and comparing group information.
-
-        :param file_to_read:  (Default value = "")
-        :param column:  (Default value = 0)
-        :param separator:  (Default value = ":")
-
-        :return: column_data - dictionary; columnized data set of specified file
-        """
-
-        if file_to_read and isinstance(column, int) and separator:
-            reading = open(file_to_read, "r")
-
-            for line in reading.readlines():
-                try:
-                    column_data = line.split(separator)[column]
-                except IndexError:
-                    continue
-            return column_data
-
     def checkgrouprefs(self):
         """Per RedHat STIG - CCE-RHEL7-CCE-TBD 2.4.1.2.3, check group references.
         
@@ -289,12 +259,11 @@ class CheckDupIDs(Rule):
 
         """
 
-        group_groups = self.getcolumn("/etc/group", 2)
-        pwd_groups = self.getcolumn("/etc/passwd", 3)
+        accountdb = getaccountdb(self.logger)
 
-        for group in pwd_groups:
-            if not group in group_groups:
-                message = "Group: " + str(group) + " is not in the passwd file."
+        for group in sorted(set(user.gid for user in accountdb.getusers())):
+            if not accountdb.getgroupsbygid(group):
+                message = "Group: " + str(group) + " is not in the group file."
                 self.logger.log(LogPriority.INFO, message)
                 self.issuelist.append(message)
 
@@ -39,6 +39,8 @@ checked in fix method.
 @change: 2018/06/08 ekkehard - make eligible for macOS Mojave 10.14
 @change: 2019/03/12 ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - look up the current user's passwd entry in the shared
+        account database
 '''
 
 
@@ -50,6 +52,7 @@ from rule import Rule
 from logdispatcher import LogPriority
 from stonixutilityfunctions import isWritable
 from CommandHelper import CommandHelper
+from accountdb import getaccountdb
 
 
 class ConfigureDotFiles(Rule):
@@ -152,26 +155,18 @@ being made non-world-writable, set the value of ConfigureDotFiles to False.'''
 
         try:
 
-            f = open('/etc/passwd', 'r')
-            contentlines = f.readlines()
-            f.close()
+            accountdb = getaccountdb(self.logger)
+            for user in accountdb.getusersbyhome(self.environ.geteuidhome()):
 
-            for line in contentlines:
+                if user.home and user.uid >= 500 and \
+                   not re.search('nfsnobody', user.name):
 
-                line = line.split(':')
-
-                if len(line) >= 6 and line[5] and \
-                   self.environ.geteuidhome() == str(line[5]):
-
-                    line[2] = int(line[2])
-                    if line[2] >= 500 and not re.search('nfsnobody', line[0]):
-
-                        if os.path.exists(line[5]):
-                            filelist = os.listdir(line[5])
-                            for i in range(len(filelist)):
-                                if re.search('^\.', filelist[i]):
-                                    dotfilelist.append(line[5] + '/' +
-                                                       filelist[i])
+                    if os.path.exists(user.home):
+                        filelist = os.listdir(user.home)
+                        for i in range(len(filelist)):
+                            if re.search('^\.', filelist[i]):
+                                dotfilelist.append(user.home + '/' +
+                                                   filelist[i])
 
         except Exception:
             raise
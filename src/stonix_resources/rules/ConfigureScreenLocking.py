@@ -56,6 +56,8 @@ Created on Jul 11, 2013
     beginning of fix() to the beginning of the fix linux path
 @change: 2019/03/12 ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - get user home directories from the shared account
+    database
 """
 
 from stonixutilityfunctions import createFile
@@ -69,6 +71,7 @@ import os
 import traceback
 import re
 from pwd import getpwnam
+from accountdb import getaccountdb
 
 
 class ConfigureScreenLocking(RuleKVEditor):
@@ -554,17 +557,9 @@ class ConfigureScreenLocking(RuleKVEditor):
                                              "LockGrace": "60000",
                                              "Timeout": "840"}}
         if self.environ.geteuid() == 0:
-            contents = readFile("/etc/passwd", self.logger)
-            for line in contents:
-                temp = line.split(":")
-                try:
-                    username = temp[0]
-                    homepath = temp[5]
-                except IndexError:
-                    self.logdispatch.log(LogPriority.DEBUG,
-                                         ['ConfigureScreenLocking',
-                                           'IndexError processing ' + str(temp)])
-                    continue
+            for user in getaccountdb(self.logger).getusers():
+                username = user.name
+                homepath = user.home
                 kdeparent1 = os.path.join(homepath, ".kde")
                 kdeparent2 = os.path.join(homepath, ".kde4")
                 kdefile = os.path.join(homepath, self.rcpath)
@@ -697,18 +692,10 @@ class ConfigureScreenLocking(RuleKVEditor):
             homepath = self.environ.geteuidhome()
             kdefile = os.path.join(homepath, self.rcpath)
             uidnum = int(self.environ.geteuid())
-            passwddata = readFile("/etc/passwd", self.logger)
             found = False
-            for user in passwddata:
-                user = user.split(':')
-                try:
-                    puidnum = int(user[2])
-
-                    if puidnum == uidnum:
-                        username = user[0]
-                        found = True
-                except IndexError:
-                    continue
+            for user in getaccountdb(self.logger).getusersbyuid(uidnum):
+                username = user.name
+                found = True
 
             if not found:
                 self.detailedresults += "Could not obtain your user id.\n" + \
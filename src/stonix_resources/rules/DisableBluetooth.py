@@ -33,6 +33,9 @@ Check to see if all of the above operations have been done or not - report()
 @change: 2015/10/07 eball Help text cleanup
 @change 2017/08/28 rsn Fixing to use new help text methods
 @change: 2017/10/23 rsn - change to new service helper interface
+@change: 2026/10/16 - drivers blacklisted in any modprobe configuration file
+    are found through the shared modprobe policy; only the missing ones are
+    added to blacklist.conf
 '''
 
 
@@ -43,6 +46,7 @@ from logdispatcher import LogPriority
 from ServiceHelper import ServiceHelper
 from KVEditorStonix import KVEditorStonix
 from stonixutilityfunctions import iterate, setPerms, checkPerms, resetsecon
+from modprobepolicy import getmodprobepolicy
 
 
 class DisableBluetooth(Rule):
@@ -87,6 +91,8 @@ class DisableBluetooth(Rule):
                                          "bfusb"]}
         self.iditerator = 0
         self.created = False
+        self.modprobe = getmodprobepolicy(self.logger)
+        self.sharedresources = ['modprobe']
         self.sethelptext()
 
     def report(self):
@@ -122,11 +128,19 @@ class DisableBluetooth(Rule):
                 if enabled:
                     self.detailedresults += service + " is enabled\n"
                     compliant = False
-            # check whether bluetooth drivers are blacklisted
+            # check whether bluetooth drivers are blacklisted, in any of
+            # the modprobe configuration files
+            missing = []
+            for driver in self.driverdict["blacklist"]:
+                if not self.modprobe.isblacklisted(driver) and \
+                        driver not in missing:
+                    missing.append(driver)
+            blacklist = {"blacklist": missing}
+            self.kve = None
             if os.path.exists(kvpath):
                 self.kve = KVEditorStonix(self.statechglogger, self.logger,
                                           kvtype, kvpath, kvtmppath,
-                                          self.driverdict, kvintent,
+                                          blacklist, kvintent,
                                           kvconftype)
                 if not checkPerms(kvpath, [0, 0, 420], self.logger):
                     self.detailedresults += "Permissions are incorrect on " + \
@@ -138,7 +152,7 @@ class DisableBluetooth(Rule):
                 if self.kve.fixables:
                     self.detailedresults += "\nThe following configuration options are missing or incorrect in " + str(kvpath) + ":\n" + "\n".join(self.kve.fixables)
                     compliant = False
-            else:
+            elif missing:
                 if os.path.exists('/etc/modprobe.d'):
                     compliant = False
                     os.system('touch /etc/modprobe.d/blacklist.conf')
@@ -149,9 +163,9 @@ class DisableBluetooth(Rule):
 Bluetooth\n"
                     self.kve = KVEditorStonix(self.statechglogger, self.logger,
                                               kvtype, kvpath, kvtmppath,
-                                              self.driverdict, kvintent,
+                                              blacklist, kvintent,
                                               kvconftype)
-                    self.kve.fixables = self.driverdict
+                    self.kve.fixables = blacklist
             self.compliant = compliant
         except (KeyboardInterrupt, SystemExit):
             # User initiated exit
@@ -207,33 +221,34 @@ Bluetooth\n"
                         success = False
                         debug += "Unable to disable " + service + "\n"
 
-            if self.created:
-                self.iditerator += 1
-                myid = iterate(self.iditerator, self.rulenumber)
-                event = {"eventtype": "creation",
-                         "filepath": self.kve.getPath()}
-                self.statechglogger.recordchgevent(myid, event)
-            # blacklist bluetooth drivers
-            if os.path.exists(self.kve.getPath()):
-                if not checkPerms(self.kve.getPath(), [0, 0, 420],
-                                  self.logger):
+            if self.kve:
+                if self.created:
                     self.iditerator += 1
                     myid = iterate(self.iditerator, self.rulenumber)
-                    if not setPerms(self.kve.getPath(), [0, 0, 420],
-                                    self.logger, self.statechglogger, myid):
+                    event = {"eventtype": "creation",
+                             "filepath": self.kve.getPath()}
+                    self.statechglogger.recordchgevent(myid, event)
+                # blacklist bluetooth drivers
+                if os.path.exists(self.kve.getPath()):
+                    if not checkPerms(self.kve.getPath(), [0, 0, 420],
+                                      self.logger):
+                        self.iditerator += 1
+                        myid = iterate(self.iditerator, self.rulenumber)
+                        if not setPerms(self.kve.getPath(), [0, 0, 420],
+                                        self.logger, self.statechglogger, myid):
+                            success = False
+                if self.kve.fixables:
+                    self.iditerator += 1
+                    if not self.created:
+                        myid = iterate(self.iditerator, self.rulenumber)
+                        self.kve.setEventID(myid)
+                    if not self.kve.fix():
                         success = False
-            if self.kve.fixables:
-                self.iditerator += 1
-                if not self.created:
-                    myid = iterate(self.iditerator, self.rulenumber)
-                    self.kve.setEventID(myid)
-                if not self.kve.fix():
-                    success = False
-                elif not self.kve.commit():
-                    success = False
-                os.chown(self.kve.getPath(), 0, 0)
-                os.chmod(self.kve.getPath(), 420)
-                resetsecon(self.kve.getPath())
+                    elif not self.kve.commit():
+                        success = False
+                    os.chown(self.kve.getPath(), 0, 0)
+                    os.chmod(self.kve.getPath(), 420)
+                    resetsecon(self.kve.getPath())
             if debug:
                 self.logger.log(LogPriority.DEBUG, debug)
             self.rulesuccess = success
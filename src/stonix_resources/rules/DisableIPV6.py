@@ -41,6 +41,8 @@ Created on Apr 9, 2013
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
 @change: 2019/08/07 Brandon R. Gonzales - Improve logging in linux report;
         Remove/cleanup unused lines of code
+@change: 2026/10/16 - runtime values are read and set through the shared
+    sysctl service instead of one sysctl command per key
 '''
 
 from stonixutilityfunctions import iterate, setPerms, checkPerms, writeFile
@@ -51,6 +53,7 @@ from KVEditorStonix import KVEditorStonix
 from pkghelper import Pkghelper
 from CommandHelper import CommandHelper
 from ServiceHelper import ServiceHelper
+from sysctlservice import getsysctlservice
 
 import traceback
 import os
@@ -87,6 +90,8 @@ class DisableIPV6(Rule):
         # self.editor3: sshd file editor
         self.editor1, self.editor2, self.editor3 = "", "", ""
         self.sh = ServiceHelper(self.environ, self.logger)
+        self.sysctl = getsysctlservice(self.logger)
+        self.sharedresources = ['sysctl']
         self.sethelptext()
 
     def report(self):
@@ -411,28 +416,14 @@ and/or wasn't able to be created\n"
 
         # in addition to checking /etc/sysctl.conf contents we need to
         # also check sysctl compliancy using the sysctl command
-        for key in self.sysctls:
-            self.ch.executeCommand("/sbin/sysctl " + key)
-            retcode = self.ch.getReturnCode()
-            output = self.ch.getOutputString()
-            errmsg = output + self.ch.getErrorString()
-            if retcode != 0:
-                if re.search("unknown key", errmsg):
-                    continue
-                else:
-                    self.detailedresults += "Failed to get value " + key + " using sysctl command\n"
-                    errmsg = self.ch.getErrorString()
-                    self.logger.log(LogPriority.DEBUG, errmsg)
-                    compliant = False
-            else:
-                actualoutput = output.strip()
-                expectedoutput = key + " = " + self.sysctls[key]
-                if actualoutput != expectedoutput:
-                    compliant = False
-                    self.detailedresults += "\nsysctl output has " + \
-                                            "incorrect value: expected " + \
-                                            expectedoutput + ", found " + \
-                                            actualoutput + "\n"
+        # keys unknown to this kernel are skipped
+        wrong, _ = self.sysctl.checkvalues(self.sysctls)
+        for key in wrong:
+            compliant = False
+            self.detailedresults += "\nsysctl has incorrect value: " + \
+                "expected " + key + " = " + self.sysctls[key] + ", found " + \
+                key + " = " + wrong[key] + " (" + \
+                self.sysctl.describe(key) + ")\n"
         # check files inside modprobe.d directory for correct contents
         if os.path.exists("/etc/modprobe.d/"):
             modprobefiles = glob.glob("/etc/modprobe.d/*")
@@ -674,42 +665,24 @@ contain the correct contents\n"
                             success = False
                     resetsecon(sysctl)
 
-        # here we also check the output of the sysctl command for each key
-        # to cover all bases
-        for key in self.sysctls:
-            if self.ch.executeCommand("/sbin/sysctl " + key):
-                output = self.ch.getOutputString().strip()
-                errmsg = output + self.ch.getErrorString()
-                if re.search("unknown key", errmsg):
-                    continue
-                if not re.search(self.sysctls[key] + "$", output):
-                    undovalue = output[-1]
-                    self.ch.executeCommand("/sbin/sysctl -q -e -w " + key + "=" + self.sysctls[key])
-                    retcode = self.ch.getReturnCode()
-                    if retcode != 0:
-                        success = False
-                        self.detailedresults += "Failed to set " + key + " = " + self.sysctls[key] + "\n"
-                        errmsg = self.ch.getErrorString()
-                        self.logger.log(LogPriority.DEBUG, errmsg)
-                    else:
-                        self.iditerator += 1
-                        myid = iterate(self.iditerator, self.rulenumber)
-                        command = "/sbin/sysctl -q -e -w " + key + "=" + undovalue
-                        event = {"eventtype": "commandstring",
-                                 "command": command}
-                        self.statechglogger.recordchgevent(myid, event)
-            else:
-                self.detailedresults += "Unable to get value for " + key + "\n"
-                success = False
-        # at the end do a print and ignore any key errors to ensure
+        # set the running values as well, keys unknown to this kernel
+        # are skipped, then load the configuration file
+        changed, failed = self.sysctl.setvalues(self.sysctls)
+        for key in failed:
+            success = False
+            self.detailedresults += "Failed to set " + key + " = " + self.sysctls[key] + "\n"
+        for key in changed:
+            self.iditerator += 1
+            myid = iterate(self.iditerator, self.rulenumber)
+            command = "/sbin/sysctl -q -e -w " + key + "=" + changed[key]
+            event = {"eventtype": "commandstring",
+                     "command": command}
+            self.statechglogger.recordchgevent(myid, event)
+        # at the end reload the file, ignoring any key errors, to ensure
         # the new values are read into the kernel
-        self.ch.executeCommand("/sbin/sysctl -q -e -p")
-        retcode2 = self.ch.getReturnCode()
-        if retcode2 != 0:
+        if not self.sysctl.reload():
             success = False
             self.detailedresults += "Failed to load new sysctl configuration from config file\n"
-            errmsg2 = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg2)
 
         # We never found the correct contents in any of the modprobe.d files
         # so we're going to created the stonix-blacklist file
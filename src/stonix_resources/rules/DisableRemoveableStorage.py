@@ -46,6 +46,9 @@ OS X Mavericks not Mountain Lion, Lion, etc.
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
 @chagne: 2019/12/18 Brandon R. Gonzales - update grub file fix to account for
     Fedora 31's new kernel option format
+@change: 2026/10/16 - loaded modules and modprobe directives are looked up
+    in the shared modprobe policy instead of running lsmod and reading
+    every modprobe.d file per directive
 '''
 
 
@@ -53,7 +56,6 @@ OS X Mavericks not Mountain Lion, Lion, etc.
 import os
 import re
 import traceback
-import glob
 import sys
 
 from CommandHelper import CommandHelper
@@ -62,6 +64,7 @@ from stonixutilityfunctions import readFile, setPerms, createFile
 from stonixutilityfunctions import checkPerms, iterate, writeFile, resetsecon
 from logdispatcher import LogPriority
 from pkghelper import Pkghelper
+from modprobepolicy import getmodprobepolicy, adddirectives
 from ..KVEditorStonix import KVEditorStonix
 
 
@@ -113,6 +116,8 @@ class DisableRemoveableStorage(Rule):
         self.grubperms = ""
         self.ph = Pkghelper(self.logger, self.environ)
         self.ch = CommandHelper(self.logger)
+        self.modprobe = getmodprobepolicy(self.logger)
+        self.sharedresources = ['modprobe']
 
     def report(self):
         '''report the current rule-compliance status of this system. update
@@ -168,28 +173,13 @@ class DisableRemoveableStorage(Rule):
 
         '''
         compliant = True
-        lsmodcmd = ""
-
-        # determine location of lsmod binary
-        if os.path.exists("/sbin/lsmod"):
-            lsmodcmd = "/sbin/lsmod"
-        elif os.path.exists("/usr/bin/lsmod"):
-            lsmodcmd = "/usr/bin/lsmod"
-
-        usbmods = ["usb_storage",
-                   "usb-storage"]
-        # run lsmod command and look for any of the items from
-        # usbmods list in the output.  If item exists in output
-        # then that usb module is not disabled.  This is for
-        # reporting only.  There is no fix using lsmod command.
-        if lsmodcmd:
-            for usb in usbmods:
-                cmd = [lsmodcmd, "|", "grep", usb]
-                self.ch.executeCommand(cmd)
-                if self.ch.getReturnCode() == "0":
-                    compliant = False
-                    self.detailedresults += "lsmod command shows usb not disabled\n"
-                    break
+
+        # if the usb storage module is loaded then usb storage is not
+        # disabled.  This is for reporting only.  There is no fix for
+        # a loaded module.
+        if self.modprobe.isloaded("usb_storage"):
+            compliant = False
+            self.detailedresults += "usb_storage module is loaded, usb not disabled\n"
 
         # check compliance of grub file(s) if files exist
         if re.search("Red Hat", self.environ.getostype()) and \
@@ -242,66 +232,27 @@ class DisableRemoveableStorage(Rule):
         # check modprobe files inside modprobe.d directory for
         # contents inside self.blacklist variable
         removeables = []
-        found1 = True
         # self.blacklist dictionary contains the directives
-        # and the value we're looking for (key) and contains
-        # a default value of False for each one.  Upon finding
-        # each directive and value pair e.g. blacklist usb_storage
-        # the dictionary is updated with a True value.  This keeps
-        # track of the directives we didnt find or that had
-        # incorrect values
+        # we're looking for (key) and a default value of False
+        # for each one.  The dictionary is updated with a True
+        # value for each directive that is in effect in any of
+        # the modprobe configuration files, including
+        # /etc/modprobe.conf.  This keeps track of the
+        # directives we didnt find
         self.blacklist = {"blacklist usb_storage": False,
                           "install usbcore /bin/true": False,
                           "install usb-storage /bin/true": False,
                           "blacklist uas": False,
                           "blacklist firewire-ohci": False,
                           "blacklist firewire-sbp2": False}
-        #check if /etc/modprobe.d directory exists
-        if os.path.exists("/etc/modprobe.d"):
-            #extract all files inside modprobe.d
-            dirs = glob.glob("/etc/modprobe.d/*")
-            # since file name doesn't matter
-            # i.e. all files are read and treated the same in
-            # modprobe.d, if directives are found in any of
-            # the files inside this directory, where they don't
-            # have to be in the same file, the system is compliant
-            for directory in dirs:
-                if os.path.isdir(directory):
-                    continue
-                contents = readFile(directory, self.logger)
-                for item in self.blacklist:
-                    for line in contents:
-                        if re.search("^" + item, line.strip()):
-                            self.blacklist[item] = True
-            # if we don't find all directives in any of the files in
-            # modprobe.d, we will now check /etc/modprobe.conf as
-            # they are all equivalent. We will still keep track of
-            # whether we already found one directive in one of the
-            # files in modprobe.d
-            for item in self.blacklist:
-                if not self.blacklist[item]:
-                    found1 = False
-        else:
-            found1 = False
-
-        # either not all directives inside self.blacklist were found
-        # or /etc/modprobe.d didn't exist.  Now we check /etc/modprobe.conf
-        # for any remaining unfound directives.
-        if not found1:
-            if os.path.exists("/etc/modprobe.conf"):
-                contents = readFile("/etc/modprobe.conf")
-                if contents:
-                    for item in self.blacklist:
-                        for line in contents:
-                            if re.search("^" + item,
-                                         line.strip()):
-                                self.blacklist[item] = True
-            for item in self.blacklist:
-                if not self.blacklist[item]:
-                    debug = "modprobe.conf nor blacklist " + \
-                            "files contain " + item + "\n"
-                    self.logger.log(LogPriority.DEBUG, debug)
-                    compliant = False
+        for item in self.blacklist:
+            if self.modprobe.hasdirective(item):
+                self.blacklist[item] = True
+            else:
+                debug = "modprobe.conf nor blacklist " + \
+                        "files contain " + item + "\n"
+                self.logger.log(LogPriority.DEBUG, debug)
+                compliant = False
         # any directives that were found we remove from self.blacklist
         # We must add to a variable called removeables first then
         # iterate through removeables and remove each item self.blacklist
@@ -535,7 +486,6 @@ class DisableRemoveableStorage(Rule):
                                     "Unable to fully fix system for this rule\n"
             success = False
         blacklistf = "/etc/modprobe.d/stonix-blacklist.conf"
-        tempstring = ""
         # Check if self.blacklist still contains values, if it
         # does, then we didn't find all the blacklist values
         # in report
@@ -553,29 +503,14 @@ class DisableRemoveableStorage(Rule):
                 event = {"eventtype": "creation",
                          "filepath": blacklistf}
                 self.statechglogger.recordchgevent(myid, event)
-            # file was already present and we need contents already
-            # inside file to remain in newly written file
-            if not created1:
-                contents = readFile(blacklistf, self.logger)
-                for item in contents:
-                    tempstring += item
-            for item in self.blacklist:
-                tempstring += item + "\n"
-            tmpfile = blacklistf + ".tmp"
-            if writeFile(tmpfile, tempstring,
-                         self.logger):
-                self.iditerator += 1
-                myid = iterate(self.iditerator,
-                               self.rulenumber)
-                event = {"eventtype": "conf",
-                         "filepath": blacklistf}
-                self.statechglogger.recordchgevent(myid, event)
-                self.statechglogger.recordfilechange(blacklistf,
-                                                     tmpfile, myid)
-                os.rename(tmpfile, blacklistf)
-                os.chown(blacklistf, 0, 0)
-                os.chmod(blacklistf, 420)
-                resetsecon(blacklistf)
+            # add the remaining items to the file, keeping the
+            # contents already inside it
+            self.iditerator += 1
+            myid = iterate(self.iditerator, self.rulenumber)
+            if not adddirectives(blacklistf, list(self.blacklist),
+                                 self.logger, self.statechglogger, myid):
+                success = False
+                self.detailedresults += "Unable to write " + blacklistf + "\n"
             if not checkPerms(blacklistf, [0, 0, 420],
                               self.logger):
                 self.iditerator += 1
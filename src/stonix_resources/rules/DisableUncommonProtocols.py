@@ -21,15 +21,19 @@ This rule disables support for several uncommon network protocols.
 @author: Eric Ball
 @change: 2015/09/10 eball - Original implementation
 @change 2017/08/28 rsn Fixing to use new help text methods
+@change: 2026/10/16 - install commands are looked up in the shared modprobe
+    policy instead of running grep per protocol; missing directives are
+    added with one write
+@change: 2026/10/16 - compliant reports may be reused by the result cache
 '''
 
 import os
-import re
 import traceback
 from CommandHelper import CommandHelper
 from stonixutilityfunctions import iterate, createFile
 from rule import Rule
 from logdispatcher import LogPriority
+from modprobepolicy import getmodprobepolicy, adddirectives
 
 
 class DisableUncommonProtocols(Rule):
@@ -63,6 +67,9 @@ class DisableUncommonProtocols(Rule):
                          "CCE-27106-4"]
         self.iditerator = 0
         self.ch = CommandHelper(self.logger)
+        self.modprobe = getmodprobepolicy(self.logger)
+        self.sharedresources = ['modprobe']
+        self.cacheable = True
         self.sethelptext()
 
     def report(self):
@@ -70,15 +77,12 @@ class DisableUncommonProtocols(Rule):
             protocols = self.ci2.getcurrvalue()
             self.compliant = True
             self.detailedresults = ""
-            mpdir = "/etc/modprobe.d/"
 
             for proto in protocols:
                 if type(proto) is bytes:
                     proto = proto.decode('utf-8')
-                cmd = ["grep", "-R", proto, mpdir]
-                self.ch.executeCommand(cmd)
-                if not re.search(":install " + proto + " /bin/true",
-                                 self.ch.getOutputString()):
+                command, _ = self.modprobe.getinstall(proto)
+                if command != "/bin/true":
                     self.compliant = False
                     self.detailedresults += proto + " is not disabled\n"
         except (KeyboardInterrupt, SystemExit):
@@ -115,13 +119,21 @@ class DisableUncommonProtocols(Rule):
                 event = {"eventtype": "creation", "filepath": protoconf}
                 self.statechglogger.recordchgevent(myid, event)
 
+            directives = []
             for proto in protocols:
-                cmd = ["grep", "-R", proto, mpdir]
-                self.ch.executeCommand(cmd)
-                if not re.search(":install " + proto + " /bin/true",
-                                 self.ch.getOutputString()):
-                    open(protoconf, "a").write("install " + proto +
-                                               " /bin/true\n")
+                if type(proto) is bytes:
+                    proto = proto.decode('utf-8')
+                command, _ = self.modprobe.getinstall(proto)
+                if command != "/bin/true":
+                    directives.append("install " + proto + " /bin/true")
+            if directives:
+                self.iditerator += 1
+                myid = iterate(self.iditerator, self.rulenumber)
+                if not adddirectives(protoconf, directives, self.logger,
+                                     self.statechglogger, myid):
+                    success = False
+                    self.detailedresults += "Unable to write " + \
+                        protoconf + "\n"
 
             self.rulesuccess = success
         except (KeyboardInterrupt, SystemExit):
@@ -27,16 +27,19 @@ file system support from the kernel.
 @change: 2016/05/26 ekkehard Results Formatting
 @change: 2016/10/20 eball Results Formatting
 @change: 2017/08/28 rsn Fixing to use new help text methods
+@change: 2026/10/16 - install commands are looked up in the shared modprobe
+    policy instead of matching each file line per file system type
+@change: 2026/10/16 - compliant reports may be reused by the result cache
 '''
 
 import os
-import re
 import traceback
 import stat
 
 from rule import Rule
 from logdispatcher import LogPriority
 from stonixutilityfunctions import resetsecon
+from modprobepolicy import getmodprobepolicy
 
 
 class DisableUnusedFs(Rule):
@@ -61,6 +64,11 @@ class DisableUnusedFs(Rule):
         self.mandatory = True
         self.rootrequired = True
         self.blacklistfile = '/etc/modprobe.d/usgcb-blacklist.conf'
+        self.modprobe = getmodprobepolicy(self.logger)
+        self.sharedresources = ['modprobe']
+        self.cacheable = True
+        # report only checks that the blacklist file exists
+        self.cacheinputs = [self.blacklistfile]
 
         datatype = 'bool'
         key = 'DISABLEFS'
@@ -98,20 +106,14 @@ be space separated.'''
                                 ['DisableUnusedFs.report',
                                  "blacklist not found"])
             else:
-                fhandle = open(self.blacklistfile, 'r')
-                fdata = fhandle.readlines()
-                fhandle.close()
                 for fstype in self.fslist.getcurrvalue():
-                    found = False
-                    for line in fdata:
-                        pattern = '^install ' + fstype + ' /bin/true'
-                        if re.search(pattern, line):
-                            found = True
-                    if not found:
+                    command, _ = self.modprobe.getinstall(fstype)
+                    if command != '/bin/true':
                         compliant = False
                         self.logger.log(LogPriority.DEBUG,
                                         ['DisableUnusedFs.report',
-                                         "Directive not found " + pattern])
+                                         "Directive not found install " +
+                                         str(fstype) + " /bin/true"])
 
         except (KeyboardInterrupt, SystemExit):
             # User initiated exit
@@ -24,17 +24,20 @@ ExecShield overflow prevention and the randomize_va_space ASLR mechanism.
 @change: 2015/10/07 eball Help text/PEP8 cleanup
 @change: 2016/04/26 ekkehard Results Formatting
 @change 2017/08/28 rsn Fixing to use new help text methods
+@change: 2026/10/16 - the running values are set through the shared sysctl
+    service instead of one sysctl command per key
+@change: 2026/10/16 - compliant reports may be reused by the result cache
 '''
 
 import os
 import re
 import traceback
-import subprocess
 
 from rule import Rule
 from stonixutilityfunctions import resetsecon
 from logdispatcher import LogPriority
 from KVEditorStonix import KVEditorStonix
+from sysctlservice import getsysctlservice
 
 
 class ExecShield(Rule):
@@ -76,6 +79,13 @@ class ExecShield(Rule):
             self.directives = {'kernel.randomize_va_space': '2'}
         self.execshieldcompliant = False
         self.ExecCI = self.__initializeExecShield()
+        self.sysctl = getsysctlservice(self.logdispatch)
+        self.sharedresources = ['sysctl']
+        self.cacheable = True
+        # report opens these directly
+        self.cacheinputs = ['/proc/sys/kernel/randomize_va_space']
+        if self.execshieldapplies:
+            self.cacheinputs.append(self.shieldprocpath)
         self.sethelptext()
 
     def __initializeExecShield(self):
@@ -215,12 +225,8 @@ class ExecShield(Rule):
                 self.editor = KVEditorStonix(self.statechglogger, self.logdispatch,
                                              kvtype, self.sysctlconf, self.tmpPath,
                                              self.directives, intent, "openeq")
-                if self.execshieldapplies:
-                    cmdshield = '/sbin/sysctl -w kernel.exec-shield=1'
-                    subprocess.call(cmdshield, shell=True)
-                cmdvarand = '/sbin/sysctl -w kernel.randomize_va_space=2'
-                subprocess.call(cmdvarand, shell=True)
-    
+                self.sysctl.setvalues(self.directives)
+
                 if not self.editor.report():
                     if self.editor.fixables:
                         myid = '0063001'
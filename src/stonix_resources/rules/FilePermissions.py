@@ -40,6 +40,11 @@ rule class
 @change: 2018/06/08 ekkehard - make eligible for macOS Mojave 10.14
 @change: 2019/03/12 ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - multifind keeps a per file system index so that only
+    changed directories are read in full on later runs
+@change: 2026/10/16 - multifind and gwreport use the shared scandir based
+    FSWalker
+@change: 2026/10/16 - multifind scans up to SCANJOBS file systems in parallel
 '''
 
 import os
@@ -49,13 +54,13 @@ import random
 import shutil
 import stat
 import re
-import pwd
-import grp
 
 from rule import Rule
 from logdispatcher import LogPriority
 from localize import SITELOCALWWWDIRS
 from stonixutilityfunctions import getlocalfs
+from fswalker import FSWalker, WorldWritable, SetID, Unowned, \
+    GroupWritable, NonRootOwned, scanfilesystems
 
 
 class FilePermissions(Rule):
@@ -83,6 +88,7 @@ class FilePermissions(Rule):
         self.compliant = False
         self.rulenumber = 25
         self.rulename = 'FilePermissions'
+        self.sharedresources = ['files', 'pkgdb']
         self.mandatory = True
         self.formatDetailedResults("initialize")
         self.guidance = ['NSA 2.2.3.3', 'CCE-3795-2', 'CCE-4351-3',
@@ -115,6 +121,7 @@ class FilePermissions(Rule):
         self.noorigin = os.path.join(self.noownerdir,
                                      'no-owners-at-install.db')
         self.nolast = os.path.join(self.noownerdir, 'no-owners-previous.db')
+        self.indexdir = os.path.join(self.infodir, 'fsindex')
 
         datatype = 'bool'
         key = 'SETSTICKY'
@@ -163,6 +170,26 @@ value of FIXROOTOWNERSHIP to False. The affected directories are: /bin, \
         default = True
         self.fixroot = self.initCi(datatype, key, instructions, default)
 
+        datatype = 'int'
+        key = 'FULLSCANDAYS'
+        instructions = '''After the first scan this rule only re-reads \
+directories that have changed since the previous scan. Changing the \
+permissions or owner of an existing file does not mark its directory as \
+changed so a full scan of every file is still done when the last full scan is \
+older than FULLSCANDAYS days. Set FULLSCANDAYS to 0 to scan every file on \
+every run.'''
+        default = 1
+        self.fullscandays = self.initCi(datatype, key, instructions, default)
+
+        datatype = 'int'
+        key = 'SCANJOBS'
+        instructions = '''The maximum number of file systems this rule will \
+scan at the same time. Each file system is scanned by its own process. Raise \
+this on systems with many local disks, lower it to 1 to scan one file system \
+at a time and limit the I/O load placed on busy systems.'''
+        default = 2
+        self.scanjobs = self.initCi(datatype, key, instructions, default)
+
         self.hasrunalready = False
         self.wwresults = ''
         self.gwresults = ''
@@ -172,6 +199,7 @@ value of FIXROOTOWNERSHIP to False. The affected directories are: /bin, \
         self.findoverrun = False
         self.gwfiles = []
         self.nrofiles = []
+        self.newfiles = {'ww': [], 'suid': [], 'unowned': []}
         random.seed()
         self.sethelptext()
 
@@ -253,132 +281,54 @@ value of FIXROOTOWNERSHIP to False. The affected directories are: /bin, \
                 if os.path.exists(dbsets[dbset]['db']):
                     os.rename(dbsets[dbset]['db'], dbsets[dbset]['last'])
 
-            fslist = self.getfilesystems()
-            for filesystem in fslist:
+            filesystems = []
+            for filesystem in self.getfilesystems():
                 if filesystem in self.bypassfs.getcurrvalue():
                     self.logger.log(LogPriority.DEBUG,
                                     ['FilePermissions.multifind',
                                      'Skipping Filesystem: ' +
                                      str(filesystem)])
                     continue
+                filesystems.append(filesystem)
+            self.logger.log(LogPriority.DEBUG,
+                            ['FilePermissions.multifind',
+                             'Walking Filesystems: ' + str(filesystems) +
+                             ' jobs: ' + str(self.scanjobs.getcurrvalue())])
+            scans = scanfilesystems(filesystems,
+                                    [WorldWritable(), SetID(), Unowned()],
+                                    self.indexdir,
+                                    self.fullscandays.getcurrvalue(), 25000,
+                                    self.scanjobs.getcurrvalue())
+            # merged in the order returned by getfilesystems
+            for scan in scans:
+                filesystem = scan['filesystem']
                 self.logger.log(LogPriority.DEBUG,
                                 ['FilePermissions.multifind',
-                                 'Walking Filesystem: ' + str(filesystem)])
-                if self.findoverrun:
-                        break
-                for root, dirs, files in os.walk(filesystem):
-                    # check the number of hits we have if we've got 30,000
-                    # hits then this FS is so bad we don't want to continue
-                    try:
-                        if len(dbsets['ww']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'WW overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-                    try:
-                        if len(dbsets['suid']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'SUID overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-                    try:
-                        if len(dbsets['unowned']['results']) > 25000:
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Unowned overflow!'])
-                            self.findoverrun = True
-                    except TypeError:
-                        pass
-
-                    if self.findoverrun:
-                        break
-
-                    # This wacky looking snippet filters out directories that
-                    # are actually file system mount points
-                    dirs[:] = [dirname for dirname in dirs if not
-                               os.path.ismount(os.path.join(root, dirname))]
-                    for dirname in dirs:
-                        path = os.path.join(root, dirname)
-                        try:
-                            mode = os.stat(path)
-                        except OSError:
-                            continue
-                        worldwrite = mode.st_mode & stat.S_IWOTH
-                        # sticky = mode.st_mode & stat.S_ISVTX
-                        if worldwrite:
-                            dbsets['ww']['results'].append(path)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found WW Dir: ' + str(path)])
-                    for name in files:
-                        try:
-                            if len(dbsets['ww']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                 'WW overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-                        try:
-                            if len(dbsets['suid']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                 'SUID overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-                        try:
-                            if len(dbsets['unowned']['results']) > 25000:
-                                self.logger.log(LogPriority.DEBUG,
-                                                ['FilePermissions.multifind',
-                                                 'Unowned overflow!'])
-                                self.findoverrun = True
-                        except TypeError:
-                            pass
-
-                        if self.findoverrun:
-                            break
-
-                        fpath = os.path.join(root, name)
-                        if os.path.islink(fpath):
-                            continue
-                        try:
-                            fmode = os.stat(fpath)
-                        except OSError:
-                            continue
-                        worldwrite = fmode.st_mode & stat.S_IWOTH
-                        if worldwrite:
-                            dbsets['ww']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found WW File: ' + str(fpath)])
-                        suid = fmode.st_mode & stat.S_ISUID
-                        sgid = fmode.st_mode & stat.S_ISGID
-                        if suid or sgid:
-                            dbsets['suid']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found SUID File: ' + str(fpath)])
-                        try:
-                            pwd.getpwuid(fmode.st_uid)[0]
-                        except KeyError:
-                            dbsets['unowned']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found unowned File: ' +
-                                             str(fpath)])
-                        try:
-                            grp.getgrgid(fmode.st_gid)[0]
-                        except KeyError:
-                            dbsets['unowned']['results'].append(fpath)
-                            self.logger.log(LogPriority.DEBUG,
-                                            ['FilePermissions.multifind',
-                                             'Found unowned File, bad group: '
-                                             + str(fpath)])
+                                 'Walked Filesystem: ' + str(filesystem) +
+                                 ' incremental: ' + str(scan['incremental'])])
+                if scan['overrun']:
+                    self.logger.log(LogPriority.DEBUG,
+                                    ['FilePermissions.multifind',
+                                     'Result overflow on ' +
+                                     str(filesystem)])
+                    self.findoverrun = True
+                for dbset in dbsets:
+                    dbsets[dbset]['results'].extend(scan['results'][dbset])
+                    if len(dbsets[dbset]['results']) > 25000:
+                        self.findoverrun = True
+                    if scan['new'] is None:
+                        continue
+                    self.newfiles[dbset].extend(scan['new'][dbset])
+                    for path in scan['new'][dbset]:
+                        self.logger.log(LogPriority.DEBUG,
+                                        ['FilePermissions.multifind',
+                                         'New ' + dbset + ' file on ' +
+                                         str(filesystem) + ': ' + path])
+            for dbset in dbsets:
+                self.logger.log(LogPriority.DEBUG,
+                                ['FilePermissions.multifind',
+                                 'Found ' + dbset + ' files: ' +
+                                 str(dbsets[dbset]['results'])])
             for myset in dbsets:
                 data = '\n'.join(dbsets[myset]['results'])
                 whandle = open(dbsets[myset]['db'], 'w')
@@ -623,50 +573,20 @@ find / -xdev -type f \( -perm -0002 -a ! -perm -1000 \) -print'''
         locationList = ["/lib", "/lib64", "/usr/lib", "/usr/lib64",
                         "/lib/modules", "/bin", "/usr/bin", "/usr/local/bin",
                         "/sbin", "/usr/sbin", "/usr/local/sbin"]
-        gwfiles = []
-        nrofiles = []
-
+        walker = FSWalker([GroupWritable(), NonRootOwned()], xdev=False)
         for loc in locationList:
             if os.path.islink(loc):
                 continue
-            for root, dirs, files in os.walk(loc):
-                for dirname in dirs:
-                    path = os.path.join(root, dirname)
-#                     if os.path.islink(path):
-#                         continue
-                    try:
-                        mode = os.stat(path)
-                    except OSError:
-                        continue
-                    groupwrite = mode.st_mode & stat.S_IWGRP
-                    if groupwrite:
-                        gwfiles.append(path)
-                    if mode.st_uid != 0:
-                        nrofiles.append(path)
-                for name in files:
-                    fpath = os.path.join(root, name)
-                    if os.path.islink(fpath):
-                        continue
-                    try:
-                        fmode = os.stat(fpath)
-                    except OSError:
-                        continue
-                    groupwrite = fmode.st_mode & stat.S_IWGRP
-                    if groupwrite:
-                        gwfiles.append(fpath)
-                    if fmode.st_uid != 0:
-                        if self.environ.getosfamily() == 'darwin':
-                            macuucpfiles = ['/usr/lib/cron', '/usr/bin/cu',
-                                            '/usr/bin/uucp', '/usr/bin/uuname',
-                                            '/usr/bin/uustat', '/usr/bin/uux',
-                                            '/usr/sbin/uucico',
-                                            '/usr/sbin/uuxqt']
-                            if fpath in macuucpfiles:
-                                continue
-                            else:
-                                nrofiles.append(fpath)
-                        else:
-                            nrofiles.append(fpath)
+            walker.walk(loc)
+        gwfiles = walker.getresults('gw')
+        nrofiles = walker.getresults('nro')
+        if self.environ.getosfamily() == 'darwin':
+            macuucpfiles = ['/usr/lib/cron', '/usr/bin/cu', '/usr/bin/uucp',
+                            '/usr/bin/uuname', '/usr/bin/uustat',
+                            '/usr/bin/uux', '/usr/sbin/uucico',
+                            '/usr/sbin/uuxqt']
+            nrofiles = [path for path in nrofiles
+                        if path not in macuucpfiles]
 
         self.logger.log(LogPriority.DEBUG,
                         ['GroupWritable.report',
@@ -33,6 +33,8 @@ Created on May 31, 2016
     and not override the undo method.
 @change: 2019/03/12 ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - get user home directories from the shared account
+    database
 '''
 
 
@@ -48,6 +50,7 @@ from logdispatcher import LogPriority
 from stonixutilityfunctions import resetsecon, setPerms, iterate, writeFile, readFile, checkPerms, createFile
 from pkghelper import Pkghelper
 from pwd import getpwnam
+from accountdb import getaccountdb
 
 
 class ForceIdleLogout(Rule):
@@ -369,20 +372,9 @@ FORCEIDLELOGOUTTIMEOUT to the desired duration in minutes.'''
                                              "AutoLogoutTimeout": str(self.seconds)}}
 
         if self.environ.geteuid() == 0:
-            contents = readFile("/etc/passwd", self.logger)
-            for line in contents:
-                username = ""
-                homepath = ""
-                temp = line.split(':')
-                try:
-                    username = temp[0]
-                    homepath = temp[5]
-                except(IndexError):
-                    self.logdispatch.log(LogPriority.DEBUG,
-                                         ['ForceIdleLogout.__chkkde4',
-                                          'IndexError processing ' +
-                                          str(username)])
-                    continue
+            for user in getaccountdb(self.logger).getusers():
+                username = user.name
+                homepath = user.home
                 kdeparent = os.path.join(homepath, self.kdecheck)
                 kdefile = os.path.join(homepath, self.rcpath)
                 if not os.path.exists(kdeparent):
@@ -732,18 +724,10 @@ FORCEIDLELOGOUTTIMEOUT to the desired duration in minutes.'''
             homepath = self.environ.geteuidhome()
             kdefile = os.path.join(homepath, self.rcpath)
             uidnum = int(self.environ.geteuid())
-            passwddata = readFile("/etc/passwd", self.logger)
             found = False
-            for user in passwddata:
-                user = user.split(':')
-                try:
-                    puidnum = int(user[2])
-                    pdefgid = int(user[3])
-                except(IndexError):
-                    continue
-                if puidnum == uidnum:
-                    homepath = user[5]
-                    found = True
+            for user in getaccountdb(self.logger).getusersbyuid(uidnum):
+                homepath = user.home
+                found = True
             if not found:
                 self.detailedresults += "Could not obtain your user id.\n" + \
                     "Stonix couldn't proceed with correcting " + kdefile + "\n"
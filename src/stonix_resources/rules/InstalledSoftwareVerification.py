@@ -24,6 +24,14 @@ Verify package integrity, correct permissions
 @change: 2016/04/20 eball - Per RHEL 7 STIG, added a fix to automate correction
     of file permissions
 @change: 2018/07/30 Breen Malmberg - re-wrote the report and fix methods entirely
+@change: 2026/10/16 - report now verifies the whole rpm database with a single
+    streamed rpm -Va pass instead of one rpm -V call per installed package;
+    results are kept per package for use by fix
+@change: 2026/10/16 - rpm -Va is streamed through CommandHelper with a
+    timeout; the owners of all files with bad permissions are looked up with
+    one rpm -qf call
+@change: 2026/10/17 - owners are looked up OWNERCHUNK files at a time and
+    kept as a map of package to files
 """
 
 
@@ -35,6 +43,26 @@ from rule import Rule
 from logdispatcher import LogPriority
 from CommandHelper import CommandHelper
 
+# rpm -V output line: <attribute flags> [<file type marker>] <path>
+# the attribute flags are, in order: S M 5 D L U G T P
+VERIFYLINE = re.compile(r"^([SM5DLUGTP.?]{8,9})\s+(?:[cdglra]\s+)?(/.*)$")
+
+# attribute flag position for each kind of deviation we report on
+VERIFYFLAGS = {"perm": 1,
+               "hash": 2,
+               "owner": 5,
+               "group": 6}
+
+# seconds a full rpm -Va pass may take before it is killed
+VERIFYTIMEOUT = 3600
+
+# number of files or packages passed to a single rpm query, keeps the
+# argument list well below the system limit
+OWNERCHUNK = 100
+
+# rpm query format of the full package name
+PKGFORMAT = "%{NAME}-%{VERSION}-%{RELEASE}.%{ARCH}"
+
 
 class InstalledSoftwareVerification(Rule):
 
@@ -47,6 +75,7 @@ class InstalledSoftwareVerification(Rule):
         self.statechglogger = statechglogger
         self.rulenumber = 230
         self.rulename = 'InstalledSoftwareVerification'
+        self.sharedresources = ['pkgdb']
         self.formatDetailedResults("initialize")
         self.mandatory = True
         self.rootrequired = True
@@ -65,32 +94,121 @@ default.'
         self.fixPermsCi = self.initCi(datatype, key, instructions, default)
         self.sethelptext()
 
-    def getInstalledPackages(self):
-        """return a list of installed packages (as reported
-        by rpm database)
-
-
-        :returns: installedpackages
-
-        :rtype: list
-@author: Breen Malmberg
+    def parseVerifyLine(self, line):
+        """parse a single line of rpm -V output
 
+        :param line: string; one line of rpm -V output
+        :returns: (path, deviations) where deviations is a list of the
+            VERIFYFLAGS keys which failed verification, or (None, [])
+        :rtype: tuple
         """
 
-        installedpackages = []
+        deviations = []
+        match = VERIFYLINE.search(line.strip())
+        if not match:
+            return None, deviations
+        flags, path = match.group(1), match.group(2).strip()
+        for kind, position in VERIFYFLAGS.items():
+            if flags[position] not in [".", "?"]:
+                deviations.append(kind)
+        return path, deviations
+
+    def verifyPackages(self):
+        """run a single verification pass over the whole rpm database,
+        parsing the output line by line as it is produced
+
+        :returns: success
+        :rtype: bool
+        """
 
-        listinstalledcmd = "/usr/bin/rpm -qa"
+        verifycmd = ["/usr/bin/rpm", "-Va", "--nosignature", "--nolinkto",
+                     "--nofiledigest", "--nosize", "--nomtime", "--nordev",
+                     "--nocaps"]
+
+        def handleline(line):
+            path, deviations = self.parseVerifyLine(line)
+            if not path:
+                return
+            if "perm" in deviations:
+                self.badpermfiles.append(path)
+            if "group" in deviations:
+                self.badgroupfiles.append(path)
+            if "owner" in deviations:
+                self.badownerfiles.append(path)
+            if "hash" in deviations:
+                self.badhashfiles.append(path)
+
+        verifych = CommandHelper(self.logger)
+        verifych.setTimeout(VERIFYTIMEOUT)
+        if not verifych.executeCommandStream(verifycmd, handleline):
+            return False
+        # rpm -V returns 1 when it finds deviations, anything higher is a
+        # failure to run the verification
+        retcode = verifych.getReturnCode()
+        if retcode not in [0, 1]:
+            self.logger.log(LogPriority.DEBUG, "rpm verification exited with code " + str(retcode))
+            return False
+
+        return True
+
+    def getOwningPackages(self, paths):
+        """return the installed packages which own any of the given files
+        and which of the files each of them owns. The owners are found with
+        rpm -qf and then their file lists with rpm -q, OWNERCHUNK arguments
+        per rpm call.
+
+        :param paths: list; full paths to files
+        :returns: packages - dict of package name -> list of files
+        :rtype: dict
+        """
 
-        self.ch.executeCommand(listinstalledcmd)
-        outputlist = self.ch.getOutput()
-        retcode = self.ch.getReturnCode()
-        if retcode == 0:
-            installedpackages = outputlist
-        else:
-            errmsg = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg)
+        packages = {}
+        owners = []
+        paths = list(paths)
+
+        for i in range(0, len(paths), OWNERCHUNK):
+            ownercmd = ["/usr/bin/rpm", "-qf", "--queryformat",
+                        PKGFORMAT + "\n"] + paths[i:i + OWNERCHUNK]
+            self.ch.executeCommand(ownercmd)
+            # rpm -qf returns non-zero if any one of the files is not owned
+            # by a package, which it reports on a line of its own
+            for line in self.ch.getOutput():
+                line = line.strip()
+                if line and not line.startswith("file ") and \
+                        line not in owners:
+                    owners.append(line)
+            if self.ch.getReturnCode() != 0:
+                self.logger.log(LogPriority.DEBUG, self.ch.getErrorString())
+
+        wanted = set(paths)
+        for i in range(0, len(owners), OWNERCHUNK):
+            filescmd = ["/usr/bin/rpm", "-q", "--queryformat",
+                        "[%{FILENAMES}\t" + PKGFORMAT + "\n]"] + \
+                owners[i:i + OWNERCHUNK]
+            self.ch.executeCommand(filescmd)
+            for line in self.ch.getOutput():
+                path, _, pkg = line.strip().rpartition("\t")
+                if path in wanted:
+                    packages.setdefault(pkg, [])
+                    if path not in packages[pkg]:
+                        packages[pkg].append(path)
+            if self.ch.getReturnCode() != 0:
+                self.logger.log(LogPriority.DEBUG, self.ch.getErrorString())
+
+        return packages
+
+    def getUnattributedFiles(self):
+        """return the files with incorrect permissions which could not be
+        attributed to a package
+
+        :returns: files
+        :rtype: list
+        """
 
-        return installedpackages
+        attributed = set()
+        for files in self.badpermpkgs.values():
+            attributed.update(files)
+        return [f for f in self.badpermfiles if f not in attributed]
 
     def report(self):
         """Compile a list of files not conforming to rpm package database permissions (Mode)
@@ -110,7 +228,6 @@ default.'
         self.detailedresults = ""
         self.compliant = True
         self.ch = CommandHelper(self.logger)
-        reportcmd = "/usr/bin/rpm -V --nosignature --nolinkto --nofiledigest --nosize --nomtime --nordev --nocaps "
         self.badpermfiles = []
         self.badpermpkgs = {}
         self.badgroupfiles = []
@@ -121,34 +238,22 @@ default.'
 
             self.logger.log(LogPriority.DEBUG, "Searching for files with incorrect permissions...")
 
-            installedpkgs = self.getInstalledPackages()
-
-            for pkg in installedpkgs:
-                self.ch.executeCommand(reportcmd + pkg)
-                outputlist = self.ch.getOutput()
-                self.badpermpkgs[pkg] = []
-                for line in outputlist:
-                    # search for bad permissions
-                    if re.search("^.*(\.+M|M\.+)", line, re.IGNORECASE):
-                        sline = line.split()
-                        self.badpermpkgs[pkg].append(sline[len(sline)-1])
-                        self.badpermfiles.append(sline[len(sline)-1])
-                    # search for bad group ownership
-                    if re.search("^.*(\.+G|G\.+)", line, re.IGNORECASE):
-                        sline = line.split()
-                        self.badgroupfiles.append(sline[len(sline)-1])
-                    # search for bad ownership (user)
-                    if re.search("^.*(\.+U|U\.+)", line, re.IGNORECASE):
-                        sline = line.split()
-                        self.badownerfiles.append(sline[len(sline)-1])
-                    # search for bad md5 hash
-                    if re.search("^.*(\.+5|5\.+)", line, re.IGNORECASE):
-                        sline = line.split()
-                        self.badhashfiles.append(sline[len(sline)-1])
+            if not self.verifyPackages():
+                self.compliant = False
+                self.detailedresults += "\nUnable to verify the installed packages against the rpm database."
+
+            # only files with a permission deviation need to be attributed to
+            # a package; fix resets permissions one package at a time
+            self.badpermpkgs = self.getOwningPackages(self.badpermfiles)
 
             if self.badpermfiles:
                 self.compliant = False
-                self.detailedresults += "\nThe following package files have incorrect permissions:\n" + "\n".join(self.badpermfiles)
+                self.detailedresults += "\nThe following package files have incorrect permissions:"
+                for pkg in sorted(self.badpermpkgs):
+                    self.detailedresults += "\n" + pkg + ":\n" + "\n".join(self.badpermpkgs[pkg])
+                unowned = self.getUnattributedFiles()
+                if unowned:
+                    self.detailedresults += "\nPackage unknown:\n" + "\n".join(unowned)
             if self.badgroupfiles:
                 self.compliant = False
                 self.detailedresults += "\n\nThe following package files have bad group ownership:\n" + "\n".join(self.badgroupfiles)
@@ -198,6 +303,12 @@ default.'
                     retcode = self.ch.getReturnCode()
                     if retcode != 0:
                         self.rulesuccess = False
+                        self.detailedresults += "\nFailed to reset the permissions of package " + pkg + ":\n" + "\n".join(self.badpermpkgs[pkg])
+
+            unowned = self.getUnattributedFiles()
+            if unowned:
+                self.rulesuccess = False
+                self.detailedresults += "\nUnable to find the packages owning these files, their permissions were not reset:\n" + "\n".join(unowned)
 
             self.detailedresults += "\n\nPlease note that we will not attempt to fix ownership, group ownership, or bad md5 checksums. For suggestions on what to do if files are found with these issues, please see the rule's help text."
             self.detailedresults += "\nIt is expected that this rule will still be non-compliant after fix if files are found with incorrect ownership or group ownership."
@@ -63,6 +63,7 @@ class LinuxPackageSigning(RuleKVEditor):
         self.rootrequired = True
         self.mandatory = True
         self.rulename = 'LinuxPackageSigning'
+        self.sharedresources = ['pkgdb']
         self.formatDetailedResults("initialize")
         self.sethelptext()
         self.guidance = ['CNSSI 1253: cm-5(3)']
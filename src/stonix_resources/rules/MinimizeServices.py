@@ -35,6 +35,8 @@ Created on Aug 9, 2012
 @change: 2017/10/24 Roy Nielsen changing to use service helper, second gen
 @change: 2018/1/17 Brandon Gonzales Add sddm.service and sddm to the
         systemd whitelist
+@change: 2026/10/16 take a service state snapshot before the audit loops
+@change: 2026/10/17 drop the snapshot again once the loops are done
 """
 
 
@@ -68,6 +70,7 @@ class MinimizeServices(Rule):
         self.statechglogger = statechglogger
         self.rulenumber = 12
         self.rulename = 'MinimizeServices'
+        self.sharedresources = ['servicemgr']
         self.formatDetailedResults("initialize")
         self.mandatory = True
         self.sethelptext()
@@ -589,6 +592,7 @@ elements should be space separated."""
         try:
 
             servicelist = self.servicehelper.listServices()
+            self.servicehelper.takeSnapshot()
             allowedlist = self.svcslistci.getcurrvalue()
             corelist = self.svcslistci.getdefvalue()
 
@@ -623,6 +627,8 @@ elements should be space separated."""
             self.compliant = False
             self.detailedresults += traceback.format_exc()
             self.logger.log(LogPriority.ERROR, self.detailedresults)
+        finally:
+            self.servicehelper.clearSnapshot()
         self.formatDetailedResults("report", self.compliant, self.detailedresults)
         self.logger.log(LogPriority.INFO, self.detailedresults)
         return self.compliant
@@ -641,6 +647,7 @@ elements should be space separated."""
         if self.minimizeci.getcurrvalue():
             try:
                 servicelist = self.servicehelper.listServices()
+                self.servicehelper.takeSnapshot()
                 allowedlist = self.svcslistci.getcurrvalue()
 
                 # make sure you're not dealing with any return garbage
@@ -676,6 +683,8 @@ elements should be space separated."""
                 self.rulesuccess = False
                 self.detailedresults += traceback.format_exc()
                 self.logger.log(LogPriority.ERROR, self.detailedresults)
+            finally:
+                self.servicehelper.clearSnapshot()
         self.formatDetailedResults("fix", self.rulesuccess, self.detailedresults)
         self.logger.log(LogPriority.INFO, self.detailedresults)
         return self.rulesuccess
@@ -42,6 +42,8 @@ which conflicted with DisableIPV6 and NoCoreDumps which expected 644.
     consistent with other rules that handle sysctl and to properly
     handle sysctl by writing to /etc/sysctl.conf and also using command
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - fs.suid_dumpable is read and set through the shared
+    sysctl service instead of the sysctl command
 """
 
 
@@ -55,6 +57,7 @@ from rule import Rule
 from logdispatcher import LogPriority
 from stonixutilityfunctions import iterate, readFile, checkPerms, createFile, setPerms, writeFile, resetsecon
 from KVEditorStonix import KVEditorStonix
+from sysctlservice import getsysctlservice
 
 
 class NoCoreDumps(Rule):
@@ -85,6 +88,8 @@ class NoCoreDumps(Rule):
         instructions = "To prevent the disabling of core dumps on your system, set the value of NOCOREDUMPS to False."
         default = True
         self.ci = self.initCi(datatype, key, instructions, default)
+        self.sysctl = getsysctlservice(self.logger)
+        self.sharedresources = ['sysctl']
         self.sethelptext()
 
     def report(self):
@@ -228,19 +233,14 @@ class NoCoreDumps(Rule):
 
         compliant = True
 
-        self.ch.executeCommand("/sbin/sysctl fs.suid_dumpable")
-        retcode = self.ch.getReturnCode()
+        value = self.sysctl.getvalue("fs.suid_dumpable")
 
-        if retcode != 0:
-            self.detailedresults += "Failed to get value of core dumps configuration with sysctl command\n"
-            errmsg = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg)
+        if value is None:
+            self.detailedresults += "Failed to get value of core dumps configuration from the kernel\n"
             compliant = False
-        else:
-            output = self.ch.getOutputString()
-            if output.strip() != "fs.suid_dumpable = 0":
-                compliant = False
-                self.detailedresults += "Core dumps are currently enabled\n"
+        elif value != "0":
+            compliant = False
+            self.detailedresults += "Core dumps are currently enabled\n"
 
         if not os.path.exists("/etc/sysctl.conf"):
             compliant = False
@@ -388,28 +388,22 @@ class NoCoreDumps(Rule):
                             success = False
                     resetsecon(sysctl)
 
-        # using sysctl -w command
+        # set the running value
         self.logger.log(LogPriority.DEBUG, "Configuring /etc/sysctl fs.suid_dumpable directive")
-        self.ch.executeCommand("/sbin/sysctl -w fs.suid_dumpable=0")
-        retcode = self.ch.getReturnCode()
-        if retcode != 0:
+        changed, failed = self.sysctl.setvalues({"fs.suid_dumpable": "0"})
+        if failed or self.sysctl.getvalue("fs.suid_dumpable") is None:
             success = False
             self.detailedresults += "Failed to set core dumps variable suid_dumpable to 0\n"
-            errmsg = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg)
         else:
             self.logger.log(LogPriority.DEBUG, "Re-reading sysctl configuration from files")
-            self.ch.executeCommand("/sbin/sysctl -q -e -p")
-            retcode2 = self.ch.getReturnCode()
-            if retcode2 != 0:
+            if not self.sysctl.reload():
                 success = False
                 self.detailedresults += "Failed to load new sysctl configuration from config file\n"
-                errmsg2 = self.ch.getErrorString()
-                self.logger.log(LogPriority.DEBUG, errmsg2)
-            else:
+            elif changed:
                 self.iditerator += 1
                 myid = iterate(self.iditerator, self.rulenumber)
-                command = "/sbin/sysctl -w fs.suid_dumpable=1"
+                command = "/sbin/sysctl -w fs.suid_dumpable=" + \
+                    changed["fs.suid_dumpable"]
                 event = {"eventtype": "commandstring",
                          "command": command}
                 self.statechglogger.recordchgevent(myid, event)
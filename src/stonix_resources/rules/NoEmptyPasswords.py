@@ -23,6 +23,8 @@ Created on Oct 29, 2012
 @change: 2014/10/17 ekkehard OS X Yosemite 10.10 Update
 @change: 2015/04/16 dkennel updated for new isApplicable
 @change: 2015/10/07 eball Help text/PEP8 cleanup
+@change: 2026/10/16 - report looks users and shadow entries up in the shared
+    account database
 '''
 
 
@@ -31,6 +33,7 @@ from stonixutilityfunctions import getUserGroupName
 from rule import Rule
 from logdispatcher import LogPriority
 from pkghelper import Pkghelper
+from accountdb import getaccountdb
 from subprocess import call
 import os
 import traceback
@@ -87,27 +90,21 @@ class NoEmptyPasswords(Rule):
                 self.shadow = "/etc/master.passwd"
                 self.passwd = "/etc/passwd"
             compliant = True
+            accountdb = getaccountdb(self.logger)
             if not os.path.exists(self.passwd):
                 self.detailedresults += "This system doesn't contain an \
 /etc/passwd file\n"
                 compliant = False
             else:
-                contents = readFile(self.passwd, self.logger)
-                if not contents:
+                users = accountdb.getusers()
+                if not users:
                     self.detailedresults += "This system contains an \
 /etc/passwd file but it's blank\n"
                     compliant = False
                 else:
-                    try:
-                        for line in contents:
-                            if re.search(":", line):
-                                line = line.split(":")
-                                if int(line[2]) >= 500:
-                                    self.users.append(line[0])
-                    except IndexError:
-                        self.detailedresults += traceback.format_exc() + "\n"
-                        self.detailedresults += "Index out of range\n"
-                        compliant = False
+                    for user in users:
+                        if user.uid >= 500:
+                            self.users.append(user.name)
             if not os.path.exists(self.shadow):
                 self.detailedresults += "This system doesn't contain an \
 /etc/shadow file or /etc/master.passwd file\n"
@@ -115,30 +112,17 @@ class NoEmptyPasswords(Rule):
             if not self.users:
                 self.detailedresults += "There are no local accounts on this \
 system that need to be checked for empty passwords\n"
-            contents = readFile(self.shadow, self.logger)
-            if not contents:
+            if not accountdb.getshadows():
                 self.detailedresults += "Your system contains an \
 /etc/shadow file or /etc/master.passwd file but it's blank\n"
                 compliant = False
             else:
-                try:
-                    for user in self.users:
-                        for line in contents:
-                            if re.search(":", line):
-                                line = line.split(":")
-                                if line[0] == user:
-                                    # if line[1].isdigit():
-                                    #    compliant = False
-                                    # elif line[1].strip() == "":
-                                    if line[1].strip() == "":
-                                        if line[0] not in self.empty:
-                                            self.empty.append(line[0])
-                                            compliant = False
-                                            break
-                except IndexError:
-                    self.detailedresults += traceback.format_exc() + "\n"
-                    self.detailedresults += "Index out of range\n"
-                    compliant = False
+                for user in self.users:
+                    shadow = accountdb.getshadow(user)
+                    if shadow and shadow.passwd.strip() == "":
+                        if user not in self.empty:
+                            self.empty.append(user)
+                            compliant = False
             if self.ph:
                 if self.ph.manager == "apt-get":
                     retval = getUserGroupName("/etc/shadow")
@@ -28,11 +28,13 @@ Created on Jul 13, 2012
 @change: 2018/06/08 ekkehard - make eligible for macOS Mojave 10.14
 @change: 2019/03/12 ekkehard - make eligible for macOS Sierra 10.12+
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - enumerate users through the shared account database
 '''
 
 import pwd
 from rule import Rule
 from stonixutilityfunctions import *
+from accountdb import getaccountdb
 
 
 class RemoveBadDotFiles(Rule):
@@ -70,7 +72,7 @@ class RemoveBadDotFiles(Rule):
                            'os': {'Mac OS X': ['10.15', 'r', '10.15.10']}}
         self.homelist = ['/', '/root']
         try:
-            mypwd = pwd.getpwall()
+            mypwd = getaccountdb(self.logger).getallusers()
             for user in mypwd:
                 home = user[5]
                 if home not in self.homelist:
@@ -23,6 +23,7 @@ This rule removes all detected games.
 @change: 2016/09/14 eball Added autoremove command to apt-get systems fix
 @change: 2018/08/20 Brandon R. Gonzales Added protections for functions using
                     '/usr/games' in case the directory doesn't exist
+@change: 2026/10/16 - remove all game packages in one transaction
 '''
 
 import os
@@ -153,10 +154,15 @@ class RemoveSUIDGames(Rule):
             for event in eventlist:
                 self.statechglogger.deleteentry(event)
 
+            results = {}
+            if self.gamesfound:
+                for game in self.gamesfound:
+                    self.ph.queueRemove(game)
+                results = self.ph.commitTransaction()
             for game in self.gamesfound:
                 # pkgName = self.ph.getPackageFromFile(game)
                 # if pkgName is not None and str(pkgName) is not "":
-                if self.ph.remove(game):
+                if results.get(game):
                     self.iditerator += 1
                     myid = iterate(self.iditerator, self.rulenumber)
                     event = {"eventtype": "pkghelper",
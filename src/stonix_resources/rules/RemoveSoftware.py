@@ -24,6 +24,7 @@ Created on Apr 5, 2016
 @change: 2018/07/31 Breen Malmberg - added doc strings for report and fix
         methods; added redhat insights software to default list of software
         to remove
+@change: 2026/10/16 - fix removes all packages in one transaction
 """
 
 import traceback
@@ -46,6 +47,7 @@ class RemoveSoftware(Rule):
         self.logger = logger
         self.rulenumber = 91
         self.rulename = "RemoveSoftware"
+        self.sharedresources = ['pkgdb']
         self.mandatory = True
         self.formatDetailedResults("initialize")
         self.sethelptext()
@@ -167,22 +169,24 @@ class RemoveSoftware(Rule):
             for event in eventlist:
                 self.statechglogger.deleteentry(event)
 
+            # remove all packages in one package manager transaction
             for pkg in self.remove_packages:
-                try:
-                    if self.ph.remove(pkg):
-                        self.iditerator += 1
-                        self.detailedresults += "\nRemoved package: " + str(pkg)
-                        myid = iterate(self.iditerator, self.rulenumber)
-                        event = {"eventtype": "pkghelper",
-                                 "pkgname": pkg,
-                                 "startstate": "installed",
-                                 "endstate": "removed"}
-                        self.statechglogger.recordchgevent(myid, event)
-                    else:
-                        self.rulesuccess = False
-                        self.detailedresults += "\nFailed to remove package: " + str(pkg)
-                except Exception:
-                    continue
+                self.ph.queueRemove(pkg)
+            results = self.ph.commitTransaction()
+
+            for pkg in self.remove_packages:
+                if results.get(pkg):
+                    self.iditerator += 1
+                    self.detailedresults += "\nRemoved package: " + str(pkg)
+                    myid = iterate(self.iditerator, self.rulenumber)
+                    event = {"eventtype": "pkghelper",
+                             "pkgname": pkg,
+                             "startstate": "installed",
+                             "endstate": "removed"}
+                    self.statechglogger.recordchgevent(myid, event)
+                else:
+                    self.rulesuccess = False
+                    self.detailedresults += "\nFailed to remove package: " + str(pkg)
 
         except (KeyboardInterrupt, SystemExit):
             raise
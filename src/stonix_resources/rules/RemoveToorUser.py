@@ -21,14 +21,14 @@ Created on Nov 13, 2012
 @author: dwalker
 @change: 04/21/2014 dkennel Updated CI invocation.
 @change: 2015/04/16 dkennel updated for new isApplicable
+@change: 2026/10/16 - look up toor in the shared account database
 '''
 
-from stonixutilityfunctions import readFile
 from rule import Rule
 from logdispatcher import LogPriority
+from accountdb import getaccountdb
 from subprocess import call
 import traceback
-import re
 
 
 class RemoveToorUser(Rule):
@@ -63,14 +63,9 @@ REMOVETOORUSER to False.'''
 
         try:
             found = False
-            fileLocation = "/etc/passwd"
-            contents = readFile(fileLocation, self.logger)
-            if contents:
-                user = "^toor"
-                for line in contents:
-                    if re.search(user, line):
-                        found = True
-                        break
+            accountdb = getaccountdb(self.logger)
+            if accountdb.getusers():
+                found = accountdb.getuser("toor") is not None
                 if found:
                     self.compliant = False
                 else:
@@ -21,14 +21,17 @@ Created on May 9, 2016
 Unprivileged access to the kernel syslog can expose sensitive kernel address information.
 
 @author: Breen Malmberg
+@change: 2026/10/16 - kernel.dmesg_restrict is read and set through the
+    shared sysctl service instead of the sysctl command
+@change: 2026/10/16 - compliant reports may be reused by the result cache
 '''
 
 
 from rule import Rule
 from CommandHelper import CommandHelper
 from logdispatcher import LogPriority
+from sysctlservice import getsysctlservice
 
-import re
 import traceback
 
 
@@ -82,6 +85,9 @@ class RestrictAccessToKernelMessageBuffer(Rule):
         '''
 
         self.ch = CommandHelper(self.logger)
+        self.sysctl = getsysctlservice(self.logger)
+        self.sharedresources = ['sysctl']
+        self.cacheable = True
 
     def report(self):
         '''run report actions for this rule
@@ -96,29 +102,16 @@ class RestrictAccessToKernelMessageBuffer(Rule):
 
         self.detailedresults = ""
         self.compliant = True
-        kernelopt = False
 
         try:
 
-            self.ch.executeCommand(self.reportcommand)
-            output = self.ch.getOutput()
-            retcode = self.ch.getReturnCode()
-            if retcode != 0:
-                self.detailedresults += "\nError while running command: " + str(self.reportcommand)
-            for line in output:
-                if re.search("kernel\.dmesg\_restrict", line):
-                    kernelopt = True
-                    sline = line.split('=')
-                    if len(sline) > 1:
-                        if str(sline[1]).strip() == '0':
-                            self.compliant = False
-                            self.detailedresults += "\nKernel message buffer is currently not restricted."
-                    else:
-                        self.compliant = False
-                        self.detailedresults += "\nCould not determine the state of the kernel message buffer access restrictions."
-            if not kernelopt:
+            value = self.sysctl.getvalue("kernel.dmesg_restrict")
+            if value is None:
                 self.compliant = False
                 self.detailedresults += "\nCould not determine the state of the kernel message buffer access restrictions."
+            elif value == '0':
+                self.compliant = False
+                self.detailedresults += "\nKernel message buffer is currently not restricted."
 
         except (KeyboardInterrupt, SystemExit):
             raise
@@ -145,12 +138,10 @@ class RestrictAccessToKernelMessageBuffer(Rule):
 
         try:
 
-            self.ch.executeCommand(self.fixcommand)
-            rcode = self.ch.getReturnCode()
-            errmsg = self.ch.getErrorString()
-            if rcode != '0':
+            _, failed = self.sysctl.setvalues({"kernel.dmesg_restrict": "1"})
+            if failed:
                 success = False
-                self.detailedresults += "\n" + str(errmsg)
+                self.detailedresults += "\nFailed to set kernel.dmesg_restrict = 1"
 
         except (KeyboardInterrupt, SystemExit):
             raise
@@ -43,6 +43,8 @@ variable.
     handle sysctl by writing to /etc/sysctl.conf and also using command
 @change: 2019/06/26 Brandon R. Gonzales - Fix MacOS CI logic in fix()
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - runtime values are read and set through the shared
+    sysctl service instead of one sysctl command per key
 '''
 
 from stonixutilityfunctions import resetsecon, iterate, readFile, writeFile
@@ -53,6 +55,7 @@ from logdispatcher import LogPriority
 from CommandHelper import CommandHelper
 from subprocess import Popen, PIPE, call
 from KVEditorStonix import KVEditorStonix
+from sysctlservice import getsysctlservice
 import os
 import traceback
 import re
@@ -81,6 +84,8 @@ class SecureIPV4(Rule):
                            'os': {'Mac OS X': ['10.15', 'r', '10.15.10']}}
         self.iditerator = 0
         self.ch = CommandHelper(self.logger)
+        self.sysctl = getsysctlservice(self.logger)
+        self.sharedresources = ['sysctl']
 
     def __InitializeNetworkTuning1(self):
         '''Private method to initialize the configurationitem object for the
@@ -190,21 +195,15 @@ class SecureIPV4(Rule):
                 self.detailedresults += "Permissions are incorrect on " + \
                     self.path + "\n"
                 compliant = False
-        for key in lfc:
-            self.ch.executeCommand("/sbin/sysctl " + key)
-            retcode = self.ch.getReturnCode()
-
-            if retcode != 0:
-                self.detailedresults += "Failed to get value of core dumps configuration with sysctl command\n"
-                errmsg = self.ch.getErrorString()
-                self.logger.log(LogPriority.DEBUG, errmsg)
-                compliant = False
-            else:
-                output = self.ch.getOutputString()
-                if output.strip() != key + " = " + lfc[key]:
-                    compliant = False
-                    self.detailedresults += "sysctl output has incorrect value: " + \
-                        output + "\n"
+        wrong, unknown = self.sysctl.checkvalues(lfc)
+        for key in unknown:
+            self.detailedresults += "Failed to get value of " + key + \
+                " from the kernel\n"
+            compliant = False
+        for key in wrong:
+            compliant = False
+            self.detailedresults += "sysctl has incorrect value: " + key + \
+                " = " + wrong[key] + " (" + self.sysctl.describe(key) + ")\n"
         return compliant
 
     def reportLinux2(self):
@@ -231,21 +230,15 @@ class SecureIPV4(Rule):
                     "correctly for configuration item 2\n"
                 compliant = False
 
-        for key in lfc:
-            self.ch.executeCommand("/sbin/sysctl " + key)
-            retcode = self.ch.getReturnCode()
-
-            if retcode != 0:
-                self.detailedresults += "Failed to get value of core dumps configuration with sysctl command\n"
-                errmsg = self.ch.getErrorString()
-                self.logger.log(LogPriority.DEBUG, errmsg)
-                compliant = False
-            else:
-                output = self.ch.getOutputString()
-                if output.strip() != key + " = " + lfc[key]:
-                    compliant = False
-                    self.detailedresults += "sysctl output has incorrect value: " + \
-                        output + "\n"
+        wrong, unknown = self.sysctl.checkvalues(lfc)
+        for key in unknown:
+            self.detailedresults += "Failed to get value of " + key + \
+                " from the kernel\n"
+            compliant = False
+        for key in wrong:
+            compliant = False
+            self.detailedresults += "sysctl has incorrect value: " + key + \
+                " = " + wrong[key] + " (" + self.sysctl.describe(key) + ")\n"
         return compliant
 
     def reportMac(self):
@@ -485,39 +478,27 @@ class SecureIPV4(Rule):
                         success = False
                 resetsecon(self.path)
 
-        # here we also check the output of the sysctl command for each key
-        # to cover all bases
+        # set the running values as well, then load the configuration file
         for key in lfc:
-            if self.ch.executeCommand("/sbin/sysctl " + key):
-                output = self.ch.getOutputString().strip()
-                if not re.search(lfc[key] + "$", output):
-                    undovalue = output[-1]
-                    self.ch.executeCommand("/sbin/sysctl -w " + key + "=" + lfc[key])
-                    retcode = self.ch.getReturnCode()
-                    if retcode != 0:
-                        success = False
-                        self.detailedresults += "Failed to set " + key + " = " + lfc[key] + "\n"
-                        errmsg = self.ch.getErrorString()
-                        self.logger.log(LogPriority.DEBUG, errmsg)
-                    else:
-                        self.iditerator += 1
-                        myid = iterate(self.iditerator, self.rulenumber)
-                        command = "/sbin/sysctl -w " + key + "=" + undovalue
-                        event = {"eventtype": "commandstring",
-                                 "command": command}
-                        self.statechglogger.recordchgevent(myid, event)
-            else:
+            if self.sysctl.getvalue(key) is None:
                 self.detailedresults += "Unable to get value for " + key + "\n"
                 success = False
-        # at the end do a print and ignore any key errors to ensure
+        changed, failed = self.sysctl.setvalues(lfc)
+        for key in failed:
+            success = False
+            self.detailedresults += "Failed to set " + key + " = " + lfc[key] + "\n"
+        for key in changed:
+            self.iditerator += 1
+            myid = iterate(self.iditerator, self.rulenumber)
+            command = "/sbin/sysctl -w " + key + "=" + changed[key]
+            event = {"eventtype": "commandstring",
+                     "command": command}
+            self.statechglogger.recordchgevent(myid, event)
+        # at the end reload the file, ignoring any key errors, to ensure
         # the new values are read into the kernel
-        self.ch.executeCommand("/sbin/sysctl -q -e -p")
-        retcode2 = self.ch.getReturnCode()
-        if retcode2 != 0:
+        if not self.sysctl.reload():
             success = False
             self.detailedresults += "Failed to load new sysctl configuration from config file\n"
-            errmsg2 = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg2)
         return success
 
     def fixMac(self):
@@ -33,6 +33,8 @@ Created on Jan 14, 2014
     consistent with other rules that handle sysctl and to properly
     handle sysctl by writing to /etc/sysctl.conf and also using command
 @change: 2019/08/07 ekkehard - enable for macOS Catalina 10.15 only
+@change: 2026/10/16 - runtime values are read and set through the shared
+    sysctl service instead of one sysctl command per key
 '''
 
 from stonixutilityfunctions import iterate, setPerms, checkPerms, writeFile
@@ -42,6 +44,7 @@ from logdispatcher import LogPriority
 from KVEditorStonix import KVEditorStonix
 from CommandHelper import CommandHelper
 from pkghelper import Pkghelper
+from sysctlservice import getsysctlservice
 import traceback
 import os
 import glob
@@ -77,6 +80,8 @@ False.'''
         # self.editor2: network file editor
         self.editor1, self.editor2 = "", ""
         self.ch = CommandHelper(self.logger)
+        self.sysctl = getsysctlservice(self.logger)
+        self.sharedresources = ['sysctl']
 
     def report(self):
         try:
@@ -216,23 +221,12 @@ False.'''
 
         # in addition to checking /etc/sysctl.conf contents we need to
         # also check sysctl compliancy using the sysctl command
-        for key in self.sysctls:
-            self.ch.executeCommand("/sbin/sysctl " + key)
-            retcode = self.ch.getReturnCode()
-            output = self.ch.getOutputString()
-            errmsg = output + self.ch.getErrorString()
-            if retcode != 0:
-                if re.search("unknown key", errmsg):
-                    continue
-                else:
-                    self.detailedresults += "Failed to get value of " + key + " key with sysctl command\n"
-                    self.logger.log(LogPriority.DEBUG, errmsg)
-                    compliant = False
-            else:
-                if output.strip() != key + " = " + self.sysctls[key]:
-                    compliant = False
-                    self.detailedresults += "sysctl output has incorrect value: " + \
-                        output + "\n"
+        # keys unknown to this kernel are skipped
+        wrong, _ = self.sysctl.checkvalues(self.sysctls)
+        for key in wrong:
+            compliant = False
+            self.detailedresults += "sysctl has incorrect value: " + key + \
+                " = " + wrong[key] + " (" + self.sysctl.describe(key) + ")\n"
 
         # set the appropriate files based on the system
         if self.ph.manager == "yum":
@@ -497,42 +491,24 @@ the correct contents\n"
                             success = False
                     resetsecon(sysctl)
 
-        # here we also check the output of the sysctl command for each key
-        # to cover all bases
-        for key in self.sysctls:
-            if self.ch.executeCommand("/sbin/sysctl " + key):
-                output = self.ch.getOutputString().strip()
-                errmsg = output + self.ch.getErrorString()
-                if re.search("unknown key", errmsg):
-                    continue
-                if not re.search(self.sysctls[key] + "$", output):
-                    undovalue = output[-1]
-                    self.ch.executeCommand("/sbin/sysctl -q -e -w " + key + "=" + self.sysctls[key])
-                    retcode = self.ch.getReturnCode()
-                    if retcode != 0:
-                        success = False
-                        self.detailedresults += "Failed to set " + key + " = " + self.sysctls[key] + "\n"
-                        errmsg = self.ch.getErrorString()
-                        self.logger.log(LogPriority.DEBUG, errmsg)
-                    else:
-                        self.iditerator += 1
-                        myid = iterate(self.iditerator, self.rulenumber)
-                        command = "/sbin/sysctl -q -e -w " + key + "=" + undovalue
-                        event = {"eventtype": "commandstring",
-                                 "command": command}
-                        self.statechglogger.recordchgevent(myid, event)
-            else:
-                self.detailedresults += "Unable to get value for " + key + "\n"
-                success = False
-        # at the end do a print and ignore any key errors to ensure
+        # set the running values as well, keys unknown to this kernel
+        # are skipped, then load the configuration file
+        changed, failed = self.sysctl.setvalues(self.sysctls)
+        for key in failed:
+            success = False
+            self.detailedresults += "Failed to set " + key + " = " + self.sysctls[key] + "\n"
+        for key in changed:
+            self.iditerator += 1
+            myid = iterate(self.iditerator, self.rulenumber)
+            command = "/sbin/sysctl -q -e -w " + key + "=" + changed[key]
+            event = {"eventtype": "commandstring",
+                     "command": command}
+            self.statechglogger.recordchgevent(myid, event)
+        # at the end reload the file, ignoring any key errors, to ensure
         # the new values are read into the kernel
-        self.ch.executeCommand("/sbin/sysctl -q -e -p")
-        retcode2 = self.ch.getReturnCode()
-        if retcode2 != 0:
+        if not self.sysctl.reload():
             success = False
             self.detailedresults += "Failed to load new sysctl configuration from config file\n"
-            errmsg2 = self.ch.getErrorString()
-            self.logger.log(LogPriority.DEBUG, errmsg2)
 
         # correct the network file if it exists
         if netwrkfile:
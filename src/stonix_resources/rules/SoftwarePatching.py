@@ -64,6 +64,7 @@ class SoftwarePatching(Rule):
         self.statechglogger = statechglogger
         self.rulenumber = 7
         self.rulename = 'SoftwarePatching'
+        self.sharedresources = ['pkgdb']
         self.formatDetailedResults("initialize")
         self.mandatory = True
         self.sethelptext()
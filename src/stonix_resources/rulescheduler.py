@@ -0,0 +1,147 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Resource aware scheduler used by the controller to run rule methods
+concurrently. Rules declare the shared system resources that they touch via
+Rule.getsharedresources() (e.g. 'files', 'pkgdb', 'servicemgr'). Two rules
+which declare a common resource are never run at the same time. A rule that
+declares the 'exclusive' resource is always run by itself.
+
+The work done by rule report methods is dominated by waiting on subprocesses
+and disk I/O so a thread pool is used. Rule instances hold references to the
+logger, environment and state change logger which cannot be shared with
+worker processes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from stonix_resources.logdispatcher import LogPriority
+
+EXCLUSIVE = 'exclusive'
+
+
+class RuleScheduler(object):
+    """Run a method across a list of rules on a pool of worker threads while
+    honoring the shared resources declared by each rule.
+
+    :param logger: LogDispatcher instance
+    :param jobs: int; maximum number of rules to run at the same time
+
+    """
+
+    def __init__(self, logger, jobs=1):
+        self.logger = logger
+        try:
+            self.jobs = max(1, int(jobs))
+        except (TypeError, ValueError):
+            self.jobs = 1
+
+    def getjobs(self):
+        """return the maximum number of concurrently running rules
+
+        :return: self.jobs
+        :rtype: int
+        """
+
+        return self.jobs
+
+    def getresources(self, rule):
+        """return the set of shared resources declared by the given rule
+
+        :param rule: Rule instance
+        :return: resources
+        :rtype: set
+        """
+
+        resources = set()
+        try:
+            resources = set(rule.getsharedresources())
+        except AttributeError:
+            pass
+        return resources
+
+    def canstart(self, resources, busy, running):
+        """return True if a rule declaring the given resources may be started
+        while the resources in busy are held by the running rules
+
+        :param resources: set; resources declared by the candidate rule
+        :param busy: set; resources held by running rules
+        :param running: int; number of rules currently running
+        :return: bool
+        """
+
+        if running >= self.jobs:
+            return False
+        if EXCLUSIVE in busy:
+            return False
+        if EXCLUSIVE in resources and running:
+            return False
+        if resources & busy:
+            return False
+        return True
+
+    def run(self, rules, action, callback=None):
+        """Call action(rule) for every rule in rules. Rules are started in the
+        order they are given whenever their resources are free. callback(rule,
+        error) is called from the calling thread as each rule completes, error
+        is None when action returned normally.
+
+        :param rules: list of Rule instances
+        :param action: callable taking a single rule argument
+        :param callback: callable taking a rule and an exception or None
+            (Default value = None)
+
+        """
+
+        pending = list(rules)
+        running = {}
+        busy = set()
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for rule in list(pending):
+                    resources = self.getresources(rule)
+                    if not self.canstart(resources, busy, len(running)):
+                        if EXCLUSIVE in resources:
+                            # do not let later rules starve an exclusive one
+                            break
+                        continue
+                    pending.remove(rule)
+                    busy |= resources
+                    future = pool.submit(action, rule)
+                    running[future] = (rule, resources)
+
+                done, _ = wait(list(running.keys()),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    rule, resources = running.pop(future)
+                    busy -= resources
+                    error = future.exception()
+                    if isinstance(error, (KeyboardInterrupt, SystemExit)):
+                        for other in running:
+                            other.cancel()
+                        raise error
+                    if error is not None:
+                        self.logger.log(LogPriority.DEBUG,
+                                        ['RuleScheduler', 'Rule ' +
+                                         str(rule.getrulename()) +
+                                         ' raised: ' + str(error)])
+                    if callback:
+                        callback(rule, error)
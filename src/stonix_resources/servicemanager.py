@@ -0,0 +1,250 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide registry of the service management programs found on this
+system. The probing of the file system for chkconfig, rc-update, update-rc.d,
+systemctl, svcadm, rc.conf and launchd and the construction of the matching
+SH* backend helpers used to be done by every ServiceHelper constructor. It is
+now done once by the first ServiceHelper; later ServiceHelper instances share
+the same backend instances, and with them any state the backends cache (such
+as the systemd unit state snapshot).
+
+The backends hold a single CommandHelper each, so ServiceHelper serializes
+its calls into them with ServiceManagers.lock.
+"""
+
+import os
+import re
+import threading
+
+from stonix_resources import SHchkconfig
+from stonix_resources import SHrcupdate
+from stonix_resources import SHupdaterc
+from stonix_resources import SHsystemctl
+from stonix_resources import SHsvcadm
+from stonix_resources import SHrcconf
+from stonix_resources import SHlaunchd
+from stonix_resources import SHlaunchdTwo
+
+from stonix_resources.logdispatcher import LogPriority
+from stonix_resources.get_libc import getLibc
+
+
+class ServiceManagers(object):
+    """The service management backends detected on this system
+
+    :param environ: environment object reference
+    :param logger: logdispatcher object reference
+
+    """
+
+    def __init__(self, environ, logger):
+        self.environ = environ
+        self.logdispatcher = logger
+        self.isHybrid = False
+        self.isdualparameterservice = False
+        self.svchelper = None
+        self.secondary = None
+        self.lock = threading.RLock()
+
+        try:
+            self.lc = getLibc()
+        except Exception as err:
+            self.logdispatcher.log(LogPriority.ERROR, str(err))
+            raise
+
+        systemctl_paths = ["/usr/bin/systemctl", "/bin/systemctl"]
+
+        # Red Hat, CentOS, SUSE
+        foundchkconfig = os.path.exists('/sbin/chkconfig')
+        foundservice = os.path.exists('/sbin/service') or \
+                       os.path.exists('/usr/sbin/service')
+        if foundchkconfig and foundservice:
+            ischkconfig = True
+        else:
+            ischkconfig = False
+
+        # Gentoo
+        if os.path.exists('/sbin/rc-update'):
+            isrcupdate = True
+        else:
+            isrcupdate = False
+        # Ubuntu, Debian
+        if os.path.exists('/usr/sbin/update-rc.d'):
+            isupdaterc = True
+        else:
+            isupdaterc = False
+        # Fedora, RHEL 7
+        if any(os.path.exists(p) for p in systemctl_paths):
+            issystemctl = True
+        else:
+            issystemctl = False
+        # Solaris
+        if os.path.exists('/usr/sbin/svcadm'):
+            issvcadm = True
+        else:
+            issvcadm = False
+        # FreeBSD
+        if os.path.exists('/etc/rc.conf') and \
+        os.path.exists('/etc/rc.d/LOGIN'):
+            isrcconf = True
+        else:
+            isrcconf = False
+        # OS X
+        if os.path.exists('/sbin/launchd'):
+            islaunchd = True
+            self.isdualparameterservice = True
+        else:
+            islaunchd = False
+
+        truecount = 0
+        for svctype in [ischkconfig, isrcupdate, isupdaterc,
+                        issystemctl, issvcadm, isrcconf, islaunchd]:
+            if svctype:
+                truecount += 1
+        if truecount == 0:
+            raise RuntimeError("Could not identify service management programs")
+        elif truecount == 1:
+            if ischkconfig:
+                self.svchelper = SHchkconfig.SHchkconfig(self.environ,
+                                                         self.logdispatcher)
+            elif isrcupdate:
+                self.svchelper = SHrcupdate.SHrcupdate(self.environ,
+                                                       self.logdispatcher)
+            elif isupdaterc:
+                self.svchelper = SHupdaterc.SHupdaterc(self.environ,
+                                                       self.logdispatcher)
+            elif issystemctl:
+                self.svchelper = SHsystemctl.SHsystemctl(self.environ,
+                                                         self.logdispatcher)
+            elif issvcadm:
+                self.svchelper = SHsvcadm.SHsvcadm(self.environ,
+                                                   self.logdispatcher)
+            elif isrcconf:
+                self.svchelper = SHrcconf.SHrcconf(self.environ,
+                                                   self.logdispatcher)
+            elif islaunchd:
+                if re.match("10.11", self.environ.getosver()):
+                    self.svchelper = SHlaunchd.SHlaunchd(self.environ,
+                                                     self.logdispatcher)
+                else:
+                    self.svchelper = SHlaunchdTwo.SHlaunchdTwo(self.environ,
+                                                     self.logdispatcher)
+            else:
+                raise RuntimeError("Could not identify service management programs")
+        elif truecount > 1:
+            self.isHybrid = True
+            count = 0
+            if issystemctl:
+                self.svchelper = SHsystemctl.SHsystemctl(self.environ,
+                                                         self.logdispatcher)
+                count = 1
+            if ischkconfig:
+                if count == 0:
+                    self.svchelper = SHchkconfig.SHchkconfig(self.environ,
+                                                             self.logdispatcher)
+                    count = 1
+                elif count == 1:
+                    self.secondary = SHchkconfig.SHchkconfig(self.environ,
+                                                             self.logdispatcher)
+            if isrcupdate:
+                if count == 0:
+                    self.svchelper = SHrcupdate.SHrcupdate(self.environ,
+                                                           self.logdispatcher)
+                    count = 1
+                elif count == 1:
+                    self.secondary = SHrcupdate.SHrcupdate(self.environ,
+                                                           self.logdispatcher)
+            if isupdaterc:
+                if count == 0:
+                    self.svchelper = SHupdaterc.SHupdaterc(self.environ,
+                                                           self.logdispatcher)
+                    count = 1
+                elif count == 1:
+                    self.secondary = SHupdaterc.SHupdaterc(self.environ,
+                                                           self.logdispatcher)
+            if issvcadm:
+                if count == 0:
+                    self.svchelper = SHsvcadm.SHsvcadm(self.environ,
+                                                       self.logdispatcher)
+                    count = 1
+                elif count == 1:
+                    self.secondary = SHsvcadm.SHsvcadm(self.environ,
+                                                       self.logdispatcher)
+            if isrcconf:
+                if count == 0:
+                    self.svchelper = SHrcconf.SHrcconf(self.environ,
+                                                       self.logdispatcher)
+                    count = 1
+                elif count == 1:
+                    self.secondary = SHrcconf.SHrcconf(self.environ,
+                                                       self.logdispatcher)
+            if islaunchd:
+                self.svchelper = SHlaunchd.SHlaunchd(self.environ,
+                                                     self.logdispatcher)
+                count = 1
+
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'ischkconfig: ' + str(ischkconfig))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'isrcupdate: ' + str(isrcupdate))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'isupdaterc: ' + str(isupdaterc))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'issystemctl: ' + str(issystemctl))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'issvcadm: ' + str(issvcadm))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'isrcconf: ' + str(isrcconf))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'ishybrid: ' + str(self.isHybrid))
+        self.logdispatcher.log(LogPriority.DEBUG,
+                               'isdualparameterservice: ' +
+                               str(self.isdualparameterservice))
+
+
+_managers = None
+_managerslock = threading.Lock()
+
+
+def getservicemanagers(environ, logger):
+    """Return the service management backends of this system, detecting them
+    on the first call
+
+    :param environ: environment object reference
+    :param logger: logdispatcher object reference
+    :return: managers
+    :rtype: ServiceManagers
+    """
+
+    global _managers
+    with _managerslock:
+        if _managers is None:
+            _managers = ServiceManagers(environ, logger)
+        return _managers
+
+
+def resetservicemanagers():
+    """Forget the detected backends so that the next ServiceHelper probes
+    again, e.g. after a service management package has been installed"""
+
+    global _managers
+    with _managerslock:
+        _managers = None
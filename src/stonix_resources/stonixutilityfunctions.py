@@ -78,6 +78,8 @@ from types import *
 from distutils.version import LooseVersion
 from subprocess import call, Popen, PIPE, STDOUT
 from stonix_resources.logdispatcher import LogPriority
+from stonix_resources import filecache
+from stonix_resources import resultcache
 
 
 def resetsecon(filename):
@@ -633,20 +635,20 @@ def readFile(filepath, logger):
          into the try block
 @change: Breen Malmberg - 7/12/2017 - minor doc string edit
 @change: bgonz12 - 2018/1/18 - added handling for 'filepath' not existing
+@change: 2026/10/16 - read through the shared file cache
 
     '''
     
     contents = []
 
     if not os.path.exists(filepath):
+        resultcache.recordpath(filepath)
         detailedresults = "Unable to open specified file: " + filepath + \
             ". File does not exist."
         logger.log(LogPriority.DEBUG, detailedresults)
     else:
         try:
-            f = open(filepath, 'r')
-            contents = f.readlines()
-            f.close()
+            contents = list(filecache.readlines(filepath))
         except IOError:
             debug = "Unable to open the specified file: " + \
                 filepath + ". " + traceback.format_exc()
@@ -665,14 +667,13 @@ def readFileString(filepath, logger):
     '''
     contents = ""
     if not os.path.exists(filepath):
+        resultcache.recordpath(filepath)
         detailedresults = "Unable to open specified file: " + filepath + \
             ". File does not exist."
         logger.log(LogPriority.DEBUG, detailedresults)
     else:
         try:
-            f = open(filepath, 'r')
-            contents = f.read()
-            f.close()
+            contents = "".join(filecache.readlines(filepath))
         except IOError:
             debug = "Unable to open the specified file: " + \
                 filepath + ". " + traceback.format_exc()
@@ -695,6 +696,7 @@ def writeFile(tmpfile, contents, logger):
         list and string type contents parameter; no change needed
         to implementation in rules
 @change: Breen Malmberg - 7/12/2017 - minor doc string edit
+@change: 2026/10/16 - drop the file from the shared file cache
 
     """
 
@@ -728,6 +730,7 @@ def writeFile(tmpfile, contents, logger):
                 success = False
                 logger.log(LogPriority.DEBUG, "Given contents was niether a string, nor a list! Could not write to file " + str(tmpfile))
             w.close()
+            filecache.invalidate(tmpfile)
 
     except Exception:
         raise
@@ -848,6 +851,7 @@ def checkPerms(path, perm, logger):
             if not v:
                 logger.log(LogPriority.DEBUG, "Specified parameter: " + str(v) + " was blank or None!\n")
 
+        resultcache.recordpath(path)
         statdata = os.stat(path)
         owner = statdata.st_uid
         group = statdata.st_gid
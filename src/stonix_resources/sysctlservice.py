@@ -0,0 +1,343 @@
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+"""
+Created on 2026/10/16
+
+Process wide view of the kernel tunables for the rules that manage sysctl
+settings (SecureIPV4, SecureIPV6, DisableIPV6, NoCoreDumps, ExecShield,
+RestrictAccessToKernelMessageBuffer). Those rules used to run
+'/sbin/sysctl <key>' once per key to read a value and 'sysctl -w' once per
+key to change one.
+
+SysctlService reads the runtime values straight from /proc/sys. Reading a
+file there costs far less than starting sysctl, so the values are read again
+on every call and changes made outside of STONIX are always seen. Changes
+are written to /proc/sys without starting a process, and the configuration
+files are loaded again with a single 'sysctl -p' at the end of a fix. Where
+there is no /proc/sys the sysctl command is used instead; the values it
+reports are kept until they are changed through the service or reload() is
+called, and all changed keys are set with one 'sysctl -w' call.
+
+getconfig() merges /etc/sysctl.d/*.conf, the other sysctl.d directories and
+/etc/sysctl.conf in the order 'sysctl --system' applies them, so the rules
+can tell which file sets the value that is loaded at boot.
+"""
+
+import os
+import threading
+
+from stonix_resources import filecache
+from stonix_resources import resultcache
+from stonix_resources.CommandHelper import CommandHelper
+from stonix_resources.logdispatcher import LogPriority
+
+PROCSYS = "/proc/sys"
+SYSCTLCONF = "/etc/sysctl.conf"
+# in order of precedence, a file masks files of the same name in the
+# directories after it
+SYSCTLDIRS = ["/etc/sysctl.d", "/run/sysctl.d", "/usr/local/lib/sysctl.d",
+              "/usr/lib/sysctl.d", "/lib/sysctl.d"]
+SYSCTLCMDS = ["/sbin/sysctl", "/usr/sbin/sysctl"]
+
+
+def normalize(value):
+    """Return a sysctl value in the form used for comparisons. Values with
+    several fields are separated by tabs in /proc/sys and by spaces in the
+    configuration files.
+
+    :param value: value as read or configured
+    :return: fields of the value separated by single spaces
+    :rtype: str
+    """
+
+    return " ".join(str(value).split())
+
+
+class SysctlService(object):
+    """Runtime values and configuration of the kernel tunables
+
+    :param logger: logdispatcher object reference
+    :param procsys: path of the sysctl tree (Default value = "/proc/sys")
+    :param sysctlconf: path of sysctl.conf (Default value = "/etc/sysctl.conf")
+    :param sysctldirs: sysctl.d directories in order of precedence
+        (Default value = SYSCTLDIRS)
+
+    """
+
+    def __init__(self, logger, procsys=PROCSYS, sysctlconf=SYSCTLCONF,
+                 sysctldirs=None):
+        self.logger = logger
+        self.procsys = procsys
+        self.sysctlconf = sysctlconf
+        if sysctldirs is None:
+            sysctldirs = SYSCTLDIRS
+        self.sysctldirs = sysctldirs
+        self.sysctl = ""
+        for path in SYSCTLCMDS:
+            if os.path.exists(path):
+                self.sysctl = path
+                break
+        self.lock = threading.RLock()
+        # key -> normalized runtime value, None for keys that do not exist,
+        # only used when the values are read with the sysctl command
+        self.values = {}
+        self.sources = None
+        self.config = {}
+        self.reads = 0
+        self.commands = 0
+
+    def __path(self, key):
+        """Return the /proc/sys path of a key given in dotted or in path
+        form
+        """
+
+        if "/" in key:
+            return os.path.join(self.procsys, key.strip("/"))
+        return os.path.join(self.procsys, key.replace(".", "/"))
+
+    def __run(self, command):
+        """Run a sysctl command, return the CommandHelper or None if it
+        failed
+        """
+
+        self.commands += 1
+        ch = CommandHelper(self.logger)
+        if not ch.executeCommand(command) or ch.getReturnCode() != 0:
+            self.logger.log(LogPriority.DEBUG, "Command " + str(command) +
+                            " failed: " + str(ch.getErrorString()))
+            return None
+        return ch
+
+    def __read(self, key):
+        """Read the runtime value of a key without using the snapshot"""
+
+        if os.path.isdir(self.procsys):
+            self.reads += 1
+            resultcache.recordpath(self.__path(key))
+            try:
+                with open(self.__path(key), "r") as f:
+                    return normalize(f.read())
+            except (IOError, OSError):
+                return None
+        if not self.sysctl:
+            return None
+        ch = self.__run([self.sysctl, "-n", key])
+        if ch is None:
+            return None
+        return normalize(ch.getOutputString())
+
+    def getvalue(self, key):
+        """Return the runtime value of a kernel tunable
+
+        :param key: name of the tunable, e.g. net.ipv4.ip_forward
+        :return: value with fields separated by single spaces, None if the
+            tunable does not exist or can not be read
+        :rtype: str
+        """
+
+        if os.path.isdir(self.procsys):
+            return self.__read(key)
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = self.__read(key)
+            return self.values[key]
+
+    def getvalues(self, keys):
+        """Return the runtime values of several kernel tunables
+
+        :param keys: names of the tunables
+        :return: dict of name to value, see getvalue
+        :rtype: dict
+        """
+
+        return dict((key, self.getvalue(key)) for key in keys)
+
+    def checkvalues(self, wanted):
+        """Compare the runtime values of kernel tunables with the values a
+        rule requires
+
+        :param wanted: dict of name to required value
+        :return: (dict of name to current value of the tunables that differ,
+            list of the tunables that do not exist on this system)
+        :rtype: tuple
+        """
+
+        wrong = {}
+        unknown = []
+        for key, value in self.getvalues(wanted).items():
+            if value is None:
+                unknown.append(key)
+            elif value != normalize(wanted[key]):
+                wrong[key] = value
+        return wrong, unknown
+
+    def setvalues(self, wanted):
+        """Set the runtime values of kernel tunables. Tunables which already
+        have the wanted value and tunables which do not exist on this system
+        are left alone.
+
+        :param wanted: dict of name to value
+        :return: (dict of name to previous value of the tunables that were
+            changed, list of the tunables that could not be changed)
+        :rtype: tuple
+        """
+
+        changed = {}
+        failed = []
+        with self.lock:
+            wrong, _ = self.checkvalues(wanted)
+            if not wrong:
+                return changed, failed
+            if os.path.isdir(self.procsys):
+                for key in wrong:
+                    try:
+                        with open(self.__path(key), "w") as f:
+                            f.write(str(wanted[key]) + "\n")
+                        changed[key] = wrong[key]
+                    except (IOError, OSError) as err:
+                        self.logger.log(LogPriority.DEBUG, "Unable to set " +
+                                        key + ": " + str(err))
+                        failed.append(key)
+            else:
+                settings = [key + "=" + str(wanted[key]) for key in wrong]
+                if self.sysctl and self.__run([self.sysctl, "-w"] + settings):
+                    changed = wrong
+                else:
+                    failed = list(wrong)
+                for key in wrong:
+                    self.values.pop(key, None)
+        return changed, failed
+
+    def reload(self):
+        """Load the settings of sysctl.conf into the kernel with one
+        'sysctl -p', ignoring unknown keys, and forget the runtime values
+        read with the sysctl command so far
+
+        :return: success
+        :rtype: bool
+        """
+
+        with self.lock:
+            self.values = {}
+            if not self.sysctl:
+                return False
+            return self.__run([self.sysctl, "-q", "-e", "-p"]) is not None
+
+    def getfiles(self):
+        """Return the sysctl configuration files in the order they are
+        applied, later files overriding earlier ones
+
+        :return: paths
+        :rtype: list
+        """
+
+        byname = {}
+        for directory in self.sysctldirs:
+            resultcache.recordpath(directory)
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                if name.endswith(".conf") and name not in byname:
+                    byname[name] = os.path.join(directory, name)
+        files = [byname[name] for name in sorted(byname)]
+        resultcache.recordpath(self.sysctlconf)
+        if os.path.exists(self.sysctlconf):
+            files.append(self.sysctlconf)
+        return files
+
+    def getconfig(self):
+        """Return the merged settings of all sysctl configuration files
+
+        :return: dict of name to (value, path of the file that sets it)
+        :rtype: dict
+        """
+
+        sources = []
+        for path in self.getfiles():
+            try:
+                sources.append((path, filecache.readlines(path)))
+            except (IOError, OSError):
+                continue
+        with self.lock:
+            if sources == self.sources:
+                return self.config
+            config = {}
+            for path, lines in sources:
+                for line in lines:
+                    line = line.strip()
+                    if not line or line[0] in "#;" or "=" not in line:
+                        continue
+                    key, value = line.split("=", 1)
+                    # a leading - only tells sysctl to ignore errors
+                    key = key.strip().lstrip("-").replace("/", ".")
+                    config[key] = (normalize(value), path)
+            self.sources = sources
+            self.config = config
+            return config
+
+    def getconfigured(self, key):
+        """Return the value a kernel tunable is set to at boot
+
+        :param key: name of the tunable
+        :return: (value, path of the file that sets it), (None, None) if no
+            file sets it
+        :rtype: tuple
+        """
+
+        return self.getconfig().get(key, (None, None))
+
+    def describe(self, key):
+        """Return a short description of where the boot time value of a
+        tunable comes from, for the detailed results of a rule
+
+        :param key: name of the tunable
+        :return: description
+        :rtype: str
+        """
+
+        value, path = self.getconfigured(key)
+        if path is None:
+            return key + " is not set in any sysctl configuration file"
+        return key + " is set to " + value + " in " + path
+
+    def invalidate(self):
+        """Forget the runtime values read with the sysctl command so far"""
+
+        with self.lock:
+            self.values = {}
+
+
+_sysctlservice = None
+_sysctlservicelock = threading.Lock()
+
+
+def getsysctlservice(logger):
+    """Return the process wide sysctl service
+
+    :param logger: logdispatcher object reference
+    :return: sysctl service
+    :rtype: SysctlService
+    """
+
+    global _sysctlservice
+    with _sysctlservicelock:
+        if _sysctlservice is None:
+            _sysctlservice = SysctlService(logger)
+        return _sysctlservice
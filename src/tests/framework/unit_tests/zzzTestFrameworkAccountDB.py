@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Created on 2026/10/16
+
+Unit tests for the shared local account database.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.accountdb import AccountDatabase
+
+PASSWD = """root:x:0:0:root:/root:/bin/bash
+daemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin
+# a comment
+
+alice:x:1000:1000:Alice:/home/alice:/bin/bash
+bob:x:1001:100:Bob:/home/bob:/bin/zsh
+toor:x:0:0:root:/root:/bin/sh
+broken:x:notanumber:1:Broken:/tmp:/bin/sh
++@netgroup::::::
+nobody:x:65534:65534:nobody:/nonexistent:/usr/sbin/nologin
+"""
+
+GROUP = """root:x:0:
+daemon:x:1:
+users:x:100:alice,bob
+alice:x:1000:
+"""
+
+SHADOW = """root:$6$abc:19000:0:99999:7:::
+alice::19000:0:99999:7:::
+bob:!:19000
+"""
+
+LOGINDEFS = """# login.defs
+UID_MIN                  1000
+UID_MAX                 60000
+"""
+
+
+class zzzTestFrameworkAccountDB(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create account files in a temporary directory'''
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.paths = {}
+        for name, contents in [("passwd", PASSWD), ("group", GROUP),
+                               ("shadow", SHADOW),
+                               ("logindefs", LOGINDEFS)]:
+            self.paths[name] = os.path.join(self.tmpdir, name)
+            self.write(name, contents)
+        self.db = AccountDatabase(None, **self.paths)
+
+    def tearDown(self):
+        '''remove the temporary directory'''
+
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, contents):
+        '''write the contents of one of the account files'''
+
+        with open(self.paths[name], "w") as f:
+            f.write(contents)
+
+    def testUsers(self):
+        '''test the passwd indexes'''
+
+        names = [user.name for user in self.db.getusers()]
+        self.assertEqual(names, ["root", "daemon", "alice", "bob", "toor",
+                                 "nobody"])
+        alice = self.db.getuser("alice")
+        self.assertEqual((alice.uid, alice.gid, alice.home, alice.shell),
+                         (1000, 1000, "/home/alice", "/bin/bash"))
+        self.assertIsNone(self.db.getuser("broken"))
+        self.assertEqual([user.name for user in self.db.getusersbyuid(0)],
+                         ["root", "toor"])
+        self.assertEqual([user.name for user in
+                          self.db.getusersbyhome("/root")], ["root", "toor"])
+        self.assertEqual(self.db.getusersbyuid(4242), [])
+
+    def testGroupsAndShadow(self):
+        '''test the group and shadow indexes'''
+
+        self.assertEqual(self.db.getgroup("users").members, ["alice", "bob"])
+        self.assertEqual(self.db.getgroup("alice").members, [])
+        self.assertEqual(self.db.getgroupsbygid(100)[0].name, "users")
+        self.assertEqual(self.db.getgroupsbygid(65534), [])
+        self.assertEqual(self.db.getshadow("alice").passwd, "")
+        self.assertEqual(self.db.getshadow("bob").passwd, "!")
+        self.assertEqual(self.db.getshadow("bob").maxage, "")
+        self.assertIsNone(self.db.getshadow("daemon"))
+
+    def testClassification(self):
+        '''test telling regular users from system accounts'''
+
+        self.assertEqual(self.db.getuidrange(), (1000, 60000))
+        self.assertEqual([user.name for user in self.db.getregularusers()],
+                         ["alice", "bob"])
+        self.assertEqual([user.name for user in self.db.getsystemusers()],
+                         ["root", "daemon", "toor"])
+        os.remove(self.paths["logindefs"])
+        self.assertEqual(self.db.getuidrange(), (500, 60000))
+
+    def testReload(self):
+        '''test that the indexes follow changes of the files'''
+
+        self.assertIsNotNone(self.db.getuser("toor"))
+        users = self.db.users
+        self.db.getusers()
+        self.assertIs(self.db.users, users,
+                      "passwd was indexed again although it did not change")
+        self.write("passwd", PASSWD.replace("toor:", "toor2:"))
+        self.assertIsNone(self.db.getuser("toor"))
+        self.assertIsNotNone(self.db.getuser("toor2"))
+        os.remove(self.paths["shadow"])
+        self.assertEqual(self.db.getshadows(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
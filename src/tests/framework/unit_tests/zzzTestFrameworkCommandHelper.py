@@ -40,6 +40,7 @@ Perform tests on different parts of the functionality for framework CommandHelpe
 
 import unittest
 import sys
+import time
 
 sys.path.append("../../../..")
 from src.tests.lib.logdispatcher_lite import LogPriority
@@ -91,6 +92,56 @@ class zzzTestFrameworkCommandHelper(unittest.TestCase):
         self.assertTrue(self.commandhelper.executeCommand(["ls", "-l", "/"]),
                         "Execute commandhelper.executeCommand(['ls','-l','/'])"
                         + " Command List Failed!")
+    def testCommandTimeout(self):
+        ''' '''
+
+        self.assertTrue(self.commandhelper.setTimeout(1))
+        starttime = time.time()
+        self.assertFalse(self.commandhelper.executeCommand("echo partial; sleep 30 | cat; echo never"),
+                         "Command exceeding timeout did not fail!")
+        self.assertTrue(time.time() - starttime < 10,
+                        "Timed out command was not killed!")
+        self.assertTrue(self.commandhelper.getTimedOut())
+        self.assertEqual(self.commandhelper.getReturnCode(), -1)
+        self.assertEqual(self.commandhelper.getOutput(), ["partial"],
+                         "Partial output was not collected after timeout!")
+
+    def testCommandMetrics(self):
+        ''' '''
+
+        self.assertTrue(self.commandhelper.executeCommand(["sleep", "0.2"]))
+        self.assertTrue(self.commandhelper.getWallTime() >= 0.2)
+        self.assertTrue(self.commandhelper.getCpuTime() >= 0)
+        self.assertFalse(self.commandhelper.getTimedOut())
+        self.assertFalse(self.commandhelper.setTimeout(-1))
+
+    def testExecuteCommandStream(self):
+        ''' '''
+
+        lines = []
+        self.assertTrue(self.commandhelper.executeCommandStream(
+            "echo one; echo two; echo oops >&2; exit 1", lines.append))
+        self.assertEqual(lines, ["one", "two"])
+        self.assertEqual(self.commandhelper.getReturnCode(), 1)
+        self.assertEqual(self.commandhelper.getError(), ["oops"])
+        # standard output was handed to the handler, not collected
+        self.assertEqual(self.commandhelper.getOutput(), [])
+        self.assertEqual(self.commandhelper.getErrorOutput(), ["oops"])
+
+    def testExecuteCommandStreamTimeout(self):
+        ''' '''
+
+        lines = []
+        self.assertTrue(self.commandhelper.setTimeout(1))
+        starttime = time.time()
+        self.assertFalse(self.commandhelper.executeCommandStream(
+            "echo partial; sleep 30 | cat; echo never", lines.append),
+            "Streamed command exceeding timeout did not fail!")
+        self.assertTrue(time.time() - starttime < 10,
+                        "Timed out streamed command was not killed!")
+        self.assertTrue(self.commandhelper.getTimedOut())
+        self.assertEqual(self.commandhelper.getReturnCode(), -1)
+        self.assertEqual(lines, ["partial"])
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the batched, background error e-mail delivery in
+logdispatcher.py. A minimal SMTP server on the loopback interface stands in
+for the mail relay.
+'''
+
+import socket
+import socketserver
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.logdispatcher import ErrorReporter
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    '''Just enough of RFC 5321 for smtplib to deliver a message'''
+
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost ESMTP')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('ascii', 'replace').strip().upper()
+            if command.startswith('EHLO') or command.startswith('HELO'):
+                self.reply('250 localhost')
+            elif command.startswith('DATA'):
+                self.reply('354 go ahead')
+                data = []
+                while True:
+                    line = self.rfile.readline()
+                    if line in (b'.\r\n', b''):
+                        break
+                    data.append(line)
+                self.server.messages.append(
+                    b''.join(data).decode('utf-8', 'replace'))
+                self.reply('250 ok')
+            elif command.startswith('QUIT'):
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0),
+                                                 FakeSMTPHandler)
+        self.messages = []
+        self.connections = 0
+
+
+class zzzTestFrameworkErrorReporter(unittest.TestCase):
+
+    def setUp(self):
+        self.server = FakeSMTPServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.relay = '127.0.0.1:' + str(self.server.server_address[1])
+        self.debug = []
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reporter(self, relay=None, **kwargs):
+        if relay is None:
+            relay = self.relay
+        return ErrorReporter(relay, 'stonix@localhost', 'devs@localhost',
+                             'Sent by: testhost', self.debug.append,
+                             **kwargs)
+
+    def testDigest(self):
+        '''errors reported within one window are sent as a single message'''
+        reporter = self.reporter(window=60)
+        start = time.time()
+        for i in range(20):
+            reporter.report('rule' + str(i), 'error number ' + str(i))
+        self.assertTrue(time.time() - start < 1)
+        reporter.close(10)
+        self.assertEqual(len(self.server.messages), 1)
+        message = self.server.messages[0]
+        self.assertIn('20 errors', message)
+        self.assertEqual(message.count('Sent by: testhost'), 1)
+        for i in range(20):
+            self.assertIn('error number ' + str(i), message)
+
+    def testConnectionReused(self):
+        '''successive digests share one SMTP connection'''
+        reporter = self.reporter(window=0.1)
+        reporter.report('first', 'first error')
+        time.sleep(0.5)
+        reporter.report('second', 'second error')
+        reporter.close(10)
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 1)
+
+    def testQueueOverflow(self):
+        '''errors beyond the queue limit are counted, not queued'''
+        reporter = self.reporter(window=60, maxqueue=5)
+        for i in range(50):
+            reporter.report('rule', 'error ' + str(i))
+        reporter.close(10)
+        total = ''.join(self.server.messages)
+        self.assertIn('further errors were not sent', total)
+
+    def testRelayUnavailable(self):
+        '''an unreachable relay is tried once, later errors are dropped'''
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        reporter = self.reporter(relay='127.0.0.1:' + str(port), window=0,
+                                 timeout=2)
+        reporter.report('rule', 'first error')
+        start = time.time()
+        while not reporter.unavailable and time.time() - start < 5:
+            time.sleep(0.05)
+        self.assertTrue(reporter.unavailable)
+        start = time.time()
+        for i in range(100):
+            reporter.report('rule', 'error ' + str(i))
+        self.assertTrue(time.time() - start < 1)
+        reporter.close(5)
+        self.assertEqual(len(self.debug), 1)
+        self.assertIn('error contacting e-mail server', self.debug[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the fsindex.py incremental file system scan index.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.fsindex import FSIndex
+
+
+class zzzTestFrameworkFSIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.indexdir = os.path.join(self.tmpdir, 'fsindex')
+        self.scandir = os.path.join(self.tmpdir, 'scan')
+        os.mkdir(self.scandir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def testRoundTrip(self):
+        '''a saved directory is returned unchanged by a new index'''
+        index = FSIndex(self.indexdir, '/')
+        self.assertFalse(index.load())
+        dirstat = os.lstat(self.scandir)
+        files = {'bad': (0o100777, 0, 0, 0)}
+        index.setdir(self.scandir, dirstat, files)
+        index.save(fullscan=True)
+        self.assertEqual(os.stat(index.path).st_mode & 0o777, 0o600)
+
+        index = FSIndex(self.indexdir, '/')
+        self.assertTrue(index.load())
+        self.assertTrue(index.getfullscanage() < 60)
+        self.assertEqual(index.getdir(self.scandir, dirstat), files)
+        self.assertEqual(index.getfiles(),
+                         {os.path.join(self.scandir, 'bad'):
+                          (0o100777, 0, 0, 0)})
+
+    def testChangedDirectory(self):
+        '''a directory whose entries changed is not returned'''
+        index = FSIndex(self.indexdir, '/home')
+        index.setdir(self.scandir, os.lstat(self.scandir), {})
+        index.save()
+        self.assertEqual(index.fullscan, 0)
+        os.utime(self.scandir, ns=(0, 0))
+        index = FSIndex(self.indexdir, '/home')
+        index.load()
+        self.assertEqual(index.getdir(self.scandir,
+                                      os.lstat(self.scandir)), None)
+
+    def testOtherFilesystem(self):
+        '''an index is only loaded for the file system it describes'''
+        index = FSIndex(self.indexdir, '/data')
+        index.save()
+        other = FSIndex(self.indexdir, '/data')
+        other.filesystem = '/other'
+        self.assertFalse(other.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
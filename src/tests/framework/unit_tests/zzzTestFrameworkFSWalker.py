@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the fswalker.py shared file system walker.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources import fswalker
+from src.stonix_resources.fsindex import FSIndex
+from src.stonix_resources.fswalker import FSWalker, WorldWritable, SetID, \
+    GroupWritable, NonRootOwned, scanfilesystems
+
+
+class zzzTestFrameworkFSWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.top = os.path.join(self.tmpdir, 'top')
+        os.makedirs(os.path.join(self.top, 'sub'))
+        self.wwfile = os.path.join(self.top, 'sub', 'ww')
+        self.suidfile = os.path.join(self.top, 'suid')
+        self.wwdir = os.path.join(self.top, 'wwdir')
+        self.link = os.path.join(self.top, 'link')
+        for path in [self.wwfile, self.suidfile]:
+            open(path, 'w').close()
+        os.mkdir(self.wwdir)
+        os.chmod(self.wwfile, 0o666)
+        os.chmod(self.suidfile, 0o4755)
+        os.chmod(self.wwdir, 0o777)
+        os.symlink(self.wwfile, self.link)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def testVisitors(self):
+        '''each visitor collects its entries in a single walk'''
+        walker = FSWalker([WorldWritable(), SetID()])
+        flagged = walker.walk(self.top)
+        self.assertEqual(sorted(walker.getresults('ww')),
+                         sorted([self.wwfile, self.wwdir]))
+        self.assertEqual(walker.getresults('suid'), [self.suidfile])
+        self.assertEqual(flagged, {self.wwfile: set(['ww']),
+                                   self.suidfile: set(['suid'])})
+        self.assertFalse(self.link in walker.getresults('ww'))
+
+    def testOverlappingTrees(self):
+        '''directories are visited once even when the trees overlap'''
+        walker = FSWalker([GroupWritable(), NonRootOwned()], xdev=False)
+        os.chmod(self.wwfile, 0o664)
+        walker.walk(self.top)
+        walker.walk(os.path.join(self.top, 'sub'))
+        self.assertEqual(walker.getresults('gw').count(self.wwfile), 1)
+
+    def testLimit(self):
+        '''the walk stops once a visitor exceeds the limit'''
+        for num in range(5):
+            path = os.path.join(self.top, 'ww' + str(num))
+            open(path, 'w').close()
+            os.chmod(path, 0o666)
+        walker = FSWalker([WorldWritable()], limit=2)
+        walker.walk(self.top)
+        self.assertTrue(walker.overrun)
+        self.assertEqual(len(walker.getresults('ww')), 3)
+
+    def testIncremental(self):
+        '''unchanged directories only re-check recorded files and new
+        matches are reported'''
+        indexdir = os.path.join(self.tmpdir, 'index')
+        index = FSIndex(indexdir, '/')
+        FSWalker([WorldWritable(), SetID()]).walk(self.top, index)
+        index.save(fullscan=True)
+
+        os.chmod(self.suidfile, 0o755)
+        index = FSIndex(indexdir, '/')
+        index.load()
+        walker = FSWalker([WorldWritable(), SetID()])
+        flagged = walker.walk(self.top, index, True)
+        self.assertEqual(walker.getresults('suid'), [])
+        self.assertEqual(walker.newsince(index.getfiles(), flagged),
+                         {'ww': [], 'suid': []})
+
+        newfile = os.path.join(self.top, 'sub', 'new')
+        open(newfile, 'w').close()
+        os.chmod(newfile, 0o4777)
+        index.save()
+        index.load()
+        walker = FSWalker([WorldWritable(), SetID()])
+        flagged = walker.walk(self.top, index, True)
+        self.assertEqual(walker.newsince(index.getfiles(), flagged),
+                         {'ww': [newfile], 'suid': [newfile]})
+
+    def testScanFilesystems(self):
+        '''parallel scans return the same results in the given order'''
+        other = os.path.join(self.tmpdir, 'other')
+        os.mkdir(other)
+        otherfile = os.path.join(other, 'ww')
+        open(otherfile, 'w').close()
+        os.chmod(otherfile, 0o666)
+        indexdir = os.path.join(self.tmpdir, 'index')
+        serial = scanfilesystems([other, self.top],
+                                 [WorldWritable(), SetID()], indexdir, 1)
+        parallel = scanfilesystems([other, self.top],
+                                   [WorldWritable(), SetID()], indexdir, 1,
+                                   jobs=2)
+        self.assertEqual([scan['filesystem'] for scan in parallel],
+                         [other, self.top])
+        self.assertEqual([scan['results'] for scan in parallel],
+                         [scan['results'] for scan in serial])
+        self.assertEqual([scan['incremental'] for scan in parallel],
+                         [True, True])
+        self.assertEqual(parallel[0]['new'], {'ww': [], 'suid': []})
+
+    def testScanFilesystemsFrozen(self):
+        '''a frozen build scans serially instead of spawning workers'''
+        class NoProcesses(object):
+            def get_context(self, method):
+                raise AssertionError('worker processes started in a '
+                                     'frozen build')
+        other = os.path.join(self.tmpdir, 'other')
+        os.mkdir(other)
+        savedmultiprocessing = fswalker.multiprocessing
+        fswalker.multiprocessing = NoProcesses()
+        sys.frozen = True
+        try:
+            scans = scanfilesystems([other, self.top], [WorldWritable()],
+                                    jobs=2)
+        finally:
+            del sys.frozen
+            fswalker.multiprocessing = savedmultiprocessing
+        self.assertEqual([scan['filesystem'] for scan in scans],
+                         [other, self.top])
+        self.assertIn(self.wwfile, scans[1]['results']['ww'])
+
+
+if __name__ == "__main__":
+    unittest.main()
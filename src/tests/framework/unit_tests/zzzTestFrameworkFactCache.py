@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Created on 2026/10/16
+
+Unit tests for the host fact cache and the lazily determined host facts of
+Environment.
+'''
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.factcache import FactCache
+
+
+class zzzTestFrameworkFactCache(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create a temporary directory for the cache file'''
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "sub", "factcache.json")
+
+    def tearDown(self):
+        '''remove the temporary directory'''
+
+        shutil.rmtree(self.tmpdir)
+
+    def testPersistence(self):
+        '''test that facts survive in the file until their ttl expires'''
+
+        cache = FactCache(self.path, "boot1")
+        self.assertEqual(cache.get("osname", 60), (False, None))
+        cache.set("osname", "RHEL")
+        cache.set("unserializable", object())
+        self.assertEqual(oct(os.stat(self.path).st_mode & 0o777), "0o600")
+
+        cache = FactCache(self.path, "boot1")
+        self.assertEqual(cache.get("osname", 60), (True, "RHEL"))
+        self.assertEqual(cache.get("unserializable", 60), (False, None))
+        cache.facts["osname"]["time"] = time.time() - 120
+        self.assertEqual(cache.get("osname", 60), (False, None))
+
+    def testReboot(self):
+        '''test that a reboot discards the cache'''
+
+        FactCache(self.path, "boot1").set("systemtype", "systemd")
+        cache = FactCache(self.path, "boot2")
+        self.assertEqual(cache.get("systemtype", 3600), (False, None))
+        cache = FactCache(self.path, "")
+        self.assertEqual(cache.get("systemtype", 3600), (False, None))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        cache = FactCache(self.path, "boot1")
+        self.assertEqual(cache.get("systemtype", 3600), (False, None))
+
+    def testLazyEnvironment(self):
+        '''test that Environment determines host facts on first use and
+        takes them from the fact cache afterwards'''
+
+        environ = Environment()
+        environ.factcache = FactCache(self.path, "boot1")
+        self.assertNotIn("osname", environ.facts)
+        osname = environ.getosname()
+        self.assertIn("osname", environ.facts)
+        self.assertEqual(environ.factcache.get("osname", 60), (True, osname))
+        with open(self.path, "r") as f:
+            self.assertIn("osname", json.load(f)["facts"])
+
+        def fail():
+            raise AssertionError("fact was determined again")
+
+        environ = Environment()
+        environ.factcache = FactCache(self.path, "boot1")
+        environ.setosname = fail
+        self.assertEqual(environ.getosname(), osname)
+
+    def testSetterFailure(self):
+        '''test that a failing setter leaves the fact undetermined'''
+
+        environ = Environment()
+        environ.factcache = FactCache(self.path, "boot1")
+
+        def fail():
+            raise OSError("no network")
+
+        environ.sethostname = fail
+        self.assertRaises(OSError, environ.gethostname)
+        self.assertNotIn("hostname", environ.facts)
+        del environ.sethostname
+        self.assertTrue(environ.gethostname())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the filecache.py shared file content cache.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.filecache import FileCache
+
+
+class zzzTestFrameworkFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'test.conf')
+        self.write(self.path, 'a = 1\nb = 2\n')
+        self.cache = FileCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, text):
+        with open(path, 'w') as fh:
+            fh.write(text)
+        # move the mtime out of the racy window so the file can be cached
+        old = time.time() - 60
+        os.utime(path, (old, old))
+
+    def testHitAndMiss(self):
+        lines = self.cache.readlines(self.path)
+        self.assertEqual(lines, ('a = 1\n', 'b = 2\n'))
+        self.assertTrue(isinstance(lines, tuple))
+        self.assertTrue(self.cache.readlines(self.path) is lines)
+        stats = self.cache.getstats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def testReplacedFile(self):
+        self.cache.readlines(self.path)
+        tmppath = self.path + '.tmp'
+        self.write(tmppath, 'a = 3\nb = 2\n')
+        os.rename(tmppath, self.path)
+        self.assertEqual(self.cache.readlines(self.path),
+                         ('a = 3\n', 'b = 2\n'))
+        self.assertEqual(self.cache.getstats()['misses'], 2)
+
+    def testRacyFileNotCached(self):
+        with open(self.path, 'w') as fh:
+            fh.write('a = 1\n')
+        self.cache.readlines(self.path)
+        self.assertEqual(self.cache.getstats()['entries'], 0)
+
+    def testInvalidate(self):
+        self.cache.readlines(self.path)
+        self.cache.invalidate(self.path)
+        stats = self.cache.getstats()
+        self.assertEqual(stats['invalidations'], 1)
+        self.assertEqual(stats['entries'], 0)
+
+    def testMissingFile(self):
+        self.assertRaises(IOError, self.cache.readlines,
+                          os.path.join(self.tmpdir, 'missing'))
+
+    def testMaxEntries(self):
+        cache = FileCache(maxentries=2)
+        for i in range(4):
+            path = os.path.join(self.tmpdir, str(i))
+            self.write(path, str(i) + '\n')
+            cache.readlines(path)
+        self.assertEqual(cache.getstats()['entries'], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the helptext.py rule help text index.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.helptext import parsehelptext, gethelptext, \
+    getindexpath, INDEXNAME
+
+
+class zzzTestFrameworkHelpText(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.helpfile = os.path.join(self.tmpdir, 'stonix_helptext')
+        self.indexpath = os.path.join(self.tmpdir, 'state', INDEXNAME)
+        self.contents = '''<12>        "First line.
+
+Second line."
+
+<7>        "Rule seven."
+
+<12>        "Duplicate block."
+'''
+        with open(self.helpfile, 'w') as fh:
+            fh.write(self.contents)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def testParse(self):
+        index = parsehelptext(self.contents)
+        self.assertEqual(index, {'12': 'First line.\n\nSecond line',
+                                 '7': 'Rule seven'})
+
+    def testCachedAndInvalidated(self):
+        self.assertEqual(gethelptext(self.helpfile, 7, self.indexpath),
+                         'Rule seven')
+        self.assertTrue(os.path.exists(self.indexpath))
+        self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                         ['state', 'stonix_helptext'])
+        self.assertEqual(gethelptext(self.helpfile, 99, self.indexpath), '')
+        with open(self.helpfile, 'w') as fh:
+            fh.write('<7>        "Updated help text for rule seven."')
+        os.utime(self.helpfile, ns=(0, 0))
+        self.assertEqual(gethelptext(self.helpfile, '7', self.indexpath),
+                         'Updated help text for rule seven')
+
+    def testNoIndexPath(self):
+        self.assertEqual(gethelptext(self.helpfile, 7), 'Rule seven')
+        self.assertEqual(os.listdir(self.tmpdir), ['stonix_helptext'])
+
+    def testStateLocation(self):
+        environ = Environment()
+        self.assertEqual(os.path.dirname(getindexpath(environ)),
+                         '/var/db/stonix' if environ.geteuid() == 0
+                         else environ.get_log_path())
+
+    def testMissingFile(self):
+        self.assertEqual(gethelptext(os.path.join(self.tmpdir, 'none'), 7),
+                         '')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+'''
+Created on 2026/10/16
+
+Unit tests for the native host probes, run against a fake file system root.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources import hostprobe
+
+FIBTRIE = """Main:
+  +-- 0.0.0.0/0 3 0 5
+     |-- 0.0.0.0
+        /0 universe UNICAST
+     +-- 127.0.0.0/8 2 0 2
+        +-- 127.0.0.0/31 1 0 0
+           |-- 127.0.0.0
+              /8 host LOCAL
+           |-- 127.0.0.1
+              /32 host LOCAL
+     +-- 192.0.2.0/24 2 0 2
+           |-- 192.0.2.0
+              /24 link UNICAST
+           |-- 192.0.2.2
+              /32 host LOCAL
+        |-- 192.0.2.255
+           /32 link BROADCAST
+Local:
+  +-- 0.0.0.0/0 3 0 5
+           |-- 192.0.2.2
+              /32 host LOCAL
+"""
+
+ROUTE = """Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask
+eth0\t000200C0\t00000000\t0001\t0\t0\t0\t00FFFFFF
+eth0\t00000000\t010200C0\t0003\t0\t0\t0\t00000000
+"""
+
+
+class zzzTestFrameworkHostProbe(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create an empty fake file system root'''
+
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        '''remove the fake file system root'''
+
+        shutil.rmtree(self.root)
+
+    def write(self, path, contents):
+        '''write a file below the fake root'''
+
+        path = os.path.join(self.root, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(contents)
+
+    def testMissing(self):
+        '''test that every probe reports unavailable data as None'''
+
+        self.assertIsNone(hostprobe.initsystem(self.root))
+        self.assertEqual(hostprobe.osrelease(self.root), {})
+        self.assertIsNone(hostprobe.lsbrelease(self.root))
+        self.assertIsNone(hostprobe.macaddress(self.root))
+        self.assertIsNone(hostprobe.ipaddresses(self.root))
+        self.assertIsNone(hostprobe.defaultgateway(self.root))
+        self.assertIsNone(hostprobe.dmi("uuid", self.root))
+
+    def testInitSystem(self):
+        '''test reading the command of process 1'''
+
+        self.write("proc/1/comm", "systemd\n")
+        self.assertEqual(hostprobe.initsystem(self.root), "systemd")
+
+    def testOsRelease(self):
+        '''test that os-release is described as lsb_release would'''
+
+        self.write("usr/lib/os-release",
+                   '# comment\nNAME="Ubuntu"\nVERSION="22.04.3 LTS"\n'
+                   'VERSION_ID="22.04"\nPRETTY_NAME="Ubuntu 22.04.3 LTS"\n')
+        self.assertEqual(hostprobe.osrelease(self.root)["NAME"], "Ubuntu")
+        self.assertEqual(hostprobe.lsbrelease(self.root),
+                         ("Ubuntu 22.04.3 LTS", "22.04"))
+        self.write("etc/redhat-release",
+                   "Red Hat Enterprise Linux Server release 7.9 (Maipo)\n")
+        self.assertEqual(hostprobe.lsbrelease(self.root),
+                         ("Red Hat Enterprise Linux Server release 7.9 " +
+                          "(Maipo)", "7.9"))
+
+    def testMacAddress(self):
+        '''test that the first non zero address in ifindex order is used'''
+
+        ibaddress = "80:00:02:08:fe:80:00:00:00:00:00:00:00:02:c9:03:00:" + \
+            "1f:2b:61"
+        for iface, index, address in [("lo", 1, "00:00:00:00:00:00"),
+                                      ("wlan0", 3, "52:54:00:aa:bb:02"),
+                                      ("eth0", 2, "52:54:00:aa:bb:01"),
+                                      ("ib0", 4, ibaddress)]:
+            self.write("sys/class/net/%s/ifindex" % iface, "%d\n" % index)
+            self.write("sys/class/net/%s/address" % iface, address + "\n")
+        self.assertEqual(hostprobe.macaddress(self.root), "52:54:00:aa:bb:01")
+        shutil.rmtree(os.path.join(self.root, "sys/class/net/eth0"))
+        shutil.rmtree(os.path.join(self.root, "sys/class/net/wlan0"))
+        self.assertEqual(hostprobe.macaddress(self.root), hostprobe.NOMAC)
+
+    def testNetwork(self):
+        '''test the local addresses and the default gateway'''
+
+        self.write("proc/net/fib_trie", FIBTRIE)
+        self.write("proc/net/route", ROUTE)
+        self.assertEqual(hostprobe.ipaddresses(self.root),
+                         ["127.0.0.1", "192.0.2.2"])
+        self.assertEqual(hostprobe.defaultgateway(self.root), "192.0.2.1")
+        self.write("proc/net/route", ROUTE.splitlines()[0] + "\n")
+        self.assertEqual(hostprobe.defaultgateway(self.root), "")
+
+    def testDmi(self):
+        '''test reading DMI fields'''
+
+        self.write("sys/class/dmi/id/product_uuid",
+                   "4c4c4544-0042-3510-8052-b4c04f565931\n")
+        self.write("sys/class/dmi/id/sys_vendor", "\n")
+        self.write("sys/class/dmi/id/chassis_vendor", "Dell Inc.\n")
+        # the UUID matches the uppercase output of dmidecode
+        self.assertEqual(hostprobe.dmi("uuid", self.root),
+                         "4C4C4544-0042-3510-8052-B4C04F565931")
+        self.assertEqual(hostprobe.dmi("chassismanufacturer", self.root),
+                         "Dell Inc.")
+        self.assertIsNone(hostprobe.dmi("systemmanufacturer", self.root))
+
+    def testStats(self):
+        '''test that commands and native answers are counted'''
+
+        hostprobe.resetstats()
+        self.write("proc/1/comm", "init\n")
+        hostprobe.initsystem(self.root)
+        self.assertEqual(hostprobe.runcmd("echo one; echo two"),
+                         ["one\n", "two\n"])
+        stats = hostprobe.getstats()
+        self.assertEqual(stats["native"], 1)
+        self.assertEqual(stats["commands"], 1)
+        self.assertTrue(stats["commandtime"] > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
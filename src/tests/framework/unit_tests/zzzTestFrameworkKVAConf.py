@@ -74,6 +74,37 @@ class zzzTestFrameworkKVAConf(unittest.TestCase):
         self.assertTrue(self.editor.commit())
         self.assertTrue(self.editor.report())
 
+    def testDuplicateKeys(self):
+        open("/tmp/kvaconfUT", "w").write("# kernel.x = 1\n" +
+                                          "kernel.x = 1\n" +
+                                          "kernel.x = 1\n" +
+                                          "kernel_y = 0\n" +
+                                          "kernel.x = 0\n")
+        self.assertTrue(self.editor.setPath("/tmp/kvaconfUT"))
+        self.assertTrue(self.editor.setData({'kernel.x': '1'}))
+        self.assertFalse(self.editor.report())
+        self.assertTrue(self.editor.fix())
+        self.assertTrue(self.editor.commit())
+        self.assertEqual(open("/tmp/kvaconfUT").read(),
+                         "# kernel.x = 1\nkernel_y = 0\nkernel.x = 1\n")
+
+    def testSpaceRepeatable(self):
+        open("/tmp/kvaconfUT", "w").write("# blacklist usb\n" +
+                                          "blacklist  bluetooth\n" +
+                                          "options bluetooth x\n")
+        self.assertTrue(self.editor.setPath("/tmp/kvaconfUT"))
+        self.assertTrue(self.editor.setConfigType("space"))
+        self.assertTrue(self.editor.setData(
+            {"blacklist": ["bluetooth", "usb"], "options": "bluetooth y"}))
+        self.assertFalse(self.editor.report())
+        self.assertEqual(self.editor.fixables,
+                         {"blacklist": ["usb"], "options": "bluetooth y"})
+        self.assertTrue(self.editor.fix())
+        self.assertTrue(self.editor.commit())
+        self.assertEqual(open("/tmp/kvaconfUT").read(),
+                         "# blacklist usb\nblacklist  bluetooth\n" +
+                         "blacklist usb\noptions bluetooth y\n")
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+'''
+Created on 2026/10/16
+
+Unit tests for the shared modprobe policy, run against fake modprobe.d
+directories, a fake modprobe.conf and a fake /proc/modules.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.modprobepolicy import ModprobePolicy, \
+    adddirectives, modname
+
+
+class zzzTestFrameworkModprobePolicy(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create fake modprobe configuration trees'''
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.etcdir = os.path.join(self.tmpdir, "etc", "modprobe.d")
+        self.libdir = os.path.join(self.tmpdir, "usr", "lib", "modprobe.d")
+        self.conf = os.path.join(self.tmpdir, "etc", "modprobe.conf")
+        self.procmodules = os.path.join(self.tmpdir, "proc", "modules")
+        self.write(os.path.join(self.libdir, "10-dist.conf"),
+                   "install cramfs /bin/false\nblacklist uas\n")
+        self.write(os.path.join(self.libdir, "20-masked.conf"),
+                   "install dccp /bin/false\n")
+        self.write(os.path.join(self.etcdir, "20-masked.conf"),
+                   "# local override\ninstall dccp /bin/true\n")
+        self.write(os.path.join(self.etcdir, "30-usb.conf"),
+                   "blacklist usb-storage\n" +
+                   "install firewire-ohci \\\n    /bin/true\n" +
+                   "alias net-pf-42 sctp\n")
+        self.write(os.path.join(self.etcdir, "40-ignored.bak"),
+                   "blacklist bluetooth\n")
+        self.write(self.conf, "install cramfs /bin/true\n")
+        self.write(self.procmodules,
+                   "usb_storage 77824 0 - Live 0x0000000000000000\n" +
+                   "ext4 983040 2 - Live 0x0000000000000000\n")
+        self.logger = LogDispatcher(Environment())
+        self.policy = ModprobePolicy(self.logger, [self.etcdir, self.libdir],
+                                     self.conf, self.procmodules)
+
+    def tearDown(self):
+        '''remove the fake trees'''
+
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, contents):
+        '''write a file, creating its directory'''
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(contents)
+
+    def testFiles(self):
+        '''test that only .conf files are read and /etc masks /usr/lib'''
+
+        files = self.policy.getfiles()
+        self.assertEqual(files,
+                         [os.path.join(self.libdir, "10-dist.conf"),
+                          os.path.join(self.etcdir, "20-masked.conf"),
+                          os.path.join(self.etcdir, "30-usb.conf"),
+                          self.conf])
+
+    def testDirectives(self):
+        '''test install, blacklist and alias lookups'''
+
+        self.assertEqual(modname("usb-storage"), "usb_storage")
+        # the first install command read wins
+        self.assertEqual(self.policy.getinstall("cramfs"),
+                         ("/bin/false",
+                          os.path.join(self.libdir, "10-dist.conf")))
+        self.assertEqual(self.policy.getinstall("dccp")[0], "/bin/true")
+        self.assertEqual(self.policy.getinstall("firewire_ohci")[0],
+                         "/bin/true")
+        self.assertEqual(self.policy.getinstall("sctp"), (None, None))
+        self.assertTrue(self.policy.isblacklisted("usb_storage"))
+        self.assertTrue(self.policy.isblacklisted("uas"))
+        self.assertFalse(self.policy.isblacklisted("bluetooth"))
+        self.assertEqual(self.policy.getaliases("net-pf-42"), ["sctp"])
+        self.assertTrue(self.policy.hasdirective("blacklist usb-storage"))
+        self.assertTrue(
+            self.policy.hasdirective("install firewire-ohci /bin/true"))
+        self.assertFalse(self.policy.hasdirective("install cramfs /bin/true"))
+        self.assertFalse(self.policy.hasdirective("options uas quirks=1"))
+        # the files are only parsed again once one of them changes
+        self.assertEqual(self.policy.loads, 1)
+        self.write(os.path.join(self.etcdir, "50-new.conf"),
+                   "blacklist bluetooth\n")
+        self.assertTrue(self.policy.isblacklisted("bluetooth"))
+        self.assertEqual(self.policy.loads, 2)
+
+    def testLoaded(self):
+        '''test the loaded module lookups'''
+
+        self.assertTrue(self.policy.isloaded("usb-storage"))
+        self.assertFalse(self.policy.isloaded("uas"))
+        os.remove(self.procmodules)
+        self.assertIsNone(self.policy.getloaded())
+        self.assertFalse(self.policy.isloaded("usb_storage"))
+
+    def testAddDirectives(self):
+        '''test that only missing directives are added to a drop-in'''
+
+        path = os.path.join(self.etcdir, "stonix-test.conf")
+        self.assertTrue(adddirectives(path, ["blacklist bluetooth",
+                                             "blacklist btusb"], self.logger))
+        self.assertTrue(adddirectives(path, ["blacklist btusb",
+                                             "install dccp /bin/true"],
+                                      self.logger))
+        with open(path, "r") as f:
+            self.assertEqual(f.read(), "blacklist bluetooth\n" +
+                             "blacklist btusb\ninstall dccp /bin/true\n")
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        self.assertFalse(os.path.exists(path + ".tmp"))
+        self.assertTrue(self.policy.isblacklisted("btusb"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Created on 2026/10/16
+
+Unit tests for the installed package inventory used by Pkghelper. The bulk
+query is replaced by a small script printing canned package manager output so
+the tests do not depend on the package manager of the test host.
+'''
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.environment import Environment
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.pkginventory import PackageInventory
+
+RPMOUTPUT = "bash\t(none):5.1.8-6.el9\tx86_64\n" + \
+    "glibc\t(none):2.34-60.el9\tx86_64\n" + \
+    "glibc\t(none):2.34-60.el9\ti686\n" + \
+    "kernel\t(none):5.14.0-284.el9\tx86_64\n" + \
+    "kernel\t(none):5.14.0-362.el9\tx86_64\n" + \
+    "shim-x64\t1:15.6-1.el9\tx86_64\n"
+
+DPKGOUTPUT = "bash\t5.1-6ubuntu1\tamd64\tii \n" + \
+    "libc6\t2.35-0ubuntu3\tamd64\tii \n" + \
+    "telnet\t0.17-44\tamd64\trc \n" + \
+    "libstdc++6\t12.3.0-1ubuntu1\tamd64\tii \n"
+
+
+class zzzTestFrameworkPkgInventory(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''initialize and set class variables and objects'''
+
+        self.environ = Environment()
+        self.logger = LogDispatcher(self.environ)
+        self.tmpdir = tempfile.mkdtemp()
+        self.dbfile = os.path.join(self.tmpdir, "db")
+        with open(self.dbfile, "w") as f:
+            f.write("1")
+
+    def tearDown(self):
+        '''clean up temporary files'''
+
+        for name in os.listdir(self.tmpdir):
+            os.remove(os.path.join(self.tmpdir, name))
+        os.rmdir(self.tmpdir)
+
+    def makeInventory(self, manager, output):
+        '''return an inventory whose bulk query prints output'''
+
+        outfile = os.path.join(self.tmpdir, "output")
+        with open(outfile, "w") as f:
+            f.write(output)
+        inventory = PackageInventory(self.logger, manager)
+        inventory.query = ["/bin/cat", outfile]
+        inventory.dbfiles = [self.dbfile]
+        return inventory
+
+    def testRpm(self):
+        '''test parsing of rpm -qa output'''
+
+        inventory = self.makeInventory("dnf", RPMOUTPUT)
+        self.assertTrue(inventory.isinstalled("bash"))
+        self.assertTrue(inventory.isinstalled("glibc.i686"))
+        self.assertTrue(inventory.isinstalled("shim-x64"))
+        self.assertFalse(inventory.isinstalled("telnet"))
+        self.assertFalse(inventory.isinstalled("bash.i686"))
+        self.assertEqual(inventory.getversions("kernel"),
+                         {"5.14.0-284.el9", "5.14.0-362.el9"})
+        self.assertEqual(inventory.getversions("shim-x64"), {"1:15.6-1.el9"})
+        self.assertEqual(inventory.getversions("telnet"), set())
+        self.assertEqual(inventory.loads, 1)
+
+    def testDpkg(self):
+        '''test parsing of dpkg-query output'''
+
+        inventory = self.makeInventory("apt-get", DPKGOUTPUT)
+        self.assertTrue(inventory.isinstalled("libc6"))
+        self.assertTrue(inventory.isinstalled("libc6:amd64"))
+        self.assertTrue(inventory.isinstalled("libstdc++6"))
+        # removed but not purged
+        self.assertFalse(inventory.isinstalled("telnet"))
+        self.assertEqual(inventory.getversions("bash"), {"5.1-6ubuntu1"})
+
+    def testFallback(self):
+        '''test that the inventory leaves patterns and unknown platforms to
+        the package manager'''
+
+        inventory = self.makeInventory("yum", RPMOUTPUT)
+        self.assertIsNone(inventory.isinstalled("kernel*"))
+        self.assertIsNone(inventory.isinstalled("bash -y"))
+        self.assertIsNone(inventory.isinstalled("glibc >= 2.34"))
+        self.assertEqual(inventory.loads, 0)
+        self.assertIsNone(
+            PackageInventory(self.logger, "portage").isinstalled("bash"))
+        self.assertIsNone(
+            PackageInventory(self.logger, None).isinstalled("bash"))
+        inventory.query = ["/bin/false"]
+        self.assertIsNone(inventory.isinstalled("bash"))
+
+    def testReload(self):
+        '''test that the inventory is read again after invalidation or a
+        package database change, and only then'''
+
+        inventory = self.makeInventory("zypper", RPMOUTPUT)
+        for _ in range(5):
+            self.assertTrue(inventory.isinstalled("bash"))
+        self.assertEqual(inventory.loads, 1)
+        inventory.invalidate()
+        self.assertTrue(inventory.isinstalled("bash"))
+        self.assertEqual(inventory.loads, 2)
+        with open(self.dbfile, "w") as f:
+            f.write("22")
+        self.assertTrue(inventory.isinstalled("bash"))
+        self.assertEqual(inventory.loads, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for reportuploader.py. A plain HTTP server on the loopback
+interface stands in for the report server.
+'''
+
+import http.client
+import http.server
+import json
+import os
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.stonix_resources.reportuploader import ReportUploader
+
+
+class FakeReportHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        body = self.rfile.read(length)
+        self.server.requests.append((self.path, self.headers['Content-Type'],
+                                     body))
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    '''threaded test server; http.server.ThreadingHTTPServer needs 3.7+'''
+
+    daemon_threads = True
+
+
+class PlainUploader(ReportUploader):
+    '''ReportUploader speaking plain HTTP to the test server'''
+
+    def connect(self):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                self.server, timeout=self.timeout)
+        return self.connection
+
+
+class zzzTestFrameworkReportUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeReportHandler)
+        self.httpd.requests = []
+        self.httpd.status = 200
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.tmpdir = tempfile.mkdtemp()
+        self.spooldir = os.path.join(self.tmpdir, 'spool')
+        self.report = os.path.join(self.tmpdir, 'stonix-xmlreport.xml')
+        with open(self.report, 'w') as fh:
+            fh.write('<run><findings><Rule val="x" /></findings></run>\n')
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.tmpdir)
+
+    def uploader(self, **kwargs):
+        uploader = PlainUploader('127.0.0.1:' +
+                                 str(self.httpd.server_address[1]),
+                                 self.spooldir, **kwargs)
+        uploader.sleep = lambda seconds: None
+        return uploader
+
+    def testUpload(self):
+        '''the report is posted as the file field of a multipart form'''
+        self.assertTrue(self.uploader().upload(self.report))
+        self.assertEqual(len(self.httpd.requests), 1)
+        path, ctype, body = self.httpd.requests[0]
+        self.assertEqual(path, '/stonix/results.php')
+        self.assertTrue(ctype.startswith('multipart/form-data; boundary='))
+        self.assertIn(b'name="file"; filename="stonix-xmlreport.xml"', body)
+        self.assertIn(b'<Rule val="x" />', body)
+
+    def testFailureSpooled(self):
+        '''a report the server rejects is retried, then spooled'''
+        self.httpd.status = 503
+        uploader = self.uploader(retries=3)
+        self.assertFalse(uploader.upload(self.report))
+        self.assertEqual(len(self.httpd.requests), 3)
+        spooled = uploader.getspooled()
+        self.assertEqual(len(spooled), 1)
+        self.assertTrue(spooled[0][1]['next'] > time.time())
+
+    def testDrain(self):
+        '''spooled reports which are due are sent after a successful upload'''
+        self.httpd.status = 503
+        uploader = self.uploader(retries=1)
+        uploader.upload(self.report)
+        uploader.upload(self.report)
+        self.httpd.status = 200
+        self.httpd.requests = []
+        # not due yet, only the current report is sent
+        uploader.upload(self.report)
+        self.assertEqual(len(self.httpd.requests), 1)
+        self.assertEqual(len(uploader.getspooled()), 2)
+        for report, state in uploader.getspooled():
+            state['next'] = 0
+            uploader.writestate(report, state)
+        self.httpd.requests = []
+        uploader.upload(self.report)
+        self.assertEqual(len(self.httpd.requests), 3)
+        self.assertEqual(uploader.getspooled(), [])
+
+    def testSpoolLimit(self):
+        '''the spool never holds more than maxfiles reports'''
+        self.httpd.status = 503
+        uploader = self.uploader(retries=1, maxfiles=2)
+        for i in range(5):
+            uploader.upload(self.report)
+        self.assertEqual(len(uploader.getspooled()), 2)
+        self.assertEqual(len([name for name in os.listdir(self.spooldir)
+                              if not name.endswith('.json')]), 2)
+
+    def testUnreachable(self):
+        '''an unreachable server does not raise'''
+        uploader = ReportUploader('127.0.0.1:1', self.spooldir, retries=1,
+                                  timeout=2)
+        self.assertFalse(uploader.upload(self.report))
+        self.assertEqual(len(uploader.getspooled()), 1)
+        with open(uploader.statepath(uploader.getspooled()[0][0])) as fh:
+            self.assertEqual(json.load(fh)['attempts'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
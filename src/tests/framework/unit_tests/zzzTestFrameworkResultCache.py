@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+'''
+Created on 2026/10/16
+
+Unit tests for the rule result cache: recording the inputs of a report and
+reusing a compliant result while those inputs are unchanged.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.environment import Environment
+from src.stonix_resources import filecache
+# the result cache module the file cache records into
+from src.stonix_resources.filecache import resultcache
+
+ResultCache = resultcache.ResultCache
+pathtoken = resultcache.pathtoken
+
+
+class FakeItem(object):
+    '''configuration item with a fixed value'''
+
+    def __init__(self, value):
+        self.value = value
+
+    def getkey(self):
+        return "FAKEITEM"
+
+    def getcurrvalue(self):
+        return self.value
+
+
+class FakeRule(object):
+    '''rule whose report is compliant while a file contains "yes"'''
+
+    def __init__(self, environ, path):
+        self.environ = environ
+        self.path = path
+        self.item = FakeItem(True)
+        self.compliant = False
+        self.rulesuccess = True
+        self.detailedresults = ""
+        self.currstate = "notconfigured"
+        self.cacheable = True
+        self.cacheinputs = []
+        self.reports = 0
+
+    def report(self):
+        self.reports += 1
+        self.compliant = "yes" in "".join(filecache.readlines(self.path))
+        self.detailedresults = "compliant" if self.compliant else "wrong"
+        self.currstate = "configured" if self.compliant else "notconfigured"
+        return self.compliant
+
+    def getrulename(self):
+        return "FakeRule"
+
+    def getconfigitems(self):
+        return [self.item]
+
+    def getcacheinputs(self):
+        return self.cacheinputs
+
+    def iscacheable(self):
+        return self.cacheable
+
+    def iscompliant(self):
+        return self.compliant
+
+    def getrulesuccess(self):
+        return self.rulesuccess
+
+    def getdetailedresults(self):
+        return self.detailedresults
+
+    def getcurrstate(self):
+        return self.currstate
+
+
+class zzzTestFrameworkResultCache(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create a rule input file and a cache file location'''
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.input = os.path.join(self.tmpdir, "input.conf")
+        self.cachefile = os.path.join(self.tmpdir, "db", "resultcache.json")
+        self.environ = Environment()
+        self.logger = LogDispatcher(self.environ)
+        self.write(self.input, "yes\n")
+
+    def tearDown(self):
+        '''remove the temporary files'''
+
+        resultcache.stoprecording()
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, contents, age=60):
+        '''write a file and give it a modification time in the past so that
+        it is not considered racy'''
+
+        with open(path, "w") as f:
+            f.write(contents)
+        past = time.time() - age
+        os.utime(path, (past, past))
+
+    def testPathToken(self):
+        '''test the tokens of changed, missing and racy files'''
+
+        token = pathtoken(self.input)
+        self.assertEqual(pathtoken(self.input), token)
+        self.write(self.input, "no\n", 30)
+        self.assertNotEqual(pathtoken(self.input), token)
+        os.chmod(self.input, 0o600)
+        self.assertNotEqual(pathtoken(self.input), token)
+        self.assertIsNone(pathtoken(os.path.join(self.tmpdir, "missing")))
+        with open(self.input, "w") as f:
+            f.write("just written\n")
+        self.assertIs(pathtoken(self.input), False)
+
+    def testRecording(self):
+        '''test that reads are recorded only while recording'''
+
+        missing = os.path.join(self.tmpdir, "missing")
+        filecache.readlines(self.input)
+        resultcache.startrecording()
+        filecache.readlines(self.input)
+        self.assertRaises(IOError, filecache.readlines, missing)
+        resultcache.suspend()
+        resultcache.untracked()
+        resultcache.resume()
+        inputs, tracked = resultcache.stoprecording()
+        self.assertTrue(tracked)
+        self.assertEqual(inputs, {self.input: pathtoken(self.input),
+                                  missing: None})
+        resultcache.startrecording()
+        resultcache.untracked()
+        self.assertFalse(resultcache.stoprecording()[1])
+        resultcache.recordpath(self.input)
+        self.assertFalse(resultcache.isrecording())
+
+    def testRunReport(self):
+        '''test reusing and refreshing a compliant result'''
+
+        rule = FakeRule(self.environ, self.input)
+        cache = ResultCache(self.cachefile, self.logger)
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 1)
+        rule.compliant = False
+        rule.detailedresults = ""
+        self.assertTrue(cache.runreport(rule))
+        self.assertEqual(rule.reports, 1)
+        self.assertTrue(rule.iscompliant())
+        self.assertEqual(rule.getdetailedresults(), "compliant")
+        self.assertEqual(rule.getcurrstate(), "configured")
+        # --no-cache evaluates the rule
+        self.assertFalse(cache.runreport(rule, False))
+        self.assertEqual(rule.reports, 2)
+        # a saved result is used by the next run
+        cache.save()
+        cache = ResultCache(self.cachefile, self.logger)
+        self.assertTrue(cache.runreport(rule))
+        self.assertEqual(rule.reports, 2)
+        # a changed configuration item value invalidates the result
+        rule.item.value = False
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 3)
+        self.assertTrue(cache.runreport(rule))
+        # a changed input invalidates the result, a non compliant result
+        # is not stored
+        self.write(self.input, "no\n", 30)
+        self.assertFalse(cache.runreport(rule))
+        self.assertFalse(rule.iscompliant())
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 5)
+        self.assertEqual(cache.getstats(),
+                         {'hits': 2, 'misses': 3, 'entries': 0})
+
+    def testNotCached(self):
+        '''test rules and results which must not be cached'''
+
+        rule = FakeRule(self.environ, self.input)
+        cache = ResultCache(self.cachefile, self.logger)
+        rule.cacheable = False
+        cache.runreport(rule)
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 2)
+        # a declared input that was just modified can not be fingerprinted
+        rule.cacheable = True
+        declared = os.path.join(self.tmpdir, "declared")
+        with open(declared, "w") as f:
+            f.write("new\n")
+        rule.cacheinputs = [declared]
+        cache.runreport(rule)
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 4)
+        # an expired result is not used
+        os.utime(declared, (time.time() - 60, time.time() - 60))
+        cache.maxage = 0
+        cache.runreport(rule)
+        self.assertFalse(cache.runreport(rule))
+        self.assertEqual(rule.reports, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the rulemanifest.py rule catalog.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.rulemanifest import RuleManifest, getmanifestpath
+
+
+class FakeRule(object):
+    '''Minimal stand in for a Rule instance'''
+
+    def __init__(self, num, name, applicable, rootrequired=False):
+        self.rulenumber = num
+        self.rulename = name
+        self.applicable = applicable
+        self.rootrequired = rootrequired
+
+    def getrulenum(self):
+        return self.rulenumber
+
+    def getrulename(self):
+        return self.rulename
+
+    def getisrootrequired(self):
+        return self.rootrequired
+
+
+class Rule(FakeRule):
+    '''Stands in for the Rule base class'''
+
+    def isapplicable(self):
+        return True
+
+
+class CustomRule(Rule):
+    '''A rule that decides its own applicability'''
+
+    def isapplicable(self):
+        return False
+
+
+class zzzTestFrameworkRuleManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.enviro = Environment()
+        self.logger = LogDispatcher(self.enviro)
+        self.rulesdir = tempfile.mkdtemp()
+        self.rulefile = os.path.join(self.rulesdir, 'SomeRule.py')
+        with open(self.rulefile, 'w') as fh:
+            fh.write('# rule')
+        family = self.enviro.getosfamily()
+        self.rules = [Rule(1, 'Everywhere', {'default': 'default'}),
+                      Rule(2, 'ThisFamily', {'type': 'white',
+                                             'family': [family]}),
+                      Rule(3, 'OtherFamily', {'type': 'black',
+                                              'family': [family]}),
+                      CustomRule(4, 'Custom', {'default': 'default'})]
+
+        self.statedir = tempfile.mkdtemp()
+        self.path = os.path.join(self.statedir, 'db', 'rulemanifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.rulesdir, ignore_errors=True)
+        shutil.rmtree(self.statedir, ignore_errors=True)
+
+    def testRoundTrip(self):
+        '''a saved manifest is loaded and filtered by applicability'''
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                self.path)
+        self.assertFalse(manifest.load())
+        manifest.build(self.rules)
+        self.assertTrue(manifest.save())
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                self.path)
+        self.assertTrue(manifest.load())
+        self.assertEqual(len(manifest.getentries()), 4)
+        self.assertEqual([entry['rulename'] for entry in manifest.select()],
+                         ['Everywhere', 'ThisFamily', 'Custom'])
+        self.assertEqual([entry['rulename'] for entry in
+                          manifest.select(['OtherFamily', 'ThisFamily'])],
+                         ['ThisFamily'])
+        entry = manifest.select(['Custom'])[0]
+        self.assertTrue(entry['customapplicable'])
+        self.assertEqual(entry['module'], __name__)
+        self.assertEqual(entry['classname'], 'CustomRule')
+
+    def testInvalidatedByRuleChange(self):
+        '''changing a rule file invalidates the manifest'''
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                self.path)
+        manifest.build(self.rules)
+        manifest.save()
+        with open(os.path.join(self.rulesdir, 'NewRule.py'), 'w') as fh:
+            fh.write('# rule')
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                self.path)
+        self.assertFalse(manifest.load())
+
+    def testStateLocation(self):
+        '''the manifest is kept outside of the rules directory and an
+        unwritable location only disables it'''
+        self.assertEqual(os.path.dirname(getmanifestpath(self.enviro)),
+                         '/var/db/stonix' if self.enviro.geteuid() == 0
+                         else self.enviro.get_log_path())
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                self.path)
+        manifest.build(self.rules)
+        self.assertTrue(manifest.save())
+        self.assertEqual(os.listdir(self.rulesdir), ['SomeRule.py'])
+        blocker = os.path.join(self.statedir, 'file')
+        open(blocker, 'w').close()
+        manifest = RuleManifest(self.logger, self.enviro, self.rulesdir,
+                                os.path.join(blocker, 'rulemanifest.json'))
+        manifest.build(self.rules)
+        self.assertFalse(manifest.save())
+        self.assertFalse(manifest.load())
+
+
+if __name__ == "__main__":
+    unittest.main()
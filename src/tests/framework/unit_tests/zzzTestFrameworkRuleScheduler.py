@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+
+'''
+Test suite for the rulescheduler.py parallel rule runner.
+'''
+
+import sys
+import threading
+import time
+import unittest
+
+sys.path.append("../../../..")
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.rulescheduler import RuleScheduler
+
+
+class FakeRule(object):
+    '''Minimal stand in for a Rule instance'''
+
+    def __init__(self, name, resources):
+        self.name = name
+        self.resources = resources
+
+    def getrulename(self):
+        return self.name
+
+    def getsharedresources(self):
+        return self.resources
+
+
+class zzzTestFrameworkRuleScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.enviro = Environment()
+        self.logger = LogDispatcher(self.enviro)
+        self.lock = threading.Lock()
+        self.active = {}
+        self.overlaps = []
+        self.maxrunning = 0
+
+    def tearDown(self):
+        pass
+
+    def action(self, rule):
+        with self.lock:
+            mine = set(rule.getsharedresources())
+            for other in self.active.values():
+                theirs = set(other.getsharedresources())
+                if mine & theirs or 'exclusive' in mine | theirs:
+                    self.overlaps.append((other.getrulename(),
+                                          rule.getrulename()))
+            self.active[rule.getrulename()] = rule
+            self.maxrunning = max(self.maxrunning, len(self.active))
+        time.sleep(0.05)
+        with self.lock:
+            del self.active[rule.getrulename()]
+
+    def testAllRulesRun(self):
+        '''every rule is run and reported exactly once'''
+        rules = [FakeRule('rule' + str(i), []) for i in range(10)]
+        completed = []
+        RuleScheduler(self.logger, 4).run(
+            rules, self.action, lambda rule, err: completed.append(rule))
+        self.assertEqual(sorted([r.getrulename() for r in completed]),
+                         sorted([r.getrulename() for r in rules]))
+        self.assertTrue(self.maxrunning > 1)
+        self.assertTrue(self.maxrunning <= 4)
+
+    def testSharedResourcesSerialized(self):
+        '''rules sharing a resource never run at the same time'''
+        rules = [FakeRule('pkg1', ['pkgdb']), FakeRule('pkg2', ['pkgdb']),
+                 FakeRule('svc1', ['servicemgr']),
+                 FakeRule('both', ['pkgdb', 'servicemgr']),
+                 FakeRule('excl', ['exclusive']), FakeRule('free', [])]
+        RuleScheduler(self.logger, 4).run(rules, self.action)
+        self.assertEqual(self.overlaps, [])
+
+    def testErrorPassedToCallback(self):
+        '''an exception raised by the action is handed to the callback'''
+        errors = []
+
+        def failing(rule):
+            raise ValueError(rule.getrulename())
+
+        RuleScheduler(self.logger, 2).run(
+            [FakeRule('bad', [])], failing,
+            lambda rule, err: errors.append(err))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], ValueError))
+
+    def testInvalidJobs(self):
+        '''invalid job counts fall back to a single worker'''
+        self.assertEqual(RuleScheduler(self.logger, 0).getjobs(), 1)
+        self.assertEqual(RuleScheduler(self.logger, 'x').getjobs(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -31,6 +31,8 @@ Created on Oct 4, 2012
         was relying on OS commands which no longer work and the code itself was not being
         used anywhere in this test anyway
 @change: 2019/04/09 Breen Malmberg - unit test refactor
+@change: 2026/10/16 added testSnapshot
+@change: 2026/10/16 added testSharedBackends
 """
 
 import os
@@ -156,5 +158,46 @@ class zzzTestFrameworkServiceHelper(unittest.TestCase):
         if self.mysh.stopService(*self.service):
             self.assertFalse(self.mysh.isRunning(*self.service))
 
+    def testSharedBackends(self):
+        '''test that service helpers share the detected backends'''
+
+        other = ServiceHelper(self.environ, self.logger)
+        self.assertIs(other.svchelper, self.mysh.svchelper)
+        self.assertIs(other.secondary, self.mysh.secondary)
+        self.assertIs(other.lock, self.mysh.lock)
+
+    def testSnapshot(self):
+        '''test that audits answered from a service state snapshot agree
+        with audits of each service
+
+
+        '''
+
+        services = self.mysh.listServices()[:25]
+        before = [(self.mysh.auditService(s), self.mysh.isRunning(s))
+                  for s in services]
+        self.mysh.takeSnapshot()
+        after = [(self.mysh.auditService(s), self.mysh.isRunning(s))
+                 for s in services]
+        self.assertEqual(before, after)
+
+    def testClearSnapshot(self):
+        '''test that audits are no longer answered from the service state
+        snapshot once it has been cleared
+
+
+        '''
+
+        getstate = getattr(self.mysh.svchelper, 'getSnapshotState', None)
+        if getstate is None:
+            self.skipTest("service helper does not take snapshots")
+        services = self.mysh.listServices()[:25]
+        if not self.mysh.takeSnapshot():
+            self.skipTest("unable to take a service state snapshot")
+        self.mysh.clearSnapshot()
+        for service in services:
+            self.assertIsNone(getstate('enabled', service))
+            self.assertIsNone(getstate('active', service))
+
 if __name__ == "__main__":
     unittest.main()
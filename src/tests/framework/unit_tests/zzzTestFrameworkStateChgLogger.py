@@ -25,8 +25,11 @@ Created on Aug 24, 2012
     /var/db to /var/db
 @change: 2016/02/10 roy - adding sys.path.append for both test framework and individual
                           test runs.
+@change: 2026/10/16 - added batch and shelve migration tests
 '''
+import glob
 import os
+import shelve
 import shutil
 import sys
 import unittest
@@ -43,8 +46,7 @@ class zzzTestFrameworkStateChgLogger(unittest.TestCase):
         self.environ = environment.Environment()
         self.environ.setdebugmode(True)
         self.logger = logdispatcher.LogDispatcher(self.environ)
-        if os.path.exists('/var/db/stonix/eventlog'):
-            os.remove('/var/db/stonix/eventlog')
+        self.removelogs()
         self.testobj = StateChgLogger.StateChgLogger(self.logger, self.environ)
         self.srcfile = '/etc/stonixtest.conf'
         self.dstfile = '/etc/stonixtest.conf.tmp'
@@ -58,6 +60,10 @@ class zzzTestFrameworkStateChgLogger(unittest.TestCase):
         except OSError:
             pass
 
+    def removelogs(self):
+        for logfile in glob.glob('/var/db/stonix/eventlog*'):
+            os.remove(logfile)
+
     def mktestfiles(self):
         whandle = open(self.srcfile, 'w')
         whandle2 = open(self.dstfile, 'w')
@@ -176,6 +182,34 @@ key4 = True
         self.assertEqual(expected, myreturn2[0],
                              'Expected event id not returned')
 
+    def testBatch(self):
+        mydict = {'eventtype': 'perm',
+                  'startstate': '0,0,420',
+                  'endstate': '0,0,416'}
+        with self.testobj.batch():
+            self.testobj.recordchgevent('9999006', mydict)
+            self.testobj.recordchgevent('9999007', mydict)
+            self.assertEqual(self.testobj.getchgevent('9999007'), mydict)
+        self.testobj.closelog()
+        self.testobj = StateChgLogger.StateChgLogger(self.logger, self.environ)
+        self.assertEqual(self.testobj.findrulechanges(9999),
+                         ['9999006', '9999007'])
+        self.assertRaises(KeyError, self.testobj.getchgevent, '9999008')
+
+    def testShelveMigration(self):
+        self.testobj.closelog()
+        self.removelogs()
+        mydict = {'eventtype': 'perm',
+                  'startstate': [0, 0, 420],
+                  'endstate': [0, 0, 416]}
+        oldlog = shelve.open('/var/db/stonix/eventlog', 'c')
+        oldlog['0888009'] = mydict
+        oldlog.close()
+        self.testobj = StateChgLogger.StateChgLogger(self.logger, self.environ)
+        self.assertEqual(self.testobj.getchgevent('0888009'), mydict)
+        self.assertEqual(self.testobj.findrulechanges(888), ['0888009'])
+        self.assertEqual(glob.glob('/var/db/stonix/eventlog'), [])
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+###############################################################################
+#                                                                             #
+# Copyright 2019. Triad National Security, LLC. All rights reserved.          #
+# This program was produced under U.S. Government contract 89233218CNA000001  #
+# for Los Alamos National Laboratory (LANL), which is operated by Triad       #
+# National Security, LLC for the U.S. Department of Energy/National Nuclear   #
+# Security Administration.                                                    #
+#                                                                             #
+# All rights in the program are reserved by Triad National Security, LLC, and #
+# the U.S. Department of Energy/National Nuclear Security Administration. The #
+# Government is granted for itself and others acting on its behalf a          #
+# nonexclusive, paid-up, irrevocable worldwide license in this material to    #
+# reproduce, prepare derivative works, distribute copies to the public,       #
+# perform publicly and display publicly, and to permit others to do so.       #
+#                                                                             #
+###############################################################################
+'''
+Created on 2026/10/16
+
+Unit tests for the shared sysctl service, run against a fake /proc/sys tree
+and fake sysctl configuration files.
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.append("../../../..")
+from src.tests.lib.logdispatcher_lite import LogDispatcher
+from src.stonix_resources.environment import Environment
+from src.stonix_resources.sysctlservice import SysctlService
+
+
+class zzzTestFrameworkSysctlService(unittest.TestCase):
+    '''Class docs'''
+
+    def setUp(self):
+        '''create fake /proc/sys and configuration trees'''
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.procsys = os.path.join(self.tmpdir, "proc", "sys")
+        self.etcdir = os.path.join(self.tmpdir, "etc", "sysctl.d")
+        self.libdir = os.path.join(self.tmpdir, "usr", "lib", "sysctl.d")
+        self.conf = os.path.join(self.tmpdir, "etc", "sysctl.conf")
+        self.write(os.path.join(self.procsys, "net/ipv4/ip_forward"), "1\n")
+        self.write(os.path.join(self.procsys, "fs/suid_dumpable"), "0\n")
+        self.write(os.path.join(self.procsys, "net/ipv4/tcp_rmem"),
+                   "4096\t131072\t6291456\n")
+        self.logger = LogDispatcher(Environment())
+        self.service = SysctlService(self.logger, self.procsys, self.conf,
+                                     [self.etcdir, self.libdir])
+        # never run the real sysctl command against the fake tree
+        self.service.sysctl = ""
+
+    def tearDown(self):
+        '''remove the fake trees'''
+
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, path, contents):
+        '''write a file, creating its directory'''
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(contents)
+
+    def testValues(self):
+        '''test reading and comparing runtime values'''
+
+        self.assertEqual(self.service.getvalue("net.ipv4.ip_forward"), "1")
+        self.assertEqual(self.service.getvalue("net/ipv4/ip_forward"), "1")
+        self.assertEqual(self.service.getvalue("net.ipv4.tcp_rmem"),
+                         "4096 131072 6291456")
+        self.assertIsNone(self.service.getvalue("net.ipv6.conf.all.mtu"))
+        wrong, unknown = self.service.checkvalues(
+            {"net.ipv4.ip_forward": "0", "fs.suid_dumpable": "0",
+             "net.ipv4.tcp_rmem": "4096 131072  6291456",
+             "net.ipv6.conf.all.mtu": "1280"})
+        self.assertEqual(wrong, {"net.ipv4.ip_forward": "1"})
+        self.assertEqual(unknown, ["net.ipv6.conf.all.mtu"])
+        # changes made behind the service's back are seen
+        self.write(os.path.join(self.procsys, "net/ipv4/ip_forward"), "0\n")
+        self.assertEqual(self.service.checkvalues(
+            {"net.ipv4.ip_forward": "0"}), ({}, []))
+
+    def testSetValues(self):
+        '''test that only differing, existing keys are written'''
+
+        changed, failed = self.service.setvalues(
+            {"net.ipv4.ip_forward": "0", "fs.suid_dumpable": "0",
+             "net.ipv6.conf.all.mtu": "1280"})
+        self.assertEqual(changed, {"net.ipv4.ip_forward": "1"})
+        self.assertEqual(failed, [])
+        self.assertEqual(self.service.getvalue("net.ipv4.ip_forward"), "0")
+        self.assertFalse(os.path.exists(os.path.join(self.procsys,
+                                                     "net/ipv6")))
+        self.assertEqual(self.service.commands, 0)
+        self.assertFalse(self.service.reload())
+
+    def testConfig(self):
+        '''test the precedence of the configuration files'''
+
+        self.write(os.path.join(self.libdir, "50-default.conf"),
+                   "net.ipv4.ip_forward = 1\nfs.suid_dumpable=2\n")
+        self.write(os.path.join(self.libdir, "60-masked.conf"),
+                   "kernel.dmesg_restrict = 0\n")
+        self.write(os.path.join(self.etcdir, "60-masked.conf"),
+                   "# local override\n; of the vendor file\n" +
+                   "-kernel/dmesg_restrict = 1\n")
+        self.write(os.path.join(self.etcdir, "README"), "a = b\n")
+        self.write(self.conf, "fs.suid_dumpable = 0\n")
+        self.assertEqual(self.service.getfiles(),
+                         [os.path.join(self.libdir, "50-default.conf"),
+                          os.path.join(self.etcdir, "60-masked.conf"),
+                          self.conf])
+        config = self.service.getconfig()
+        self.assertEqual(config["net.ipv4.ip_forward"],
+                         ("1", os.path.join(self.libdir, "50-default.conf")))
+        self.assertEqual(config["kernel.dmesg_restrict"],
+                         ("1", os.path.join(self.etcdir, "60-masked.conf")))
+        self.assertEqual(self.service.getconfigured("fs.suid_dumpable"),
+                         ("0", self.conf))
+        self.assertEqual(self.service.getconfigured("vm.swappiness"),
+                         (None, None))
+        self.assertTrue(self.service.describe("fs.suid_dumpable").endswith(
+            "set to 0 in " + self.conf))
+
+
+if __name__ == "__main__":
+    unittest.main()
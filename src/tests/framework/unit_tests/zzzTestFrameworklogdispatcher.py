@@ -25,14 +25,28 @@ Created on Sep 21, 2011
 @change: 2016-02-10 roy - adding sys.path.append for both test framework and 
                           individual test runs.
 '''
+import gzip
+import os
+import shutil
 import sys
+import tempfile
+import threading
 import unittest
+import xml.etree.ElementTree as ET
 
 sys.path.append("../../../..")
-from src.stonix_resources.logdispatcher import LogDispatcher, LogPriority
+from src.stonix_resources.logdispatcher import LogDispatcher, LogPriority, \
+    LogEvent, MessageData, xmlReport
 import src.stonix_resources.environment as environment
 
 
+def entry(tag, detail):
+    data = MessageData()
+    data.Tag = tag
+    data.Detail = detail
+    return data
+
+
 class zzzTestFrameworklogdispatcher(unittest.TestCase):
 
     def setUp(self):
@@ -87,6 +101,82 @@ class zzzTestFrameworklogdispatcher(unittest.TestCase):
                                                   "Error message text"])
         except:
             self.fail("Failed to write formatted ERROR message")
+    def testLogEvent(self):
+        try:
+            self.logger.logevent(LogEvent.RULESTART, "TestRule")
+            self.logger.logevent(LogEvent.STARTREPORT)
+            self.logger.logevent(LogEvent.ENDREPORT)
+            self.logger.logevent(LogEvent.RULEEND, "TestRule")
+        except:
+            self.fail("Failed to write rule events to log file")
+
+    def testCallerPrefix(self):
+        prefix = self.logger.callerprefix(sys._getframe())
+        self.assertTrue(prefix.startswith(__name__ + ":testCallerPrefix"),
+                        "Unexpected caller prefix: " + prefix)
+
+    def testXmlReportStreaming(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'report.xml')
+            report = xmlReport(path)
+            report.writeMetadata(entry('Hostname', 'host & co'))
+            report.writeMetadata(entry('OS', 'Linux'))
+            for i in range(100):
+                report.writeFinding(entry('Rule' + str(i), 'finding'))
+            # the file must be a complete document before it is closed
+            root = ET.parse(path).getroot()
+            self.assertEqual(root.tag, 'run')
+            self.assertEqual([child.tag for child in root],
+                             ['metadata', 'findings'])
+            self.assertEqual(root[0][0].get('val'), 'host & co')
+            self.assertEqual(len(root[1]), 100)
+            report.writeMetadata(entry('RuleCount', '100'))
+            report.closeReport()
+            root = ET.parse(path).getroot()
+            self.assertEqual([child.tag for child in root],
+                             ['metadata', 'findings', 'metadata'])
+            self.assertEqual(report.getreportpath(), path)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testXmlReportThreads(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'report.xml')
+            report = xmlReport(path)
+
+            def writer(name):
+                for i in range(200):
+                    if i % 10 == 0:
+                        report.writeMetadata(entry(name + 'Meta', str(i)))
+                    report.writeFinding(entry(name, str(i)))
+            threads = [threading.Thread(target=writer, args=('Rule' + str(i),))
+                       for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            report.closeReport()
+            root = ET.parse(path).getroot()
+            self.assertEqual(sum(len(child) for child in root), 4 * 220)
+            self.assertEqual(report.entries, 4 * 220)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def testXmlReportCompressed(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'report.xml')
+            report = xmlReport(path, compress=True)
+            report.writeFinding(entry('Rule', 'finding'))
+            report.closeReport()
+            self.assertEqual(report.getreportpath(), path + '.gz')
+            with gzip.open(path + '.gz', 'rb') as fh:
+                root = ET.fromstring(fh.read())
+            self.assertEqual(root[0][0].tag, 'Rule')
+        finally:
+            shutil.rmtree(tmpdir)
 
 if __name__ == "__main__":
     unittest.main()
@@ -26,6 +26,7 @@ Created on Jul 31, 2012
 @change: 2016-02-10 roy - adding sys.path.append for both test framework and
                           individual test runs.
 @change: 2016/07/15 eball Added feedback to assertions
+@change: 2026/10/16 added testTransaction
 '''
 import sys
 import unittest
@@ -34,6 +35,44 @@ sys.path.append("../../../..")
 import src.stonix_resources.pkghelper as pkghelper
 from src.tests.lib.logdispatcher_lite import LogDispatcher
 import src.stonix_resources.environment as environment
+from src.stonix_resources.pkginventory import PackageInventory
+
+
+class FakeBackend(object):
+    '''package manager backend which records its invocations and refuses
+    the whole transaction if it contains an unknown package'''
+
+    def __init__(self, installed, known):
+        self.installed = set(installed)
+        self.known = set(known)
+        self.calls = []
+
+    def transaction(self, package, install):
+        self.calls.append(package)
+        names = package.split()
+        if not self.known.issuperset(names):
+            return False
+        if install:
+            self.installed.update(names)
+        else:
+            self.installed.difference_update(names)
+        return True
+
+    def installpackage(self, package):
+        return self.transaction(package, True)
+
+    def removepackage(self, package):
+        return self.transaction(package, False)
+
+    def checkInstall(self, package):
+        return package in self.installed
+
+
+class FakeEnviron(object):
+    '''environment reporting root'''
+
+    def geteuid(self):
+        return 0
 
 
 class zzzTestFrameworkpkghelper(unittest.TestCase):
@@ -68,6 +107,44 @@ class zzzTestFrameworkpkghelper(unittest.TestCase):
                             "Could not remove " + self.pkg)
             self.assertFalse(self.helper.check(self.pkg),
                              self.pkg + " still found after pkghelper.remove")
+    def testTransaction(self):
+        backend = FakeBackend(["rsh", "talk", "vsftpd"],
+                              ["rsh", "talk", "vsftpd", "tftp"])
+        self.helper.pckgr = backend
+        self.helper.enviro = FakeEnviron()
+        self.helper.manager = "dnf"
+        self.helper.inventory = PackageInventory(self.logger, None)
+
+        for pkg in ["rsh", "talk", "vsftpd"]:
+            self.helper.queueRemove(pkg)
+        self.helper.queueInstall("tftp")
+        results = self.helper.commitTransaction()
+        self.assertEqual(results, {"rsh": True, "talk": True,
+                                   "vsftpd": True, "tftp": True})
+        self.assertEqual(backend.calls, ["rsh talk vsftpd", "tftp"],
+                         "packages were not removed in one transaction")
+        self.assertEqual(backend.installed, {"tftp"})
+
+        # an unknown package aborts the batch, the others are retried alone
+        backend.calls = []
+        for pkg in ["rsh", "nosuchpackage", "talk"]:
+            self.helper.queueInstall(pkg)
+        results = self.helper.commitTransaction()
+        self.assertEqual(results, {"rsh": True, "nosuchpackage": False,
+                                   "talk": True})
+        self.assertEqual(backend.calls, ["rsh nosuchpackage talk", "rsh",
+                                         "nosuchpackage", "talk"])
+        self.assertEqual(self.helper.commitTransaction(), {},
+                         "queue was not cleared by commitTransaction")
+
+        # package managers without batch support get one call per package
+        backend.calls = []
+        self.helper.manager = "portage"
+        self.helper.queueRemove("rsh")
+        self.helper.queueRemove("talk")
+        self.helper.commitTransaction()
+        self.assertEqual(backend.calls, ["rsh", "talk"])
+
 
 if __name__ == "__main__":
     unittest.main()
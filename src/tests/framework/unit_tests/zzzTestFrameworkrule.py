@@ -30,6 +30,7 @@ Test suite for the rule.py base class.
 '''
 import re
 import sys
+import types
 import unittest
 
 sys.path.append("../../../..")
@@ -47,6 +48,7 @@ class zzzTestFramework(unittest.TestCase):
         config = configuration.Configuration(myenv)
         logger = logdispatcher.LogDispatcher(myenv)
         state = StateChgLogger.StateChgLogger(logger, myenv)
+        self.args = (config, myenv, logger, state)
         self.to = rule.Rule(config, myenv, logger, state)
 
     def tearDown(self):
@@ -307,6 +309,29 @@ class zzzTestFramework(unittest.TestCase):
         self.to.settargetstate('notconfigured')
         self.assertEqual(self.to.gettargetstate(), 'notconfigured')
 
+    def testgetsharedresources(self):
+        '''getsharedresources returns the declared resources plus pkgdb or
+        servicemgr for rules whose module uses Pkghelper or ServiceHelper.
+        The base class declares nothing.
+
+
+        '''
+        self.assertEqual(self.to.getsharedresources(), [])
+        module = types.ModuleType('FakeHelperRule')
+        module.ServiceHelper = object
+        module.Pkghelper = object
+        sys.modules['FakeHelperRule'] = module
+        try:
+            klass = type('FakeHelperRule', (rule.Rule,),
+                         {'__module__': 'FakeHelperRule'})
+            fake = klass(*self.args)
+            fake.sharedresources = ['modprobe', 'servicemgr']
+            self.assertEqual(fake.getsharedresources(),
+                             ['modprobe', 'servicemgr', 'pkgdb'])
+            self.assertEqual(fake.sharedresources, ['modprobe', 'servicemgr'])
+        finally:
+            del sys.modules['FakeHelperRule']
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
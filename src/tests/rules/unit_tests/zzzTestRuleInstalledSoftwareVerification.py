@@ -55,6 +55,16 @@ class zzzTestRuleInstalledSoftwareVerification(RuleTest):
     def runTest(self):
         pass
 
+    def testParseVerifyLine(self):
+        path, deviations = self.rule.parseVerifyLine(".M.......    /usr/bin/passwd")
+        self.assertEqual(path, "/usr/bin/passwd")
+        self.assertEqual(deviations, ["perm"])
+        path, deviations = self.rule.parseVerifyLine(".....UG..  c /etc/sudoers")
+        self.assertEqual(path, "/etc/sudoers")
+        self.assertEqual(sorted(deviations), ["group", "owner"])
+        path, deviations = self.rule.parseVerifyLine("missing   c /etc/foo.conf")
+        self.assertEqual(path, None)
+
     def setConditionsForRule(self):
         '''Configure system for the unit test
 